@@ -1,15 +1,194 @@
-from flask import Flask, request
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-import hashlib
+from collections import namedtuple
+from flask import Flask, Response, g, request, url_for
+from flask_jwt_extended import JWTManager, create_access_token, decode_token
+from jwt import ExpiredSignatureError, PyJWTError
+from flask_jwt_extended.exceptions import JWTExtendedException
+import functools
+import io
+import os
+import threading
+
+# Las operaciones y el estado de la API se comparten con la versión ASGI (api_asgi.py).
+import api_operaciones as operaciones
+from api_operaciones import contador_tareas, proyectos, tareas, usuarios  # noqa: F401
+
+from gestor_de_tareas.utilidades.cache import CacheLRU
+from gestor_de_tareas.utilidades.metricas import instrumentar_app
+from gestor_de_tareas.utilidades.paginacion import normalizar_limite
+from gestor_de_tareas.utilidades.exportacion import FORMATOS, agrupar
+from gestor_de_tareas.utilidades.importacion import leer_csv, leer_ndjson
 
 app = Flask(__name__)
 
 app.config["JWT_SECRET_KEY"] = "bocatalomoya"  # Cambia esta clave por una más segura
 jwt = JWTManager(app)
 
-# Base de datos simulada para los usuarios y tareas
-usuarios = {}
-tareas = {}
+# Tokens ya verificados: token -> Sesion. Verificar la firma de un token en cada petición
+# cuesta más que el resto de una consulta sencilla, así que cada token se verifica una vez y
+# se reutiliza hasta que caduca. Su tamaño se ajusta con API_CACHE_TOKENS (0 la desactiva).
+# La revocación se comprueba en cada petición, también con el token en la caché.
+cache_tokens = CacheLRU(int(os.environ.get("API_CACHE_TOKENS", 10_000)))
+
+# Datos de un token verificado: usuario, identificador único (jti) e instante de caducidad.
+Sesion = namedtuple("Sesion", ["usuario", "jti", "caduca"])
+
+
+def crear_token(usuario):
+    """
+    Crea un token de acceso para el usuario con la configuración JWT de esta aplicación.
+
+    Parameters
+    ----------
+    usuario : str
+        Identidad del token.
+
+    Returns
+    -------
+    str
+        Token JWT firmado.
+    """
+    with app.app_context():
+        return create_access_token(identity=usuario)
+
+
+def verificar_token(token):
+    """
+    Verifica la firma y la caducidad de un token de acceso.
+
+    Usa la misma configuración que Flask-JWT-Extended, de modo que la aplicación ASGI acepta
+    los mismos tokens que esta. El resultado se guarda en `cache_tokens` hasta que el token
+    caduca; no comprueba si está revocado (ver `autenticar`).
+
+    Parameters
+    ----------
+    token : str
+        Token JWT sin el prefijo "Bearer".
+
+    Returns
+    -------
+    Sesion
+        Usuario, jti y caducidad del token.
+
+    Raises
+    ------
+    jwt.exceptions.PyJWTError
+        Si el token no es válido o ha caducado.
+    """
+    sesion = cache_tokens.obtener(token)
+    if sesion is None:
+        with app.app_context():
+            datos = decode_token(token)
+        sesion = Sesion(datos[app.config["JWT_IDENTITY_CLAIM"]], datos["jti"], datos["exp"])
+        cache_tokens.guardar(token, sesion, sesion.caduca)
+    return sesion
+
+
+def autenticar(cabecera):
+    """
+    Obtiene la sesión del token de una cabecera Authorization.
+
+    Los errores tienen el mismo formato y código que los de `jwt_required` de
+    Flask-JWT-Extended.
+
+    Parameters
+    ----------
+    cabecera : Optional[str]
+        Valor de la cabecera Authorization, o None si no se ha enviado.
+
+    Returns
+    -------
+    tuple
+        (sesión, None) si el token es válido, o (None, (cuerpo, código de estado)).
+    """
+    if cabecera is None:
+        return None, ({"msg": "Missing Authorization Header"}, 401)
+    partes = cabecera.split()
+    if len(partes) != 2 or partes[0] != "Bearer":
+        return None, ({"msg": "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'"}, 422)
+    try:
+        sesion = verificar_token(partes[1])
+    except ExpiredSignatureError:
+        return None, ({"msg": "Token has expired"}, 401)
+    except (PyJWTError, JWTExtendedException) as error:
+        return None, ({"msg": str(error)}, 422)
+    if operaciones.token_revocado(sesion.jti):
+        return None, ({"msg": "Token has been revoked"}, 401)
+    return sesion, None
+
+
+def autenticacion_requerida(vista):
+    """
+    Decorador para las rutas que requieren un token JWT, en lugar de `jwt_required`.
+
+    Deja la sesión del token en `g.sesion` (ver `usuario_actual`).
+    """
+    @functools.wraps(vista)
+    def envoltura(*args, **kwargs):
+        g.sesion, error = autenticar(request.headers.get('Authorization'))
+        if error is not None:
+            return error
+        return vista(*args, **kwargs)
+    return envoltura
+
+
+def usuario_actual():
+    """
+    Devuelve el usuario del token de la petición en curso.
+    """
+    return g.sesion.usuario
+
+
+def condicional(vista):
+    """
+    Decorador para las rutas GET que devuelven datos del usuario: envía su versión como ETag
+    y responde 304 sin ejecutar la vista si el cliente ya la tiene (If-None-Match).
+
+    El ETag es la versión de los datos del usuario (ver `operaciones.version_usuario`), que se
+    lee antes de la vista; así nunca es más reciente que el cuerpo que acompaña. Va después
+    de `autenticacion_requerida`.
+    """
+    @functools.wraps(vista)
+    def envoltura(*args, **kwargs):
+        etag = operaciones.version_usuario(usuario_actual())
+        if request.if_none_match.contains_weak(etag):
+            respuesta = Response(status=304)
+        else:
+            respuesta = app.make_response(vista(*args, **kwargs))
+            if respuesta.status_code != 200:
+                return respuesta
+        respuesta.set_etag(etag)
+        respuesta.headers['Cache-Control'] = 'private, no-cache'
+        respuesta.vary.add('Authorization')
+        return respuesta
+    return envoltura
+
+
+def respuesta_paginada(datos, siguiente):
+    """
+    Construye la respuesta de un listado paginado.
+
+    El cuerpo conserva el formato de siempre y el cursor de la página siguiente se envía en
+    la cabecera X-Cursor-Siguiente y en una cabecera Link con rel="next".
+
+    Parameters
+    ----------
+    datos : dict
+        Elementos de la página.
+    siguiente : Optional[str]
+        Cursor de la página siguiente, o None si es la última.
+
+    Returns
+    -------
+    tuple
+        (cuerpo, código de estado, cabeceras).
+    """
+    cabeceras = {}
+    if siguiente is not None:
+        parametros = request.args.to_dict()
+        parametros['cursor'] = siguiente
+        url = url_for(request.endpoint, **(request.view_args or {}), **parametros)
+        cabeceras = {'X-Cursor-Siguiente': siguiente, 'Link': f'<{url}>; rel="next"'}
+    return datos, 200, cabeceras
 
 
 # Ruta de prueba para verificar el funcionamiento de la API
@@ -22,13 +201,8 @@ def hello_world():
 @app.route('/signup', methods=['POST'])
 def signup():
     username = request.args.get('user', '')
-    if username in usuarios:
-        return f'Usuario {username} ya existe', 409
-    else:
-        contraseña = request.args.get('contraseña', '')
-        hashed = hashlib.sha256(contraseña.encode()).hexdigest()
-        usuarios[username] = hashed
-        return f'Usuario {username} registrado con éxito', 200
+    contraseña = request.args.get('contraseña', '')
+    return operaciones.registrar_usuario(username, operaciones.cifrar_contraseña(contraseña))
 
 
 # Inicio de sesión de usuario
@@ -36,169 +210,232 @@ def signup():
 def signin():
     username = request.args.get('user', '')
     contraseña = request.args.get('contraseña', '')
-    hashed = hashlib.sha256(contraseña.encode()).hexdigest()
 
-    if username in usuarios and usuarios[username] == hashed:
+    if operaciones.comprobar_usuario(username, operaciones.cifrar_contraseña(contraseña)):
         # Crear el token de acceso
-        access_token = create_access_token(identity=username)
-        return {'access_token': access_token}, 200
+        return {'access_token': crear_token(username)}, 200
     else:
         return 'Usuario o contraseña incorrectos', 401
 
 
-# Obtener todas las tareas (requiere autenticación JWT)
+# Cierre de sesión: revoca el token usado en la petición (requiere autenticación JWT)
+@app.route('/signout', methods=['POST'])
+@autenticacion_requerida
+def signout():
+    operaciones.revocar_token(g.sesion.jti, g.sesion.caduca)
+    cache_tokens.quitar(request.headers['Authorization'].split()[1])
+    return 'Sesión cerrada', 200
+
+
+# Obtener las tareas del usuario por páginas, en orden de ID (requiere autenticación JWT).
+# Parámetros opcionales: 'limit' (tareas por página) y 'cursor' (devuelto por la página anterior).
 @app.route('/tareas', methods=['GET'])
-@jwt_required()
+@autenticacion_requerida
+@condicional
 def get_tareas():
-    usuario_actual = get_jwt_identity()  # Obtener el usuario actual
-    usuario_tareas = {tarea_id: tarea for tarea_id, tarea in tareas.items() if tarea['user'] == usuario_actual}
-    return usuario_tareas, 200
+    usuario = usuario_actual()  # Obtener el usuario actual
+    limite = normalizar_limite(request.args.get('limit'))
+    ultimo = operaciones.leer_cursor_entero(request.args.get('cursor'))
+    if ultimo is None:
+        return 'Cursor no válido', 400
+    return respuesta_paginada(*operaciones.listar_tareas(usuario, limite, ultimo))
+
+
+# Buscar tareas del usuario por palabras del nombre y la descripción, de más a menos relevante
+# (requiere autenticación JWT). Parámetros: 'q' (texto a buscar), y opcionales 'limit' y 'cursor'.
+@app.route('/buscar/tareas', methods=['GET'])
+@autenticacion_requerida
+@condicional
+def buscar_tareas():
+    inicio = operaciones.leer_cursor_entero(request.args.get('cursor'))
+    if inicio is None or inicio < 0:
+        return 'Cursor no válido', 400
+    limite = normalizar_limite(request.args.get('limit'))
+    cuerpo, estado, siguiente = operaciones.buscar_tareas(usuario_actual(), request.args.get('q', '').strip(),
+                                                          limite, inicio)
+    if estado != 200:
+        return cuerpo, estado
+    return respuesta_paginada(cuerpo, siguiente)
+
+
+# Exportar todas las tareas del usuario en streaming (requiere autenticación JWT).
+# Parámetro opcional 'formato': "ndjson" (por defecto) o "csv". La respuesta se envía por bloques
+# a medida que se serializa, sin construir la exportación completa en memoria.
+@app.route('/exportar/tareas', methods=['GET'])
+@autenticacion_requerida
+@condicional
+def exportar_tareas():
+    usuario = usuario_actual()
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in FORMATOS:
+        return f'Formato no válido: {formato}', 400
+    ids = operaciones.ids_para_exportar(usuario)
+    lineas = operaciones.lineas_csv_api(ids) if formato == 'csv' else operaciones.lineas_ndjson_api(ids)
+    return Response(agrupar(lineas), mimetype=FORMATOS[formato],
+                    headers={'Content-Disposition': f'attachment; filename="tareas.{formato}"'})
+
+
+# Cambios en las tareas y proyectos del usuario desde una versión (requiere autenticación JWT).
+# Parámetro 'desde': el ETag de una respuesta anterior (sin comillas) o la 'version' de la
+# respuesta anterior de esta ruta. Devuelve solo lo que ha cambiado (null si se ha eliminado) y
+# la nueva versión; 410 si esa versión ya no está en el registro y hay que volver a cargar todo.
+@app.route('/cambios', methods=['GET'])
+@autenticacion_requerida
+@condicional
+def cambios():
+    return operaciones.cambios_desde(usuario_actual(), request.args.get('desde'))
+
+
+# Flujo de cambios del usuario como server-sent events (requiere autenticación JWT), en lugar de
+# sondear /cambios. Empieza en la versión del parámetro 'desde' o de la cabecera Last-Event-ID
+# (al reconectar) o, si no se indica, en la actual, que se envía en un evento "inicio". Después
+# envía un evento "cambios" (el cuerpo de /cambios) cada vez que cambian sus datos, o
+# "reiniciar" si hay que volver a cargarlos. EventSource no puede enviar la cabecera
+# Authorization, así que en el navegador hay que leer el flujo con fetch().
+# Con WSGI cada flujo abierto ocupa un hilo del servidor; para muchos clientes conviene servir
+# api_asgi.py, donde un flujo en espera no ocupa ninguno.
+@app.route('/cambios/eventos', methods=['GET'])
+@autenticacion_requerida
+def eventos_cambios():
+    usuario = usuario_actual()
+    desde = request.args.get('desde') or request.headers.get('Last-Event-ID')
+    if desde is not None and not operaciones.version_valida(desde):
+        return "El parámetro desde debe ser una versión devuelta por la API", 400
+
+    def flujo():
+        aviso = threading.Event()
+        operaciones.suscribir(usuario, aviso.set)
+        try:
+            version = desde
+            if version is None:
+                version = operaciones.version_usuario(usuario)
+                yield operaciones.evento('inicio', {'version': version}, version)
+            while True:
+                aviso.clear()
+                mensaje, version = operaciones.evento_cambios(usuario, version)
+                if mensaje is not None:
+                    yield mensaje
+                elif not aviso.wait(operaciones.LATIDO_EVENTOS):
+                    yield b': latido\n\n'
+        finally:
+            operaciones.cancelar_suscripcion(usuario, aviso.set)
+
+    return Response(flujo(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 # Obtener una tarea específica (requiere autenticación JWT)
 @app.route('/tareas/<tarea_id>', methods=['GET'])
-@jwt_required()
+@autenticacion_requerida
+@condicional
 def get_tarea(tarea_id):
-    usuario_actual = get_jwt_identity()  # Obtener el usuario actual
-    tarea = tareas.get(tarea_id)
-    if tarea and tarea['user'] == usuario_actual:
-        return tarea, 200
-    else:
-        return 'Tarea no encontrada o no tienes permiso', 404
+    usuario = usuario_actual()  # Obtener el usuario actual
+    return operaciones.obtener_tarea(usuario, tarea_id)
 
 
 # Crear una nueva tarea (requiere autenticación JWT)
 @app.route('/tareas', methods=['POST'])
-@jwt_required()
+@autenticacion_requerida
 def create_tarea():
-    usuario_actual = get_jwt_identity()  # Obtener el usuario actual
+    usuario = usuario_actual()  # Obtener el usuario actual
     tarea_name = request.args.get('name', '')
     tarea_description = request.args.get('description', '')
+    return operaciones.crear_tarea(usuario, tarea_name, tarea_description)
+
+
+# Crear tareas en bloque (requiere autenticación JWT). El cuerpo es NDJSON (por defecto) o CSV,
+# según el parámetro 'formato', con los campos 'name' y 'description' de cada tarea. Cada lote
+# reserva sus IDs y se guarda de una vez; los registros no válidos se informan por posición.
+@app.route('/tareas/lote', methods=['POST'])
+@autenticacion_requerida
+def create_tareas_lote():
+    usuario = usuario_actual()
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in FORMATOS:
+        return f'Formato no válido: {formato}', 400
+    texto = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    registros = leer_csv(texto) if formato == 'csv' else leer_ndjson(texto)
+    return operaciones.crear_tareas_lote(usuario, registros)
+
 
-    if not tarea_name:
-        return 'El nombre de la tarea es obligatorio', 400
+# Cambiar el estado de varias tareas (requiere autenticación JWT). Cuerpo JSON:
+# {"ids": ["1", "2"], "estado": "Completada"}. Devuelve los IDs actualizados y los errores de cada ID.
+@app.route('/tareas/lote', methods=['PUT'])
+@autenticacion_requerida
+def update_tareas_lote():
+    return operaciones.cambiar_estado_lote(usuario_actual(), request.get_json(silent=True))
 
-    tarea_id = str(len(tareas) + 1)  # Generar un ID simple basado en la longitud de las tareas existentes
-    tareas[tarea_id] = {
-        'name': tarea_name,
-        'description': tarea_description,
-        'user': usuario_actual
-    }
-    return f'Tarea {tarea_id} creada con éxito', 201
+
+# Eliminar varias tareas (requiere autenticación JWT). Cuerpo JSON: {"ids": ["1", "2"]}.
+@app.route('/tareas/lote', methods=['DELETE'])
+@autenticacion_requerida
+def delete_tareas_lote():
+    return operaciones.eliminar_lote(usuario_actual(), request.get_json(silent=True))
 
 
 # Actualizar una tarea existente (requiere autenticación JWT)
 @app.route('/tareas/<tarea_id>', methods=['PUT'])
-@jwt_required()
+@autenticacion_requerida
 def update_tarea(tarea_id):
-    usuario_actual = get_jwt_identity()
-    tarea = tareas.get(tarea_id)
-
-    if tarea and tarea['user'] == usuario_actual:
-        tarea['name'] = request.args.get('name', tarea['name'])
-        tarea['description'] = request.args.get('description', tarea['description'])
-        tarea['estado'] = request.args.get('estado', tarea.get('estado', EstadoTarea.PENDIENTE.value))
-        return f'Tarea {tarea_id} actualizada', 200
-    return 'Tarea no encontrada o no tienes permiso', 404
+    return operaciones.actualizar_tarea(usuario_actual(), tarea_id, request.args)
 
 
 # Eliminar una tarea (requiere autenticación JWT)
 @app.route('/tareas/<tarea_id>', methods=['DELETE'])
-@jwt_required()
+@autenticacion_requerida
 def delete_tarea(tarea_id):
-    usuario_actual = get_jwt_identity()  # Obtener el usuario actual
-    tarea = tareas.get(tarea_id)
-
-    if tarea and tarea['user'] == usuario_actual:
-        del tareas[tarea_id]
-        return f'Tarea {tarea_id} eliminada', 200
-    else:
-        return 'Tarea no encontrada o no tienes permiso', 404
-
-
-if __name__ == '__main__':
-    app.run(debug=True)
+    usuario = usuario_actual()  # Obtener el usuario actual
+    return operaciones.eliminar_tarea(usuario, tarea_id)
 
 @app.route('/proyectos', methods=['POST'])
-@jwt_required()
+@autenticacion_requerida
 def crear_proyecto():
-    usuario = get_jwt_identity()
-    nombre = request.args.get('nombre')
-
-    if not nombre:
-        return 'Nombre del proyecto requerido', 400
-
-    if usuario not in proyectos:
-        proyectos[usuario] = {}
-
-    if nombre in proyectos[usuario]:
-        return 'El proyecto ya existe', 409
-
-    proyectos[usuario][nombre] = {"tareas": []}
-    return f"Proyecto '{nombre}' creado para {usuario}", 201
+    return operaciones.crear_proyecto(usuario_actual(), request.args.get('nombre'))
 
 
 @app.route('/proyectos', methods=['GET'])
-@jwt_required()
+@autenticacion_requerida
+@condicional
 def listar_proyectos():
-    usuario = get_jwt_identity()
-    return proyectos.get(usuario, {}), 200
-
+    return operaciones.listar_proyectos(usuario_actual())
 
-@app.route('/proyectos/<nombre>/tareas', methods=['POST'])
-@jwt_required()
-def asignar_tarea_a_proyecto(nombre):
-    usuario = get_jwt_identity()
-    tarea_id = request.args.get('id')
 
-    if not tarea_id or tarea_id not in tareas:
-        return 'Tarea inválida o no encontrada', 404
+# Progreso de todos los proyectos del usuario de una vez
+@app.route('/proyectos/progreso', methods=['GET'])
+@autenticacion_requerida
+@condicional
+def progreso_proyectos():
+    return operaciones.progreso_proyectos(usuario_actual())
 
-    if tareas[tarea_id]['user'] != usuario:
-        return 'No tienes permiso para esa tarea', 403
 
-    if usuario not in proyectos or nombre not in proyectos[usuario]:
-        return 'Proyecto no encontrado', 404
-
-    if tarea_id not in proyectos[usuario][nombre]["tareas"]:
-        proyectos[usuario][nombre]["tareas"].append(tarea_id)
-
-    return f"Tarea {tarea_id} asignada al proyecto '{nombre}'", 200
+@app.route('/proyectos/<nombre>/tareas', methods=['POST'])
+@autenticacion_requerida
+def asignar_tarea_a_proyecto(nombre):
+    return operaciones.asignar_tarea_a_proyecto(usuario_actual(), nombre, request.args.get('id'))
 
 
 @app.route('/proyectos/<nombre>/tareas', methods=['GET'])
-@jwt_required()
+@autenticacion_requerida
+@condicional
 def tareas_de_proyecto(nombre):
-    usuario = get_jwt_identity()
-
-    if usuario not in proyectos or nombre not in proyectos[usuario]:
-        return 'Proyecto no encontrado', 404
-
-    ids = proyectos[usuario][nombre]["tareas"]
-    tareas_proyecto = {}
-    for i in ids:
-        if i in tareas:
-            tarea = tareas[i]
-            tareas_proyecto[i] = {
-                'name': tarea['name'],
-                'description': tarea.get('description', ''),
-                'estado': tarea.get('estado', 'Pendiente')
-            }
-    return tareas_proyecto, 200
+    inicio = operaciones.leer_cursor_entero(request.args.get('cursor'))
+    if inicio is None:
+        return 'Cursor no válido', 400
+    limite = normalizar_limite(request.args.get('limit'))
+    cuerpo, estado, siguiente = operaciones.tareas_de_proyecto(usuario_actual(), nombre, inicio, limite)
+    if estado != 200:
+        return cuerpo, estado
+    return respuesta_paginada(cuerpo, siguiente)
 
 @app.route('/proyectos/<nombre>/progreso', methods=['GET'])
-@jwt_required()
+@autenticacion_requerida
+@condicional
 def progreso_proyecto(nombre):
-    usuario = get_jwt_identity()
+    return operaciones.progreso_proyecto(usuario_actual(), nombre)
 
-    if usuario not in proyectos or nombre not in proyectos[usuario]:
-        return 'Proyecto no encontrado', 404
 
-    ids = proyectos[usuario][nombre]["tareas"]
-    total = len(ids)
-    if total == 0:
-        return {"progreso": 0}, 200
+instrumentar_app(app, operaciones.indicadores)
 
-    completadas = sum(1 for i in ids if i in tareas and tareas[i].get('estado') == 'Completada')
-    progreso = (completadas / total) * 100
-    return {"progreso": progreso}, 200
+
+if __name__ == '__main__':
+    app.run(debug=True)
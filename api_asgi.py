@@ -0,0 +1,549 @@
+"""
+Versión ASGI de la API REST de api.py, con las mismas rutas y respuestas.
+
+Los manejadores son corrutinas, así que una petición en curso no ocupa un hilo mientras
+espera: un único proceso puede mantener miles de clientes con conexiones persistentes. El
+trabajo que bloquea se envía a un grupo de hilos:
+
+    - el cálculo del resumen de la contraseña en /signup y /signin;
+    - las operaciones sobre los datos cuando se guardan en disco (GESTOR_BACKEND=sqlite). En
+      memoria son tan rápidas que se ejecutan directamente en el bucle de eventos.
+
+Los datos y la verificación de los tokens JWT (con su caché y la lista de tokens revocados)
+son los de api.py (ver api_operaciones), de modo que un token emitido por una aplicación vale
+para la otra y ambas pueden servirse a la vez en el mismo proceso.
+
+Las rutas GET con datos del usuario envían los mismos ETag que api.py y responden 304 a
+If-None-Match (ver `condicional`).
+
+GET /cambios/eventos envía los cambios del usuario como server-sent events (ver `Eventos`).
+Un flujo en espera solo ocupa una corrutina, así que esta es la versión a servir cuando hay
+muchos clientes conectados a la vez.
+
+Diferencias con api.py: /tareas/lote lee el cuerpo completo antes de procesarlo (la versión
+WSGI lo procesa a medida que llega) y no se publica /metrics.
+
+Ejemplo de ejecución (con cualquier servidor ASGI):
+    $ uvicorn api_asgi:app --port 5000
+"""
+
+import asyncio
+import functools
+import io
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode
+
+from werkzeug.http import parse_etags, quote_etag
+from werkzeug.utils import get_content_type
+
+import api
+import api_operaciones as operaciones
+from gestor_de_tareas.utilidades.paginacion import normalizar_limite
+from gestor_de_tareas.utilidades.exportacion import FORMATOS, agrupar
+from gestor_de_tareas.utilidades.importacion import leer_csv, leer_ndjson
+
+# Hilos para el trabajo que bloquea; se pueden ajustar con API_HILOS.
+_hilos = ThreadPoolExecutor(int(os.environ.get("API_HILOS", 16)), thread_name_prefix="api-asgi")
+
+# Rutas registradas con el decorador `ruta`: (método, patrón, manejador, requiere token).
+_rutas = []
+
+
+async def en_hilo(funcion, *args):
+    """
+    Ejecuta una función que bloquea en el grupo de hilos y espera su resultado.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_hilos, functools.partial(funcion, *args))
+
+
+async def en_datos(funcion, *args):
+    """
+    Ejecuta una operación sobre los datos: en el grupo de hilos si se guardan en disco y
+    directamente si están en memoria.
+    """
+    if operaciones.PERSISTENTE:
+        return await en_hilo(funcion, *args)
+    return funcion(*args)
+
+
+class Peticion:
+    """
+    Datos de una petición HTTP recibida por ASGI.
+
+    Parameters
+    ----------
+    scope : dict
+        Ámbito ASGI de la conexión.
+    receive : Callable
+        Función ASGI para recibir el cuerpo.
+    """
+
+    def __init__(self, scope, receive):
+        """
+        Lee el método, la ruta, los parámetros y las cabeceras.
+        """
+        self.metodo = scope["method"]
+        self.ruta = scope["path"]
+        # Si un parámetro o una cabecera se repite, vale el primero, como en `request.args.get`
+        # y `request.headers.get` de Flask.
+        self.args = {}
+        for nombre, valor in parse_qsl(scope.get("query_string", b"").decode("utf-8", "replace"),
+                                       keep_blank_values=True):
+            self.args.setdefault(nombre, valor)
+        self.cabeceras = {}
+        for nombre, valor in scope.get("headers", []):
+            self.cabeceras.setdefault(nombre.decode("latin-1").lower(), valor.decode("latin-1"))
+        self.usuario = None
+        self.sesion = None
+        self._receive = receive
+
+    async def cuerpo(self):
+        """
+        Recibe el cuerpo completo de la petición.
+
+        Returns
+        -------
+        bytes
+            Cuerpo de la petición.
+        """
+        partes = []
+        while True:
+            mensaje = await self._receive()
+            partes.append(mensaje.get("body", b""))
+            if not mensaje.get("more_body"):
+                return b"".join(partes)
+
+    async def json(self):
+        """
+        Recibe el cuerpo y lo interpreta como JSON.
+
+        Returns
+        -------
+        Any
+            Documento JSON, o None si el cuerpo no es JSON válido.
+        """
+        try:
+            return json.loads(await self.cuerpo())
+        except ValueError:
+            return None
+
+    async def desconexion(self):
+        """
+        Espera a que el cliente cierre la conexión, descartando el cuerpo que quede por leer.
+        """
+        while (await self._receive())["type"] != "http.disconnect":
+            pass
+
+
+class Flujo:
+    """
+    Respuesta que se envía por bloques a medida que se genera.
+
+    Parameters
+    ----------
+    bloques : Iterator[str]
+        Bloques de texto del cuerpo; se generan en el grupo de hilos si los datos están en
+        disco.
+    tipo : str
+        Tipo MIME del cuerpo.
+    cabeceras : dict
+        Cabeceras adicionales.
+    """
+
+    def __init__(self, bloques, tipo, cabeceras):
+        """
+        Guarda el generador de bloques y las cabeceras.
+        """
+        self.bloques = bloques
+        self.tipo = tipo
+        self.cabeceras = cabeceras
+
+
+class Eventos:
+    """
+    Respuesta de GET /cambios/eventos: un flujo de server-sent events con los cambios de los
+    datos del usuario, ver `api.eventos_cambios`.
+
+    Se suscribe a los avisos de `operaciones.suscribir` y espera a la vez un aviso, la
+    desconexión del cliente o el siguiente latido. Solo guarda la última versión enviada:
+    si el cliente lee despacio, `send` espera y los cambios que lleguen mientras tanto se
+    envían juntos en el siguiente evento.
+
+    Parameters
+    ----------
+    peticion : Peticion
+        Petición autenticada.
+    desde : Optional[str]
+        Versión desde la que enviar los cambios, o None para empezar en la actual.
+    """
+
+    def __init__(self, peticion, desde):
+        """
+        Guarda la petición y la versión inicial.
+        """
+        self.peticion = peticion
+        self.desde = desde
+
+    async def enviar(self, send):
+        """
+        Envía el flujo hasta que el cliente se desconecta.
+        """
+        bucle = asyncio.get_running_loop()
+        aviso = asyncio.Event()
+
+        def avisar():
+            try:
+                bucle.call_soon_threadsafe(aviso.set)
+            except RuntimeError:
+                pass  # El bucle ya se ha cerrado.
+
+        usuario = self.peticion.usuario
+        desconexion = asyncio.ensure_future(self.peticion.desconexion())
+        operaciones.suscribir(usuario, avisar)
+        try:
+            cabeceras = {'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache',
+                         'X-Accel-Buffering': 'no'}
+            await send({"type": "http.response.start", "status": 200, "headers": _codificar(cabeceras)})
+            version = self.desde
+            if version is None:
+                version = await en_datos(operaciones.version_usuario, usuario)
+                inicio = operaciones.evento('inicio', {'version': version}, version)
+                await send({"type": "http.response.body", "body": inicio, "more_body": True})
+            while not desconexion.done():
+                aviso.clear()
+                mensaje, version = await en_datos(operaciones.evento_cambios, usuario, version)
+                if mensaje is None:
+                    espera = asyncio.ensure_future(aviso.wait())
+                    hechas, _ = await asyncio.wait({espera, desconexion}, timeout=operaciones.LATIDO_EVENTOS,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                    espera.cancel()
+                    if hechas:
+                        continue
+                    mensaje = b": latido\n\n"
+                await send({"type": "http.response.body", "body": mensaje, "more_body": True})
+        finally:
+            operaciones.cancelar_suscripcion(usuario, avisar)
+            desconexion.cancel()
+
+
+def ruta(metodo, patron, autenticada=True):
+    """
+    Decorador que registra un manejador para un método y una ruta.
+
+    Parameters
+    ----------
+    metodo : str
+        Método HTTP.
+    patron : str
+        Ruta con parámetros entre '<' y '>', como en Flask (p. ej. "/tareas/<tarea_id>").
+    autenticada : bool, optional
+        Si la ruta requiere un token JWT (por defecto True). La sesión del token queda en
+        `peticion.sesion` y su usuario en `peticion.usuario`.
+
+    Returns
+    -------
+    Callable
+        Decorador que devuelve el manejador sin modificar.
+    """
+    expresion = re.compile("^" + re.sub(r"<(\w+)>", r"(?P<\1>[^/]+)", patron) + "$")
+
+    def registrar(manejador):
+        _rutas.append((metodo, expresion, manejador, autenticada))
+        return manejador
+    return registrar
+
+
+def condicional(manejador):
+    """
+    Envía la versión de los datos del usuario como ETag y responde 304 si el cliente ya la
+    tiene, ver `api.condicional`.
+    """
+    @functools.wraps(manejador)
+    async def envoltura(peticion, **parametros):
+        etag = await en_datos(operaciones.version_usuario, peticion.usuario)
+        cabeceras = {'ETag': quote_etag(etag), 'Cache-Control': 'private, no-cache', 'Vary': 'Authorization'}
+        if parse_etags(peticion.cabeceras.get('if-none-match')).contains_weak(etag):
+            return '', 304, cabeceras
+        respuesta = await manejador(peticion, **parametros)
+        if isinstance(respuesta, Flujo):
+            respuesta.cabeceras.update(cabeceras)
+            return respuesta
+        cuerpo, estado, *resto = respuesta
+        if estado != 200:
+            return respuesta
+        return cuerpo, estado, dict(resto[0] if resto else {}, **cabeceras)
+    return envoltura
+
+
+def respuesta_paginada(peticion, datos, siguiente):
+    """
+    Añade las cabeceras del cursor de la página siguiente, ver `api.respuesta_paginada`.
+    """
+    cabeceras = {}
+    if siguiente is not None:
+        url = f"{peticion.ruta}?{urlencode(dict(peticion.args, cursor=siguiente))}"
+        cabeceras = {'X-Cursor-Siguiente': siguiente, 'Link': f'<{url}>; rel="next"'}
+    return datos, 200, cabeceras
+
+
+@ruta('GET', '/', autenticada=False)
+async def hello_world(peticion):
+    return 'API de Gestión de Tareas Colaborativas', 200
+
+
+@ruta('POST', '/signup', autenticada=False)
+async def signup(peticion):
+    username = peticion.args.get('user', '')
+    hashed = await en_hilo(operaciones.cifrar_contraseña, peticion.args.get('contraseña', ''))
+    return await en_datos(operaciones.registrar_usuario, username, hashed)
+
+
+@ruta('GET', '/signin', autenticada=False)
+async def signin(peticion):
+    username = peticion.args.get('user', '')
+    hashed = await en_hilo(operaciones.cifrar_contraseña, peticion.args.get('contraseña', ''))
+    if await en_datos(operaciones.comprobar_usuario, username, hashed):
+        return {'access_token': api.crear_token(username)}, 200
+    return 'Usuario o contraseña incorrectos', 401
+
+
+@ruta('POST', '/signout')
+async def signout(peticion):
+    await en_datos(operaciones.revocar_token, peticion.sesion.jti, peticion.sesion.caduca)
+    api.cache_tokens.quitar(peticion.cabeceras["authorization"].split()[1])
+    return 'Sesión cerrada', 200
+
+
+@ruta('GET', '/tareas')
+@condicional
+async def get_tareas(peticion):
+    limite = normalizar_limite(peticion.args.get('limit'))
+    ultimo = operaciones.leer_cursor_entero(peticion.args.get('cursor'))
+    if ultimo is None:
+        return 'Cursor no válido', 400
+    datos, siguiente = await en_datos(operaciones.listar_tareas, peticion.usuario, limite, ultimo)
+    return respuesta_paginada(peticion, datos, siguiente)
+
+
+@ruta('GET', '/buscar/tareas')
+@condicional
+async def buscar_tareas(peticion):
+    inicio = operaciones.leer_cursor_entero(peticion.args.get('cursor'))
+    if inicio is None or inicio < 0:
+        return 'Cursor no válido', 400
+    limite = normalizar_limite(peticion.args.get('limit'))
+    cuerpo, estado, siguiente = await en_datos(operaciones.buscar_tareas, peticion.usuario,
+                                               peticion.args.get('q', '').strip(), limite, inicio)
+    if estado != 200:
+        return cuerpo, estado
+    return respuesta_paginada(peticion, cuerpo, siguiente)
+
+
+@ruta('GET', '/exportar/tareas')
+@condicional
+async def exportar_tareas(peticion):
+    formato = peticion.args.get('formato', 'ndjson')
+    if formato not in FORMATOS:
+        return f'Formato no válido: {formato}', 400
+    ids = await en_datos(operaciones.ids_para_exportar, peticion.usuario)
+    lineas = operaciones.lineas_csv_api(ids) if formato == 'csv' else operaciones.lineas_ndjson_api(ids)
+    return Flujo(agrupar(lineas), FORMATOS[formato],
+                 {'Content-Disposition': f'attachment; filename="tareas.{formato}"'})
+
+
+@ruta('GET', '/cambios')
+@condicional
+async def cambios(peticion):
+    return await en_datos(operaciones.cambios_desde, peticion.usuario, peticion.args.get('desde'))
+
+
+@ruta('GET', '/cambios/eventos')
+async def eventos_cambios(peticion):
+    desde = peticion.args.get('desde') or peticion.cabeceras.get('last-event-id')
+    if desde is not None and not operaciones.version_valida(desde):
+        return "El parámetro desde debe ser una versión devuelta por la API", 400
+    return Eventos(peticion, desde)
+
+
+@ruta('GET', '/tareas/<tarea_id>')
+@condicional
+async def get_tarea(peticion, tarea_id):
+    return await en_datos(operaciones.obtener_tarea, peticion.usuario, tarea_id)
+
+
+@ruta('POST', '/tareas')
+async def create_tarea(peticion):
+    return await en_datos(operaciones.crear_tarea, peticion.usuario,
+                          peticion.args.get('name', ''), peticion.args.get('description', ''))
+
+
+@ruta('POST', '/tareas/lote')
+async def create_tareas_lote(peticion):
+    formato = peticion.args.get('formato', 'ndjson')
+    if formato not in FORMATOS:
+        return f'Formato no válido: {formato}', 400
+    texto = io.StringIO((await peticion.cuerpo()).decode('utf-8'), newline='')
+    registros = leer_csv(texto) if formato == 'csv' else leer_ndjson(texto)
+    return await en_datos(operaciones.crear_tareas_lote, peticion.usuario, registros)
+
+
+@ruta('PUT', '/tareas/lote')
+async def update_tareas_lote(peticion):
+    return await en_datos(operaciones.cambiar_estado_lote, peticion.usuario, await peticion.json())
+
+
+@ruta('DELETE', '/tareas/lote')
+async def delete_tareas_lote(peticion):
+    return await en_datos(operaciones.eliminar_lote, peticion.usuario, await peticion.json())
+
+
+@ruta('PUT', '/tareas/<tarea_id>')
+async def update_tarea(peticion, tarea_id):
+    return await en_datos(operaciones.actualizar_tarea, peticion.usuario, tarea_id, peticion.args)
+
+
+@ruta('DELETE', '/tareas/<tarea_id>')
+async def delete_tarea(peticion, tarea_id):
+    return await en_datos(operaciones.eliminar_tarea, peticion.usuario, tarea_id)
+
+
+@ruta('POST', '/proyectos')
+async def crear_proyecto(peticion):
+    return await en_datos(operaciones.crear_proyecto, peticion.usuario, peticion.args.get('nombre'))
+
+
+@ruta('GET', '/proyectos')
+@condicional
+async def listar_proyectos(peticion):
+    return await en_datos(operaciones.listar_proyectos, peticion.usuario)
+
+
+@ruta('GET', '/proyectos/progreso')
+@condicional
+async def progreso_proyectos(peticion):
+    return await en_datos(operaciones.progreso_proyectos, peticion.usuario)
+
+
+@ruta('POST', '/proyectos/<nombre>/tareas')
+async def asignar_tarea_a_proyecto(peticion, nombre):
+    return await en_datos(operaciones.asignar_tarea_a_proyecto, peticion.usuario, nombre, peticion.args.get('id'))
+
+
+@ruta('GET', '/proyectos/<nombre>/tareas')
+@condicional
+async def tareas_de_proyecto(peticion, nombre):
+    inicio = operaciones.leer_cursor_entero(peticion.args.get('cursor'))
+    if inicio is None:
+        return 'Cursor no válido', 400
+    limite = normalizar_limite(peticion.args.get('limit'))
+    cuerpo, estado, siguiente = await en_datos(operaciones.tareas_de_proyecto, peticion.usuario,
+                                               nombre, inicio, limite)
+    if estado != 200:
+        return cuerpo, estado
+    return respuesta_paginada(peticion, cuerpo, siguiente)
+
+
+@ruta('GET', '/proyectos/<nombre>/progreso')
+@condicional
+async def progreso_proyecto(peticion, nombre):
+    return await en_datos(operaciones.progreso_proyecto, peticion.usuario, nombre)
+
+
+async def despachar(peticion):
+    """
+    Busca el manejador de la petición, comprueba el token si hace falta y lo ejecuta.
+
+    Returns
+    -------
+    tuple, Flujo or Eventos
+        (cuerpo, código de estado[, cabeceras]), una respuesta por bloques o un flujo de eventos.
+    """
+    metodos = False
+    for metodo, expresion, manejador, autenticada in _rutas:
+        coincidencia = expresion.match(peticion.ruta)
+        if coincidencia is None:
+            continue
+        if metodo != peticion.metodo:
+            metodos = True
+            continue
+        if autenticada:
+            peticion.sesion, error = await en_datos(api.autenticar, peticion.cabeceras.get("authorization"))
+            if error is not None:
+                return error
+            peticion.usuario = peticion.sesion.usuario
+        return await manejador(peticion, **coincidencia.groupdict())
+    return ('Method Not Allowed', 405) if metodos else ('Not Found', 404)
+
+
+async def enviar(send, respuesta):
+    """
+    Envía una respuesta por ASGI.
+
+    Los diccionarios se envían como JSON y los textos como HTML, igual que en Flask.
+    """
+    if isinstance(respuesta, Eventos):
+        await respuesta.enviar(send)
+        return
+    if isinstance(respuesta, Flujo):
+        cabeceras = dict(respuesta.cabeceras, **{'Content-Type': get_content_type(respuesta.tipo, 'utf-8')})
+        await send({"type": "http.response.start", "status": 200, "headers": _codificar(cabeceras)})
+        while True:
+            bloque = await en_datos(next, respuesta.bloques, None)
+            if bloque is None:
+                break
+            await send({"type": "http.response.body", "body": bloque.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    cuerpo, estado, *resto = respuesta
+    cabeceras = dict(resto[0]) if resto else {}
+    if estado == 304:
+        await send({"type": "http.response.start", "status": estado, "headers": _codificar(cabeceras)})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    if isinstance(cuerpo, dict):
+        datos = (json.dumps(cuerpo, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+        cabeceras['Content-Type'] = 'application/json'
+    else:
+        datos = cuerpo.encode("utf-8")
+        cabeceras['Content-Type'] = 'text/html; charset=utf-8'
+    cabeceras['Content-Length'] = str(len(datos))
+    await send({"type": "http.response.start", "status": estado, "headers": _codificar(cabeceras)})
+    await send({"type": "http.response.body", "body": datos})
+
+
+def _codificar(cabeceras):
+    """
+    Convierte un diccionario de cabeceras al formato de ASGI.
+    """
+    return [(nombre.lower().encode("latin-1"), valor.encode("latin-1")) for nombre, valor in cabeceras.items()]
+
+
+async def app(scope, receive, send):
+    """
+    Aplicación ASGI.
+
+    Parameters
+    ----------
+    scope : dict
+        Ámbito de la conexión ("http" o "lifespan").
+    receive : Callable
+        Corrutina que recibe los mensajes del servidor.
+    send : Callable
+        Corrutina que envía los mensajes al servidor.
+    """
+    if scope["type"] == "lifespan":
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif mensaje["type"] == "lifespan.shutdown":
+                _hilos.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+    await enviar(send, await despachar(Peticion(scope, receive)))
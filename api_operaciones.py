@@ -0,0 +1,1062 @@
+"""
+Operaciones de la API REST, comunes a api.py (Flask, WSGI) y api_asgi.py (ASGI).
+
+Cada operación recibe datos ya leídos de la petición (usuario autenticado, parámetros y
+cuerpo) y devuelve el cuerpo de la respuesta y el código de estado, sin depender del
+framework. Aquí se guarda también el estado de la API (usuarios, tareas y proyectos), de modo
+que ambas aplicaciones servidas en el mismo proceso comparten los mismos datos.
+
+Las operaciones son síncronas: con GESTOR_BACKEND=sqlite leen y escriben en disco, por lo que
+api_asgi.py las ejecuta en un grupo de hilos.
+
+Los flujos de eventos de GET /cambios/eventos se suscriben a `difusor` (ver `suscribir`), que
+avisa de los cambios de cada usuario al terminar la operación que los ha hecho.
+"""
+
+import csv
+import functools
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+# Permite reutilizar el paquete gestor_de_tareas del proyecto web.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "proyecto_web_tareas"))
+
+from gestor_de_tareas.clases.tarea import EstadoTarea  # noqa: E402
+from gestor_de_tareas.utilidades.eventos import Difusor  # noqa: E402
+from gestor_de_tareas.utilidades.importacion import por_lotes  # noqa: E402
+from gestor_de_tareas.almacenamiento.sqlite import ConexionesSQLite  # noqa: E402
+from gestor_de_tareas.almacenamiento.tablas import (RegistroCambiosMemoria, RegistroCambiosSQLite,  # noqa: E402
+                                                    SecuenciaMemoria, SecuenciaSQLite, TablaMemoria, TablaSQLite)
+
+# Base de datos para los usuarios, tareas y proyectos. Por defecto se guardan en memoria, así que
+# la API debe servirse con un único proceso (puede usar varios hilos). Con GESTOR_BACKEND=sqlite
+# se guardan en "api.db" dentro de GESTOR_DATOS y se puede servir con varios workers
+# (gunicorn -w 4 api:app): todos leen y escriben la misma base de datos.
+# Las operaciones de comprobar y después modificar usan `actualizar` y `quitar`, que son
+# atómicas tanto entre hilos como entre procesos (ver gestor_de_tareas.almacenamiento.tablas).
+# Los IDs de tarea salen de una secuencia y no del número de tareas, que se repetiría tras un
+# borrado. Las tareas están indexadas por usuario, así que listar las de un usuario solo
+# recorre las suyas. Sus nombres y descripciones están indexados por palabras para buscarlas
+# (`buscar_tareas`) sin recorrerlas. Las tareas de cada proyecto se guardan como un conjunto ordenado (un
+# diccionario {ID: None}) para comprobar en O(1) si una tarea ya está en el proyecto.
+# Cada proyecto lleva además la cuenta de sus tareas en cada estado ("conteo") y la tabla
+# `pertenencias` guarda los proyectos de cada tarea. Al cambiar el estado de una tarea o
+# eliminarla se ajustan los contadores de sus proyectos en la misma transacción (ver
+# `tareas.transaccion`), de modo que el progreso de un proyecto se calcula en O(1).
+# Cada operación que modifica tareas o proyectos de un usuario anota qué ha cambiado en
+# `registro`, en la misma transacción. La versión de cada usuario (ver `version_usuario`) es
+# el ETag de todas sus respuestas y `cambios_desde` devuelve solo lo que ha cambiado a partir
+# de una versión. El registro guarda las últimas API_REGISTRO_CAMBIOS entradas de todos los
+# usuarios; quien pida cambios más antiguos debe volver a cargar sus datos.
+CAPACIDAD_REGISTRO = int(os.environ.get("API_REGISTRO_CAMBIOS", 50_000))
+PERSISTENTE = os.environ.get("GESTOR_BACKEND", "memoria") == "sqlite"
+if PERSISTENTE:
+    DIRECTORIO_DATOS = os.environ.get("GESTOR_DATOS", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                   "proyecto_web_tareas", "datos"))
+    os.makedirs(DIRECTORIO_DATOS, exist_ok=True)
+    conexiones = ConexionesSQLite(os.path.join(DIRECTORIO_DATOS, "api.db"), esquema="")
+    usuarios = TablaSQLite(conexiones, "usuarios")
+    tareas = TablaSQLite(conexiones, "tareas", indices=("user",), texto=("name", "description"))
+    proyectos = TablaSQLite(conexiones, "proyectos")
+    pertenencias = TablaSQLite(conexiones, "pertenencias")
+    revocados = TablaSQLite(conexiones, "revocados", caducidad=True)
+    contador_tareas = SecuenciaSQLite(conexiones, "tareas")
+    registro = RegistroCambiosSQLite(conexiones, CAPACIDAD_REGISTRO)
+else:
+    # Las tablas que se modifican juntas comparten cerrojo (ver `TablaMemoria.transaccion`).
+    cerrojo = threading.RLock()
+    usuarios = TablaMemoria()
+    tareas = TablaMemoria(indices=("user",), cerrojo=cerrojo, texto=("name", "description"))
+    proyectos = TablaMemoria(cerrojo=cerrojo)
+    pertenencias = TablaMemoria(cerrojo=cerrojo)
+    revocados = TablaMemoria(caducidad=True)
+    contador_tareas = SecuenciaMemoria()
+    registro = RegistroCambiosMemoria(CAPACIDAD_REGISTRO)
+
+# Los clientes abiertos en GET /cambios/eventos se suscriben a `difusor` y las operaciones que
+# modifican datos avisan al terminar (ver `avisa_cambios`). Cada suscripción solo guarda la
+# versión que ya ha enviado, así que un cliente lento no acumula eventos: cuando vuelve a leer
+# recibe todos los cambios pendientes juntos y, si son más antiguos que el registro, un evento
+# "reiniciar". Con GESTOR_BACKEND=sqlite los cambios pueden venir de otro worker; un hilo por
+# proceso consulta la última versión del registro cada API_EVENTOS_SONDEO milisegundos mientras
+# haya suscripciones (ver `vigilar_registro`). Los flujos sin cambios envían un comentario cada
+# API_EVENTOS_LATIDO segundos para que los proxies no cierren la conexión.
+LATIDO_EVENTOS = int(os.environ.get("API_EVENTOS_LATIDO", 15))
+SONDEO_EVENTOS = int(os.environ.get("API_EVENTOS_SONDEO", 1_000)) / 1000
+difusor = Difusor()
+vigilancia = None
+cerrojo_vigilancia = threading.Lock()
+
+NO_ENCONTRADA = 'Tarea no encontrada o no tienes permiso'
+ESTADOS = [estado.value for estado in EstadoTarea]
+
+
+def cifrar_contraseña(contraseña):
+    """
+    Calcula el resumen con el que se guarda una contraseña.
+
+    Parameters
+    ----------
+    contraseña : str
+        Contraseña en claro.
+
+    Returns
+    -------
+    str
+        Resumen SHA-256 en hexadecimal.
+    """
+    return hashlib.sha256(contraseña.encode()).hexdigest()
+
+
+def leer_cursor_entero(valor):
+    """
+    Interpreta el parámetro 'cursor' de la URL como entero.
+
+    Parameters
+    ----------
+    valor : Optional[str]
+        Valor del parámetro, o None si no se indica.
+
+    Returns
+    -------
+    Optional[int]
+        Valor del cursor (0 si no se indica), o None si no es un entero válido.
+    """
+    try:
+        return int(valor or 0)
+    except ValueError:
+        return None
+
+
+def avisa_cambios(operacion):
+    """
+    Decorador para las operaciones que modifican datos de un usuario (su primer argumento):
+    al terminar avisa a sus flujos de eventos (ver `difusor`).
+
+    El aviso se da después de la transacción de la operación, cuando los cambios ya se pueden
+    leer. Si la operación no ha cambiado nada, el flujo lo comprueba y no envía nada.
+    """
+    @functools.wraps(operacion)
+    def envoltura(usuario, *args, **kwargs):
+        try:
+            return operacion(usuario, *args, **kwargs)
+        finally:
+            difusor.avisar(usuario)
+    return envoltura
+
+
+def registrar_usuario(username, hashed):
+    """
+    Registra un usuario si no existe.
+
+    Parameters
+    ----------
+    username : str
+        Nombre de usuario.
+    hashed : str
+        Resumen de la contraseña (ver `cifrar_contraseña`).
+
+    Returns
+    -------
+    tuple
+        (mensaje, código de estado).
+    """
+    if not usuarios.actualizar([username], lambda actual: hashed if actual is None else None):
+        return f'Usuario {username} ya existe', 409
+    return f'Usuario {username} registrado con éxito', 200
+
+
+def comprobar_usuario(username, hashed):
+    """
+    Comprueba el usuario y el resumen de su contraseña.
+
+    Returns
+    -------
+    bool
+        True si las credenciales son correctas.
+    """
+    return usuarios.get(username) == hashed
+
+
+def revocar_token(jti, caduca):
+    """
+    Revoca un token hasta que caduque y olvida los tokens revocados que ya han caducado, sin
+    recorrer los demás (ver `TablaMemoria.quitar_caducados`).
+
+    Los tokens revocados se guardan con los demás datos, así que con GESTOR_BACKEND=sqlite la
+    revocación vale para todos los workers.
+
+    Parameters
+    ----------
+    jti : str
+        Identificador único del token (claim "jti").
+    caduca : int
+        Instante de caducidad del token (claim "exp").
+    """
+    revocados[jti] = caduca
+    revocados.quitar_caducados(time.time())
+
+
+def token_revocado(jti):
+    """
+    Indica si un token se ha revocado.
+
+    Parameters
+    ----------
+    jti : str
+        Identificador único del token.
+
+    Returns
+    -------
+    bool
+        True si el token está revocado.
+    """
+    return jti in revocados
+
+
+def listar_tareas(usuario, limite, ultimo):
+    """
+    Devuelve una página de las tareas del usuario, en orden de ID.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    limite : int
+        Tareas por página.
+    ultimo : int
+        ID de la última tarea de la página anterior (0 para la primera).
+
+    Returns
+    -------
+    tuple
+        (tareas de la página por ID, cursor de la página siguiente o None).
+    """
+    pagina = tareas.por_indice('user', usuario, ultimo, limite + 1)
+    ids = list(pagina)
+    usuario_tareas = {tarea_id: pagina[tarea_id] for tarea_id in ids[:limite]}
+    return usuario_tareas, ids[limite - 1] if len(ids) > limite else None
+
+
+def buscar_tareas(usuario, consulta, limite, inicio):
+    """
+    Busca por palabras en el nombre y la descripción de las tareas del usuario.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    consulta : str
+        Texto a buscar.
+    limite : int
+        Tareas por página.
+    inicio : int
+        Número de resultados de las páginas anteriores (0 para la primera).
+
+    Returns
+    -------
+    tuple
+        (tareas de la página, de más a menos relevante, o mensaje de error, código de estado,
+        cursor de la página siguiente o None).
+    """
+    if not consulta:
+        return 'El parámetro q es obligatorio', 400, None
+    encontradas, hay_mas = tareas.buscar(consulta, limite, inicio, 'user', usuario)
+    # Lista y no diccionario por ID: las respuestas JSON ordenan las claves y se perdería la relevancia.
+    resultado = [{'id': tarea_id, 'name': tarea['name'], 'description': tarea.get('description', ''),
+                  'estado': tarea.get('estado', EstadoTarea.PENDIENTE.value)}
+                 for tarea_id, tarea in encontradas.items()]
+    return {'tareas': resultado}, 200, str(inicio + limite) if hay_mas else None
+
+
+def ids_para_exportar(usuario):
+    """
+    Devuelve los IDs de todas las tareas del usuario.
+    """
+    return list(tareas.por_indice('user', usuario))
+
+
+def lineas_ndjson_api(ids):
+    """
+    Genera una línea JSON por cada tarea que siga existiendo.
+
+    Parameters
+    ----------
+    ids : list
+        IDs de las tareas a exportar.
+
+    Returns
+    -------
+    Iterator[str]
+        Líneas NDJSON con el ID y los campos de cada tarea.
+    """
+    for tarea_id in ids:
+        tarea = tareas.get(tarea_id)
+        if tarea is not None:
+            yield json.dumps({'id': tarea_id, 'name': tarea['name'], 'description': tarea.get('description', ''),
+                              'estado': tarea.get('estado', EstadoTarea.PENDIENTE.value)},
+                             ensure_ascii=False) + '\n'
+
+
+def lineas_csv_api(ids):
+    """
+    Genera la cabecera CSV y una fila por cada tarea que siga existiendo.
+
+    Parameters
+    ----------
+    ids : list
+        IDs de las tareas a exportar.
+
+    Returns
+    -------
+    Iterator[str]
+        Filas CSV con el ID y los campos de cada tarea.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(('id', 'name', 'description', 'estado'))
+    for tarea_id in ids:
+        tarea = tareas.get(tarea_id)
+        if tarea is not None:
+            escritor.writerow((tarea_id, tarea['name'], tarea.get('description', ''),
+                               tarea.get('estado', EstadoTarea.PENDIENTE.value)))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def obtener_tarea(usuario, tarea_id):
+    """
+    Devuelve una tarea del usuario.
+
+    Returns
+    -------
+    tuple
+        (tarea o mensaje de error, código de estado).
+    """
+    tarea = tareas.get(tarea_id)
+    if tarea and tarea['user'] == usuario:
+        return tarea, 200
+    return NO_ENCONTRADA, 404
+
+
+@avisa_cambios
+def crear_tarea(usuario, nombre, descripcion):
+    """
+    Crea una tarea del usuario.
+
+    Returns
+    -------
+    tuple
+        (mensaje, código de estado).
+    """
+    if not nombre:
+        return 'El nombre de la tarea es obligatorio', 400
+    tarea_id = str(next(contador_tareas))
+    with tareas.transaccion():
+        tareas[tarea_id] = {
+            'name': nombre,
+            'description': descripcion,
+            'user': usuario
+        }
+        registrar_cambios(usuario, [tarea_id])
+    return f'Tarea {tarea_id} creada con éxito', 201
+
+
+@avisa_cambios
+def crear_tareas_lote(usuario, registros):
+    """
+    Crea tareas en bloque a partir de los registros leídos de un cuerpo NDJSON o CSV.
+
+    Cada lote reserva sus IDs y se guarda de una vez; los registros no válidos se informan
+    por posición.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    registros : Iterable[tuple]
+        Pares (posición, registro o ValueError), ver `leer_ndjson` y `leer_csv`.
+
+    Returns
+    -------
+    tuple
+        ({'creadas', 'errores'}, código de estado).
+    """
+    creadas, errores = [], []
+    for lote in por_lotes(registros):
+        validas = []
+        for posicion, registro in lote:
+            if isinstance(registro, ValueError):
+                errores.append({'posicion': posicion, 'error': str(registro)})
+            elif not isinstance(registro.get('name'), str) or not registro['name']:
+                errores.append({'posicion': posicion, 'error': 'El nombre de la tarea es obligatorio'})
+            elif not isinstance(registro.get('description') or '', str):
+                errores.append({'posicion': posicion, 'error': 'La descripción debe ser texto'})
+            else:
+                validas.append(registro)
+        nuevas = {str(tarea_id): {'name': registro['name'],
+                                  'description': registro.get('description') or '',
+                                  'user': usuario}
+                  for tarea_id, registro in zip(contador_tareas.reservar(len(validas)), validas)}
+        with tareas.transaccion():
+            tareas.update(nuevas)
+            registrar_cambios(usuario, nuevas)
+        creadas.extend(nuevas)
+    return {'creadas': creadas, 'errores': errores}, 201
+
+
+@avisa_cambios
+def cambiar_estado_lote(usuario, datos):
+    """
+    Cambia el estado de varias tareas del usuario.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    datos : Any
+        Cuerpo JSON de la petición: {"ids": [...], "estado": "..."}.
+
+    Returns
+    -------
+    tuple
+        ({'actualizadas', 'errores'} o mensaje de error, código de estado).
+    """
+    ids = datos.get('ids') if isinstance(datos, dict) else None
+    estados = {estado.value for estado in EstadoTarea}
+    if not isinstance(ids, list) or datos.get('estado') not in estados:
+        return "Se esperaba un JSON con 'ids' y un 'estado' válido", 400
+
+    def cambiar(tarea):
+        if tarea is None or tarea['user'] != usuario:
+            return None
+        tarea['estado'] = datos['estado']
+        return tarea
+
+    pedidos = list(dict.fromkeys(str(i) for i in ids))
+    with tareas.transaccion():
+        anteriores = {tarea_id: estado_de(tarea) for tarea_id, tarea in tareas.varios(pedidos).items()}
+        actualizadas = list(tareas.actualizar(pedidos, cambiar))
+        nombres = actualizar_conteos(usuario, {tarea_id: (anteriores[tarea_id], datos['estado'])
+                                               for tarea_id in actualizadas
+                                               if anteriores[tarea_id] != datos['estado']})
+        registrar_cambios(usuario, actualizadas, nombres)
+    errores = [{'id': tarea_id, 'error': NO_ENCONTRADA} for tarea_id in pedidos if tarea_id not in actualizadas]
+    return {'actualizadas': actualizadas, 'errores': errores}, 200
+
+
+def eliminar_lote(usuario, datos):
+    """
+    Elimina varias tareas del usuario.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    datos : Any
+        Cuerpo JSON de la petición: {"ids": [...]}.
+
+    Returns
+    -------
+    tuple
+        ({'eliminadas', 'errores'} o mensaje de error, código de estado).
+    """
+    ids = datos.get('ids') if isinstance(datos, dict) else None
+    if not isinstance(ids, list):
+        return "Se esperaba un JSON con 'ids'", 400
+    pedidos = list(dict.fromkeys(str(i) for i in ids))
+    eliminadas = quitar_tareas(usuario, pedidos)
+    quitadas = set(eliminadas)
+    errores = [{'id': tarea_id, 'error': NO_ENCONTRADA} for tarea_id in pedidos if tarea_id not in quitadas]
+    return {'eliminadas': eliminadas, 'errores': errores}, 200
+
+
+@avisa_cambios
+def actualizar_tarea(usuario, tarea_id, campos):
+    """
+    Modifica el nombre, la descripción o el estado de una tarea del usuario.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    tarea_id : str
+        ID de la tarea.
+    campos : Mapping[str, str]
+        Parámetros 'name', 'description' y 'estado'; los que falten no se modifican.
+
+    Returns
+    -------
+    tuple
+        (mensaje, código de estado).
+    """
+    cambios = {}
+
+    def cambiar(tarea):
+        if tarea is None or tarea['user'] != usuario:
+            return None
+        anterior = estado_de(tarea)
+        tarea['name'] = campos.get('name', tarea['name'])
+        tarea['description'] = campos.get('description', tarea['description'])
+        tarea['estado'] = campos.get('estado', anterior)
+        if tarea['estado'] != anterior:
+            cambios[tarea_id] = (anterior, tarea['estado'])
+        return tarea
+
+    with tareas.transaccion():
+        actualizada = tareas.actualizar([tarea_id], cambiar)
+        registrar_cambios(usuario, actualizada, actualizar_conteos(usuario, cambios))
+    if actualizada:
+        return f'Tarea {tarea_id} actualizada', 200
+    return NO_ENCONTRADA, 404
+
+
+def eliminar_tarea(usuario, tarea_id):
+    """
+    Elimina una tarea del usuario.
+
+    Returns
+    -------
+    tuple
+        (mensaje, código de estado).
+    """
+    if quitar_tareas(usuario, [tarea_id]):
+        return f'Tarea {tarea_id} eliminada', 200
+    return NO_ENCONTRADA, 404
+
+
+@avisa_cambios
+def quitar_tareas(usuario, ids):
+    """
+    Elimina las tareas del usuario indicadas y las quita de sus proyectos.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    ids : list
+        IDs de las tareas a eliminar.
+
+    Returns
+    -------
+    list
+        IDs de las tareas eliminadas (las que existían y eran del usuario).
+    """
+    with tareas.transaccion():
+        anteriores = {tarea_id: estado_de(tarea) for tarea_id, tarea in tareas.varios(ids).items()}
+        eliminadas = tareas.quitar(ids, lambda tarea: tarea['user'] == usuario)
+        nombres = actualizar_conteos(usuario, {tarea_id: (anteriores[tarea_id], None) for tarea_id in eliminadas})
+        registrar_cambios(usuario, eliminadas, nombres)
+    return eliminadas
+
+
+def estado_de(tarea):
+    """
+    Devuelve el estado de una tarea; las tareas nuevas no lo guardan y están pendientes.
+    """
+    return tarea.get('estado', EstadoTarea.PENDIENTE.value)
+
+
+def actualizar_conteos(usuario, cambios):
+    """
+    Ajusta los proyectos del usuario tras cambiar el estado de algunas de sus tareas.
+
+    Debe llamarse dentro de `tareas.transaccion()`, en la misma transacción que el cambio.
+    Solo se leen las pertenencias de las tareas cambiadas y se escribe una vez el registro
+    de proyectos del usuario, sin recorrer las tareas de ningún proyecto.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario propietario de las tareas.
+    cambios : dict
+        {ID: (estado anterior, estado nuevo)}. Un estado nuevo None indica que la tarea se
+        ha eliminado: se quita de sus proyectos.
+
+    Returns
+    -------
+    set
+        Nombres de los proyectos modificados.
+    """
+    nombres = pertenencias.varios(cambios)
+    if not nombres:
+        return set()
+
+    def ajustar(proyectos_usuario):
+        for tarea_id, nombres_tarea in nombres.items():
+            anterior, nuevo = cambios[tarea_id]
+            for nombre in nombres_tarea:
+                proyecto = proyectos_usuario[nombre]
+                conteo = proyecto['conteo']
+                conteo[anterior] -= 1
+                if nuevo is None:
+                    del miembros(proyecto)[tarea_id]
+                else:
+                    conteo[nuevo] = conteo.get(nuevo, 0) + 1
+        return proyectos_usuario
+
+    proyectos.actualizar([usuario], ajustar)
+    eliminadas = [tarea_id for tarea_id in nombres if cambios[tarea_id][1] is None]
+    if eliminadas:
+        pertenencias.quitar(eliminadas, lambda _: True)
+    return {nombre for nombres_tarea in nombres.values() for nombre in nombres_tarea}
+
+
+def registrar_cambios(usuario, ids_tareas=(), nombres_proyectos=()):
+    """
+    Anota en `registro` las tareas y proyectos del usuario que ha modificado una operación.
+
+    Debe llamarse después de modificarlos y, si la operación usa `tareas.transaccion()`,
+    dentro de ella.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario propietario de los datos.
+    ids_tareas : Iterable[str], optional
+        IDs de las tareas creadas, modificadas o eliminadas.
+    nombres_proyectos : Iterable[str], optional
+        Nombres de los proyectos creados o modificados.
+    """
+    registro.registrar(usuario, [('tarea', tarea_id) for tarea_id in ids_tareas]
+                       + [('proyecto', nombre) for nombre in nombres_proyectos])
+
+
+def version_usuario(usuario):
+    """
+    Devuelve la versión de los datos del usuario, que cambia con cada operación que modifica
+    sus tareas o proyectos.
+
+    Se usa como ETag de las respuestas del usuario y como parámetro 'desde' de
+    `cambios_desde`. Incluye la época del registro, de modo que una versión de otra base de
+    datos o de un proceso anterior (con los datos en memoria) no se confunde con la actual.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+
+    Returns
+    -------
+    str
+        Versión con el formato "<época>.<número>".
+    """
+    return f'{registro.epoca}.{registro.version(usuario)}'
+
+
+def version_valida(version):
+    """
+    Comprueba que un texto tiene el formato de una versión "<época>.<número>" (ver
+    `version_usuario`). No comprueba que sea de la época actual ni que siga en el registro.
+    """
+    return (version or '').partition('.')[2].isdigit()
+
+
+def cambios_desde(usuario, desde):
+    """
+    Devuelve las tareas y proyectos del usuario que han cambiado después de una versión.
+
+    Solo se leen los cambios posteriores a `desde` y los datos que han cambiado, así que el
+    coste es proporcional a los cambios y no al número de tareas del usuario.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    desde : Optional[str]
+        Versión que ya conoce el cliente: el ETag de una respuesta anterior (sin comillas) o
+        la 'version' de la respuesta anterior de esta operación.
+
+    Returns
+    -------
+    tuple
+        ({'version', 'tareas', 'proyectos'} o mensaje de error, código de estado). 'tareas' y
+        'proyectos' tienen el valor actual de lo que ha cambiado, con el mismo formato que
+        GET /tareas/<id> y GET /proyectos, o null si se ha eliminado. Si la versión es de
+        otra época o sus cambios ya se han descartado del registro, el código es 410 y el
+        cliente debe volver a cargar los datos.
+    """
+    if not version_valida(desde):
+        return "El parámetro desde debe ser una versión devuelta por la API", 400
+    epoca, _, numero = desde.partition('.')
+    resultado = registro.desde(usuario, int(numero)) if epoca == registro.epoca else None
+    if resultado is None:
+        return 'Los cambios desde esa versión ya no están disponibles; vuelve a cargar los datos', 410
+    version, cambios = resultado
+    ids_tareas = [clave for tipo, clave in cambios if tipo == 'tarea']
+    nombres = [clave for tipo, clave in cambios if tipo == 'proyecto']
+    encontradas = tareas.varios(ids_tareas)
+    proyectos_usuario = proyectos.get(usuario, {}) if nombres else {}
+    return {
+        'version': f'{registro.epoca}.{version}',
+        'tareas': {tarea_id: encontradas.get(tarea_id) for tarea_id in ids_tareas},
+        'proyectos': {nombre: publico(proyectos_usuario[nombre]) if nombre in proyectos_usuario else None
+                      for nombre in nombres},
+    }, 200
+
+
+def evento(tipo, datos, id_evento):
+    """
+    Da formato de server-sent event a un mensaje.
+
+    Parameters
+    ----------
+    tipo : str
+        Tipo del evento (campo "event").
+    datos : Any
+        Datos del evento, que se envían como JSON en una sola línea.
+    id_evento : str
+        Identificador del evento; el cliente lo reenvía en la cabecera Last-Event-ID al
+        reconectar.
+
+    Returns
+    -------
+    bytes
+        Evento codificado, terminado en una línea vacía.
+    """
+    return f'event: {tipo}\nid: {id_evento}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n'.encode()
+
+
+def evento_cambios(usuario, version):
+    """
+    Prepara el siguiente evento de un flujo de cambios del usuario.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    version : str
+        Última versión enviada al cliente.
+
+    Returns
+    -------
+    tuple
+        (evento o None si no hay cambios, versión a partir de la que seguir). El evento es de
+        tipo "cambios", con el mismo cuerpo que `cambios_desde`, o "reiniciar" si los cambios
+        desde `version` ya no están en el registro: el cliente debe volver a cargar los datos.
+    """
+    cambios, codigo = cambios_desde(usuario, version)
+    if codigo != 200:
+        version = version_usuario(usuario)
+        return evento('reiniciar', {'version': version}, version), version
+    if not cambios['tareas'] and not cambios['proyectos']:
+        return None, version
+    return evento('cambios', cambios, cambios['version']), cambios['version']
+
+
+def suscribir(usuario, avisar):
+    """
+    Suscribe un flujo de eventos a los cambios del usuario (ver `difusor`).
+
+    Con GESTOR_BACKEND=sqlite arranca también, si no está en marcha, el hilo que detecta los
+    cambios hechos por otros procesos (ver `vigilar_registro`).
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    avisar : Callable[[], None]
+        Función sin argumentos que no bloquee, ver `Difusor.suscribir`.
+    """
+    global vigilancia
+    difusor.suscribir(usuario, avisar)
+    if PERSISTENTE:
+        with cerrojo_vigilancia:
+            if vigilancia is None or not vigilancia.is_alive():
+                vigilancia = threading.Thread(target=vigilar_registro, name="vigilancia-registro", daemon=True)
+                vigilancia.start()
+
+
+def cancelar_suscripcion(usuario, avisar):
+    """
+    Cancela una suscripción hecha con `suscribir`.
+    """
+    difusor.cancelar_suscripcion(usuario, avisar)
+
+
+def vigilar_registro():
+    """
+    Avisa a los flujos de este proceso de los cambios hechos por otros procesos.
+
+    Consulta la última versión del registro cada SONDEO_EVENTOS segundos (una consulta de una
+    fila para todos los flujos) y solo cuando ha cambiado lee la versión de cada usuario
+    suscrito. Termina cuando ya no quedan suscripciones; `suscribir` lo vuelve a arrancar.
+    """
+    global vigilancia
+    ultima = registro.ultima()
+    versiones = {}
+    while True:
+        time.sleep(SONDEO_EVENTOS)
+        with cerrojo_vigilancia:
+            if not len(difusor):
+                vigilancia = None
+                return
+        try:
+            actual = registro.ultima()
+            if actual == ultima:
+                continue
+            ultima = actual
+            suscritos = difusor.usuarios()
+            versiones = {usuario: version for usuario, version in versiones.items() if usuario in suscritos}
+            for usuario in suscritos:
+                version = registro.version(usuario)
+                if versiones.get(usuario) != version:
+                    versiones[usuario] = version
+                    difusor.avisar(usuario)
+        except Exception as e:
+            print(f"[ERROR] No se pudo consultar el registro de cambios: {e}")
+
+
+@avisa_cambios
+def crear_proyecto(usuario, nombre):
+    """
+    Crea un proyecto vacío del usuario.
+
+    Returns
+    -------
+    tuple
+        (mensaje, código de estado).
+    """
+    if not nombre:
+        return 'Nombre del proyecto requerido', 400
+
+    def crear(proyectos_usuario):
+        proyectos_usuario = proyectos_usuario or {}
+        if nombre in proyectos_usuario:
+            return None
+        proyectos_usuario[nombre] = {"tareas": {}, "conteo": dict.fromkeys(ESTADOS, 0)}
+        return proyectos_usuario
+
+    with tareas.transaccion():
+        creado = proyectos.actualizar([usuario], crear)
+        registrar_cambios(usuario, nombres_proyectos=[nombre] if creado else [])
+    if not creado:
+        return 'El proyecto ya existe', 409
+    return f"Proyecto '{nombre}' creado para {usuario}", 201
+
+
+def listar_proyectos(usuario):
+    """
+    Devuelve los proyectos del usuario.
+
+    Returns
+    -------
+    tuple
+        (proyectos por nombre, con la lista de IDs de sus tareas y el número de tareas en
+        cada estado, y código de estado).
+    """
+    return {nombre: publico(proyecto) for nombre, proyecto in proyectos.get(usuario, {}).items()}, 200
+
+
+def publico(proyecto):
+    """
+    Devuelve un proyecto tal como se envía en las respuestas, con la lista de IDs de sus tareas.
+    """
+    return dict(proyecto, tareas=list(miembros(proyecto)))
+
+
+@avisa_cambios
+def asignar_tarea_a_proyecto(usuario, nombre, tarea_id):
+    """
+    Añade una tarea del usuario a uno de sus proyectos.
+
+    Returns
+    -------
+    tuple
+        (mensaje, código de estado).
+    """
+    existe = False
+
+    def asignar(proyectos_usuario):
+        nonlocal existe
+        if proyectos_usuario is None or nombre not in proyectos_usuario:
+            return None
+        existe = True
+        proyecto = proyectos_usuario[nombre]
+        tareas_proyecto = miembros(proyecto)
+        if tarea_id in tareas_proyecto:
+            return None
+        tareas_proyecto[tarea_id] = None
+        estado = estado_de(tarea)
+        proyecto['conteo'][estado] = proyecto['conteo'].get(estado, 0) + 1
+        return proyectos_usuario
+
+    # La tarea se lee en la misma transacción, para que no cambie de estado ni se elimine
+    # antes de contarla en el proyecto.
+    with tareas.transaccion():
+        tarea = tareas.get(tarea_id) if tarea_id else None
+        if tarea is None:
+            return 'Tarea inválida o no encontrada', 404
+
+        if tarea['user'] != usuario:
+            return 'No tienes permiso para esa tarea', 403
+
+        if proyectos.actualizar([usuario], asignar):
+            pertenencias.actualizar([tarea_id], lambda nombres: (nombres or []) + [nombre])
+            registrar_cambios(usuario, nombres_proyectos=[nombre])
+    if not existe:
+        return 'Proyecto no encontrado', 404
+
+    return f"Tarea {tarea_id} asignada al proyecto '{nombre}'", 200
+
+
+def miembros(proyecto):
+    """
+    Devuelve las tareas de un proyecto como conjunto ordenado ({ID: None}).
+
+    Los proyectos guardados antes de usar conjuntos tienen una lista de IDs; se convierte.
+
+    Parameters
+    ----------
+    proyecto : dict
+        Proyecto guardado en `proyectos`.
+
+    Returns
+    -------
+    dict
+        IDs de las tareas del proyecto, en el orden en que se añadieron.
+    """
+    if isinstance(proyecto["tareas"], list):
+        proyecto["tareas"] = dict.fromkeys(proyecto["tareas"])
+    return proyecto["tareas"]
+
+
+def tareas_de_proyecto(usuario, nombre, inicio, limite):
+    """
+    Devuelve una página de las tareas de un proyecto del usuario.
+
+    Parameters
+    ----------
+    usuario : str
+        Usuario autenticado.
+    nombre : str
+        Nombre del proyecto.
+    inicio : int
+        Posición de la primera tarea de la página.
+    limite : int
+        Tareas por página.
+
+    Returns
+    -------
+    tuple
+        (tareas de la página o mensaje de error, código de estado, cursor de la página
+        siguiente o None).
+    """
+    proyecto = proyectos.get(usuario, {}).get(nombre)
+    if proyecto is None:
+        return 'Proyecto no encontrado', 404, None
+
+    fin = inicio + limite
+    ids = miembros(proyecto)
+    pagina = list(itertools.islice(ids, inicio, fin))
+    encontradas = tareas.varios(pagina)
+    tareas_proyecto = {}
+    for i in pagina:
+        tarea = encontradas.get(i)
+        if tarea is not None:
+            tareas_proyecto[i] = {
+                'name': tarea['name'],
+                'description': tarea.get('description', ''),
+                'estado': tarea.get('estado', 'Pendiente')
+            }
+    return tareas_proyecto, 200, str(fin) if fin < len(ids) else None
+
+
+def progreso_proyecto(usuario, nombre):
+    """
+    Devuelve el porcentaje de tareas completadas de un proyecto del usuario.
+
+    Returns
+    -------
+    tuple
+        ({'progreso'} o mensaje de error, código de estado).
+    """
+    proyecto = proyectos.get(usuario, {}).get(nombre)
+    if proyecto is None:
+        return 'Proyecto no encontrado', 404
+    return {"progreso": porcentaje(proyecto['conteo'])}, 200
+
+
+def progreso_proyectos(usuario):
+    """
+    Devuelve el porcentaje de tareas completadas de todos los proyectos del usuario.
+
+    Returns
+    -------
+    tuple
+        (progreso por nombre de proyecto, código de estado).
+    """
+    return {nombre: porcentaje(proyecto['conteo']) for nombre, proyecto in proyectos.get(usuario, {}).items()}, 200
+
+
+def porcentaje(conteo):
+    """
+    Calcula el porcentaje de tareas completadas a partir del contador de un proyecto.
+
+    Parameters
+    ----------
+    conteo : dict
+        Número de tareas del proyecto en cada estado.
+
+    Returns
+    -------
+    float
+        Porcentaje de tareas completadas, o 0 si el proyecto no tiene tareas.
+    """
+    total = sum(conteo.values())
+    if total == 0:
+        return 0
+    return (conteo.get(EstadoTarea.COMPLETADA.value, 0) / total) * 100
+
+
+def indicadores():
+    """
+    Indicadores instantáneos que se publican en /metrics.
+
+    Returns
+    -------
+    list
+        Tuplas (nombre, ayuda, valor) con el número de usuarios, tareas, proyectos y flujos de
+        eventos abiertos.
+    """
+    return [
+        ("api_usuarios", "Número de usuarios registrados.", len(usuarios)),
+        ("api_tareas", "Número de tareas.", len(tareas)),
+        ("api_proyectos", "Número de proyectos.",
+         sum(len(proyectos_usuario) for proyectos_usuario in proyectos.values())),
+        ("api_flujos_eventos", "Flujos de GET /cambios/eventos abiertos en este proceso.", len(difusor)),
+    ]
+
+
+def migrar_conteos():
+    """
+    Calcula los contadores y las pertenencias de los proyectos guardados sin ellos.
+
+    Los proyectos creados antes de llevar la cuenta de sus tareas por estado no tienen
+    "conteo"; se calculan una vez a partir de sus tareas, quitando las que ya no existen.
+    """
+    with tareas.transaccion():
+        for usuario, proyectos_usuario in proyectos.items():
+            antiguos = [nombre for nombre, proyecto in proyectos_usuario.items() if 'conteo' not in proyecto]
+            for nombre in antiguos:
+                proyecto = proyectos_usuario[nombre]
+                existentes = tareas.varios(miembros(proyecto))
+                proyecto['tareas'] = {tarea_id: None for tarea_id in proyecto['tareas'] if tarea_id in existentes}
+                proyecto['conteo'] = dict.fromkeys(ESTADOS, 0)
+                for tarea_id in proyecto['tareas']:
+                    estado = estado_de(existentes[tarea_id])
+                    proyecto['conteo'][estado] = proyecto['conteo'].get(estado, 0) + 1
+                    pertenencias.actualizar([tarea_id], lambda nombres: (nombres or []) + [nombre])
+            if antiguos:
+                proyectos[usuario] = proyectos_usuario
+
+
+if PERSISTENTE:
+    migrar_conteos()
@@ -32,20 +32,29 @@ def signin():
 
 
 # Función para obtener todas las tareas (requiere token)
+# GET /tareas devuelve una página; se piden las siguientes con el cursor de la cabecera
+# X-Cursor-Siguiente hasta que la respuesta ya no la incluye.
 def get_tasks(token):
     headers = {'Authorization': f'Bearer {token}'}
-    respuesta = requests.get(f"{BASE_URL}/tareas", headers=headers)
+    tareas = {}
+    params = {}
+    while True:
+        respuesta = requests.get(f"{BASE_URL}/tareas", params=params, headers=headers)
+        if respuesta.status_code != 200:
+            print(respuesta.text)
+            return
+        tareas.update(respuesta.json())
+        cursor = respuesta.headers.get('X-Cursor-Siguiente')
+        if cursor is None:
+            break
+        params = {'cursor': cursor}
 
-    if respuesta.status_code == 200:
-        tareas = respuesta.json()
-        if tareas:
-            print("Tareas:")
-            for tarea_id, tarea in tasks.items():
-                print(f"ID: {tarea_id}, Nombre: {tarea['nombre']}, Descripción: {tarea['description']}")
-        else:
-            print("No tienes tareas.")
+    if tareas:
+        print("Tareas:")
+        for tarea_id, tarea in tareas.items():
+            print(f"ID: {tarea_id}, Nombre: {tarea['name']}, Descripción: {tarea['description']}")
     else:
-        print(respuesta.text)
+        print("No tienes tareas.")
 
 
 # Función para crear una nueva tarea (requiere token)
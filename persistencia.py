@@ -8,8 +8,16 @@ en un archivo binario usando pickle.
 La idea es persistir el estado actual de la aplicación y recuperarlo en arranques posteriores.
 Además, se registra la función de guardado automático al salir de la aplicación mediante atexit.
 
+El guardado es atómico: se escribe un archivo temporal, se sincroniza con fsync y se renombra
+sobre el original, de modo que un corte durante la escritura no corrompe el archivo anterior.
+Para guardar cambios de forma incremental, la aplicación web usa
+gestor_de_tareas.almacenamiento.diario, cuyas instantáneas usan el formato binario versionado
+de gestor_de_tareas.almacenamiento.instantanea en lugar de pickle. pickle puede ejecutar
+código al cargar un archivo, así que `cargar_datos` solo debe usarse con archivos de confianza.
+
 """
 
+import os
 import pickle
 import atexit
 from typing import Any, List, Dict, Tuple
@@ -38,8 +46,12 @@ def guardar_datos(usuarios: List[Any],
     """
     try:
         datos = {"usuarios": usuarios, "tareas": tareas, "proyectos": proyectos}
-        with open(filename, "wb") as archivo:
+        temporal = f"{filename}.tmp"
+        with open(temporal, "wb") as archivo:
             pickle.dump(datos, archivo)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, filename)
         print(f"[Persistencia] Datos guardados en '{filename}'.")
     except Exception as error:
         print("Error al guardar datos:", error)
@@ -6,41 +6,266 @@ Este módulo implementa la aplicación web para gestionar tareas y proyectos uti
 Se definen rutas para crear, listar, modificar, filtrar, asignar, cambiar el estado y eliminar tareas,
 además de gestionar proyectos.
 
+"/vencimientos" muestra las tareas no completadas vencidas y las que vencen en los próximos
+días, a partir del índice por fecha límite del gestor. "/buscar" busca tareas por las palabras
+de su título y descripción y las muestra de más a menos relevante.
+
+Los listados de tareas se paginan por cursor: aceptan los parámetros `limit` (tareas por
+página) y `cursor` (devuelto por la página anterior), y "/" y "/filtrar" también `orden`
+("id" o "prioridad").
+
+Las páginas "/", "/proyectos" y "/proyectos/<nombre>/tareas" se guardan ya generadas en una
+caché LRU cuya clave incluye la URL y la versión de las colecciones que muestran (la `version`
+de los gestores, que cambia con cada modificación que hacen las rutas, y en SQLite con las de
+cualquier worker). Mientras no cambien los datos, se sirven sin volver a consultar al gestor
+ni a renderizar la plantilla. Si cambian, la página se vuelve a generar, pero la tarjeta de
+cada tarea se guarda aparte con los campos que muestra como clave, de modo que editar una
+tarea solo obliga a volver a renderizar su tarjeta. Los tamaños de ambas cachés se ajustan con
+GESTOR_CACHE_PAGINAS y GESTOR_CACHE_TARJETAS (0 las desactiva).
+
+Todas las rutas GET que muestran datos envían un ETag formado por las versiones de los
+gestores de los que dependen (ver `condicional`) y responden 304 a If-None-Match sin
+consultar los datos ni renderizar nada, así que recargar una página que no ha cambiado solo
+cuesta leer un contador.
+
+"/exportar/tareas" y "/exportar/proyectos" devuelven todos los datos en NDJSON (o CSV para las
+tareas) como una respuesta por bloques que se genera a medida que se envía, sin construir la
+exportación completa en memoria. Para exportar desde la línea de comandos, ver exportar.py.
+"/importar/tareas" crea tareas en bloque a partir de un cuerpo NDJSON o CSV con el mismo formato,
+y "/lote/cambiar_estado" y "/lote/eliminar" aplican una operación a una lista de IDs. Las tres
+responden en JSON con los errores de cada elemento.
+
 Dependencias:
     - Flask: para crear la aplicación web.
     - gestor_de_tareas.gestores.gestor_tareas: GestorDeTareas para gestionar las tareas.
     - gestor_de_tareas.clases.tarea: EstadoTarea para indicar el estado de cada tarea.
-    - (Opcional) gestor_de_tareas.gestores.proyectos: GestorProyectos para la gestión de proyectos.
+    - gestor_de_tareas.gestores.proyectos: GestorProyectos para la gestión de proyectos.
+    - gestor_de_tareas.utilidades.metricas: métricas de latencia expuestas en /metrics.
+    - gestor_de_tareas.utilidades.cache: cachés de páginas y tarjetas renderizadas.
+    - gestor_de_tareas.utilidades.exportacion: exportación en streaming (NDJSON/CSV).
+    - gestor_de_tareas.utilidades.importacion: lectura de tareas para la creación en bloque.
+    - gestor_de_tareas.almacenamiento.diario: persistencia incremental de tareas y proyectos.
+
+Los datos se guardan en el directorio indicado por la variable de entorno GESTOR_DATOS
+(por defecto, la carpeta "datos" junto a este módulo). Con GESTOR_BACKEND=sqlite las tareas
+y proyectos se guardan en la base de datos SQLite "tareas.db" de ese directorio en lugar de
+mantenerse en memoria, lo que permite compartirlos entre varios procesos.
+
+Varios procesos: con GESTOR_BACKEND=sqlite la aplicación se puede servir con varios workers,
+por ejemplo `GESTOR_BACKEND=sqlite gunicorn -w 4 app:app`. Cada worker abre sus propias
+conexiones y la base de datos (en modo WAL) es la única fuente de verdad; las cachés de
+lectura de cada worker se invalidan con el contador de cambios de la base de datos, que
+incrementa cualquier worker que escribe (ver gestor_de_tareas.utilidades.cache). Con el
+almacenamiento en memoria solo se admite un proceso: un segundo worker sobre el mismo
+directorio no arranca.
 
 Ejemplo de ejecución:
     Ejecutar el módulo para iniciar el servidor en modo debug:
         $ python app.py
 """
 
-from flask import Flask, render_template, request, redirect, url_for
+import atexit
+import functools
+import io
+import os
+import secrets
+from datetime import date, timedelta
+
+from flask import Flask, Response, render_template, request, redirect, url_for
+from markupsafe import Markup
 from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas
 from gestor_de_tareas.clases.tarea import EstadoTarea
-
-# Se asume que existe un módulo para la gestión de proyectos.
-# En un ejemplo completo, se debería importar así:
-# from gestor_de_tareas.gestores.proyectos import GestorProyectos
+from gestor_de_tareas.gestores.proyectos import GestorProyectos, porcentaje_completadas
+from gestor_de_tareas.utilidades.cache import CacheLRU
+from gestor_de_tareas.utilidades.metricas import instrumentar_app
+from gestor_de_tareas.utilidades.paginacion import ORDENES, normalizar_limite
+from gestor_de_tareas.utilidades.exportacion import FORMATOS, exportar_proyectos, exportar_tareas
+from gestor_de_tareas.utilidades.importacion import leer_csv, leer_ndjson
+from gestor_de_tareas.almacenamiento.diario import DiarioPersistente
+from gestor_de_tareas.almacenamiento.sqlite import GestorDeTareasSQLite, GestorProyectosSQLite
 
 app = Flask(__name__)
-gestor = GestorDeTareas()
-# Se crea un diccionario vacío para proyectos, pero se asume que en la versión completa se utiliza
-# una instancia de GestorProyectos. Por ejemplo:
-# gestor_proyectos = GestorProyectos()
-# Para efectos de este ejemplo, se utiliza la variable 'gestor_proyectos' definida a continuación.
-gestor_proyectos = type("GestorProyectosDummy", (), {"proyectos": {}})()  # Dummy para evitar errores
+DIRECTORIO_DATOS = os.environ.get("GESTOR_DATOS",
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos"))
+
+if os.environ.get("GESTOR_BACKEND", "memoria") == "sqlite":
+    os.makedirs(DIRECTORIO_DATOS, exist_ok=True)
+    gestor = GestorDeTareasSQLite(os.path.join(DIRECTORIO_DATOS, "tareas.db"))
+    gestor_proyectos = GestorProyectosSQLite(gestor)
+    # Las versiones se guardan en la base de datos y son las mismas en todos los workers.
+    EPOCA_ETAG = "sqlite"
+else:
+    # Ambos gestores comparten cerrojo: sus cambios van al mismo diario (ver
+    # gestor_de_tareas.utilidades.concurrencia para el uso desde varios hilos). El gestor de
+    # proyectos sigue los cambios de estado de las tareas para mantener su progreso.
+    gestor = GestorDeTareas()
+    gestor_proyectos = GestorProyectos(gestor.cerrojo, gestor)
+
+    # Recupera el estado guardado y registra cada cambio posterior en el diario. La
+    # instantánea se proyecta en memoria y las tareas se decodifican al usarse, de modo que
+    # la aplicación arranca en milisegundos sea cual sea el número de tareas.
+    diario = DiarioPersistente(DIRECTORIO_DATOS, carga_perezosa=True)
+    diario.conectar(gestor, gestor_proyectos)
+    atexit.register(diario.cerrar)
+    # Las versiones de los gestores en memoria empiezan de nuevo en cada proceso.
+    EPOCA_ETAG = secrets.token_hex(4)
+
+# Páginas renderizadas por (URL, versiones de los datos) y tarjetas de tarea renderizadas por
+# (plantilla, campos que muestran). Las entradas de versiones antiguas no se vuelven a pedir y
+# las descarta el LRU.
+cache_paginas = CacheLRU(int(os.environ.get("GESTOR_CACHE_PAGINAS", 256)))
+cache_tarjetas = CacheLRU(int(os.environ.get("GESTOR_CACHE_TARJETAS", 10_000)))
+
+# Correspondencia entre los valores recibidos en la URL y los estados de tarea.
+MAPA_ESTADOS = {
+    "pendiente": EstadoTarea.PENDIENTE,
+    "en_progreso": EstadoTarea.EN_PROGRESO,
+    "completada": EstadoTarea.COMPLETADA
+}
+
+
+def _parametros_pagina():
+    """
+    Lee de la URL los parámetros de paginación.
+
+    Returns
+    -------
+    tuple
+        (limite, cursor, orden). Un orden desconocido se sustituye por "id".
+    """
+    orden = request.args.get("orden", "id")
+    return (normalizar_limite(request.args.get("limit")), request.args.get("cursor") or None,
+            orden if orden in ORDENES else "id")
+
+
+def _url_pagina_siguiente(siguiente):
+    """
+    Construye la URL de la página siguiente conservando el resto de parámetros de la petición.
+
+    Parameters
+    ----------
+    siguiente : Optional[str]
+        Cursor de la página siguiente.
+
+    Returns
+    -------
+    Optional[str]
+        URL de la página siguiente, o None si no hay más páginas.
+    """
+    if siguiente is None:
+        return None
+    parametros = request.args.to_dict()
+    parametros["cursor"] = siguiente
+    return url_for(request.endpoint, **(request.view_args or {}), **parametros)
+
+
+def condicional(versiones):
+    """
+    Decorador para las rutas que responden a GET: envía como ETag las versiones de los datos
+    que muestra la página y responde 304 sin ejecutar la vista si el cliente ya las tiene
+    (If-None-Match). Las demás peticiones y las respuestas que no son 200 no cambian.
+
+    Parameters
+    ----------
+    versiones : Callable[[], tuple]
+        Devuelve las versiones de los gestores de los que depende la respuesta (y cualquier
+        otro dato del que dependa, como la fecha). Se llama antes de la vista, así que el ETag
+        nunca es más reciente que el cuerpo que acompaña.
+    """
+    def decorador(vista):
+        @functools.wraps(vista)
+        def envoltura(*args, **kwargs):
+            if request.method != "GET":
+                return vista(*args, **kwargs)
+            etag = "-".join(str(parte) for parte in (EPOCA_ETAG, *versiones()))
+            if request.if_none_match.contains_weak(etag):
+                respuesta = Response(status=304)
+            else:
+                respuesta = app.make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200:
+                    return respuesta
+            respuesta.set_etag(etag)
+            respuesta.headers["Cache-Control"] = "no-cache"
+            return respuesta
+        return envoltura
+    return decorador
+
+
+def _version_tareas():
+    """
+    Versión de las tareas, para las páginas que solo muestran tareas.
+    """
+    return (gestor.version,)
+
+
+def _versiones():
+    """
+    Versiones de los proyectos y de las tareas, para las páginas que muestran ambos.
+    """
+    return (gestor_proyectos.version, gestor.version)
+
+
+def _pagina_cacheada(versiones, generar):
+    """
+    Devuelve la página de la petición en curso desde la caché o la genera y la guarda.
+
+    Parameters
+    ----------
+    versiones : tuple
+        Versiones de las colecciones que muestra la página; se leen antes de generarla, así
+        que la página guardada nunca es más antigua que ellas.
+    generar : Callable[[], str]
+        Consulta los datos y renderiza la página.
+
+    Returns
+    -------
+    str
+        HTML de la página.
+    """
+    clave = (request.full_path, versiones)
+    html = cache_paginas.obtener(clave)
+    if html is None:
+        html = generar()
+        cache_paginas.guardar(clave, html)
+    return html
+
+
+def _tarjetas(plantilla, tareas):
+    """
+    Renderiza la tarjeta de cada tarea, reutilizando las que ya están en la caché.
+
+    Parameters
+    ----------
+    plantilla : str
+        Plantilla de la tarjeta; recibe la tarea como `tarea`.
+    tareas : List[Tarea]
+        Tareas a mostrar.
+
+    Returns
+    -------
+    List[Markup]
+        HTML de cada tarjeta, listo para insertarlo en la página sin escapar.
+    """
+    tarjetas = []
+    for tarea in tareas:
+        clave = (plantilla, tarea.id_tarea, tarea.titulo, tarea.descripcion, tarea.fecha_limite,
+                 tarea.prioridad, tarea.estado, tarea.usuario_asignado)
+        html = cache_tarjetas.obtener(clave)
+        if html is None:
+            html = Markup(render_template(plantilla, tarea=tarea))
+            cache_tarjetas.guardar(clave, html)
+        tarjetas.append(html)
+    return tarjetas
 
 
 @app.route("/", methods=["GET", "POST"])
+@condicional(_version_tareas)
 def index():
     """
     Ruta principal para visualizar y crear tareas.
 
-    Para solicitudes GET, se listan todas las tareas y se renderiza la plantilla "index.html".
-    Para solicitudes POST, se extraen los datos del formulario para crear una nueva tarea y se redirige
+    Para solicitudes GET, se lista una página de tareas y se renderiza la plantilla "index.html"
+    (o se sirve desde la caché si las tareas no han cambiado). Para solicitudes POST, se extraen los datos del formulario para crear una nueva tarea y se redirige
     nuevamente a la página principal.
 
     Returns
@@ -65,32 +290,96 @@ def index():
         )
         return redirect(url_for("index"))
 
-    tareas = gestor.listar_tareas()
-    return render_template("index.html", tareas=tareas)
+    def generar():
+        limite, cursor, orden = _parametros_pagina()
+        tareas, siguiente = gestor.paginar(limite, cursor, orden)
+        return render_template("index.html", tarjetas=_tarjetas("tarjeta_tarea.html", tareas),
+                               url_siguiente=_url_pagina_siguiente(siguiente))
+
+    return _pagina_cacheada(_version_tareas(), generar)
 
 
 @app.route("/filtrar")
+@condicional(_version_tareas)
 def filtrar():
     """
-    Ruta para filtrar tareas por estado.
+    Ruta para filtrar tareas por estado, usuario asignado y/o etiqueta.
 
-    Obtiene el parámetro 'estado' desde la URL, lo mapea a un valor de EstadoTarea y
-    renderiza la plantilla "filtrar.html" con las tareas que coinciden con dicho estado.
+    Obtiene los parámetros opcionales 'estado', 'usuario' y 'etiqueta' desde la URL y
+    renderiza la plantilla "filtrar.html" con una página de las tareas que cumplen todos los
+    criterios.
+    Si no se indica ningún criterio, se filtra por el estado pendiente.
 
     Returns
     -------
     flask.Response
         Respuesta HTTP que renderiza la plantilla "filtrar.html" con la lista de tareas filtradas.
     """
-    estado_str = request.args.get("estado", "pendiente").lower()
-    mapa_estados = {
-        "pendiente": EstadoTarea.PENDIENTE,
-        "en_progreso": EstadoTarea.EN_PROGRESO,
-        "completada": EstadoTarea.COMPLETADA
-    }
-    estado = mapa_estados.get(estado_str, EstadoTarea.PENDIENTE)
-    tareas_filtradas = gestor.filtrar_por_estado(estado)
-    return render_template("filtrar.html", tareas=tareas_filtradas)
+    estado_str = request.args.get("estado")
+    usuario = request.args.get("usuario") or None
+    etiqueta = request.args.get("etiqueta") or None
+    if estado_str is None and usuario is None and etiqueta is None:
+        estado_str = "pendiente"
+
+    estado = MAPA_ESTADOS.get(estado_str.lower(), EstadoTarea.PENDIENTE) if estado_str else None
+    limite, cursor, orden = _parametros_pagina()
+    tareas_filtradas, siguiente = gestor.paginar(limite, cursor, orden,
+                                                 estado=estado, usuario=usuario, etiqueta=etiqueta)
+    return render_template("filtrar.html", tareas=tareas_filtradas,
+                           url_siguiente=_url_pagina_siguiente(siguiente))
+
+
+@app.route("/vencimientos")
+@condicional(lambda: (*_version_tareas(), date.today()))
+def vencimientos():
+    """
+    Ruta para ver las tareas no completadas vencidas y las que vencen en los próximos días.
+
+    Acepta los parámetros opcionales 'dias' (ventana de próximos vencimientos, 7 por
+    defecto) y 'limit' (número máximo de tareas de cada lista). Las consultas usan el índice
+    por fecha límite del gestor y se detienen tras `limit + 1` tareas, así que no recorren
+    todas las tareas: la tarea de más solo indica que la lista está recortada.
+
+    Returns
+    -------
+    flask.Response
+        Respuesta HTTP que renderiza la plantilla "vencimientos.html".
+    """
+    try:
+        dias = max(0, int(request.args.get("dias", 7)))
+    except ValueError:
+        dias = 7
+    limite = normalizar_limite(request.args.get("limit"))
+    hoy = date.today()
+    vencidas = gestor.vencidas(hoy, limite + 1)
+    proximas = gestor.vencen_entre(hoy, hoy + timedelta(days=dias),
+                                   [EstadoTarea.PENDIENTE, EstadoTarea.EN_PROGRESO], limite + 1)
+    return render_template("vencimientos.html", dias=dias,
+                           vencidas=vencidas[:limite], mas_vencidas=len(vencidas) > limite,
+                           proximas=proximas[:limite], mas_proximas=len(proximas) > limite)
+
+
+@app.route("/buscar")
+@condicional(_version_tareas)
+def buscar():
+    """
+    Ruta para buscar tareas por las palabras de su título y descripción.
+
+    Obtiene el texto a buscar del parámetro 'q' y los opcionales 'limit' y 'cursor' de la
+    URL, y renderiza la plantilla "buscar.html" con una página de resultados ordenados por
+    relevancia. La búsqueda usa el índice de texto del gestor, así que no recorre todas las
+    tareas.
+
+    Returns
+    -------
+    flask.Response
+        Respuesta HTTP que renderiza la plantilla "buscar.html".
+    """
+    consulta = request.args.get("q", "").strip()
+    limite, cursor, _ = _parametros_pagina()
+    tareas, siguiente = gestor.buscar(consulta, limite, cursor) if consulta else ([], None)
+    return render_template("buscar.html", consulta=consulta, tareas=tareas,
+                           url_siguiente=_url_pagina_siguiente(siguiente))
 
 
 @app.route("/cambiar_estado")
@@ -114,17 +403,13 @@ def cambiar_estado():
         return redirect(url_for("index"))
 
     id_tarea = int(id_str)
-    mapa_estados = {
-        "pendiente": EstadoTarea.PENDIENTE,
-        "en_progreso": EstadoTarea.EN_PROGRESO,
-        "completada": EstadoTarea.COMPLETADA
-    }
-    nuevo_estado = mapa_estados.get(estado_str, EstadoTarea.PENDIENTE)
+    nuevo_estado = MAPA_ESTADOS.get(estado_str, EstadoTarea.PENDIENTE)
     gestor.cambiar_estado_tarea(id_tarea, nuevo_estado)
     return redirect(url_for("index"))
 
 
 @app.route("/modificar", methods=["GET", "POST"])
+@condicional(_version_tareas)
 def modificar():
     """
     Ruta para modificar una tarea existente.
@@ -205,20 +490,114 @@ def eliminar():
     return redirect(url_for("index"))
 
 
+@app.route("/importar/tareas", methods=["POST"])
+def importar_tareas():
+    """
+    Ruta para crear tareas en bloque.
+
+    El cuerpo de la petición es un documento NDJSON (por defecto) o CSV, según el parámetro
+    'formato', con los campos de "/exportar/tareas". Se lee a medida que llega y las tareas
+    se crean por lotes (ver `GestorDeTareas.crear_tareas`).
+
+    Returns
+    -------
+    flask.Response
+        JSON con el número de tareas creadas, sus IDs y los errores de cada registro
+        rechazado ({"posicion", "error"}, contando los registros desde 1), o un error 400 si
+        el formato no existe.
+    """
+    formato = request.args.get("formato", "ndjson")
+    if formato not in FORMATOS:
+        return f"Formato no válido: {formato}", 400
+    texto = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+    registros = leer_csv(texto) if formato == "csv" else leer_ndjson(texto)
+    ids, errores = gestor.crear_tareas(registros)
+    return {"creadas": len(ids), "ids": ids,
+            "errores": [{"posicion": posicion, "error": mensaje} for posicion, mensaje in errores]}
+
+
+def _ids_del_cuerpo():
+    """
+    Lee la lista de IDs del cuerpo JSON de una operación por lotes.
+
+    Returns
+    -------
+    Optional[list]
+        Lista de IDs enteros, o None si el cuerpo no contiene una lista "ids" de enteros.
+    """
+    datos = request.get_json(silent=True)
+    ids = datos.get("ids") if isinstance(datos, dict) else None
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return None
+    return ids
+
+
+@app.route("/lote/cambiar_estado", methods=["POST"])
+def cambiar_estado_lote():
+    """
+    Ruta para cambiar el estado de varias tareas a la vez.
+
+    Espera un cuerpo JSON {"ids": [...], "estado": "completada"} con los mismos valores de
+    estado que "/cambiar_estado".
+
+    Returns
+    -------
+    flask.Response
+        JSON con los IDs actualizados y los errores de cada ID ({"id", "error"}), o un error
+        400 si el cuerpo no es válido.
+    """
+    ids = _ids_del_cuerpo()
+    estado = MAPA_ESTADOS.get(str((request.get_json(silent=True) or {}).get("estado")))
+    if ids is None or estado is None:
+        return "Se esperaba un JSON con 'ids' (lista de enteros) y un 'estado' válido.", 400
+    actualizadas, errores = gestor.cambiar_estado_tareas(ids, estado)
+    return {"actualizadas": actualizadas,
+            "errores": [{"id": id_tarea, "error": mensaje} for id_tarea, mensaje in errores]}
+
+
+@app.route("/lote/eliminar", methods=["POST"])
+def eliminar_lote():
+    """
+    Ruta para eliminar varias tareas a la vez.
+
+    Espera un cuerpo JSON {"ids": [...]}.
+
+    Returns
+    -------
+    flask.Response
+        JSON con los IDs eliminados y los errores de cada ID ({"id", "error"}), o un error
+        400 si el cuerpo no es válido.
+    """
+    ids = _ids_del_cuerpo()
+    if ids is None:
+        return "Se esperaba un JSON con 'ids' (lista de enteros).", 400
+    eliminadas, errores = gestor.eliminar_tareas(ids)
+    return {"eliminadas": eliminadas,
+            "errores": [{"id": id_tarea, "error": mensaje} for id_tarea, mensaje in errores]}
+
+
 @app.route("/proyectos")
+@condicional(_versiones)
 def ver_proyectos():
     """
     Ruta para visualizar la lista de proyectos.
 
-    Se recupera el diccionario de proyectos y se renderiza la plantilla "proyectos.html".
+    Se obtienen de una vez los contadores por estado de todos los proyectos (sin recorrer sus
+    tareas) y se renderiza la plantilla "proyectos.html" con el número de tareas y el
+    progreso de cada uno. La página se sirve desde la caché mientras no cambien los proyectos
+    ni las tareas.
 
     Returns
     -------
     flask.Response
         Respuesta HTTP que renderiza la plantilla "proyectos.html" con los proyectos.
     """
-    proyectos = gestor_proyectos.proyectos
-    return render_template("proyectos.html", proyectos=proyectos)
+    def generar():
+        proyectos = {nombre: (sum(conteo.values()), porcentaje_completadas(conteo))
+                     for nombre, conteo in gestor_proyectos.conteo_de_proyectos().items()}
+        return render_template("proyectos.html", proyectos=proyectos)
+
+    return _pagina_cacheada(_versiones(), generar)
 
 
 @app.route("/proyectos/crear", methods=["POST"])
@@ -264,6 +643,7 @@ def asignar_tarea_a_proyecto():
 
 
 @app.route("/proyectos/<nombre>/tareas")
+@condicional(_versiones)
 def tareas_de_proyecto(nombre: str):
     """
     Ruta para listar las tareas asociadas a un proyecto específico.
@@ -276,17 +656,27 @@ def tareas_de_proyecto(nombre: str):
     Returns
     -------
     flask.Response
-        Si el proyecto existe, renderiza "tareas_proyecto.html" con sus tareas.
-        Si no, redirige a la ruta de visualización de proyectos.
+        Si el proyecto existe, renderiza "tareas_proyecto.html" con una página de sus tareas
+        (o la sirve desde la caché si no han cambiado los proyectos ni las tareas). Si no,
+        redirige a la ruta de visualización de proyectos.
     """
+    versiones = _versiones()
     proyecto = gestor_proyectos.proyectos.get(nombre)
     if not proyecto:
         return redirect(url_for("ver_proyectos"))
-    tareas = proyecto.tareas
-    return render_template("tareas_proyecto.html", nombre=proyecto.nombre, tareas=tareas)
+
+    def generar():
+        limite, cursor, _ = _parametros_pagina()
+        tareas, siguiente = proyecto.paginar_tareas(limite, cursor)
+        return render_template("tareas_proyecto.html", nombre=proyecto.nombre,
+                               tarjetas=_tarjetas("tarjeta_tarea_proyecto.html", tareas),
+                               url_siguiente=_url_pagina_siguiente(siguiente))
+
+    return _pagina_cacheada(versiones, generar)
 
 
 @app.route("/proyectos/<nombre>/progreso")
+@condicional(_versiones)
 def progreso_de_proyecto(nombre: str):
     """
     Ruta para visualizar el progreso de un proyecto.
@@ -312,5 +702,66 @@ def progreso_de_proyecto(nombre: str):
     return render_template("progreso.html", nombre=nombre, progreso=progreso)
 
 
+@app.route("/exportar/tareas")
+@condicional(_version_tareas)
+def descargar_tareas():
+    """
+    Ruta para exportar todas las tareas en streaming.
+
+    Acepta el parámetro 'formato' ("ndjson" por defecto, o "csv") y los filtros opcionales
+    'estado', 'usuario' y 'etiqueta' de "/filtrar". Las tareas se leen por lotes y se envían
+    a medida que se serializan, por lo que la memoria no crece con el número de tareas.
+
+    Returns
+    -------
+    flask.Response
+        Respuesta por bloques con las tareas, o un error 400 si el formato no existe.
+    """
+    formato = request.args.get("formato", "ndjson")
+    if formato not in FORMATOS:
+        return f"Formato no válido: {formato}", 400
+    estado_str = request.args.get("estado")
+    estado = MAPA_ESTADOS.get(estado_str.lower(), EstadoTarea.PENDIENTE) if estado_str else None
+    tareas = gestor.recorrer(estado=estado, usuario=request.args.get("usuario") or None,
+                             etiqueta=request.args.get("etiqueta") or None)
+    return Response(exportar_tareas(tareas, formato), mimetype=FORMATOS[formato],
+                    headers={"Content-Disposition": f'attachment; filename="tareas.{formato}"'})
+
+
+@app.route("/exportar/proyectos")
+@condicional(_versiones)
+def descargar_proyectos():
+    """
+    Ruta para exportar los proyectos en streaming, en NDJSON.
+
+    Cada línea contiene el nombre de un proyecto y los IDs de sus tareas.
+
+    Returns
+    -------
+    flask.Response
+        Respuesta por bloques con los proyectos.
+    """
+    return Response(exportar_proyectos(gestor_proyectos.proyectos), mimetype=FORMATOS["ndjson"],
+                    headers={"Content-Disposition": 'attachment; filename="proyectos.ndjson"'})
+
+
+def indicadores():
+    """
+    Indicadores instantáneos que se publican en /metrics.
+
+    Returns
+    -------
+    list
+        Tuplas (nombre, ayuda, valor) con el número de tareas y de proyectos.
+    """
+    return [
+        ("gestor_tareas", "Número de tareas gestionadas.", len(gestor.tareas)),
+        ("gestor_proyectos", "Número de proyectos.", len(gestor_proyectos.proyectos)),
+    ]
+
+
+instrumentar_app(app, indicadores)
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,83 @@
+"""
+Benchmark: listado de tareas por usuario en api.py
+==================================================
+
+Mide el coste de listar la primera página (20 tareas) de un usuario con 50 tareas mientras
+crece el número total de tareas de otros usuarios, en memoria y en SQLite. Se compara el
+índice por usuario de las tablas (`por_indice`) con el recorrido de todas las tareas que
+hacía antes `get_tareas`. Con el índice el coste debe mantenerse plano.
+
+También mide la comprobación de duplicados al asignar una tarea a un proyecto con 10.000
+tareas, que ahora es una búsqueda en un conjunto.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_api_usuarios.py
+"""
+
+import heapq
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.almacenamiento.sqlite import ConexionesSQLite  # noqa: E402
+from gestor_de_tareas.almacenamiento.tablas import TablaMemoria, TablaSQLite  # noqa: E402
+
+TAMANOS = (10_000, 100_000, 500_000)
+TAREAS_USUARIO = 50
+LIMITE = 20
+REPETICIONES = 200
+
+
+def poblar(tabla, n):
+    """
+    Guarda `n` tareas repartidas entre 1.000 usuarios y TAREAS_USUARIO del usuario "objetivo".
+    """
+    paso = n // TAREAS_USUARIO
+    tabla.update({str(i): {'name': f't{i}', 'description': '',
+                           'user': 'objetivo' if i % paso == 0 else f'u{i % 1000}'}
+                  for i in range(1, n + 1)})
+
+
+def listar_recorriendo(tabla, usuario):
+    """
+    Primera página de las tareas de un usuario recorriendo toda la tabla, como antes.
+    """
+    copia = tabla.copy()
+    ids = heapq.nsmallest(LIMITE + 1, (int(tarea_id) for tarea_id, tarea in copia.items() if tarea['user'] == usuario))
+    return {str(tarea_id): copia[str(tarea_id)] for tarea_id in ids[:LIMITE]}
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla con los milisegundos por listado.
+    """
+    print(f"{'tareas':>10} {'tabla':>8} {'recorrido':>12} {'índice':>10}   (ms por listado)")
+    with tempfile.TemporaryDirectory() as directorio:
+        for n in TAMANOS:
+            conexiones = ConexionesSQLite(os.path.join(directorio, f"api{n}.db"), esquema="")
+            tablas = (("memoria", TablaMemoria(indices=("user",))),
+                      ("sqlite", TablaSQLite(conexiones, "tareas", indices=("user",))))
+            for nombre, tabla in tablas:
+                poblar(tabla, n)
+                assert listar_recorriendo(tabla, 'objetivo') == tabla.por_indice('user', 'objetivo', 0, LIMITE)
+                repeticiones = max(1, REPETICIONES * 10_000 // n)
+                t_recorrido = timeit.timeit(lambda: listar_recorriendo(tabla, 'objetivo'), number=repeticiones)
+                t_indice = timeit.timeit(lambda: tabla.por_indice('user', 'objetivo', 0, LIMITE + 1),
+                                         number=REPETICIONES)
+                print(f"{n:>10} {nombre:>8} {t_recorrido / repeticiones * 1e3:12.3f} "
+                      f"{t_indice / REPETICIONES * 1e3:10.3f}")
+            conexiones.cerrar()
+
+    ids = [str(i) for i in range(10_000)]
+    como_lista, como_conjunto = list(ids), dict.fromkeys(ids)
+    t_lista = timeit.timeit(lambda: '9999' in como_lista, number=REPETICIONES)
+    t_conjunto = timeit.timeit(lambda: '9999' in como_conjunto, number=REPETICIONES)
+    print(f"Duplicado en un proyecto de 10.000 tareas: lista {t_lista / REPETICIONES * 1e6:.1f} µs, "
+          f"conjunto {t_conjunto / REPETICIONES * 1e6:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: arranque en frío
+===========================
+
+Mide cuánto tarda DiarioPersistente en recuperar una instantánea con carga completa y con
+carga perezosa (mmap), y cuánto tardan después la primera búsqueda por ID y el primer
+filtrado por estado, que en la carga perezosa construye los índices secundarios.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_arranque.py
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+from datetime import date
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.clases.tarea import Tarea, EstadoTarea  # noqa: E402
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+from gestor_de_tareas.gestores.proyectos import GestorProyectos  # noqa: E402
+from gestor_de_tareas.almacenamiento.diario import DiarioPersistente  # noqa: E402
+from gestor_de_tareas.almacenamiento.instantanea import escribir_instantanea  # noqa: E402
+
+TAMANOS = (100_000, 1_000_000)
+ETIQUETAS = ("backend", "frontend", "urgente", "bug", "mejora")
+USUARIOS = ("ana", "luis", "marta", "david")
+
+
+def preparar(directorio: str, n: int) -> None:
+    """
+    Escribe en `directorio` una instantánea con `n` tareas.
+
+    Parameters
+    ----------
+    directorio : str
+        Directorio de datos.
+    n : int
+        Número de tareas.
+    """
+    estados = list(EstadoTarea)
+
+    def tareas():
+        for i in range(1, n + 1):
+            tarea = Tarea(i, f"Tarea {i}", f"Descripción de la tarea {i}",
+                          date(2030, i % 12 + 1, i % 28 + 1), i % 3 + 1,
+                          [ETIQUETAS[i % 5], ETIQUETAS[(i + 1) % 5]], USUARIOS[i % 4])
+            tarea.estado = estados[i % 3]
+            yield tarea
+
+    with open(os.path.join(directorio, DiarioPersistente.ARCHIVO_INSTANTANEA), "wb") as archivo:
+        escribir_instantanea(archivo, tareas(), {"General": range(1, 1001)}, n + 1)
+
+
+def medir(directorio: str, perezosa: bool) -> None:
+    """
+    Recupera el estado guardado e imprime los tiempos de arranque y de las primeras consultas.
+
+    Parameters
+    ----------
+    directorio : str
+        Directorio de datos.
+    perezosa : bool
+        Si se usa la carga perezosa.
+    """
+    gestor = GestorDeTareas()
+    diario = DiarioPersistente(directorio, carga_perezosa=perezosa)
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        inicio = perf_counter()
+        diario.conectar(gestor, GestorProyectos())
+        arranque = perf_counter() - inicio
+    inicio = perf_counter()
+    gestor.obtener_por_id(len(gestor.tareas) // 2)
+    busqueda = perf_counter() - inicio
+    inicio = perf_counter()
+    gestor.mas_urgentes(20, EstadoTarea.PENDIENTE)
+    filtrado = perf_counter() - inicio
+    diario.cerrar()
+    nombre = "perezosa" if perezosa else "completa"
+    print(f"  {nombre:<9} arranque {arranque * 1000:9.1f} ms   primera búsqueda {busqueda * 1000:7.2f} ms"
+          f"   primer filtrado {filtrado * 1000:9.1f} ms")
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark para cada tamaño.
+    """
+    for n in TAMANOS:
+        with tempfile.TemporaryDirectory() as directorio:
+            preparar(directorio, n)
+            print(f"{n} tareas")
+            medir(directorio, perezosa=True)
+            medir(directorio, perezosa=False)
+
+
+if __name__ == "__main__":
+    main()
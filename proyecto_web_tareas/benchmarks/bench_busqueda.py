@@ -0,0 +1,130 @@
+"""
+Benchmark: búsqueda de texto
+============================
+
+Compara la búsqueda de tareas por palabras recorriendo todas las tareas (comparando el texto
+normalizado de cada una, como habría que hacer sin índice) con `GestorDeTareas.buscar`, que
+usa el índice invertido de gestor_de_tareas.utilidades.busqueda, y con
+`GestorDeTareasSQLite.buscar` (FTS5).
+
+Los títulos y descripciones se generan con un vocabulario de 20.000 palabras cuya frecuencia
+sigue una ley de Zipf, como en un texto real: unas pocas palabras aparecen en muchas tareas
+y la mayoría en muy pocas. Se mide una consulta con una palabra rara, otra con una palabra
+frecuente, una de dos palabras y una por prefijo, además del coste que añade el índice a
+`crear_tarea` y `modificar_tarea`.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_busqueda.py
+"""
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.almacenamiento.sqlite import GestorDeTareasSQLite  # noqa: E402
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+from gestor_de_tareas.utilidades.busqueda import normalizar  # noqa: E402
+
+TAMANOS = (10_000, 100_000, 1_000_000)
+# El recorrido y SQLite solo se miden hasta este tamaño.
+TAMANO_MAXIMO_RECORRIDO = 100_000
+REPETICIONES = 20
+LIMITE = 20
+SILABAS = ("ca", "pe", "ri", "mo", "lu", "ta", "ne", "so", "di", "ve", "ga", "lo", "fa", "tu", "re", "mi",
+           "bra", "ción", "ñe", "gü")
+VOCABULARIO = ["".join(silabas) for silabas in itertools.islice(
+    itertools.chain.from_iterable(itertools.product(SILABAS, repeat=n) for n in (3, 4)), 20_000)]
+random.Random(0).shuffle(VOCABULARIO)
+PESOS = list(itertools.accumulate(1 / rango for rango in range(1, len(VOCABULARIO) + 1)))
+
+
+def texto(azar, palabras):
+    """
+    Genera un texto con `palabras` palabras del vocabulario según su frecuencia.
+    """
+    return " ".join(azar.choices(VOCABULARIO, cum_weights=PESOS, k=palabras))
+
+
+def registros(n):
+    """
+    Genera `n` registros de tareas con un título de 4 palabras y una descripción de 12.
+    """
+    azar = random.Random(n)
+    return ({"titulo": texto(azar, 4).capitalize(), "descripcion": texto(azar, 12)} for _ in range(n))
+
+
+def consultas():
+    """
+    Consultas a medir: (nombre, texto).
+    """
+    return (("rara", VOCABULARIO[5_000]),
+            ("frecuente", VOCABULARIO[1]),
+            ("dos", f"{VOCABULARIO[3]} {VOCABULARIO[40]}"),
+            ("prefijo", VOCABULARIO[200][:4]))
+
+
+def buscar_recorriendo(gestor, consulta):
+    """
+    Búsqueda recorriendo todas las tareas: cada palabra de la consulta debe ser prefijo de
+    alguna palabra de la tarea. Devuelve los IDs de las coincidencias (sin ordenar por
+    relevancia, lo que aún haría el recorrido más lento).
+    """
+    terminos = normalizar(consulta)
+    encontradas = []
+    for tarea in gestor.tareas.values():
+        palabras = normalizar(f"{tarea.titulo} {tarea.descripcion}")
+        if all(any(palabra.startswith(termino) for palabra in palabras) for termino in terminos):
+            encontradas.append(tarea.id_tarea)
+    return encontradas
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla con los milisegundos por consulta.
+    """
+    print(f"{'tareas':>10} {'consulta':>10} {'recorrido':>12} {'índice':>10} {'sqlite':>10} {'total':>8}"
+          "   (ms por consulta, primera página de 20)")
+    for n in TAMANOS:
+        gestor = GestorDeTareas()
+        gestor.crear_tareas(registros(n))
+        t_construir = timeit.timeit(lambda: gestor.buscar(VOCABULARIO[0], 1), number=1)
+        print(f"{n:>10} construcción del índice en la primera búsqueda: {t_construir * 1e3:.0f} ms")
+
+        sqlite = None
+        if n <= TAMANO_MAXIMO_RECORRIDO:
+            directorio = tempfile.TemporaryDirectory()
+            sqlite = GestorDeTareasSQLite(os.path.join(directorio.name, "tareas.db"))
+            sqlite.crear_tareas(registros(n))
+
+        for nombre, consulta in consultas():
+            total = len(gestor._busqueda.buscar(consulta, n)[0])
+            t_indice = timeit.timeit(lambda: gestor.buscar(consulta, LIMITE), number=REPETICIONES) / REPETICIONES
+            t_recorrido = t_sqlite = float("nan")
+            if sqlite is not None:
+                assert len(buscar_recorriendo(gestor, consulta)) == total
+                assert len(sqlite.buscar(consulta, n)[0]) == total
+                t_recorrido = timeit.timeit(lambda: buscar_recorriendo(gestor, consulta), number=1)
+                t_sqlite = timeit.timeit(lambda: sqlite.buscar(consulta, LIMITE), number=REPETICIONES) / REPETICIONES
+            print(f"{n:>10} {nombre:>10} {t_recorrido * 1e3:12.1f} {t_indice * 1e3:10.3f} {t_sqlite * 1e3:10.3f} "
+                  f"{total:>8}")
+
+        azar = random.Random(1)
+        t_crear = timeit.timeit(lambda: gestor.crear_tarea(texto(azar, 4), texto(azar, 12)), number=1_000)
+        ids = list(itertools.islice(gestor.tareas, 1_000))
+        t_modificar = timeit.timeit(lambda: [gestor.modificar_tarea(id_tarea, titulo=texto(azar, 4))
+                                             for id_tarea in ids], number=1)
+        print(f"{n:>10} crear_tarea: {t_crear * 1e3:.1f} µs, modificar_tarea con nuevo título: "
+              f"{t_modificar * 1e3:.1f} µs")
+        if sqlite is not None:
+            sqlite._conexiones.cerrar()
+            directorio.cleanup()
+        del gestor
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: sondeo de cambios en api.py
+======================================
+
+Un cliente que quiere estar al día de las tareas y proyectos de su usuario vuelve a pedirlos
+cada cierto tiempo. Se compara, para un usuario con 10.000 tareas y 20 proyectos, el coste de
+cada sondeo (tiempo y bytes recibidos) de tres formas:
+
+    - descargando de nuevo todas las páginas de GET /tareas y GET /proyectos, como antes;
+    - con peticiones condicionales (If-None-Match con el ETag anterior): si nada ha
+      cambiado, cada petición responde 304 sin cuerpo;
+    - con GET /cambios?desde=<versión>, que devuelve solo lo que ha cambiado.
+
+Se mide sin cambios y tras modificar 10 tareas. Los datos están en memoria, o en SQLite con
+GESTOR_BACKEND=sqlite.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_cambios.py
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+import warnings
+
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_PROYECTO)
+sys.path.insert(0, os.path.dirname(DIRECTORIO_PROYECTO))
+os.environ.setdefault("GESTOR_DATOS", tempfile.mkdtemp())
+
+TAREAS = 10_000
+PROYECTOS = 20
+CAMBIOS = 10
+REPETICIONES = 20
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla con los milisegundos y bytes por sondeo.
+    """
+    warnings.simplefilter("ignore")  # Aviso de PyJWT por la longitud de la clave de ejemplo.
+    import api
+    import api_operaciones as operaciones
+
+    cliente = api.app.test_client()
+    cliente.post("/signup?user=bench&contraseña=x")
+    token = cliente.get("/signin?user=bench&contraseña=x").get_json()["access_token"]
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    ids = operaciones.crear_tareas_lote("bench", ({"name": f"t{i}"} for i in range(TAREAS)))[0]["creadas"]
+    for p in range(PROYECTOS):
+        operaciones.crear_proyecto("bench", f"P{p}")
+        for tarea_id in ids[p::PROYECTOS][:50]:
+            operaciones.asignar_tarea_a_proyecto("bench", f"P{p}", tarea_id)
+
+    etags = {}
+
+    def completo(condicional):
+        # Todas las páginas de /tareas y /proyectos; con `condicional`, enviando el ETag anterior.
+        recibidos = 0
+        urls = ["/tareas?limit=500", "/proyectos"]
+        while urls:
+            url = urls.pop()
+            extra = {"If-None-Match": etags[url]} if condicional and url in etags else {}
+            respuesta = cliente.get(url, headers=dict(cabeceras, **extra))
+            etags[url] = respuesta.headers["ETag"]
+            recibidos += len(respuesta.data)
+            if "X-Cursor-Siguiente" in respuesta.headers:
+                urls.append(f"/tareas?limit=500&cursor={respuesta.headers['X-Cursor-Siguiente']}")
+        return recibidos
+
+    version = [operaciones.version_usuario("bench")]
+
+    def delta():
+        respuesta = cliente.get(f"/cambios?desde={version[0]}", headers=cabeceras)
+        version[0] = respuesta.get_json()["version"]
+        return len(respuesta.data)
+
+    contador = iter(range(10 ** 9))
+
+    def modificar():
+        for tarea_id in ids[:CAMBIOS]:
+            operaciones.actualizar_tarea("bench", tarea_id, {"name": f"cambio {next(contador)}"})
+
+    print(f"{'sondeo':>14} {'cambios':>8} {'ms':>10} {'bytes':>10}")
+    completo(True)
+    for nombre, sondeo in (("completo", lambda: completo(False)), ("condicional", lambda: completo(True)),
+                           ("/cambios", delta)):
+        for cambios in (0, CAMBIOS):
+            def medido():
+                if cambios:
+                    modificar()
+                return sondeo()
+
+            medido()  # Pone al día el ETag o la versión tras la medición anterior.
+            recibidos = medido()
+            t = timeit.timeit(medido, number=REPETICIONES) / REPETICIONES
+            if cambios:
+                t -= timeit.timeit(modificar, number=REPETICIONES) / REPETICIONES
+            print(f"{nombre:>14} {cambios:>8} {t * 1e3:10.2f} {recibidos:>10}")
+
+
+if __name__ == "__main__":
+    main()
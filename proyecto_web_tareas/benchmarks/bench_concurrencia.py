@@ -0,0 +1,253 @@
+"""
+Prueba de carga: GestorDeTareas y api.py desde muchos hilos
+===========================================================
+
+Lanza varios hilos que crean, modifican, cambian de estado, asignan y eliminan tareas
+mientras otros consultan el gestor (filtros, paginación, orden por prioridad y recorrido
+completo), como haría un servidor WSGI con hilos. El intervalo de cambio de hilo se reduce
+para provocar entrelazados. Al terminar se comprueban los invariantes:
+
+    - ningún ID se ha asignado dos veces y `contador_id` es mayor que todos los IDs;
+    - los índices secundarios coinciden con los que se obtienen recorriendo las tareas;
+    - se ha publicado un evento "crear" por tarea creada;
+    - ninguna consulta ha fallado.
+
+Después repite la prueba contra api.py con el cliente de pruebas de Flask: los IDs de las
+tareas creadas en paralelo (también en bloque y tras borrar) no pueden repetirse.
+
+Imprime las operaciones por segundo y termina con código 1 si se incumple algún invariante.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_concurrencia.py
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.clases.tarea import EstadoTarea  # noqa: E402
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas, _clave_prioridad  # noqa: E402
+
+ESCRITORES = 8
+LECTORES = 8
+OPERACIONES = 2_000
+ETIQUETAS = ("backend", "frontend", "urgente", "bug", "mejora")
+USUARIOS = ("ana", "luis", "marta", "david")
+
+
+def en_hilos(funciones: List[Callable[[], None]]) -> float:
+    """
+    Ejecuta cada función en su propio hilo y espera a que terminen todas.
+
+    Returns
+    -------
+    float
+        Segundos empleados.
+    """
+    hilos = [threading.Thread(target=funcion) for funcion in funciones]
+    inicio = perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return perf_counter() - inicio
+
+
+def escritor(gestor: GestorDeTareas, semilla: int, creadas: List[int]) -> Callable[[], None]:
+    """
+    Devuelve una función que hace OPERACIONES modificaciones aleatorias.
+    """
+    def ejecutar() -> None:
+        azar = random.Random(semilla)
+        for i in range(OPERACIONES):
+            operacion = azar.random()
+            id_tarea = azar.randrange(1, gestor.contador_id)
+            if operacion < 0.4:
+                tarea = gestor.crear_tarea(f"Tarea {semilla}-{i}", "", f"2030-01-{i % 28 + 1:02d}",
+                                           azar.randint(1, 3), [azar.choice(ETIQUETAS)], azar.choice(USUARIOS))
+                creadas.append(tarea.id_tarea)
+            elif operacion < 0.45:
+                ids, _ = gestor.crear_tareas({"titulo": f"Lote {semilla}-{i}-{j}", "prioridad": j % 3 + 1,
+                                              "etiquetas": [ETIQUETAS[j % 5]]} for j in range(20))
+                creadas.extend(ids)
+            elif operacion < 0.65:
+                gestor.cambiar_estado_tarea(id_tarea, azar.choice(list(EstadoTarea)))
+            elif operacion < 0.75:
+                gestor.modificar_tarea(id_tarea, prioridad=azar.randint(1, 3),
+                                       etiquetas=[azar.choice(ETIQUETAS)])
+            elif operacion < 0.85:
+                gestor.asignar_usuario_tarea(id_tarea, azar.choice(USUARIOS))
+            elif operacion < 0.95:
+                gestor.eliminar_tarea(id_tarea)
+            else:
+                gestor.eliminar_tareas(range(id_tarea, id_tarea + 5))
+    return ejecutar
+
+
+def lector(gestor: GestorDeTareas, semilla: int, fallos: List[BaseException],
+           contador: Counter) -> Callable[[], None]:
+    """
+    Devuelve una función que hace OPERACIONES consultas aleatorias y anota los fallos.
+    """
+    def ejecutar() -> None:
+        azar = random.Random(semilla)
+        for _ in range(OPERACIONES):
+            try:
+                operacion = azar.randrange(6)
+                if operacion == 0:
+                    gestor.consultar(azar.choice(list(EstadoTarea)), azar.choice(USUARIOS))
+                elif operacion == 1:
+                    gestor.filtrar_por_etiqueta(azar.choice(ETIQUETAS))
+                elif operacion == 2:
+                    gestor.paginar(20, orden=azar.choice(("id", "prioridad")), usuario=azar.choice(USUARIOS))
+                elif operacion == 3:
+                    gestor.mas_urgentes(10)
+                elif operacion == 4:
+                    gestor.obtener_por_id(azar.randrange(1, gestor.contador_id))
+                else:
+                    sum(1 for _ in gestor.recorrer(etiqueta=azar.choice(ETIQUETAS), lote=200))
+                contador["consultas"] += 1
+            except BaseException as error:  # noqa: B902 - se informa al final
+                fallos.append(error)
+    return ejecutar
+
+
+def comprobar_gestor(gestor: GestorDeTareas, creadas: List[int], eventos: Counter,
+                     fallos: List[BaseException]) -> List[str]:
+    """
+    Comprueba los invariantes del gestor tras la prueba.
+
+    Returns
+    -------
+    List[str]
+        Descripción de cada invariante incumplido.
+    """
+    errores = []
+    repetidos = [id_tarea for id_tarea, veces in Counter(creadas).items() if veces > 1]
+    if repetidos:
+        errores.append(f"IDs asignados más de una vez: {repetidos[:10]}")
+    if gestor.tareas and gestor.contador_id <= max(gestor.tareas):
+        errores.append("contador_id no es mayor que todos los IDs")
+    if eventos["crear"] != len(creadas):
+        errores.append(f"eventos 'crear': {eventos['crear']}, tareas creadas: {len(creadas)}")
+    if gestor.version % 2:
+        errores.append("la versión ha quedado impar")
+
+    por_estado: Dict[EstadoTarea, set] = {estado: set() for estado in EstadoTarea}
+    por_usuario: Dict[str, set] = {}
+    por_etiqueta: Dict[str, set] = {}
+    claves: Dict[EstadoTarea, List] = {estado: [] for estado in EstadoTarea}
+    for id_tarea, tarea in gestor.tareas.items():
+        if tarea.id_tarea != id_tarea:
+            errores.append(f"la tarea {tarea.id_tarea} está guardada con el ID {id_tarea}")
+        por_estado[tarea.estado].add(id_tarea)
+        claves[tarea.estado].append(_clave_prioridad(tarea))
+        if tarea.usuario_asignado:
+            por_usuario.setdefault(tarea.usuario_asignado, set()).add(id_tarea)
+        for etiqueta in tarea.etiquetas:
+            por_etiqueta.setdefault(etiqueta, set()).add(id_tarea)
+    if list(gestor._por_id) != sorted(gestor.tareas):
+        errores.append("la lista de IDs no coincide con las tareas")
+    if por_estado != gestor._por_estado:
+        errores.append("el índice por estado no coincide con las tareas")
+    if por_usuario != gestor._por_usuario:
+        errores.append("el índice por usuario no coincide con las tareas")
+    if por_etiqueta != gestor._por_etiqueta:
+        errores.append("el índice por etiqueta no coincide con las tareas")
+    for estado, claves_estado in claves.items():
+        if sorted(claves_estado) != list(gestor._por_prioridad[estado]):
+            errores.append(f"el índice por prioridad de {estado.name} no coincide con las tareas")
+    if fallos:
+        errores.append(f"{len(fallos)} consultas han fallado, la primera con {fallos[0]!r}")
+    return errores
+
+
+def probar_gestor() -> List[str]:
+    """
+    Ejecuta la prueba contra GestorDeTareas e imprime el rendimiento.
+    """
+    gestor = GestorDeTareas()
+    eventos: Counter = Counter()
+    gestor.suscribir(lambda tipo, datos: eventos.update((tipo,)))
+    creadas: List[int] = []
+    for i in range(1_000):
+        creadas.append(gestor.crear_tarea(f"Inicial {i}", prioridad=i % 3 + 1,
+                                          etiquetas=[ETIQUETAS[i % 5]], usuario_asignado=USUARIOS[i % 4]).id_tarea)
+
+    fallos: List[BaseException] = []
+    contador: Counter = Counter()
+    funciones = ([escritor(gestor, semilla, creadas) for semilla in range(ESCRITORES)]
+                 + [lector(gestor, 100 + semilla, fallos, contador) for semilla in range(LECTORES)])
+    duracion = en_hilos(funciones)
+    print(f"GestorDeTareas: {ESCRITORES} escritores y {LECTORES} lectores, {duracion:.2f} s")
+    print(f"  {ESCRITORES * OPERACIONES / duracion:10.0f} modificaciones/s")
+    print(f"  {contador['consultas'] / duracion:10.0f} consultas/s")
+    print(f"  {len(gestor.tareas)} tareas al terminar, {len(creadas)} creadas")
+    return comprobar_gestor(gestor, creadas, eventos, fallos)
+
+
+def probar_api() -> List[str]:
+    """
+    Crea y borra tareas en paralelo a través de api.py y comprueba que los IDs no se repiten.
+    """
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    import api  # noqa: E402
+
+    cliente = api.app.test_client()
+    cliente.post("/signup?user=carga&contraseña=x")
+    token = cliente.get("/signin?user=carga&contraseña=x").get_json()["access_token"]
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    creadas: List[str] = []
+    fallos: List[str] = []
+
+    def ejecutar(semilla: int) -> Callable[[], None]:
+        def cuerpo() -> None:
+            cliente_hilo = api.app.test_client()
+            azar = random.Random(semilla)
+            for i in range(100):
+                if azar.random() < 0.8:
+                    respuesta = cliente_hilo.post(f"/tareas?name=t{semilla}-{i}", headers=cabeceras)
+                    creadas.append(respuesta.get_data(as_text=True).split()[1])
+                else:
+                    lineas = "\n".join(json.dumps({"name": f"l{semilla}-{i}-{j}"}) for j in range(10))
+                    respuesta = cliente_hilo.post("/tareas/lote", data=lineas, headers=cabeceras)
+                    creadas.extend(respuesta.get_json()["creadas"])
+                if creadas and azar.random() < 0.3:
+                    cliente_hilo.delete(f"/tareas/{azar.choice(creadas)}", headers=cabeceras)
+                if cliente_hilo.get("/tareas?limit=5", headers=cabeceras).status_code != 200:
+                    fallos.append("GET /tareas")
+        return cuerpo
+
+    duracion = en_hilos([ejecutar(semilla) for semilla in range(ESCRITORES)])
+    print(f"api.py: {ESCRITORES} hilos, {len(creadas)} tareas creadas en {duracion:.2f} s")
+    errores = []
+    repetidos = [tarea_id for tarea_id, veces in Counter(creadas).items() if veces > 1]
+    if repetidos:
+        errores.append(f"api.py ha repetido IDs: {repetidos[:10]}")
+    if fallos:
+        errores.append(f"api.py: {len(fallos)} consultas han fallado")
+    return errores
+
+
+def main() -> None:
+    """
+    Ejecuta ambas pruebas y termina con código 1 si se incumple algún invariante.
+    """
+    sys.setswitchinterval(1e-6)
+    errores: List[Any] = probar_gestor() + probar_api()
+    for error in errores:
+        print(f"[ERROR] {error}")
+    if errores:
+        sys.exit(1)
+    print("Invariantes correctos.")
+
+
+if __name__ == "__main__":
+    main()
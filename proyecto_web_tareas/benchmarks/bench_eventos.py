@@ -0,0 +1,120 @@
+"""
+Benchmark: flujo de eventos frente a sondeo de cambios
+======================================================
+
+Compara dos formas de que CLIENTES clientes (cada uno de un usuario distinto) se enteren de
+los cambios de sus datos:
+
+    - sondeo: cada cliente pide GET /cambios?desde=<versión> una vez por segundo; casi siempre
+      no hay nada nuevo, pero cada petición cuesta lo mismo;
+    - eventos: cada cliente mantiene abierto GET /cambios/eventos en api_asgi.py y solo recibe
+      algo cuando cambian sus datos.
+
+Se mide la CPU que gasta el servidor por segundo sin cambios, la memoria de los flujos
+abiertos, el coste de un cambio con todos los flujos abiertos (solo se avisa al flujo de su
+usuario) y el tiempo desde el cambio hasta que su cliente lo recibe. Los clientes son
+simulados en el mismo proceso (el servidor ASGI no interviene) y los datos están en memoria.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_eventos.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+import warnings
+
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_PROYECTO)
+sys.path.insert(0, os.path.dirname(DIRECTORIO_PROYECTO))
+os.environ.setdefault("GESTOR_DATOS", tempfile.mkdtemp())
+
+CLIENTES = 1_000
+ESPERA = 2.0
+CAMBIOS = 200
+
+
+async def abrir(api_asgi, usuario):
+    """
+    Abre un flujo de eventos de `usuario` y espera su evento "inicio".
+
+    Returns
+    -------
+    tuple
+        (tarea del flujo, cola con los mensajes enviados, cola para desconectar).
+    """
+    enviados, recibir = asyncio.Queue(), asyncio.Queue()
+    peticion = api_asgi.Peticion({"method": "GET", "path": "/cambios/eventos", "headers": []}, recibir.get)
+    peticion.usuario = usuario
+    await recibir.put({"type": "http.request", "body": b""})
+    tarea = asyncio.ensure_future(api_asgi.enviar(enviados.put, api_asgi.Eventos(peticion, None)))
+    await enviados.get()  # http.response.start
+    await enviados.get()  # inicio
+    return tarea, enviados, recibir
+
+
+async def main() -> None:
+    """
+    Ejecuta el benchmark e imprime los resultados.
+    """
+    warnings.simplefilter("ignore")  # Aviso de PyJWT por la longitud de la clave de ejemplo.
+    import api
+    import api_asgi
+    import api_operaciones as operaciones
+
+    cliente = api.app.test_client()
+    usuarios = [f"u{i}" for i in range(1, CLIENTES + 1)]
+    # u0 no abre flujo: sus cambios no deben despertar a nadie.
+    cliente.post("/signup?user=u0&contraseña=x")
+    token = cliente.get("/signin?user=u0&contraseña=x").get_json()["access_token"]
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    version = operaciones.version_usuario("u0")
+
+    t_sondeo = timeit.timeit(lambda: cliente.get(f"/cambios?desde={version}", headers=cabeceras),
+                             number=CLIENTES) / CLIENTES
+    print(f"{'sondeo':>8}: {t_sondeo * 1e3:.2f} ms por petición sin cambios; con {CLIENTES} clientes a 1 "
+          f"petición/s, {t_sondeo * CLIENTES * 1e3:.0f} ms de CPU por segundo")
+
+    t_cambio_solo = timeit.timeit(lambda: operaciones.crear_tarea("u0", "tarea", ""), number=CAMBIOS) / CAMBIOS
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    flujos = [await abrir(api_asgi, usuario) for usuario in usuarios]
+    memoria = (tracemalloc.get_traced_memory()[0] - antes) / CLIENTES
+    tracemalloc.stop()
+
+    cpu = time.process_time()
+    await asyncio.sleep(ESPERA)
+    cpu = (time.process_time() - cpu) / ESPERA
+    print(f"{'eventos':>8}: {len(operaciones.difusor)} flujos abiertos, {memoria / 1024:.1f} KB por flujo, "
+          f"{cpu * 1e3:.1f} ms de CPU por segundo sin cambios")
+
+    t_cambio_otro = timeit.timeit(lambda: operaciones.crear_tarea("u0", "tarea", ""), number=CAMBIOS) / CAMBIOS
+    t_cambio_flujo = timeit.timeit(lambda: operaciones.crear_tarea("u1", "tarea", ""), number=CAMBIOS) / CAMBIOS
+    print(f"{'cambio':>8}: crear_tarea {t_cambio_solo * 1e6:.0f} µs sin flujos; con {CLIENTES} flujos abiertos, "
+          f"{t_cambio_otro * 1e6:.0f} µs si su usuario no tiene flujo y {t_cambio_flujo * 1e6:.0f} µs si lo tiene")
+    await flujos[0][1].get()  # Los cambios anteriores de u1 llegan juntos en un evento.
+
+    latencias = []
+    for i in range(CAMBIOS):
+        _, enviados, _ = flujos[i % CLIENTES]
+        inicio = time.perf_counter()
+        operaciones.crear_tarea(usuarios[i % CLIENTES], "tarea", "")
+        await enviados.get()
+        latencias.append(time.perf_counter() - inicio)
+    print(f"{'entrega':>8}: evento recibido {statistics.median(latencias) * 1e3:.2f} ms después del cambio "
+          f"(mediana), frente a 500 ms de media sondeando cada segundo")
+
+    for tarea, _, recibir in flujos:
+        await recibir.put({"type": "http.disconnect"})
+    await asyncio.gather(*(tarea for tarea, _, _ in flujos))
+    print(f"{'cierre':>8}: {len(operaciones.difusor)} flujos abiertos tras desconectar")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark: exportación en streaming
+===================================
+
+Compara la memoria adicional y el tiempo de exportar todas las tareas construyendo primero
+el documento completo (como hacía get_tareas en api.py) y escribiéndolas en streaming con
+gestor_de_tareas.utilidades.exportacion. La memoria se mide con tracemalloc, así que solo
+cuenta lo que se reserva durante la exportación y no las tareas ya cargadas en el gestor.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_exportacion.py
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+from datetime import date
+from time import perf_counter
+from typing import Callable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.clases.tarea import Tarea  # noqa: E402
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+from gestor_de_tareas.utilidades.exportacion import exportar_tareas  # noqa: E402
+
+TAMANOS = (100_000, 1_000_000)
+ETIQUETAS = ("backend", "frontend", "urgente", "bug", "mejora")
+USUARIOS = ("ana", "luis", "marta", "david")
+
+
+def crear_gestor(n: int) -> GestorDeTareas:
+    """
+    Crea un gestor con `n` tareas.
+
+    Parameters
+    ----------
+    n : int
+        Número de tareas.
+
+    Returns
+    -------
+    GestorDeTareas
+        Gestor con las tareas indexadas.
+    """
+    gestor = GestorDeTareas()
+    for i in range(1, n + 1):
+        gestor.restaurar_tarea(Tarea(i, f"Tarea {i}", f"Descripción de la tarea {i}",
+                                     date(2030, i % 12 + 1, i % 28 + 1), i % 3 + 1,
+                                     [ETIQUETAS[i % 5], ETIQUETAS[(i + 1) % 5]], USUARIOS[i % 4]))
+    gestor.contador_id = n + 1
+    return gestor
+
+
+def completo(gestor: GestorDeTareas, salida) -> None:
+    """
+    Serializa todas las tareas en un único documento JSON y lo escribe.
+    """
+    salida.write(json.dumps({tarea.id_tarea: tarea.a_dict() for tarea in gestor.tareas.values()},
+                            ensure_ascii=False))
+
+
+def streaming(gestor: GestorDeTareas, salida) -> None:
+    """
+    Escribe las tareas en NDJSON a medida que se serializan.
+    """
+    salida.writelines(exportar_tareas(gestor.recorrer()))
+
+
+def medir(exportar: Callable, gestor: GestorDeTareas) -> Tuple[float, float]:
+    """
+    Exporta las tareas a /dev/null midiendo el tiempo y el pico de memoria.
+
+    Returns
+    -------
+    Tuple[float, float]
+        Segundos empleados y pico de memoria reservada en MB.
+    """
+    with open(os.devnull, "w", encoding="utf-8") as salida:
+        tracemalloc.start()
+        inicio = perf_counter()
+        exportar(gestor, salida)
+        duracion = perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return duracion, pico / 1_000_000
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark para cada tamaño.
+    """
+    for n in TAMANOS:
+        gestor = crear_gestor(n)
+        print(f"{n} tareas")
+        for nombre, exportar in (("completo", completo), ("streaming", streaming)):
+            duracion, pico = medir(exportar, gestor)
+            print(f"  {nombre:<10} {duracion:7.2f} s   pico de memoria {pico:9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: creación de tareas una a una frente a creación en bloque
+===================================================================
+
+Compara el tiempo de crear muchas tareas llamando a `crear_tarea` en un bucle y con
+`crear_tareas`, que lee un documento NDJSON, valida por lotes y actualiza los índices una vez
+por lote, tanto en el gestor en memoria como en el backend SQLite.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_importacion.py
+"""
+
+import contextlib
+import json
+import os
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any, Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+from gestor_de_tareas.almacenamiento.sqlite import GestorDeTareasSQLite  # noqa: E402
+from gestor_de_tareas.utilidades.importacion import leer_ndjson  # noqa: E402
+
+TAMANOS = (100_000, 500_000)
+ETIQUETAS = ("backend", "frontend", "urgente", "bug", "mejora")
+USUARIOS = ("ana", "luis", "marta", "david")
+
+
+def crear_lineas(n: int) -> List[str]:
+    """
+    Genera `n` líneas NDJSON con datos variados.
+
+    Parameters
+    ----------
+    n : int
+        Número de tareas.
+
+    Returns
+    -------
+    List[str]
+        Una línea por tarea.
+    """
+    return [json.dumps({"titulo": f"Tarea {i}", "descripcion": f"Descripción de la tarea {i}",
+                        "fecha_limite": f"2030-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "prioridad": i % 3 + 1,
+                        "etiquetas": [ETIQUETAS[i % 5]], "usuario_asignado": USUARIOS[i % 4]})
+            for i in range(n)]
+
+
+def una_a_una(gestor: Any, lineas: List[str]) -> None:
+    """
+    Crea las tareas con una llamada a `crear_tarea` por línea.
+    """
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for linea in lineas:
+            datos = json.loads(linea)
+            gestor.crear_tarea(datos["titulo"], datos["descripcion"], datos["fecha_limite"],
+                               datos["prioridad"], datos["etiquetas"], datos["usuario_asignado"])
+
+
+def en_bloque(gestor: Any, lineas: List[str]) -> None:
+    """
+    Crea las tareas con `crear_tareas`.
+    """
+    gestor.crear_tareas(leer_ndjson(lineas))
+
+
+def medir(crear: Callable, gestor: Any, lineas: List[str]) -> float:
+    """
+    Devuelve los segundos que tarda `crear` en crear las tareas.
+    """
+    inicio = perf_counter()
+    crear(gestor, lineas)
+    return perf_counter() - inicio
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime, para cada tamaño, una línea por método.
+    """
+    for n in TAMANOS:
+        lineas = crear_lineas(n)
+        print(f"{n} tareas")
+        with tempfile.TemporaryDirectory() as directorio:
+            for nombre, crear in (("una a una", una_a_una), ("en bloque", en_bloque)):
+                memoria = medir(crear, GestorDeTareas(), lineas)
+                ruta = os.path.join(directorio, f"{crear.__name__}.db")
+                sqlite = medir(crear, GestorDeTareasSQLite(ruta), lineas)
+                print(f"  {nombre:<10} memoria {memoria:7.2f} s   sqlite {sqlite:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
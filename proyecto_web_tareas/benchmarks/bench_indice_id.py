@@ -0,0 +1,73 @@
+"""
+Benchmark: búsqueda por ID en GestorDeTareas
+============================================
+
+Mide el coste medio de `obtener_por_id`, `cambiar_estado_tarea` y de eliminar y volver a
+crear tareas con gestores de 1.000 a 1.000.000 de tareas. Con el índice por identificador
+el coste debe mantenerse plano independientemente del tamaño.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_indice_id.py
+"""
+
+import contextlib
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+from gestor_de_tareas.clases.tarea import EstadoTarea  # noqa: E402
+
+TAMANOS = (1_000, 10_000, 100_000, 1_000_000)
+CONSULTAS = 10_000
+
+
+def poblar(n: int) -> GestorDeTareas:
+    """
+    Crea un gestor con `n` tareas.
+
+    Parameters
+    ----------
+    n : int
+        Número de tareas a crear.
+
+    Returns
+    -------
+    GestorDeTareas
+        Gestor poblado.
+    """
+    gestor = GestorDeTareas()
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for i in range(n):
+            gestor.crear_tarea(f"Tarea {i}", fecha_limite_str="2030-01-01", prioridad=i % 3 + 1)
+    return gestor
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla con los microsegundos por operación.
+    """
+    print(f"{'tareas':>10} {'obtener_por_id':>16} {'cambiar_estado':>16} {'eliminar+crear':>16}")
+    for n in TAMANOS:
+        gestor = poblar(n)
+        ids = [random.randint(1, n) for _ in range(CONSULTAS)]
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            t_obtener = timeit.timeit(lambda: [gestor.obtener_por_id(i) for i in ids], number=1)
+            t_estado = timeit.timeit(
+                lambda: [gestor.cambiar_estado_tarea(i, EstadoTarea.EN_PROGRESO) for i in ids], number=1)
+
+            def eliminar_y_crear() -> None:
+                for _ in range(CONSULTAS):
+                    gestor.eliminar_tarea(next(iter(gestor.tareas)))
+                    gestor.crear_tarea("Reemplazo")
+            t_eliminar = timeit.timeit(eliminar_y_crear, number=1)
+        por_op = 1e6 / CONSULTAS
+        print(f"{n:>10} {t_obtener * por_op:>14.2f}us {t_estado * por_op:>14.2f}us "
+              f"{t_eliminar * por_op:>14.2f}us")
+
+
+if __name__ == "__main__":
+    main()
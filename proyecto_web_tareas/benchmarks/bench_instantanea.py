@@ -0,0 +1,117 @@
+"""
+Benchmark: instantánea binaria frente a pickle
+==============================================
+
+Compara el tiempo de guardado, el tiempo de carga y el tamaño del archivo entre el guardado
+con pickle de persistencia.py (`guardar_datos` / `cargar_datos`) y el formato binario de
+gestor_de_tareas.almacenamiento.instantanea. Una de cada diez tareas lleva una descripción
+larga, que el formato binario deja sin decodificar al cargar.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_instantanea.py
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+from datetime import date
+from time import perf_counter
+from typing import List, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(RAIZ))
+
+from persistencia import cargar_datos, guardar_datos  # noqa: E402
+from gestor_de_tareas.clases.tarea import Tarea  # noqa: E402
+from gestor_de_tareas.almacenamiento.instantanea import LectorInstantanea, escribir_instantanea  # noqa: E402
+
+TAMANOS = (100_000, 1_000_000)
+ETIQUETAS = ("backend", "frontend", "urgente", "bug", "mejora")
+USUARIOS = ("ana", "luis", "marta", "david")
+
+
+def crear_tareas(n: int) -> List[Tarea]:
+    """
+    Crea `n` tareas con datos variados.
+
+    Parameters
+    ----------
+    n : int
+        Número de tareas.
+
+    Returns
+    -------
+    List[Tarea]
+        Tareas creadas.
+    """
+    larga = "Notas de la reunión. " * 100
+    return [Tarea(i, f"Tarea {i}",
+                  f"{larga}{i}" if i % 10 == 0 else f"Descripción de la tarea {i}",
+                  date(2030, i % 12 + 1, i % 28 + 1), i % 3 + 1,
+                  [ETIQUETAS[i % 5], ETIQUETAS[(i + 1) % 5]], USUARIOS[i % 4])
+            for i in range(1, n + 1)]
+
+
+def medir_pickle(tareas: List[Tarea], ruta: str) -> Tuple[float, float, int]:
+    """
+    Guarda y carga las tareas con pickle.
+
+    Returns
+    -------
+    Tuple[float, float, int]
+        Segundos de guardado, segundos de carga y bytes del archivo.
+    """
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        inicio = perf_counter()
+        guardar_datos([], tareas, {"General": tareas[:1000]}, ruta)
+        guardado = perf_counter() - inicio
+        inicio = perf_counter()
+        cargar_datos(ruta)
+        carga = perf_counter() - inicio
+    return guardado, carga, os.path.getsize(ruta)
+
+
+def medir_instantanea(tareas: List[Tarea], ruta: str) -> Tuple[float, float, int]:
+    """
+    Guarda y carga las tareas con el formato binario.
+
+    Returns
+    -------
+    Tuple[float, float, int]
+        Segundos de guardado, segundos de carga y bytes del archivo.
+    """
+    inicio = perf_counter()
+    with open(ruta, "wb") as archivo:
+        escribir_instantanea(archivo, tareas, {"General": [t.id_tarea for t in tareas[:1000]]},
+                             len(tareas) + 1)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    guardado = perf_counter() - inicio
+    inicio = perf_counter()
+    with open(ruta, "rb") as archivo:
+        lector = LectorInstantanea(archivo)
+        list(lector.tareas())
+        lector.proyectos()
+    carga = perf_counter() - inicio
+    return guardado, carga, os.path.getsize(ruta)
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla por cada tamaño.
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        for n in TAMANOS:
+            tareas = crear_tareas(n)
+            print(f"{n} tareas")
+            for nombre, medir, archivo in (("pickle", medir_pickle, "datos.pkl"),
+                                           ("instantanea", medir_instantanea, "instantanea.bin")):
+                guardado, carga, tamano = medir(tareas, os.path.join(directorio, archivo))
+                print(f"  {nombre:<12} guardar {guardado:7.2f} s   cargar {carga:7.2f} s   "
+                      f"{tamano / 1_000_000:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
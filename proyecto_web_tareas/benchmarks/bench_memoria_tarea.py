@@ -0,0 +1,69 @@
+"""
+Benchmark: memoria por tarea
+============================
+
+Mide con `tracemalloc` los bytes que ocupa cada tarea dentro de GestorDeTareas, incluyendo
+los índices del gestor. Las tareas llevan etiquetas, usuario y fecha repetidos entre sí,
+como ocurre en un uso real.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_memoria_tarea.py
+"""
+
+import contextlib
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+
+TAMANOS = (10_000, 100_000)
+ETIQUETAS = ("backend", "frontend", "urgente", "bug", "mejora")
+USUARIOS = ("ana", "luis", "marta", "david")
+
+
+def medir(n: int) -> float:
+    """
+    Crea `n` tareas y mide la memoria reservada por ellas.
+
+    Parameters
+    ----------
+    n : int
+        Número de tareas a crear.
+
+    Returns
+    -------
+    float
+        Bytes por tarea.
+    """
+    gestor = GestorDeTareas()
+    tracemalloc.start()
+    inicio, _ = tracemalloc.get_traced_memory()
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for i in range(n):
+            gestor.crear_tarea(
+                f"Tarea {i}",
+                descripcion=f"Descripción de la tarea {i}",
+                fecha_limite_str=f"2030-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                prioridad=i % 3 + 1,
+                # Se construyen cadenas nuevas, como las que llegan desde un formulario.
+                etiquetas=["".join(ETIQUETAS[i % 5]), "".join(ETIQUETAS[(i + 1) % 5])],
+                usuario_asignado="".join(USUARIOS[i % 4])
+            )
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (actual - inicio) / n
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime los bytes por tarea para cada tamaño.
+    """
+    for n in TAMANOS:
+        print(f"{n:>8} tareas: {medir(n):8.1f} bytes/tarea")
+
+
+if __name__ == "__main__":
+    main()
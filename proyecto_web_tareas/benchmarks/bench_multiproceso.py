@@ -0,0 +1,196 @@
+"""
+Prueba de carga: app.py con varios workers sobre SQLite
+=======================================================
+
+Sirve app.py con GESTOR_BACKEND=sqlite y 1, 2 y 4 procesos worker que aceptan conexiones del
+mismo socket (como gunicorn en modo prefork) y lanza varios procesos cliente durante unos
+segundos con una mezcla de peticiones: listado de tareas, progreso de un proyecto, /metrics y
+creación de tareas. Imprime las peticiones por segundo y las latencias de cada configuración.
+
+Además comprueba que las cachés de lectura de cada worker se invalidan cuando escribe otro:
+después de crear una tarea, cada cliente lee /metrics (atendido por cualquier worker) y el
+total de tareas no puede ser menor que el que ya conoce ni que las tareas iniciales más las
+que ha creado él mismo. Las lecturas que no cumplen esto se
+cuentan como "desactualizadas" y deben ser 0.
+
+El rendimiento solo escala si la máquina tiene varios núcleos: con uno solo, los workers y los
+clientes se reparten la misma CPU.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_multiproceso.py
+"""
+
+import contextlib
+import http.client
+import io
+import json
+import logging
+import multiprocessing
+import os
+import random
+import re
+import signal
+import socket
+import sys
+import tempfile
+from time import perf_counter, sleep
+from typing import Dict, List, Tuple
+
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_PROYECTO)
+
+WORKERS = (1, 2, 4)
+CLIENTES = 8
+DURACION = 5.0
+TAREAS_INICIALES = 20_000
+PROYECTO = "Carga"
+_TAREAS = re.compile(rb"^gestor_tareas (\d+)", re.MULTILINE)
+
+
+def preparar_datos(directorio: str) -> None:
+    """
+    Crea la base de datos con TAREAS_INICIALES tareas y un proyecto con 200 de ellas.
+    """
+    from gestor_de_tareas.almacenamiento.sqlite import GestorDeTareasSQLite, GestorProyectosSQLite
+
+    gestor = GestorDeTareasSQLite(os.path.join(directorio, "tareas.db"))
+    ids, _ = gestor.crear_tareas({"titulo": f"Tarea {i}", "prioridad": i % 3 + 1,
+                                  "usuario_asignado": f"usuario{i % 10}"} for i in range(TAREAS_INICIALES))
+    gestor_proyectos = GestorProyectosSQLite(gestor)
+    with contextlib.redirect_stdout(io.StringIO()):
+        gestor_proyectos.crear_proyecto(PROYECTO)
+        for id_tarea in ids[:200]:
+            gestor_proyectos.agregar_tarea_a_proyecto(PROYECTO, gestor.obtener_por_id(id_tarea))
+    # Las conexiones abiertas no deben heredarse en los procesos hijos.
+    gestor._conexiones.cerrar()
+
+
+def servir(descriptor: int, puerto: int) -> None:
+    """
+    Proceso worker: importa la aplicación y atiende peticiones del socket compartido.
+    """
+    from werkzeug.serving import make_server
+
+    sys.stdout = open(os.devnull, "w")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    import app as aplicacion
+
+    make_server("127.0.0.1", puerto, aplicacion.app, fd=descriptor).serve_forever()
+
+
+def cliente(puerto: int, semilla: int, resultados: "multiprocessing.Queue") -> None:
+    """
+    Proceso cliente: envía peticiones durante DURACION segundos y devuelve sus métricas.
+    """
+    azar = random.Random(semilla)
+    latencias: List[float] = []
+    desactualizadas = 0
+    total_conocido = 0
+    propias = 0
+    fin = perf_counter() + DURACION
+    while perf_counter() < fin:
+        operacion = azar.random()
+        inicio = perf_counter()
+        if operacion < 0.75:
+            peticion("GET", puerto, f"/?limit=20&orden={azar.choice(('id', 'prioridad'))}")
+        elif operacion < 0.85:
+            peticion("GET", puerto, f"/proyectos/{PROYECTO}/progreso")
+        elif operacion < 0.9:
+            total = int(_TAREAS.search(peticion("GET", puerto, "/metrics")).group(1))
+            desactualizadas += total < total_conocido
+            total_conocido = max(total_conocido, total)
+        else:
+            cuerpo = json.dumps({"titulo": f"Carga {semilla}", "prioridad": 2}).encode()
+            propias += json.loads(peticion("POST", puerto, "/importar/tareas", cuerpo))["creadas"]
+            latencias.append(perf_counter() - inicio)
+            # Lectura inmediata, quizá en otro worker: debe incluir las tareas creadas.
+            inicio = perf_counter()
+            total = int(_TAREAS.search(peticion("GET", puerto, "/metrics")).group(1))
+            desactualizadas += total < max(total_conocido, TAREAS_INICIALES + propias)
+            total_conocido = max(total_conocido, total)
+        latencias.append(perf_counter() - inicio)
+    resultados.put((latencias, desactualizadas))
+
+
+def peticion(metodo: str, puerto: int, ruta: str, cuerpo: bytes = None) -> bytes:
+    """
+    Envía una petición HTTP y devuelve el cuerpo de la respuesta.
+    """
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+    try:
+        conexion.request(metodo, ruta, body=cuerpo)
+        return conexion.getresponse().read()
+    finally:
+        conexion.close()
+
+
+def medir(workers: int) -> Tuple[float, float, float, int]:
+    """
+    Arranca `workers` procesos, ejecuta los clientes y detiene los workers.
+
+    Returns
+    -------
+    Tuple[float, float, float, int]
+        Peticiones por segundo, latencia p50 y p99 en milisegundos y lecturas desactualizadas.
+    """
+    contexto = multiprocessing.get_context("fork")
+    servidor = socket.socket()
+    servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    servidor.bind(("127.0.0.1", 0))
+    servidor.listen(128)
+    puerto = servidor.getsockname()[1]
+    procesos = [contexto.Process(target=servir, args=(servidor.fileno(), puerto)) for _ in range(workers)]
+    for proceso in procesos:
+        proceso.start()
+    sleep(1.0)  # Tiempo para que los workers importen la aplicación.
+
+    resultados = contexto.Queue()
+    clientes = [contexto.Process(target=cliente, args=(puerto, semilla, resultados)) for semilla in range(CLIENTES)]
+    for proceso in clientes:
+        proceso.start()
+    latencias: List[float] = []
+    desactualizadas = 0
+    for _ in clientes:
+        latencias_cliente, desactualizadas_cliente = resultados.get()
+        latencias += latencias_cliente
+        desactualizadas += desactualizadas_cliente
+    for proceso in clientes:
+        proceso.join()
+    for proceso in procesos:
+        os.kill(proceso.pid, signal.SIGTERM)
+        proceso.join()
+    servidor.close()
+
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2] * 1000
+    p99 = latencias[int(len(latencias) * 0.99)] * 1000
+    return len(latencias) / DURACION, p50, p99, desactualizadas
+
+
+def main() -> None:
+    """
+    Ejecuta la prueba para cada número de workers.
+    """
+    print(f"Núcleos disponibles: {os.cpu_count()}, clientes: {CLIENTES}, {DURACION:.0f} s por prueba")
+    resumen: Dict[int, float] = {}
+    errores = 0
+    for workers in WORKERS:
+        with tempfile.TemporaryDirectory() as directorio:
+            os.environ["GESTOR_BACKEND"] = "sqlite"
+            os.environ["GESTOR_DATOS"] = directorio
+            preparar_datos(directorio)
+            por_segundo, p50, p99, desactualizadas = medir(workers)
+        resumen[workers] = por_segundo
+        errores += desactualizadas
+        print(f"  {workers} workers: {por_segundo:8.0f} peticiones/s   p50 {p50:6.1f} ms   p99 {p99:6.1f} ms   "
+              f"lecturas desactualizadas {desactualizadas}")
+    base = resumen[WORKERS[0]]
+    print("  escalado: " + ", ".join(f"{workers} workers x{por_segundo / base:.2f}"
+                                     for workers, por_segundo in resumen.items()))
+    if errores:
+        print("[ERROR] Algún worker ha servido datos desactualizados.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
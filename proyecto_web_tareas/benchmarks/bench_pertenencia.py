@@ -0,0 +1,107 @@
+"""
+Benchmark: pertenencia de tareas a proyectos
+============================================
+
+Compara las listas de tareas que usaban antes los proyectos con el índice de pertenencia en
+ambos sentidos de GestorProyectos (gestores en memoria), con 200 proyectos y distintos
+números de tareas por proyecto:
+
+    - "¿en qué proyectos está la tarea X?": recorriendo las listas de todos los proyectos
+      frente a `proyectos_de_tarea`;
+    - comprobar si una tarea ya está en un proyecto antes de agregarla: búsqueda en la lista
+      frente a `id_tarea in proyecto`;
+    - eliminar una tarea quitándola de todos sus proyectos: recorriendo las listas frente al
+      borrado en cascada de `eliminar_tarea`.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_pertenencia.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+from gestor_de_tareas.gestores.proyectos import GestorProyectos  # noqa: E402
+
+PROYECTOS = 200
+TAMANOS = (100, 1_000, 5_000)
+CONSULTAS = 200
+
+
+def poblar(tareas_por_proyecto):
+    """
+    Crea PROYECTOS proyectos que se solapan a medias, de modo que casi todas las tareas
+    están en dos proyectos consecutivos.
+
+    Returns
+    -------
+    Tuple[GestorDeTareas, GestorProyectos, Dict[str, List[Tarea]]]
+        Los gestores y, para comparar, las listas de tareas de cada proyecto tal como se
+        guardaban antes.
+    """
+    gestor = GestorDeTareas()
+    gestor_proyectos = GestorProyectos(gestor_tareas=gestor)
+    ids, _ = gestor.crear_tareas({"titulo": f"Tarea {i}"} for i in range((PROYECTOS + 1) * tareas_por_proyecto // 2))
+    listas = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for p in range(PROYECTOS):
+            nombre = f"P{p}"
+            gestor_proyectos.crear_proyecto(nombre)
+            inicio = p * tareas_por_proyecto // 2
+            listas[nombre] = [gestor.obtener_por_id(id_tarea)
+                              for id_tarea in ids[inicio:inicio + tareas_por_proyecto]]
+            for tarea in listas[nombre]:
+                gestor_proyectos.agregar_tarea_a_proyecto(nombre, tarea)
+    return gestor, gestor_proyectos, listas
+
+
+def proyectos_recorriendo(listas, id_tarea):
+    """
+    Proyectos que contienen una tarea recorriendo todas las listas, como antes.
+    """
+    return sorted(nombre for nombre, tareas in listas.items()
+                  if any(tarea.id_tarea == id_tarea for tarea in tareas))
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla con los microsegundos por operación.
+    """
+    print(f"{'tareas/proy.':>12} {'operación':>12} {'listas':>12} {'índice':>10}   (µs por operación)")
+    for n in TAMANOS:
+        gestor, gestor_proyectos, listas = poblar(n)
+        id_tarea = gestor_proyectos.proyectos["P198"].tareas[-1].id_tarea
+        assert proyectos_recorriendo(listas, id_tarea) == gestor_proyectos.proyectos_de_tarea(id_tarea)
+        repeticiones = max(1, CONSULTAS * 100 // n)
+        t_listas = timeit.timeit(lambda: proyectos_recorriendo(listas, id_tarea), number=repeticiones)
+        t_indice = timeit.timeit(lambda: gestor_proyectos.proyectos_de_tarea(id_tarea), number=CONSULTAS)
+        print(f"{n:>12} {'proyectos':>12} {t_listas / repeticiones * 1e6:12.1f} {t_indice / CONSULTAS * 1e6:10.2f}")
+
+        lista, proyecto = listas["P0"], gestor_proyectos.proyectos["P0"]
+        ultima = lista[-1]
+        t_listas = timeit.timeit(lambda: ultima in lista, number=CONSULTAS)
+        t_indice = timeit.timeit(lambda: ultima.id_tarea in proyecto, number=CONSULTAS)
+        print(f"{n:>12} {'duplicado':>12} {t_listas / CONSULTAS * 1e6:12.1f} {t_indice / CONSULTAS * 1e6:10.2f}")
+
+        victimas = [tarea.id_tarea for tarea in listas["P100"][:CONSULTAS // 2]]
+
+        def eliminar_recorriendo():
+            for victima in victimas:
+                for nombre in listas:
+                    listas[nombre] = [tarea for tarea in listas[nombre] if tarea.id_tarea != victima]
+
+        t_listas = timeit.timeit(eliminar_recorriendo, number=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            t_indice = timeit.timeit(lambda: [gestor.eliminar_tarea(victima) for victima in victimas], number=1)
+        assert all(gestor_proyectos.proyectos_de_tarea(victima) == [] for victima in victimas)
+        print(f"{n:>12} {'eliminar':>12} {t_listas / len(victimas) * 1e6:12.1f} "
+              f"{t_indice / len(victimas) * 1e6:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
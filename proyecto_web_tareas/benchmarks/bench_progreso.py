@@ -0,0 +1,181 @@
+"""
+Benchmark: progreso de proyectos
+================================
+
+Compara el cálculo del progreso recorriendo las tareas del proyecto, como se hacía antes, con
+los contadores por estado que se mantienen al agregar tareas y al cambiar su estado:
+
+    - `Proyecto.progreso()` con proyectos de distintos tamaños (gestores en memoria);
+    - el progreso de todos los proyectos a la vez (`progreso_de_proyectos`) con 200 proyectos
+      de 500 tareas, en memoria y en SQLite;
+    - GET /proyectos/<nombre>/progreso de api.py con un proyecto de 10.000 tareas.
+
+También mide el coste que añaden los contadores a `cambiar_estado_tarea`.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_progreso.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import timeit
+import warnings
+
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_PROYECTO)
+sys.path.insert(0, os.path.dirname(DIRECTORIO_PROYECTO))
+
+from gestor_de_tareas.clases.tarea import EstadoTarea  # noqa: E402
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+from gestor_de_tareas.gestores.proyectos import GestorProyectos  # noqa: E402
+from gestor_de_tareas.almacenamiento.sqlite import GestorDeTareasSQLite, GestorProyectosSQLite  # noqa: E402
+
+TAMANOS = (1_000, 10_000, 100_000)
+PROYECTOS = 200
+TAREAS_POR_PROYECTO = 500
+TAREAS_API = 10_000
+REPETICIONES = 200
+
+
+def progreso_recorriendo(proyecto):
+    """
+    Progreso de un proyecto recorriendo sus tareas, como hacía antes `Proyecto.progreso`.
+    """
+    if not proyecto.tareas:
+        return 0
+    completadas = sum(1 for t in proyecto.tareas if t.estado == EstadoTarea.COMPLETADA)
+    return (completadas / len(proyecto.tareas)) * 100
+
+
+def poblar(gestor, gestor_proyectos, proyectos, tareas_por_proyecto):
+    """
+    Crea los proyectos indicados con sus tareas; una de cada tres queda completada.
+    """
+    ids, _ = gestor.crear_tareas({"titulo": f"Tarea {i}"} for i in range(proyectos * tareas_por_proyecto))
+    gestor.cambiar_estado_tareas(ids[::3], EstadoTarea.COMPLETADA)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for p in range(proyectos):
+            gestor_proyectos.crear_proyecto(f"P{p}")
+            for id_tarea in ids[p * tareas_por_proyecto:(p + 1) * tareas_por_proyecto]:
+                gestor_proyectos.agregar_tarea_a_proyecto(f"P{p}", gestor.obtener_por_id(id_tarea))
+    return ids
+
+
+def medir_proyecto():
+    """
+    Imprime el coste de `progreso()` de un proyecto según su número de tareas.
+    """
+    print(f"{'tareas':>10} {'recorrido':>12} {'contadores':>12}   (µs por consulta)")
+    for n in TAMANOS:
+        gestor = GestorDeTareas()
+        gestor_proyectos = GestorProyectos(gestor_tareas=gestor)
+        poblar(gestor, gestor_proyectos, 1, n)
+        proyecto = gestor_proyectos.proyectos["P0"]
+        assert progreso_recorriendo(proyecto) == proyecto.progreso()
+        repeticiones = max(1, REPETICIONES * 1_000 // n)
+        t_recorrido = timeit.timeit(lambda: progreso_recorriendo(proyecto), number=repeticiones)
+        t_contadores = timeit.timeit(proyecto.progreso, number=REPETICIONES)
+        print(f"{n:>10} {t_recorrido / repeticiones * 1e6:12.1f} {t_contadores / REPETICIONES * 1e6:12.2f}")
+
+
+def medir_todos():
+    """
+    Imprime el coste de calcular el progreso de todos los proyectos a la vez.
+    """
+    print(f"\nProgreso de {PROYECTOS} proyectos de {TAREAS_POR_PROYECTO} tareas (ms por consulta):")
+    gestor = GestorDeTareas()
+    gestor_proyectos = GestorProyectos(gestor_tareas=gestor)
+    poblar(gestor, gestor_proyectos, PROYECTOS, TAREAS_POR_PROYECTO)
+    t_recorrido = timeit.timeit(lambda: {nombre: progreso_recorriendo(proyecto)
+                                         for nombre, proyecto in gestor_proyectos.proyectos.items()}, number=20)
+    t_contadores = timeit.timeit(gestor_proyectos.progreso_de_proyectos, number=20)
+    print(f"  memoria: recorrido {t_recorrido / 20 * 1e3:.2f}, contadores {t_contadores / 20 * 1e3:.3f}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        gestor = GestorDeTareasSQLite(os.path.join(directorio, "tareas.db"))
+        gestor_proyectos = GestorProyectosSQLite(gestor)
+        poblar(gestor, gestor_proyectos, PROYECTOS, TAREAS_POR_PROYECTO)
+        conexion = gestor._conexiones.conexion()
+
+        def agregando():
+            # Consulta agregada sobre las pertenencias, equivalente a la de antes por proyecto.
+            return dict(conexion.execute(
+                "SELECT p.nombre, 100.0 * sum(t.estado = ?) / count(*) FROM proyecto_tareas p"
+                " JOIN tareas t ON t.id_tarea = p.id_tarea GROUP BY p.nombre",
+                (EstadoTarea.COMPLETADA.name,)).fetchall())
+
+        assert agregando() == gestor_proyectos.progreso_de_proyectos()
+        t_recorrido = timeit.timeit(agregando, number=20)
+        t_contadores = timeit.timeit(gestor_proyectos.progreso_de_proyectos, number=20)
+        print(f"  sqlite:  agregando {t_recorrido / 20 * 1e3:.2f}, contadores {t_contadores / 20 * 1e3:.3f}")
+        gestor._conexiones.cerrar()
+
+
+def medir_cambios():
+    """
+    Imprime el coste de cambiar el estado de una tarea con y sin proyectos que la sigan.
+    """
+    print("\ncambiar_estado_tarea (µs por cambio):")
+    for nombre, con_proyectos in (("sin proyectos", False), ("en 1 proyecto", True)):
+        gestor = GestorDeTareas()
+        ids, _ = gestor.crear_tareas({"titulo": f"Tarea {i}"} for i in range(1_000))
+        if con_proyectos:
+            gestor_proyectos = GestorProyectos(gestor_tareas=gestor)
+            with contextlib.redirect_stdout(io.StringIO()):
+                gestor_proyectos.crear_proyecto("P")
+                for id_tarea in ids:
+                    gestor_proyectos.agregar_tarea_a_proyecto("P", gestor.obtener_por_id(id_tarea))
+        estados = [EstadoTarea.COMPLETADA, EstadoTarea.PENDIENTE]
+        t = timeit.timeit(lambda: [gestor.cambiar_estado_tarea(id_tarea, estado)
+                                   for estado in estados for id_tarea in ids], number=5)
+        print(f"  {nombre}: {t / (5 * 2 * len(ids)) * 1e6:.2f}")
+
+
+def medir_api():
+    """
+    Imprime el coste de GET /proyectos/<nombre>/progreso en api.py.
+    """
+    warnings.simplefilter("ignore")  # Aviso de PyJWT por la longitud de la clave de ejemplo.
+    import api
+    import api_operaciones as operaciones
+
+    cliente = api.app.test_client()
+    cliente.post("/signup?user=bench&contraseña=x")
+    token = cliente.get("/signin?user=bench&contraseña=x").get_json()["access_token"]
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    cliente.post("/proyectos?nombre=Grande", headers=cabeceras)
+    ids = operaciones.crear_tareas_lote("bench", ({"name": f"t{i}"} for i in range(TAREAS_API)))[0]["creadas"]
+    operaciones.cambiar_estado_lote("bench", {"ids": ids[::3], "estado": "Completada"})
+    for tarea_id in ids:
+        operaciones.asignar_tarea_a_proyecto("bench", "Grande", tarea_id)
+    miembros = operaciones.miembros(operaciones.proyectos["bench"]["Grande"])
+
+    def recorriendo():
+        # Como antes: se leen todas las tareas del proyecto para contar las completadas.
+        completadas = sum(1 for tarea in operaciones.tareas.varios(miembros).values()
+                          if tarea.get('estado') == 'Completada')
+        return {"progreso": completadas / len(miembros) * 100}, 200
+
+    assert recorriendo() == operaciones.progreso_proyecto("bench", "Grande")
+    t_recorrido = timeit.timeit(recorriendo, number=50)
+    t_contadores = timeit.timeit(lambda: operaciones.progreso_proyecto("bench", "Grande"), number=50)
+    t_peticion = timeit.timeit(lambda: cliente.get("/proyectos/Grande/progreso", headers=cabeceras), number=50)
+    print(f"\napi.py, proyecto de {TAREAS_API} tareas (µs): recorrido {t_recorrido / 50 * 1e6:.0f}, "
+          f"contadores {t_contadores / 50 * 1e6:.1f}, petición completa {t_peticion / 50 * 1e6:.0f}")
+
+
+def main() -> None:
+    """
+    Ejecuta todas las mediciones.
+    """
+    medir_proyecto()
+    medir_todos()
+    medir_cambios()
+    medir_api()
+
+
+if __name__ == "__main__":
+    main()
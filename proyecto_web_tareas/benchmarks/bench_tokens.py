@@ -0,0 +1,78 @@
+"""
+Benchmark: verificación de tokens JWT en api.py
+===============================================
+
+Compara el coste de autenticar peticiones con y sin la caché de tokens verificados
+(`api.cache_tokens`):
+
+    - `autenticar` sola, con el mismo token una y otra vez, como hace un cliente que consulta
+      /tareas en bucle;
+    - peticiones completas GET /tareas?limit=5 y GET /tareas/<id> con el cliente de pruebas
+      de Flask.
+
+Sin caché, cada petición decodifica el token y verifica su firma; con caché solo se comprueba
+que el token no esté revocado.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_tokens.py
+"""
+
+import os
+import sys
+import timeit
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import api  # noqa: E402
+from gestor_de_tareas.utilidades.cache import CacheLRU  # noqa: E402
+
+AUTENTICACIONES = 50_000
+PETICIONES = 5_000
+TAREAS = 200
+
+
+def preparar():
+    """
+    Registra un usuario con TAREAS tareas y devuelve su cabecera Authorization.
+    """
+    cliente = api.app.test_client()
+    cliente.post("/signup?user=bench&contraseña=x")
+    token = cliente.get("/signin?user=bench&contraseña=x").get_json()["access_token"]
+    cabecera = f"Bearer {token}"
+    for i in range(TAREAS):
+        cliente.post(f"/tareas?name=t{i}", headers={"Authorization": cabecera})
+    return cliente, cabecera
+
+
+def medir(cliente, cabecera):
+    """
+    Devuelve los microsegundos por autenticación y por petición con la caché actual.
+    """
+    t_autenticar = timeit.timeit(lambda: api.autenticar(cabecera), number=AUTENTICACIONES)
+    cabeceras = {"Authorization": cabecera}
+    t_listar = timeit.timeit(lambda: cliente.get("/tareas?limit=5", headers=cabeceras), number=PETICIONES)
+    t_detalle = timeit.timeit(lambda: cliente.get("/tareas/1", headers=cabeceras), number=PETICIONES)
+    return (t_autenticar / AUTENTICACIONES * 1e6, t_listar / PETICIONES * 1e6, t_detalle / PETICIONES * 1e6)
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla con los microsegundos por operación.
+    """
+    warnings.simplefilter("ignore")  # Aviso de PyJWT por la longitud de la clave de ejemplo.
+    cliente, cabecera = preparar()
+    original = api.cache_tokens
+    print(f"{'caché':>10} {'autenticar':>12} {'GET /tareas':>13} {'GET /tareas/1':>15}   (µs)")
+    resultados = {}
+    for nombre, cache in (("sin caché", CacheLRU(0)), ("con caché", original)):
+        api.cache_tokens = cache
+        resultados[nombre] = medir(cliente, cabecera)
+        print(f"{nombre:>10} {resultados[nombre][0]:12.1f} {resultados[nombre][1]:13.1f} {resultados[nombre][2]:15.1f}")
+    api.cache_tokens = original
+    mejora = [sin / con for sin, con in zip(resultados["sin caché"], resultados["con caché"])]
+    print(f"{'mejora':>10} {mejora[0]:11.1f}x {mejora[1]:12.2f}x {mejora[2]:14.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: consultas de vencimientos
+====================================
+
+Compara las consultas por fecha límite recorriendo todas las tareas y comparando fechas en
+Python con el índice por fecha límite de GestorDeTareas:
+
+    - `vencen_entre`: tareas que vencen en la próxima semana;
+    - `vencidas`: tareas no completadas con la fecha límite ya pasada;
+    - `proximos_vencimientos`: las 10 próximas tareas no completadas en vencer.
+
+Las tareas tienen fechas límite repartidas en ±2 años alrededor de hoy (una de cada cinco sin
+fecha) y la mitad de las vencidas están completadas. También se mide el coste que añade el
+índice a `modificar_tarea` al cambiar la fecha límite.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_vencimientos.py
+"""
+
+import os
+import random
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_de_tareas.clases.tarea import EstadoTarea  # noqa: E402
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas  # noqa: E402
+
+TAMANOS = (10_000, 100_000, 500_000)
+REPETICIONES = 50
+HOY = date.today()
+
+
+def poblar(n):
+    """
+    Crea un gestor con `n` tareas con fechas límite aleatorias.
+    """
+    azar = random.Random(n)
+    gestor = GestorDeTareas()
+    registros = ({"titulo": f"Tarea {i}",
+                  "fecha_limite": None if azar.random() < 0.2
+                  else (HOY + timedelta(days=azar.randint(-730, 730))).isoformat()}
+                 for i in range(n))
+    ids, _ = gestor.crear_tareas(registros)
+    vencidas = [tarea.id_tarea for tarea in gestor.vencidas(HOY)]
+    gestor.cambiar_estado_tareas(vencidas[::2], EstadoTarea.COMPLETADA)
+    return gestor
+
+
+def consultas_recorriendo(gestor):
+    """
+    Las tres consultas recorriendo todas las tareas, como habría que hacer sin índice.
+    """
+    abiertas = (EstadoTarea.PENDIENTE, EstadoTarea.EN_PROGRESO)
+    semana = HOY + timedelta(days=7)
+    con_fecha = sorted((tarea for tarea in gestor.tareas.values() if tarea.fecha_limite),
+                       key=lambda tarea: (tarea.fecha_limite, tarea.id_tarea))
+    return {
+        "semana": [tarea for tarea in con_fecha if HOY <= tarea.fecha_limite <= semana],
+        "vencidas": [tarea for tarea in con_fecha if tarea.fecha_limite < HOY and tarea.estado in abiertas],
+        "proximas": [tarea for tarea in con_fecha if tarea.fecha_limite >= HOY and tarea.estado in abiertas][:10],
+    }
+
+
+def consultas_indice(gestor):
+    """
+    Las tres consultas con el índice por fecha límite.
+    """
+    return {
+        "semana": gestor.vencen_entre(HOY, HOY + timedelta(days=7)),
+        "vencidas": gestor.vencidas(HOY),
+        "proximas": gestor.proximos_vencimientos(10, HOY),
+    }
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla con los milisegundos por consulta.
+    """
+    print(f"{'tareas':>10} {'consulta':>10} {'recorrido':>12} {'índice':>10} {'resultado':>10}   (ms por consulta)")
+    for n in TAMANOS:
+        gestor = poblar(n)
+        assert consultas_recorriendo(gestor) == consultas_indice(gestor)
+        repeticiones = max(1, REPETICIONES * 10_000 // n)
+        t_recorrido = timeit.timeit(lambda: consultas_recorriendo(gestor), number=repeticiones) / repeticiones
+        resultados = consultas_indice(gestor)
+        for nombre, consulta in (("semana", lambda: gestor.vencen_entre(HOY, HOY + timedelta(days=7))),
+                                 ("vencidas", lambda: gestor.vencidas(HOY)),
+                                 ("proximas", lambda: gestor.proximos_vencimientos(10, HOY))):
+            t_indice = timeit.timeit(consulta, number=REPETICIONES) / REPETICIONES
+            # El recorrido resuelve las tres consultas a la vez; se reparte a partes iguales.
+            print(f"{n:>10} {nombre:>10} {t_recorrido / 3 * 1e3:12.2f} {t_indice * 1e3:10.3f} "
+                  f"{len(resultados[nombre]):>10}")
+
+        ids = list(gestor.tareas)[:1_000]
+        fechas = [(HOY + timedelta(days=i % 100)).isoformat() for i in range(len(ids))]
+        t_modificar = timeit.timeit(lambda: [gestor.modificar_tarea(id_tarea, fecha_limite=fecha)
+                                             for id_tarea, fecha in zip(ids, fechas)], number=1)
+        print(f"{n:>10} modificar_tarea con nueva fecha: {t_modificar / len(ids) * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: caché de páginas y tarjetas de app.py
+================================================
+
+Mide GET / (página de 50 tareas) y GET /proyectos (200 proyectos) de app.py con el gestor en
+memoria en tres situaciones:
+
+    - sin caché: se consulta el gestor y se renderiza la plantilla completa en cada petición,
+      como antes;
+    - página en caché: los datos no han cambiado y la página se sirve tal cual;
+    - tras editar una tarea: la página se vuelve a generar, pero solo se renderiza la tarjeta
+      de la tarea editada (en /proyectos no hay tarjetas y se vuelve a renderizar entera).
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python benchmarks/bench_vistas.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import timeit
+
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_PROYECTO)
+os.environ["GESTOR_DATOS"] = tempfile.mkdtemp()
+
+import app  # noqa: E402
+
+TAREAS = 10_000
+PROYECTOS = 200
+REPETICIONES = 200
+
+
+def poblar():
+    """
+    Crea TAREAS tareas y PROYECTOS proyectos con 20 tareas cada uno.
+    """
+    ids, _ = app.gestor.crear_tareas({"titulo": f"Tarea {i}", "descripcion": f"Descripción de la tarea {i}",
+                                      "fecha_limite": "2030-01-01", "prioridad": i % 3 + 1}
+                                     for i in range(TAREAS))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for p in range(PROYECTOS):
+            app.gestor_proyectos.crear_proyecto(f"P{p}")
+            for id_tarea in ids[p * 20:(p + 1) * 20]:
+                app.gestor_proyectos.agregar_tarea_a_proyecto(f"P{p}", app.gestor.obtener_por_id(id_tarea))
+    return ids
+
+
+def medir(cliente, url, editar):
+    """
+    Devuelve los µs por petición a `url` sin caché, con la página en caché y tras `editar`.
+    """
+    capacidades = app.cache_paginas.capacidad, app.cache_tarjetas.capacidad
+    app.cache_paginas.capacidad = app.cache_tarjetas.capacidad = 0
+    t_sin = timeit.timeit(lambda: cliente.get(url), number=REPETICIONES) / REPETICIONES
+    app.cache_paginas.capacidad, app.cache_tarjetas.capacidad = capacidades
+
+    cliente.get(url)
+    t_cache = timeit.timeit(lambda: cliente.get(url), number=REPETICIONES) / REPETICIONES
+
+    def editada():
+        editar()
+        cliente.get(url)
+
+    t_editar = timeit.timeit(editada, number=REPETICIONES) / REPETICIONES
+    t_edicion = timeit.timeit(editar, number=REPETICIONES) / REPETICIONES
+    return t_sin, t_cache, t_editar - t_edicion
+
+
+def main() -> None:
+    """
+    Ejecuta el benchmark e imprime una tabla con los microsegundos por petición.
+    """
+    ids = poblar()
+    cliente = app.app.test_client()
+    contador = iter(range(10 ** 9))
+
+    def editar_tarea():
+        app.gestor.modificar_tarea(ids[0], titulo=f"Tarea editada {next(contador)}")
+
+    print(f"{'página':>12} {'sin caché':>12} {'en caché':>10} {'tras editar':>12}   (µs por petición)")
+    for url in ("/?limit=50", "/proyectos"):
+        t_sin, t_cache, t_editar = medir(cliente, url, editar_tarea)
+        print(f"{url:>12} {t_sin * 1e6:12.0f} {t_cache * 1e6:10.0f} {t_editar * 1e6:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
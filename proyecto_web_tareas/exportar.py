@@ -0,0 +1,91 @@
+"""
+Exportación de tareas y proyectos desde la línea de comandos
+============================================================
+
+Lee los datos guardados por la aplicación web (mismo directorio GESTOR_DATOS y mismo
+GESTOR_BACKEND que app.py) y los escribe en NDJSON o CSV en un archivo o en la salida
+estándar. Las tareas se recorren por lotes y se escriben a medida que se serializan, de modo
+que la memoria usada no depende del número de tareas; con el backend en memoria la
+instantánea se carga de forma perezosa. Con el backend en memoria el directorio de datos solo
+lo puede usar un proceso, así que mientras la aplicación está en marcha hay que exportar con
+la ruta /exportar/tareas.
+
+Ejemplos de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python exportar.py > copia.ndjson
+    $ python exportar.py --formato csv --estado pendiente --salida pendientes.csv
+    $ python exportar.py --proyectos --salida proyectos.ndjson
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+
+from gestor_de_tareas.clases.tarea import EstadoTarea
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas
+from gestor_de_tareas.gestores.proyectos import GestorProyectos
+from gestor_de_tareas.utilidades.exportacion import FORMATOS, exportar_proyectos, exportar_tareas
+from gestor_de_tareas.almacenamiento.diario import DiarioPersistente
+from gestor_de_tareas.almacenamiento.sqlite import GestorDeTareasSQLite, GestorProyectosSQLite
+
+DIRECTORIO_DATOS = os.environ.get("GESTOR_DATOS",
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos"))
+ESTADOS = {
+    "pendiente": EstadoTarea.PENDIENTE,
+    "en_progreso": EstadoTarea.EN_PROGRESO,
+    "completada": EstadoTarea.COMPLETADA
+}
+
+
+def main() -> None:
+    """
+    Interpreta los argumentos y escribe la exportación.
+    """
+    parser = argparse.ArgumentParser(description="Exporta las tareas o los proyectos guardados.")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default="ndjson",
+                        help="formato de las tareas (los proyectos siempre se exportan en NDJSON)")
+    parser.add_argument("--proyectos", action="store_true", help="exporta los proyectos en lugar de las tareas")
+    parser.add_argument("--estado", choices=sorted(ESTADOS), help="solo las tareas con este estado")
+    parser.add_argument("--usuario", help="solo las tareas asignadas a este usuario")
+    parser.add_argument("--etiqueta", help="solo las tareas con esta etiqueta")
+    parser.add_argument("--salida", help="archivo de destino (por defecto, la salida estándar)")
+    argumentos = parser.parse_args()
+
+    diario = None
+    # Los mensajes de los gestores van a stderr para no mezclarse con la exportación.
+    with contextlib.redirect_stdout(sys.stderr):
+        if os.environ.get("GESTOR_BACKEND", "memoria") == "sqlite":
+            gestor = GestorDeTareasSQLite(os.path.join(DIRECTORIO_DATOS, "tareas.db"))
+            gestor_proyectos = GestorProyectosSQLite(gestor)
+        else:
+            gestor = GestorDeTareas()
+            gestor_proyectos = GestorProyectos()
+            diario = DiarioPersistente(DIRECTORIO_DATOS, carga_perezosa=True)
+            try:
+                diario.conectar(gestor, gestor_proyectos)
+            except RuntimeError as error:
+                print(f"[ERROR] {error}", file=sys.stderr)
+                sys.exit(1)
+
+    if argumentos.proyectos:
+        bloques = exportar_proyectos(gestor_proyectos.proyectos)
+    else:
+        bloques = exportar_tareas(gestor.recorrer(estado=ESTADOS.get(argumentos.estado),
+                                                  usuario=argumentos.usuario,
+                                                  etiqueta=argumentos.etiqueta),
+                                  argumentos.formato)
+    if argumentos.salida:
+        salida = open(argumentos.salida, "w", encoding="utf-8", newline="")
+    else:
+        salida = sys.stdout
+    try:
+        salida.writelines(bloques)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+        if diario is not None:
+            diario.cerrar()
+
+
+if __name__ == "__main__":
+    main()
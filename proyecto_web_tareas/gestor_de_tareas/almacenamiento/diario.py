@@ -0,0 +1,550 @@
+"""
+Módulo: diario
+==============
+
+Persistencia incremental de tareas y proyectos mediante un diario de escritura anticipada
+(write-ahead log) y de instantáneas compactadas.
+
+Cada cambio en GestorDeTareas o GestorProyectos se añade como una línea JSON al final del
+diario, por lo que el coste de guardar depende del tamaño del cambio y no del total de datos.
+Cada cierto número de cambios se escribe una instantánea completa de forma atómica
+(archivo temporal + fsync + rename) en un hilo aparte: el cambio que alcanza el umbral solo
+copia las referencias a las tareas y renombra el diario a "diario.anterior.log", de modo que
+las escrituras no esperan a que se codifiquen todas las tareas. Los cambios posteriores van a
+un diario nuevo y el anterior se borra cuando la instantánea ya es definitiva. Las tareas que
+se modifican mientras se escribe la instantánea pueden quedar en ella a medias, pero sus
+cambios están en el diario nuevo y se reaplican al recuperar. La instantánea usa el formato
+binario de gestor_de_tareas.almacenamiento.instantanea y se escribe tarea a tarea. Al
+arrancar se carga la instantánea y se reaplican los cambios de ambos diarios posteriores a
+ella.
+Las instantáneas JSON de versiones anteriores se siguen leyendo y se sustituyen en la
+siguiente compactación. Con `carga_perezosa=True` la instantánea binaria no se decodifica al
+arrancar: se proyecta en memoria con gestor_de_tareas.almacenamiento.mapeado y cada tarea
+se decodifica la primera vez que se usa.
+
+Un directorio de datos solo puede usarlo un proceso a la vez: al conectar se toma un bloqueo
+exclusivo sobre el archivo "bloqueo" (en sistemas con fcntl), de modo que arrancar varios
+workers con el almacenamiento en memoria falla en lugar de corromper el diario. Para varios
+procesos hay que usar el backend SQLite (gestor_de_tareas.almacenamiento.sqlite).
+
+Cada registro lleva un número de secuencia creciente y la instantánea guarda el último que
+incluye, de modo que, si el proceso muere entre escribir la instantánea y vaciar el diario,
+los registros ya incluidos se ignoran al recuperar.
+
+Dependencias:
+    - json para codificar los registros y threading para compactar en segundo plano.
+    - gestor_de_tareas.clases.tarea: Tarea.
+    - gestor_de_tareas.almacenamiento.instantanea: formato binario de las instantáneas.
+    - gestor_de_tareas.almacenamiento.mapeado: carga perezosa de la instantánea.
+    - gestor_de_tareas.utilidades.metricas: metricas_persistencia.
+"""
+
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from time import monotonic, perf_counter
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no se comprueba el uso por varios procesos.
+    fcntl = None
+
+from gestor_de_tareas.clases.tarea import Tarea
+from gestor_de_tareas.almacenamiento.instantanea import LectorInstantanea, codificar_tarea, escribir_registros
+from gestor_de_tareas.almacenamiento.mapeado import TareasMapeadas
+from gestor_de_tareas.utilidades.metricas import metricas_persistencia
+
+
+@contextmanager
+def archivo_atomico(ruta: str) -> Iterator[BinaryIO]:
+    """
+    Abre un archivo binario que sustituye a `ruta` de forma atómica al cerrarse.
+
+    Los datos se escriben en un archivo temporal del mismo directorio, se sincronizan con
+    fsync y se renombran sobre el destino. Un corte a mitad de escritura, o una excepción
+    dentro del bloque with, deja intacto el archivo anterior.
+
+    Parameters
+    ----------
+    ruta : str
+        Ruta del archivo de destino.
+
+    Returns
+    -------
+    Iterator[BinaryIO]
+        Archivo temporal abierto en modo binario de escritura.
+    """
+    temporal = f"{ruta}.tmp"
+    try:
+        with open(temporal, "wb") as archivo:
+            yield archivo
+            archivo.flush()
+            os.fsync(archivo.fileno())
+    except BaseException:
+        os.remove(temporal)
+        raise
+    os.replace(temporal, ruta)
+    _sincronizar_directorio(os.path.dirname(os.path.abspath(ruta)))
+
+
+def escribir_atomico(ruta: str, datos: bytes) -> None:
+    """
+    Escribe un archivo de forma atómica.
+
+    Parameters
+    ----------
+    ruta : str
+        Ruta del archivo de destino.
+    datos : bytes
+        Contenido completo del archivo.
+    """
+    with archivo_atomico(ruta) as archivo:
+        archivo.write(datos)
+
+
+def _sincronizar_directorio(directorio: str) -> None:
+    """
+    Sincroniza la entrada de directorio para que un rename sobreviva a un corte de energía.
+
+    En sistemas donde no se pueden abrir directorios (Windows) no se hace nada.
+
+    Parameters
+    ----------
+    directorio : str
+        Directorio a sincronizar.
+    """
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+class DiarioPersistente:
+    """
+    Diario de cambios con instantáneas periódicas para GestorDeTareas y GestorProyectos.
+
+    Las escrituras en el diario se vuelcan al sistema operativo en cada cambio (un kill -9
+    no pierde datos), pero el fsync a disco se agrupa: se hace cada `lote` registros o
+    cuando han pasado `intervalo` segundos desde el anterior.
+
+    Parameters
+    ----------
+    directorio : str
+        Directorio donde se guardan la instantánea y el diario. Se crea si no existe.
+    lote : int, optional
+        Número máximo de registros entre dos fsync (por defecto 64).
+    intervalo : float, optional
+        Segundos máximos entre dos fsync mientras haya escrituras (por defecto 1.0).
+    eventos_por_instantanea : int, optional
+        Número de registros tras los que se compacta el diario en una nueva instantánea, en
+        segundo plano (por defecto 10000).
+    carga_perezosa : bool, optional
+        Si es True, la instantánea binaria se proyecta en memoria y las tareas se decodifican
+        bajo demanda (ver `GestorDeTareas.cargar_perezosamente`), de modo que el arranque no
+        depende del número de tareas. Por defecto es False.
+
+    Attributes
+    ----------
+    secuencia : int
+        Número de secuencia del último registro escrito o recuperado.
+    """
+    ARCHIVO_INSTANTANEA = "instantanea.bin"
+    ARCHIVO_INSTANTANEA_JSON = "instantanea.json"
+    ARCHIVO_DIARIO = "diario.log"
+    ARCHIVO_DIARIO_ANTERIOR = "diario.anterior.log"
+    ARCHIVO_BLOQUEO = "bloqueo"
+
+    def __init__(self,
+                 directorio: str,
+                 lote: int = 64,
+                 intervalo: float = 1.0,
+                 eventos_por_instantanea: int = 10_000,
+                 carga_perezosa: bool = False) -> None:
+        """
+        Inicializa el diario sin abrir todavía ningún archivo.
+        """
+        os.makedirs(directorio, exist_ok=True)
+        self.ruta_instantanea = os.path.join(directorio, self.ARCHIVO_INSTANTANEA)
+        self.ruta_instantanea_json = os.path.join(directorio, self.ARCHIVO_INSTANTANEA_JSON)
+        self.ruta_diario = os.path.join(directorio, self.ARCHIVO_DIARIO)
+        self.ruta_diario_anterior = os.path.join(directorio, self.ARCHIVO_DIARIO_ANTERIOR)
+        self.ruta_bloqueo = os.path.join(directorio, self.ARCHIVO_BLOQUEO)
+        self.lote = lote
+        self.intervalo = intervalo
+        self.eventos_por_instantanea = eventos_por_instantanea
+        self.carga_perezosa = carga_perezosa
+        self.secuencia = 0
+        self._pendientes = 0
+        self._ultimo_fsync = monotonic()
+        self._eventos_desde_instantanea = 0
+        self._archivo = None
+        self._bloqueo = None
+        self._compactacion: Optional[threading.Thread] = None
+        self._gestor_tareas = None
+        self._gestor_proyectos = None
+
+    def conectar(self, gestor_tareas: Any, gestor_proyectos: Any) -> None:
+        """
+        Recupera el estado guardado en los gestores y empieza a registrar sus cambios.
+
+        Los gestores deben estar vacíos. Primero se carga la instantánea, después se
+        reaplican los registros del diario y, por último, el diario se suscribe a los
+        eventos de ambos gestores. El gestor de proyectos pasa a usar el cerrojo del gestor
+        de tareas.
+
+        Parameters
+        ----------
+        gestor_tareas : GestorDeTareas
+            Gestor de tareas a restaurar y observar.
+        gestor_proyectos : GestorProyectos
+            Gestor de proyectos a restaurar y observar.
+
+        Raises
+        ------
+        RuntimeError
+            Si otro proceso ya está usando el mismo directorio de datos.
+        """
+        self._bloquear()
+        self._gestor_tareas = gestor_tareas
+        self._gestor_proyectos = gestor_proyectos
+        # Ambos gestores escriben en el mismo archivo y la compactación lee los dos, así que
+        # sus modificaciones se serializan con un único cerrojo.
+        gestor_proyectos.cerrojo = gestor_tareas.cerrojo
+        inicio = perf_counter()
+        self._recuperar()
+        metricas_persistencia.observar("recuperar", perf_counter() - inicio)
+        self._archivo = open(self.ruta_diario, "a", encoding="utf-8")
+        gestor_tareas.suscribir(self._al_cambiar_tarea)
+        gestor_proyectos.suscribir(self._al_cambiar_proyecto)
+
+    def _bloquear(self) -> None:
+        """
+        Toma el bloqueo exclusivo del directorio de datos, si el sistema lo permite.
+
+        Raises
+        ------
+        RuntimeError
+            Si otro proceso tiene el bloqueo.
+        """
+        if fcntl is None:
+            return
+        archivo = open(self.ruta_bloqueo, "a")
+        try:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            archivo.close()
+            raise RuntimeError(f"Otro proceso ya usa el directorio de datos {os.path.dirname(self.ruta_bloqueo)}. "
+                               "Con varios workers hay que usar GESTOR_BACKEND=sqlite.") from None
+        self._bloqueo = archivo
+
+    def registrar(self, registro: Dict[str, Any]) -> None:
+        """
+        Añade un registro al final del diario.
+
+        Parameters
+        ----------
+        registro : Dict[str, Any]
+            Registro a guardar; se le añade el número de secuencia en la clave "seq".
+        """
+        inicio = perf_counter()
+        self.secuencia += 1
+        registro["seq"] = self.secuencia
+        self._archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+        self._pendientes += 1
+        if self._pendientes >= self.lote or monotonic() - self._ultimo_fsync >= self.intervalo:
+            self.sincronizar()
+        self._eventos_desde_instantanea += 1
+        metricas_persistencia.observar("diario", perf_counter() - inicio)
+        if self._eventos_desde_instantanea >= self.eventos_por_instantanea:
+            self.compactar_en_segundo_plano()
+
+    def sincronizar(self) -> None:
+        """
+        Fuerza el fsync de los registros pendientes del diario.
+        """
+        if self._archivo is not None and self._pendientes:
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+        self._pendientes = 0
+        self._ultimo_fsync = monotonic()
+
+    def compactar(self) -> None:
+        """
+        Escribe una instantánea completa del estado actual y vacía el diario, en este hilo.
+
+        Si hay una compactación en segundo plano en curso, espera antes a que termine. La
+        instantánea se escribe de forma atómica; solo cuando ya es definitiva se borra el
+        diario anterior.
+        """
+        self.esperar_compactacion()
+        self._escribir_instantanea(*self._preparar_compactacion())
+
+    def compactar_en_segundo_plano(self) -> None:
+        """
+        Empieza a escribir una instantánea del estado actual en otro hilo, si no hay ya una
+        compactación en curso.
+
+        En este hilo solo se copian las referencias a las tareas y los IDs de los proyectos
+        y se rota el diario (ver `_preparar_compactacion`). Si la instantánea falla, se
+        informa del error y el diario anterior se conserva para la recuperación.
+        """
+        if self._compactacion is not None and self._compactacion.is_alive():
+            return
+        argumentos = self._preparar_compactacion()
+
+        def compactar() -> None:
+            try:
+                self._escribir_instantanea(*argumentos)
+            except Exception as e:
+                print(f"[ERROR] No se pudo escribir la instantánea: {e}")
+
+        self._compactacion = threading.Thread(target=compactar, name="compactacion-diario", daemon=True)
+        self._compactacion.start()
+
+    def esperar_compactacion(self) -> None:
+        """
+        Espera a que termine la compactación en segundo plano, si hay alguna en curso.
+        """
+        if self._compactacion is not None:
+            self._compactacion.join()
+            self._compactacion = None
+
+    def _preparar_compactacion(self) -> Tuple[Iterable[Tuple[int, bytes]], Dict[str, List[int]], int, int]:
+        """
+        Copia lo necesario para escribir una instantánea del estado actual y rota el diario.
+
+        Se hace con el cerrojo de los gestores, de modo que la copia y la secuencia de la
+        instantánea corresponden al mismo momento. Solo se copian referencias: las tareas se
+        codifican después, al escribir la instantánea.
+
+        Returns
+        -------
+        Tuple[Iterable[Tuple[int, bytes]], Dict[str, List[int]], int, int]
+            Registros de las tareas (se generan al recorrerlos), IDs de las tareas de cada
+            proyecto, contador de IDs y secuencia incluida en la instantánea.
+        """
+        gestor_tareas = self._gestor_tareas
+        with gestor_tareas.cerrojo:
+            proyectos = {nombre: [tarea.id_tarea for tarea in proyecto.tareas]
+                         for nombre, proyecto in self._gestor_proyectos.proyectos.items()}
+            if isinstance(gestor_tareas.tareas, TareasMapeadas):
+                # Las tareas que no se han usado se copian sin decodificar.
+                registros = gestor_tareas.tareas.copia().registros()
+            else:
+                tareas = list(gestor_tareas.tareas.values())
+                registros = ((tarea.id_tarea, codificar_tarea(tarea)) for tarea in tareas)
+            self._rotar_diario()
+            return registros, proyectos, gestor_tareas.contador_id, self.secuencia
+
+    def _rotar_diario(self) -> None:
+        """
+        Pasa los registros del diario al diario anterior y empieza un diario vacío.
+
+        Si el diario anterior sigue existiendo (la última instantánea falló o el proceso se
+        detuvo antes de terminarla), los registros se añaden a él en lugar de sustituirlo.
+        """
+        if self._archivo is not None:
+            self.sincronizar()
+            self._archivo.close()
+        if os.path.exists(self.ruta_diario):
+            if os.path.exists(self.ruta_diario_anterior):
+                with open(self.ruta_diario, "rb") as origen, open(self.ruta_diario_anterior, "ab") as destino:
+                    shutil.copyfileobj(origen, destino)
+                    destino.flush()
+                    os.fsync(destino.fileno())
+                os.remove(self.ruta_diario)
+            else:
+                os.replace(self.ruta_diario, self.ruta_diario_anterior)
+            _sincronizar_directorio(os.path.dirname(os.path.abspath(self.ruta_diario)))
+        self._archivo = open(self.ruta_diario, "w", encoding="utf-8")
+        self._pendientes = 0
+        self._eventos_desde_instantanea = 0
+
+    def _escribir_instantanea(self,
+                              registros: Iterable[Tuple[int, bytes]],
+                              proyectos: Dict[str, List[int]],
+                              contador_id: int,
+                              secuencia: int) -> None:
+        """
+        Escribe la instantánea preparada por `_preparar_compactacion` y borra los diarios ya
+        incluidos en ella. No toma el cerrojo de los gestores.
+        """
+        inicio = perf_counter()
+        with archivo_atomico(self.ruta_instantanea) as archivo:
+            escribir_registros(archivo, registros, proyectos, contador_id, secuencia)
+        for ruta in (self.ruta_instantanea_json, self.ruta_diario_anterior):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+        metricas_persistencia.observar("instantanea", perf_counter() - inicio)
+
+    def cerrar(self) -> None:
+        """
+        Espera a la compactación en curso, sincroniza y cierra el diario. Pensado para
+        registrarse con atexit.
+        """
+        self.esperar_compactacion()
+        if self._archivo is not None:
+            self.sincronizar()
+            self._archivo.close()
+            self._archivo = None
+        if self._bloqueo is not None:
+            self._bloqueo.close()
+            self._bloqueo = None
+
+    def _al_cambiar_tarea(self, tipo: str, datos: Dict[str, Any]) -> None:
+        """
+        Suscriptor de GestorDeTareas: convierte cada evento en un registro del diario.
+
+        Parameters
+        ----------
+        tipo : str
+            Tipo de evento.
+        datos : Dict[str, Any]
+            Datos del evento; incluye la tarea afectada.
+        """
+        tarea = datos["tarea"]
+        if tipo == "restaurar":
+            # Solo ocurre al recuperar el propio diario: el cambio ya está registrado.
+            return
+        if tipo == "eliminar":
+            self.registrar({"op": "eliminar", "id_tarea": tarea.id_tarea})
+        else:
+            self.registrar({"op": "tarea", "tarea": tarea.a_dict()})
+
+    def _al_cambiar_proyecto(self, tipo: str, datos: Dict[str, Any]) -> None:
+        """
+        Suscriptor de GestorProyectos: convierte cada evento en un registro del diario.
+
+        Parameters
+        ----------
+        tipo : str
+            Tipo de evento ("crear_proyecto", "borrar_proyecto", "agregar_tarea" o
+            "quitar_tarea").
+        datos : Dict[str, Any]
+            Datos del evento.
+        """
+        registro = {"op": tipo, "nombre": datos["nombre"]}
+        if "tarea" in datos:
+            registro["id_tarea"] = datos["tarea"].id_tarea
+        self.registrar(registro)
+
+    def _recuperar(self) -> None:
+        """
+        Carga la instantánea y reaplica los registros posteriores del diario anterior (si
+        una compactación no llegó a terminar) y del diario.
+
+        Si la última línea de un diario está incompleta (corte durante una escritura), se
+        descarta y se trunca el archivo para que los nuevos registros empiecen en una
+        línea limpia.
+        """
+        self.secuencia = self._cargar_instantanea()
+        for ruta in (self.ruta_diario_anterior, self.ruta_diario):
+            if not os.path.exists(ruta):
+                continue
+            valido = 0
+            with open(ruta, "rb") as archivo:
+                for linea in archivo:
+                    registro = _decodificar_linea(linea)
+                    if registro is None:
+                        break
+                    valido += len(linea)
+                    if registro["seq"] <= self.secuencia:
+                        continue
+                    self._aplicar(registro)
+                    self.secuencia = registro["seq"]
+                    self._eventos_desde_instantanea += 1
+            if valido < os.path.getsize(ruta):
+                with open(ruta, "r+b") as archivo:
+                    archivo.truncate(valido)
+
+    def _cargar_instantanea(self) -> int:
+        """
+        Carga la instantánea binaria o, si no existe, la instantánea JSON heredada.
+
+        Returns
+        -------
+        int
+            Número de secuencia incluido en la instantánea (0 si no hay ninguna).
+        """
+        gestor_tareas = self._gestor_tareas
+        if os.path.exists(self.ruta_instantanea) and self.carga_perezosa:
+            tareas = TareasMapeadas(self.ruta_instantanea)
+            gestor_tareas.cargar_perezosamente(tareas)
+            lector = tareas.instantanea
+            proyectos = lector.proyectos()
+            contador_id, secuencia = lector.contador_id, lector.secuencia
+        elif os.path.exists(self.ruta_instantanea):
+            with open(self.ruta_instantanea, "rb") as archivo:
+                lector = LectorInstantanea(archivo)
+                for tarea in lector.tareas():
+                    gestor_tareas.restaurar_tarea(tarea)
+                proyectos = lector.proyectos()
+            contador_id, secuencia = lector.contador_id, lector.secuencia
+        elif os.path.exists(self.ruta_instantanea_json):
+            with open(self.ruta_instantanea_json, "rb") as archivo:
+                estado = json.loads(archivo.read().decode("utf-8"))
+            for datos in estado["tareas"]:
+                gestor_tareas.restaurar_tarea(Tarea.desde_dict(datos))
+            proyectos = estado["proyectos"]
+            contador_id, secuencia = estado["contador_id"], estado["secuencia"]
+        else:
+            return 0
+        gestor_tareas.contador_id = max(gestor_tareas.contador_id, contador_id)
+        for nombre, ids in proyectos.items():
+            self._aplicar({"op": "crear_proyecto", "nombre": nombre})
+            for id_tarea in ids:
+                self._aplicar({"op": "agregar_tarea", "nombre": nombre, "id_tarea": id_tarea})
+        return secuencia
+
+    def _aplicar(self, registro: Dict[str, Any]) -> None:
+        """
+        Aplica un registro del diario sobre los gestores.
+
+        Parameters
+        ----------
+        registro : Dict[str, Any]
+            Registro a aplicar.
+        """
+        operacion = registro["op"]
+        if operacion == "tarea":
+            self._gestor_tareas.restaurar_tarea(Tarea.desde_dict(registro["tarea"]))
+        elif operacion == "eliminar":
+            self._gestor_tareas.eliminar_tarea(registro["id_tarea"])
+        elif operacion == "agregar_tarea":
+            # Los cambios de proyectos se repiten sin los mensajes de las operaciones públicas.
+            self._gestor_proyectos.restaurar(operacion, registro["nombre"],
+                                             tarea=self._gestor_tareas.tareas.get(registro["id_tarea"]))
+        else:
+            self._gestor_proyectos.restaurar(operacion, registro["nombre"], id_tarea=registro.get("id_tarea"))
+
+
+def _decodificar_linea(linea: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decodifica una línea del diario.
+
+    Parameters
+    ----------
+    linea : bytes
+        Línea leída del archivo, incluido el salto de línea final.
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        El registro, o None si la línea está incompleta o dañada.
+    """
+    if not linea.endswith(b"\n"):
+        return None
+    try:
+        return json.loads(linea.decode("utf-8"))
+    except ValueError:
+        return None
@@ -0,0 +1 @@
+# Este archivo marca a 'almacenamiento' como subpaquete de gestor_de_tareas
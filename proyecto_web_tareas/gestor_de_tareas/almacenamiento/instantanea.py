@@ -0,0 +1,502 @@
+"""
+Módulo: instantanea
+===================
+
+Formato binario versionado para guardar instantáneas completas de tareas y proyectos.
+
+A diferencia de pickle, el formato no ejecuta código al cargarse, no depende de la estructura
+interna de la clase Tarea y se puede escribir y leer tarea a tarea, sin tener todo el
+archivo en memoria.
+
+Estructura del archivo (enteros little-endian):
+
+    Cabecera     "GTAR" + versión (u16) + reservado (u16)
+    Tareas       un registro por tarea:
+                     longitud total del registro (u32), id (i64), estado (u8), prioridad (i32),
+                     ordinal de la fecha límite (i32, 0 = sin fecha), longitud del título (u32),
+                     longitud del usuario (u16, 0xFFFF = sin usuario), número de etiquetas (u16),
+                     longitud de la descripción (u32), y a continuación los bytes UTF-8 del
+                     título, del usuario, de cada etiqueta (u16 de longitud + bytes) y de la
+                     descripción
+                 seguido de un u32 a 0 que marca el final
+    Proyectos    número de proyectos (u32) y, por proyecto, nombre (u16 + bytes), número de
+                 tareas (u32) e IDs (i64 cada uno)
+    Índice       IDs de todas las tareas (i64), ordenados de menor a mayor, seguidos de la
+                 posición de su registro (u64)
+    Cola         contador_id (i64), secuencia (i64), número de tareas (u64), posición de los
+                 proyectos (u64), posición del índice (u64) y "FIN!"
+
+La descripción va al final del registro: las descripciones largas se guardan en la tarea
+como bytes y solo se decodifican si se accede a ellas. El índice permite localizar cualquier
+tarea sin leer el resto (ver gestor_de_tareas.almacenamiento.mapeado).
+
+Dependencias:
+    - struct y array para codificar los registros.
+    - gestor_de_tareas.clases.tarea: Tarea, EstadoTarea.
+"""
+
+import struct
+import sys
+from array import array
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from gestor_de_tareas.clases.tarea import Tarea, EstadoTarea
+
+MAGICO = b"GTAR"
+VERSION = 1
+_FIN = b"FIN!"
+_SIN_USUARIO = 0xFFFF
+# Las descripciones de más bytes que este umbral se decodifican bajo demanda.
+UMBRAL_DESCRIPCION_PEREZOSA = 256
+# Bytes que se leen de golpe al recorrer las tareas.
+TAMANO_BLOQUE = 1 << 20
+
+_CABECERA = struct.Struct("<4sHH")
+_REGISTRO = struct.Struct("<IqBiiIHHI")
+_LONGITUD = struct.Struct("<I")
+_CORTA = struct.Struct("<H")
+_COLA = struct.Struct("<qqQQQ4s")
+
+_ESTADOS: List[EstadoTarea] = list(EstadoTarea)
+_CODIGOS: Dict[EstadoTarea, int] = {estado: codigo for codigo, estado in enumerate(_ESTADOS)}
+
+
+def codificar_tarea(tarea: Tarea) -> bytes:
+    """
+    Codifica una tarea como un registro binario.
+
+    Parameters
+    ----------
+    tarea : Tarea
+        Tarea a codificar.
+
+    Returns
+    -------
+    bytes
+        Registro completo, incluido su campo de longitud.
+    """
+    # Cada atributo se lee una vez: la compactación del diario codifica las tareas en otro
+    # hilo mientras pueden modificarse.
+    titulo = tarea.titulo.encode("utf-8")
+    descripcion = tarea._descripcion
+    if not isinstance(descripcion, bytes):
+        descripcion = (descripcion or "").encode("utf-8")
+    usuario = tarea.usuario_asignado
+    usuario = usuario.encode("utf-8") if usuario else None
+    etiquetas = tarea.etiquetas
+    partes = [titulo]
+    if usuario is not None:
+        partes.append(usuario)
+    for etiqueta in etiquetas:
+        codificada = etiqueta.encode("utf-8")
+        partes.append(_CORTA.pack(len(codificada)))
+        partes.append(codificada)
+    partes.append(descripcion)
+    cuerpo = b"".join(partes)
+    fecha = tarea.fecha_limite
+    fecha = fecha.toordinal() if fecha else 0
+    cabecera = _REGISTRO.pack(_REGISTRO.size + len(cuerpo), tarea.id_tarea, _CODIGOS[tarea.estado],
+                              tarea.prioridad, fecha, len(titulo),
+                              _SIN_USUARIO if usuario is None else len(usuario),
+                              len(etiquetas), len(descripcion))
+    return cabecera + cuerpo
+
+
+def decodificar_campos(buffer: bytes,
+                       inicio: int = 0,
+                       cache: Optional[Dict[Any, Any]] = None) -> Tuple[int, EstadoTarea, int, int,
+                                                                         Optional[str], Tuple[str, ...]]:
+    """
+    Lee los campos que usan los índices del gestor sin decodificar título ni descripción.
+
+    Parameters
+    ----------
+    buffer : bytes
+        Buffer que contiene el registro (bytes o mmap).
+    inicio : int, optional
+        Posición del registro dentro del buffer (por defecto 0).
+    cache : Optional[Dict[Any, Any]], optional
+        Diccionario compartido entre llamadas para reutilizar usuarios y etiquetas ya
+        decodificados. Si es None, no se reutiliza nada.
+
+    Returns
+    -------
+    Tuple[int, EstadoTarea, int, int, Optional[str], Tuple[str, ...]]
+        ID, estado, prioridad, ordinal de la fecha límite (0 si no tiene), usuario asignado
+        y etiquetas.
+    """
+    cabecera, usuario, etiquetas = _leer_campos(buffer, inicio, {} if cache is None else cache)
+    return cabecera[1], _ESTADOS[cabecera[2]], cabecera[3], cabecera[4], usuario, etiquetas
+
+
+def decodificar_tarea(buffer: bytes,
+                      inicio: int = 0,
+                      cache: Optional[Dict[Any, Any]] = None) -> Tarea:
+    """
+    Reconstruye una tarea a partir de un registro binario.
+
+    Parameters
+    ----------
+    buffer : bytes
+        Buffer que contiene el registro, tal como lo genera `codificar_tarea` (bytes o mmap).
+    inicio : int, optional
+        Posición del registro dentro del buffer (por defecto 0).
+    cache : Optional[Dict[Any, Any]], optional
+        Diccionario compartido entre llamadas para reutilizar usuarios, etiquetas y fechas ya
+        decodificados. Si es None, no se reutiliza nada.
+
+    Returns
+    -------
+    Tarea
+        Tarea reconstruida. Si la descripción supera UMBRAL_DESCRIPCION_PEREZOSA bytes, se
+        guarda sin decodificar.
+    """
+    if cache is None:
+        cache = {}
+    cabecera, usuario, etiquetas = _leer_campos(buffer, inicio, cache)
+    longitud, id_tarea, codigo, prioridad, fecha, len_titulo, _, _, len_descripcion = cabecera
+    titulo = buffer[inicio + _REGISTRO.size:inicio + _REGISTRO.size + len_titulo].decode("utf-8")
+    descripcion = buffer[inicio + longitud - len_descripcion:inicio + longitud]
+    fecha_limite = None
+    if fecha:
+        fecha_limite = cache.get(fecha)
+        if fecha_limite is None:
+            fecha_limite = cache[fecha] = date.fromordinal(fecha)
+    # Se evita Tarea.__init__: los valores ya vienen normalizados e internados.
+    tarea = Tarea.__new__(Tarea)
+    tarea.id_tarea = id_tarea
+    tarea.titulo = titulo
+    tarea._descripcion = descripcion if len_descripcion > UMBRAL_DESCRIPCION_PEREZOSA else descripcion.decode("utf-8")
+    tarea.fecha_limite = fecha_limite
+    tarea.estado = _ESTADOS[codigo]
+    tarea.prioridad = prioridad
+    tarea.etiquetas = etiquetas
+    tarea.usuario_asignado = usuario
+    return tarea
+
+
+def _leer_campos(buffer: bytes, inicio: int,
+                 cache: Dict[Any, Any]) -> Tuple[Tuple[int, ...], Optional[str], Tuple[str, ...]]:
+    """
+    Lee la cabecera, el usuario y las etiquetas de un registro.
+
+    Parameters
+    ----------
+    buffer : bytes
+        Buffer que contiene el registro.
+    inicio : int
+        Posición del registro dentro del buffer.
+    cache : Dict[Any, Any]
+        Caché de usuarios y etiquetas ya decodificados.
+
+    Returns
+    -------
+    Tuple[Tuple[int, ...], Optional[str], Tuple[str, ...]]
+        Campos de la cabecera, usuario asignado y etiquetas.
+    """
+    cabecera = _REGISTRO.unpack_from(buffer, inicio)
+    longitud, _, _, _, _, len_titulo, len_usuario, num_etiquetas, len_descripcion = cabecera
+    posicion = inicio + _REGISTRO.size + len_titulo
+    usuario = None
+    if len_usuario != _SIN_USUARIO:
+        clave = buffer[posicion:posicion + len_usuario]
+        posicion += len_usuario
+        usuario = cache.get(clave)
+        if usuario is None:
+            usuario = cache[clave] = sys.intern(clave.decode("utf-8"))
+    fin_etiquetas = inicio + longitud - len_descripcion
+    # Las etiquetas se decodifican como bloque; las combinaciones repetidas comparten tupla.
+    clave = (num_etiquetas, buffer[posicion:fin_etiquetas])
+    etiquetas = cache.get(clave)
+    if etiquetas is None:
+        lista = []
+        for _ in range(num_etiquetas):
+            (longitud_etiqueta,) = _CORTA.unpack_from(buffer, posicion)
+            posicion += _CORTA.size
+            lista.append(sys.intern(buffer[posicion:posicion + longitud_etiqueta].decode("utf-8")))
+            posicion += longitud_etiqueta
+        etiquetas = cache[clave] = tuple(lista)
+    return cabecera, usuario, etiquetas
+
+
+def escribir_instantanea(archivo: BinaryIO,
+                         tareas: Iterable[Tarea],
+                         proyectos: Dict[str, Iterable[int]],
+                         contador_id: int,
+                         secuencia: int = 0) -> int:
+    """
+    Escribe una instantánea en un archivo binario, tarea a tarea.
+
+    Parameters
+    ----------
+    archivo : BinaryIO
+        Archivo abierto en modo binario de escritura.
+    tareas : Iterable[Tarea]
+        Tareas a guardar; puede ser un generador.
+    proyectos : Dict[str, Iterable[int]]
+        IDs de las tareas de cada proyecto.
+    contador_id : int
+        Siguiente ID a asignar por el gestor de tareas.
+    secuencia : int, optional
+        Número de secuencia del diario incluido en la instantánea (por defecto 0).
+
+    Returns
+    -------
+    int
+        Número de tareas escritas.
+    """
+    return escribir_registros(archivo, ((tarea.id_tarea, codificar_tarea(tarea)) for tarea in tareas),
+                              proyectos, contador_id, secuencia)
+
+
+def escribir_registros(archivo: BinaryIO,
+                       registros: Iterable[Tuple[int, bytes]],
+                       proyectos: Dict[str, Iterable[int]],
+                       contador_id: int,
+                       secuencia: int = 0) -> int:
+    """
+    Escribe una instantánea a partir de registros ya codificados.
+
+    Permite copiar sin decodificar los registros de otra instantánea.
+
+    Parameters
+    ----------
+    archivo : BinaryIO
+        Archivo abierto en modo binario de escritura.
+    registros : Iterable[Tuple[int, bytes]]
+        Pares (id de la tarea, registro generado por `codificar_tarea`).
+    proyectos : Dict[str, Iterable[int]]
+        IDs de las tareas de cada proyecto.
+    contador_id : int
+        Siguiente ID a asignar por el gestor de tareas.
+    secuencia : int, optional
+        Número de secuencia del diario incluido en la instantánea (por defecto 0).
+
+    Returns
+    -------
+    int
+        Número de tareas escritas.
+    """
+    archivo.write(_CABECERA.pack(MAGICO, VERSION, 0))
+    posicion = _CABECERA.size
+    ids = array("q")
+    posiciones = array("Q")
+    for id_tarea, registro in registros:
+        ids.append(id_tarea)
+        posiciones.append(posicion)
+        archivo.write(registro)
+        posicion += len(registro)
+    archivo.write(_LONGITUD.pack(0))
+    posicion += _LONGITUD.size
+
+    posicion_proyectos = posicion
+    partes = [_LONGITUD.pack(len(proyectos))]
+    for nombre, ids_proyecto in proyectos.items():
+        codificado = nombre.encode("utf-8")
+        lista = array("q", ids_proyecto)
+        partes += [_CORTA.pack(len(codificado)), codificado, _LONGITUD.pack(len(lista)), _a_bytes(lista)]
+    bloque = b"".join(partes)
+    archivo.write(bloque)
+    posicion += len(bloque)
+
+    # Las tareas suelen llegar ya ordenadas por ID; solo se reordena el índice si no es así.
+    if any(ids[i] >= ids[i + 1] for i in range(len(ids) - 1)):
+        orden = sorted(range(len(ids)), key=ids.__getitem__)
+        ids = array("q", [ids[i] for i in orden])
+        posiciones = array("Q", [posiciones[i] for i in orden])
+    archivo.write(_a_bytes(ids))
+    archivo.write(_a_bytes(posiciones))
+    archivo.write(_COLA.pack(contador_id, secuencia, len(ids), posicion_proyectos, posicion, _FIN))
+    return len(ids)
+
+
+class LectorInstantanea:
+    """
+    Lector de instantáneas binarias.
+
+    Al crearse solo lee la cabecera y la cola del archivo; las tareas se leen de una en una
+    con `tareas()`.
+
+    Parameters
+    ----------
+    archivo : BinaryIO
+        Archivo abierto en modo binario de lectura y con soporte de seek.
+
+    Attributes
+    ----------
+    version : int
+        Versión del formato del archivo.
+    contador_id : int
+        Siguiente ID a asignar guardado en la instantánea.
+    secuencia : int
+        Número de secuencia del diario incluido en la instantánea.
+    num_tareas : int
+        Número de tareas guardadas.
+    posicion_proyectos : int
+        Posición de la sección de proyectos en el archivo.
+    posicion_indice : int
+        Posición del índice de IDs en el archivo.
+
+    Raises
+    ------
+    ValueError
+        Si el archivo no es una instantánea o su versión no está soportada.
+    """
+
+    def __init__(self, archivo: BinaryIO) -> None:
+        """
+        Valida la cabecera y lee la cola del archivo.
+        """
+        self._archivo = archivo
+        archivo.seek(0)
+        magico, self.version, _ = _CABECERA.unpack(_leer_exacto(archivo, _CABECERA.size))
+        if magico != MAGICO:
+            raise ValueError("El archivo no es una instantánea de tareas.")
+        if self.version != VERSION:
+            raise ValueError(f"Versión de instantánea no soportada: {self.version}.")
+        archivo.seek(-_COLA.size, 2)
+        (self.contador_id, self.secuencia, self.num_tareas, self.posicion_proyectos,
+         self.posicion_indice, fin) = _COLA.unpack(_leer_exacto(archivo, _COLA.size))
+        if fin != _FIN:
+            raise ValueError("Instantánea incompleta.")
+
+    def tareas(self) -> Iterator[Tarea]:
+        """
+        Itera sobre las tareas guardadas.
+
+        El archivo se lee en bloques de TAMANO_BLOQUE bytes, así que la memoria usada no
+        depende del tamaño de la instantánea.
+
+        Returns
+        -------
+        Iterator[Tarea]
+            Tareas en el orden en que se guardaron.
+        """
+        archivo = self._archivo
+        archivo.seek(_CABECERA.size)
+        cache: Dict[Any, Any] = {}
+        bloque = b""
+        posicion = 0
+        while True:
+            if len(bloque) - posicion < _LONGITUD.size:
+                bloque = bloque[posicion:] + archivo.read(max(TAMANO_BLOQUE, _LONGITUD.size))
+                posicion = 0
+                if len(bloque) < _LONGITUD.size:
+                    raise ValueError("Instantánea truncada.")
+            (longitud,) = _LONGITUD.unpack_from(bloque, posicion)
+            if longitud == 0:
+                return
+            if len(bloque) - posicion < longitud:
+                bloque = bloque[posicion:] + archivo.read(max(TAMANO_BLOQUE, longitud))
+                posicion = 0
+                if len(bloque) < longitud:
+                    raise ValueError("Instantánea truncada.")
+            yield decodificar_tarea(bloque, posicion, cache)
+            posicion += longitud
+
+    def proyectos(self) -> Dict[str, List[int]]:
+        """
+        Lee los proyectos y los IDs de sus tareas.
+
+        Returns
+        -------
+        Dict[str, List[int]]
+            IDs de las tareas de cada proyecto, en su orden original.
+        """
+        archivo = self._archivo
+        archivo.seek(self.posicion_proyectos)
+        (num_proyectos,) = _LONGITUD.unpack(_leer_exacto(archivo, _LONGITUD.size))
+        proyectos = {}
+        for _ in range(num_proyectos):
+            (longitud,) = _CORTA.unpack(_leer_exacto(archivo, _CORTA.size))
+            nombre = _leer_exacto(archivo, longitud).decode("utf-8")
+            (num_ids,) = _LONGITUD.unpack(_leer_exacto(archivo, _LONGITUD.size))
+            proyectos[nombre] = _desde_bytes("q", _leer_exacto(archivo, num_ids * 8)).tolist()
+        return proyectos
+
+    def indice(self) -> Tuple[array, array]:
+        """
+        Lee el índice de IDs y posiciones de los registros.
+
+        Returns
+        -------
+        Tuple[array, array]
+            Arrays paralelos con los IDs, ordenados de menor a mayor, y la posición de cada
+            registro en el archivo.
+        """
+        archivo = self._archivo
+        archivo.seek(self.posicion_indice)
+        ids = _desde_bytes("q", _leer_exacto(archivo, self.num_tareas * 8))
+        posiciones = _desde_bytes("Q", _leer_exacto(archivo, self.num_tareas * 8))
+        return ids, posiciones
+
+
+def _leer_exacto(archivo: BinaryIO, n: int) -> bytes:
+    """
+    Lee exactamente `n` bytes de un archivo.
+
+    Parameters
+    ----------
+    archivo : BinaryIO
+        Archivo del que se lee.
+    n : int
+        Número de bytes.
+
+    Returns
+    -------
+    bytes
+        Los bytes leídos.
+
+    Raises
+    ------
+    ValueError
+        Si el archivo termina antes de tiempo.
+    """
+    datos = archivo.read(n)
+    if len(datos) != n:
+        raise ValueError("Instantánea truncada.")
+    return datos
+
+
+def _a_bytes(valores: array) -> bytes:
+    """
+    Convierte un array de enteros en bytes little-endian.
+
+    Parameters
+    ----------
+    valores : array
+        Array a convertir.
+
+    Returns
+    -------
+    bytes
+        Contenido del array en orden little-endian.
+    """
+    if sys.byteorder == "big":
+        valores = array(valores.typecode, valores)
+        valores.byteswap()
+    return valores.tobytes()
+
+
+def _desde_bytes(tipo: str, datos: bytes) -> array:
+    """
+    Construye un array de enteros a partir de bytes little-endian.
+
+    Parameters
+    ----------
+    tipo : str
+        Código de tipo del array ("q" o "Q").
+    datos : bytes
+        Bytes a convertir.
+
+    Returns
+    -------
+    array
+        Array con los valores en el orden de bytes de la máquina.
+    """
+    valores = array(tipo)
+    valores.frombytes(datos)
+    if sys.byteorder == "big":
+        valores.byteswap()
+    return valores
@@ -0,0 +1,255 @@
+"""
+Módulo: mapeado
+===============
+
+Acceso perezoso a las tareas de una instantánea binaria mediante mmap.
+
+`TareasMapeadas` sustituye al diccionario `GestorDeTareas.tareas` tras un arranque: al
+abrirla solo se lee el índice de IDs de la instantánea, de modo que el tiempo de arranque no
+depende del número de tareas. Cada tarea se decodifica la primera vez que se pide y se
+conserva en memoria, así que las modificaciones posteriores se hacen sobre el mismo objeto.
+Las tareas nuevas, modificadas o eliminadas se guardan en memoria sin tocar el archivo.
+
+Dependencias:
+    - mmap para proyectar el archivo en memoria.
+    - gestor_de_tareas.almacenamiento.instantanea: formato de la instantánea.
+"""
+
+import heapq
+import mmap
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from gestor_de_tareas.clases.tarea import Tarea, EstadoTarea
+from gestor_de_tareas.almacenamiento.instantanea import (LectorInstantanea, codificar_tarea,
+                                                         decodificar_campos, decodificar_tarea)
+
+
+class TareasMapeadas(MutableMapping):
+    """
+    Diccionario {id_tarea: Tarea} respaldado por una instantánea proyectada en memoria.
+
+    Se recorre en orden de ID, que coincide con el orden de creación.
+
+    Parameters
+    ----------
+    ruta : str
+        Ruta de la instantánea binaria.
+
+    Attributes
+    ----------
+    instantanea : LectorInstantanea
+        Lector de la instantánea, con su contador de IDs, secuencia y proyectos.
+
+    Notes
+    -----
+    `leer()`, `values()` e `items()` no guardan en memoria las tareas que decodifican; para
+    modificar una tarea hay que obtenerla con `tareas[id]` o `tareas.get(id)`, como hace el
+    gestor.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        """
+        Proyecta la instantánea en memoria y lee su índice de IDs.
+        """
+        with open(ruta, "rb") as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self.instantanea = LectorInstantanea(self._mapa)
+        self._ids, self._posiciones = self.instantanea.indice()
+        self._cargadas: Dict[int, Tarea] = {}
+        self._nuevas: Set[int] = set()
+        self._eliminadas: Set[int] = set()
+        self._cache: Dict[Any, Any] = {}
+
+    def _posicion(self, id_tarea: int) -> Optional[int]:
+        """
+        Busca la posición del registro de una tarea en la instantánea.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        Optional[int]
+            Posición del registro, o None si la instantánea no contiene la tarea.
+        """
+        indice = bisect_left(self._ids, id_tarea)
+        if indice < len(self._ids) and self._ids[indice] == id_tarea:
+            return self._posiciones[indice]
+        return None
+
+    def leer(self, id_tarea: int) -> Optional[Tarea]:
+        """
+        Devuelve la tarea en memoria o la decodifica de la instantánea sin guardarla.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        Optional[Tarea]
+            La tarea, o None si no existe.
+        """
+        tarea = self._cargadas.get(id_tarea)
+        if tarea is not None or id_tarea in self._eliminadas:
+            return tarea
+        posicion = self._posicion(id_tarea)
+        if posicion is None:
+            return None
+        return decodificar_tarea(self._mapa, posicion, self._cache)
+
+    def __getitem__(self, id_tarea: int) -> Tarea:
+        """
+        Devuelve una tarea, decodificándola y guardándola en memoria si es la primera vez.
+        """
+        tarea = self._cargadas.get(id_tarea)
+        if tarea is None:
+            tarea = self.leer(id_tarea)
+            if tarea is None:
+                raise KeyError(id_tarea)
+            # setdefault es atómico: si otro hilo la ha decodificado a la vez, todos
+            # comparten el mismo objeto y no se pierden sus modificaciones.
+            tarea = self._cargadas.setdefault(id_tarea, tarea)
+            if id_tarea in self._eliminadas:
+                # Se ha eliminado mientras se decodificaba: no debe volver a la memoria.
+                self._cargadas.pop(id_tarea, None)
+                raise KeyError(id_tarea)
+        return tarea
+
+    def __setitem__(self, id_tarea: int, tarea: Tarea) -> None:
+        """
+        Añade o reemplaza una tarea en memoria.
+        """
+        self._cargadas[id_tarea] = tarea
+        self._eliminadas.discard(id_tarea)
+        if self._posicion(id_tarea) is None:
+            self._nuevas.add(id_tarea)
+
+    def __delitem__(self, id_tarea: int) -> None:
+        """
+        Elimina una tarea; la instantánea no se modifica.
+        """
+        if id_tarea not in self:
+            raise KeyError(id_tarea)
+        if id_tarea in self._nuevas:
+            self._nuevas.discard(id_tarea)
+        else:
+            # Se marca antes de sacarla de memoria, ver `__getitem__`.
+            self._eliminadas.add(id_tarea)
+        self._cargadas.pop(id_tarea, None)
+
+    def __contains__(self, id_tarea: Any) -> bool:
+        """
+        Comprueba si existe una tarea sin decodificarla.
+        """
+        if id_tarea in self._cargadas:
+            return True
+        return id_tarea not in self._eliminadas and self._posicion(id_tarea) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Itera sobre los IDs de las tareas existentes en orden ascendente.
+        """
+        eliminadas = self._eliminadas
+        guardadas = (id_tarea for id_tarea in self._ids if id_tarea not in eliminadas)
+        return heapq.merge(guardadas, sorted(self._nuevas))
+
+    def __len__(self) -> int:
+        """
+        Retorna el número de tareas existentes.
+        """
+        return len(self._ids) - len(self._eliminadas) + len(self._nuevas)
+
+    def values(self) -> Iterator[Tarea]:  # type: ignore[override]
+        """
+        Itera sobre las tareas en orden de ID sin guardar en memoria las no cargadas.
+
+        Returns
+        -------
+        Iterator[Tarea]
+            Tareas existentes.
+        """
+        return (self.leer(id_tarea) for id_tarea in self)
+
+    def items(self) -> Iterator[Tuple[int, Tarea]]:  # type: ignore[override]
+        """
+        Itera sobre los pares (id, tarea) sin guardar en memoria las tareas no cargadas.
+
+        Returns
+        -------
+        Iterator[Tuple[int, Tarea]]
+            Pares de tareas existentes.
+        """
+        return ((id_tarea, self.leer(id_tarea)) for id_tarea in self)
+
+    def copia(self) -> "TareasMapeadas":
+        """
+        Devuelve una copia que comparte la instantánea proyectada y las tareas cargadas, pero
+        no los conjuntos de tareas cargadas, nuevas y eliminadas.
+
+        Cuesta O(tareas cargadas, nuevas y eliminadas) y no decodifica nada. Permite recorrer
+        `registros()` en otro hilo mientras el original se sigue modificando.
+
+        Returns
+        -------
+        TareasMapeadas
+            Copia de las tareas existentes en este momento.
+        """
+        copia = object.__new__(TareasMapeadas)
+        copia.__dict__.update(self.__dict__)
+        copia._cargadas = dict(self._cargadas)
+        copia._nuevas = set(self._nuevas)
+        copia._eliminadas = set(self._eliminadas)
+        copia._cache = {}
+        return copia
+
+    def registros(self) -> Iterator[Tuple[int, bytes]]:
+        """
+        Itera sobre los registros codificados de las tareas, en orden de ID.
+
+        Las tareas que no se han cargado en memoria se copian tal cual de la instantánea, sin
+        decodificarlas.
+
+        Returns
+        -------
+        Iterator[Tuple[int, bytes]]
+            Pares (id de la tarea, registro) aptos para `escribir_registros`.
+        """
+        mapa = self._mapa
+        for id_tarea in self:
+            tarea = self._cargadas.get(id_tarea)
+            if tarea is not None:
+                yield id_tarea, codificar_tarea(tarea)
+            else:
+                posicion = self._posicion(id_tarea)
+                longitud = int.from_bytes(mapa[posicion:posicion + 4], "little")
+                yield id_tarea, mapa[posicion:posicion + longitud]
+
+    def campos_indice(self) -> Iterator[Tuple[int, EstadoTarea, int, int, Optional[str], Tuple[str, ...]]]:
+        """
+        Itera sobre los campos que usan los índices del gestor, sin decodificar títulos ni
+        descripciones de las tareas no cargadas.
+
+        Returns
+        -------
+        Iterator[Tuple[int, EstadoTarea, int, int, Optional[str], Tuple[str, ...]]]
+            ID, estado, prioridad, ordinal de la fecha límite (0 si no tiene), usuario y
+            etiquetas de cada tarea.
+        """
+        mapa = self._mapa
+        cache = self._cache
+        cargadas = self._cargadas
+        eliminadas = self._eliminadas
+        for id_tarea, posicion in zip(self._ids, self._posiciones):
+            if id_tarea in cargadas or id_tarea in eliminadas:
+                continue
+            yield decodificar_campos(mapa, posicion, cache)
+        for tarea in cargadas.values():
+            fecha = tarea.fecha_limite.toordinal() if tarea.fecha_limite else 0
+            yield (tarea.id_tarea, tarea.estado, tarea.prioridad, fecha,
+                   tarea.usuario_asignado, tarea.etiquetas)
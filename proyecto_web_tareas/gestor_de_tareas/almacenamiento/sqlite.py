@@ -0,0 +1,1711 @@
+"""
+Módulo: sqlite
+==============
+
+Backend de almacenamiento en SQLite para tareas y proyectos.
+
+`GestorDeTareasSQLite` y `GestorProyectosSQLite` ofrecen la misma interfaz pública que
+GestorDeTareas y GestorProyectos, pero guardan los datos en una base de datos SQLite en
+lugar de en memoria. Así el conjunto de datos no tiene que caber en RAM y varios procesos
+pueden compartir el mismo archivo. Los gestores en memoria siguen disponibles y son los
+que se usan por defecto (y en pruebas).
+
+Detalles de implementación:
+    - La base de datos se abre en modo WAL, de modo que los lectores no bloquean al escritor.
+    - Cada hilo usa su propia conexión (ver `ConexionesSQLite`).
+    - Todas las consultas son sentencias constantes con parámetros, que sqlite3 prepara una
+      vez y reutiliza desde su caché de sentencias.
+    - Hay índices por estado, usuario, etiqueta, prioridad y fecha límite, y un índice
+      parcial por fecha límite de las tareas no completadas para las consultas de
+      vencimientos.
+    - Los títulos y descripciones se indexan en la tabla FTS5 `tareas_busqueda`, que
+      mantienen disparadores, para la búsqueda de texto de `buscar`.
+    - El número de tareas de cada proyecto en cada estado se guarda en `proyecto_conteo` y lo
+      mantienen disparadores, de modo que el progreso de los proyectos se lee sin recorrerlos.
+    - Las tareas devueltas son copias: cualquier cambio debe hacerse a través del gestor.
+    - Cada transacción de escritura incrementa el contador de la tabla `cambios`, que
+      comparten todos los procesos. Los gestores lo exponen como `version` y lo usan para
+      invalidar sus cachés de lectura cuando otro proceso (p. ej. otro worker de
+      gunicorn) modifica los datos.
+    - Las operaciones que leen y después escriben una tarea empiezan con BEGIN IMMEDIATE,
+      de modo que dos procesos no pueden pisarse los cambios.
+
+Dependencias:
+    - sqlite3 (biblioteca estándar).
+    - gestor_de_tareas.clases.tarea: Tarea, EstadoTarea.
+"""
+
+import contextlib
+import sqlite3
+import threading
+from collections.abc import Mapping
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from gestor_de_tareas.clases.tarea import Tarea, EstadoTarea
+from gestor_de_tareas.gestores.proyectos import porcentaje_completadas
+from gestor_de_tareas.utilidades.cache import CacheVersionada
+from gestor_de_tareas.utilidades.decoradores import log_funcion
+from gestor_de_tareas.utilidades.busqueda import PESO_TITULO, expresion_fts
+from gestor_de_tareas.utilidades.eventos import Publicador
+from gestor_de_tareas.utilidades.paginacion import (ORDINAL_SIN_FECHA, clave_cursor, codificar_cursor,
+                                                    decodificar_cursor)
+from gestor_de_tareas.utilidades.importacion import TAMANO_LOTE, por_lotes, sin_recolector, validar_lote
+
+# Valor con el que se ordenan las tareas sin fecha límite (detrás de cualquier fecha real).
+_FECHA_MAXIMA = "9999-99-99"
+_ORDEN_PRIORIDAD = f"prioridad, coalesce(fecha_limite, '{_FECHA_MAXIMA}'), id_tarea"
+
+# Contador de cambios compartido por todos los procesos que usan la base de datos.
+ESQUEMA_CAMBIOS = """
+CREATE TABLE IF NOT EXISTS cambios (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cambios (id, version) VALUES (1, 0);
+"""
+_SQL_VERSION = "SELECT version FROM cambios WHERE id = 1"
+_SQL_REGISTRAR_CAMBIO = "UPDATE cambios SET version = version + 1 WHERE id = 1"
+
+ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS tareas (
+    id_tarea INTEGER PRIMARY KEY AUTOINCREMENT,
+    titulo TEXT NOT NULL,
+    descripcion TEXT NOT NULL DEFAULT '',
+    fecha_limite TEXT,
+    estado TEXT NOT NULL,
+    prioridad INTEGER NOT NULL,
+    usuario_asignado TEXT
+);
+CREATE TABLE IF NOT EXISTS etiquetas (
+    id_tarea INTEGER NOT NULL REFERENCES tareas(id_tarea) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL,
+    etiqueta TEXT NOT NULL,
+    PRIMARY KEY (id_tarea, posicion)
+);
+CREATE TABLE IF NOT EXISTS proyectos (
+    nombre TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS proyecto_tareas (
+    nombre TEXT NOT NULL REFERENCES proyectos(nombre) ON DELETE CASCADE,
+    id_tarea INTEGER NOT NULL REFERENCES tareas(id_tarea) ON DELETE CASCADE
+);
+-- Número de tareas de cada proyecto en cada estado, mantenido por los disparadores de abajo
+-- para que el progreso no tenga que recorrer las tareas del proyecto.
+CREATE TABLE IF NOT EXISTS proyecto_conteo (
+    nombre TEXT NOT NULL REFERENCES proyectos(nombre) ON DELETE CASCADE,
+    estado TEXT NOT NULL,
+    tareas INTEGER NOT NULL,
+    PRIMARY KEY (nombre, estado)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS proyecto_conteo_agregar AFTER INSERT ON proyecto_tareas BEGIN
+    INSERT INTO proyecto_conteo (nombre, estado, tareas)
+        SELECT NEW.nombre, estado, 1 FROM tareas WHERE id_tarea = NEW.id_tarea
+        ON CONFLICT (nombre, estado) DO UPDATE SET tareas = tareas + 1;
+END;
+-- Si la tarea ya no existe (borrado en cascada), el disparador de tareas la ha descontado.
+CREATE TRIGGER IF NOT EXISTS proyecto_conteo_quitar AFTER DELETE ON proyecto_tareas BEGIN
+    UPDATE proyecto_conteo SET tareas = tareas - 1
+        WHERE nombre = OLD.nombre AND estado = (SELECT estado FROM tareas WHERE id_tarea = OLD.id_tarea);
+END;
+CREATE TRIGGER IF NOT EXISTS proyecto_conteo_estado AFTER UPDATE OF estado ON tareas
+        WHEN OLD.estado <> NEW.estado BEGIN
+    UPDATE proyecto_conteo SET tareas = tareas - (SELECT count(*) FROM proyecto_tareas p
+                                                  WHERE p.nombre = proyecto_conteo.nombre
+                                                  AND p.id_tarea = NEW.id_tarea)
+        WHERE estado = OLD.estado AND nombre IN (SELECT nombre FROM proyecto_tareas WHERE id_tarea = NEW.id_tarea);
+    INSERT INTO proyecto_conteo (nombre, estado, tareas)
+        SELECT nombre, NEW.estado, count(*) FROM proyecto_tareas WHERE id_tarea = NEW.id_tarea GROUP BY nombre
+        ON CONFLICT (nombre, estado) DO UPDATE SET tareas = tareas + excluded.tareas;
+END;
+CREATE TRIGGER IF NOT EXISTS proyecto_conteo_eliminar BEFORE DELETE ON tareas BEGIN
+    UPDATE proyecto_conteo SET tareas = tareas - (SELECT count(*) FROM proyecto_tareas p
+                                                  WHERE p.nombre = proyecto_conteo.nombre
+                                                  AND p.id_tarea = OLD.id_tarea)
+        WHERE estado = OLD.estado AND nombre IN (SELECT nombre FROM proyecto_tareas WHERE id_tarea = OLD.id_tarea);
+END;
+-- Bases de datos creadas antes de existir los contadores: se calculan una vez.
+INSERT OR IGNORE INTO proyecto_conteo (nombre, estado, tareas)
+    SELECT p.nombre, t.estado, count(*) FROM proyecto_tareas p JOIN tareas t ON t.id_tarea = p.id_tarea
+    WHERE NOT EXISTS (SELECT 1 FROM proyecto_conteo) GROUP BY p.nombre, t.estado;
+CREATE INDEX IF NOT EXISTS idx_tareas_estado ON tareas(estado, id_tarea);
+CREATE INDEX IF NOT EXISTS idx_tareas_usuario ON tareas(usuario_asignado, id_tarea);
+CREATE INDEX IF NOT EXISTS idx_tareas_prioridad ON tareas({_ORDEN_PRIORIDAD});
+CREATE INDEX IF NOT EXISTS idx_tareas_estado_prioridad ON tareas(estado, {_ORDEN_PRIORIDAD});
+CREATE INDEX IF NOT EXISTS idx_tareas_fecha ON tareas(fecha_limite, id_tarea);
+-- Vencimientos de las tareas no completadas: el índice parcial evita saltarse las
+-- completadas al buscar las vencidas o las próximas en vencer.
+CREATE INDEX IF NOT EXISTS idx_tareas_vencimiento ON tareas(fecha_limite, id_tarea)
+    WHERE fecha_limite IS NOT NULL AND estado <> 'COMPLETADA';
+CREATE INDEX IF NOT EXISTS idx_etiquetas_etiqueta ON etiquetas(etiqueta, id_tarea);
+-- Índice de texto de títulos y descripciones (rowid = id_tarea). Las palabras se comparan sin
+-- mayúsculas ni tildes y se indexan los prefijos de 2 y 3 letras para las búsquedas por prefijo.
+CREATE VIRTUAL TABLE IF NOT EXISTS tareas_busqueda USING fts5(
+    titulo, descripcion, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS tareas_busqueda_insertar AFTER INSERT ON tareas BEGIN
+    INSERT INTO tareas_busqueda (rowid, titulo, descripcion) VALUES (NEW.id_tarea, NEW.titulo, NEW.descripcion);
+END;
+CREATE TRIGGER IF NOT EXISTS tareas_busqueda_modificar AFTER UPDATE OF titulo, descripcion ON tareas
+        WHEN OLD.titulo <> NEW.titulo OR OLD.descripcion <> NEW.descripcion BEGIN
+    UPDATE tareas_busqueda SET titulo = NEW.titulo, descripcion = NEW.descripcion WHERE rowid = NEW.id_tarea;
+END;
+CREATE TRIGGER IF NOT EXISTS tareas_busqueda_eliminar AFTER DELETE ON tareas BEGIN
+    DELETE FROM tareas_busqueda WHERE rowid = OLD.id_tarea;
+END;
+-- Bases de datos creadas antes de existir el índice de texto: se indexan una vez.
+INSERT INTO tareas_busqueda (rowid, titulo, descripcion)
+    SELECT id_tarea, titulo, descripcion FROM tareas WHERE NOT EXISTS (SELECT 1 FROM tareas_busqueda);
+-- Una tarea solo puede estar una vez en cada proyecto. En bases de datos anteriores al
+-- índice único se conserva la primera pertenencia de cada par (el disparador de arriba
+-- descuenta las repetidas).
+DELETE FROM proyecto_tareas
+    WHERE NOT EXISTS (SELECT 1 FROM sqlite_master WHERE name = 'idx_proyecto_tareas_unica')
+    AND rowid NOT IN (SELECT min(rowid) FROM proyecto_tareas GROUP BY nombre, id_tarea);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_proyecto_tareas_unica ON proyecto_tareas(nombre, id_tarea);
+CREATE INDEX IF NOT EXISTS idx_proyecto_tareas_nombre ON proyecto_tareas(nombre);
+CREATE INDEX IF NOT EXISTS idx_proyecto_tareas_tarea ON proyecto_tareas(id_tarea);
+"""
+
+_COLUMNAS = "id_tarea, titulo, descripcion, fecha_limite, estado, prioridad, usuario_asignado"
+_SQL_OBTENER = f"SELECT {_COLUMNAS} FROM tareas WHERE id_tarea = ?"
+_SQL_GUARDAR = (f"INSERT INTO tareas ({_COLUMNAS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id_tarea) DO UPDATE SET titulo = excluded.titulo,"
+                " descripcion = excluded.descripcion, fecha_limite = excluded.fecha_limite,"
+                " estado = excluded.estado, prioridad = excluded.prioridad,"
+                " usuario_asignado = excluded.usuario_asignado")
+# Las etiquetas de un resultado se leen en bloques de este número de tareas.
+_BLOQUE_ETIQUETAS = 500
+_SQL_INSERTAR_ETIQUETA = "INSERT INTO etiquetas (id_tarea, posicion, etiqueta) VALUES (?, ?, ?)"
+# Búsqueda de texto: mejor puntuación bm25 primero (la columna del título pesa PESO_TITULO veces más).
+_SQL_BUSCAR = ("SELECT rowid FROM tareas_busqueda WHERE tareas_busqueda MATCH ?"
+               f" ORDER BY bm25(tareas_busqueda, {float(PESO_TITULO)}, 1.0), rowid LIMIT ? OFFSET ?")
+# Estados de las tareas que aún pueden vencer (ver idx_tareas_vencimiento).
+_ESTADOS_ABIERTOS = tuple(estado for estado in EstadoTarea if estado != EstadoTarea.COMPLETADA)
+
+
+class ConexionesSQLite:
+    """
+    Conjunto de conexiones a una base de datos SQLite, una por hilo.
+
+    Las conexiones de sqlite3 no deben compartirse entre hilos, así que cada hilo abre la
+    suya la primera vez que la necesita y la reutiliza en las siguientes peticiones.
+
+    Parameters
+    ----------
+    ruta : str
+        Ruta del archivo de base de datos.
+    esquema : str, optional
+        Sentencias que crean las tablas si no existen (por defecto, las de tareas y
+        proyectos). La tabla `cambios` se crea siempre.
+    """
+
+    def __init__(self, ruta: str, esquema: str = ESQUEMA) -> None:
+        """
+        Inicializa el conjunto y crea el esquema si no existe.
+        """
+        self.ruta = ruta
+        self._local = threading.local()
+        self.conexion().executescript(ESQUEMA_CAMBIOS + esquema)
+
+    def conexion(self) -> sqlite3.Connection:
+        """
+        Devuelve la conexión del hilo actual, abriéndola si es necesario.
+
+        Returns
+        -------
+        sqlite3.Connection
+            Conexión configurada en modo WAL y con claves foráneas activadas.
+        """
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=30, cached_statements=256)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.execute("PRAGMA foreign_keys=ON")
+            self._local.conexion = conexion
+        return conexion
+
+    def version(self) -> int:
+        """
+        Devuelve el número de transacciones de escritura confirmadas por cualquier proceso.
+
+        Returns
+        -------
+        int
+            Valor del contador de la tabla `cambios`.
+        """
+        return self.conexion().execute(_SQL_VERSION).fetchone()[0]
+
+    @contextlib.contextmanager
+    def transaccion(self) -> Iterator[sqlite3.Connection]:
+        """
+        Ejecuta un bloque dentro de una transacción BEGIN IMMEDIATE de la conexión del hilo.
+
+        Si el hilo ya está dentro de una transacción, el bloque forma parte de ella y es la
+        transacción más externa la que confirma o deshace los cambios. Así varias operaciones
+        (p. ej. sobre tablas distintas) pueden agruparse en una única transacción.
+
+        Yields
+        ------
+        sqlite3.Connection
+            Conexión del hilo actual.
+        """
+        conexion = self.conexion()
+        if conexion.in_transaction:
+            yield conexion
+            return
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            yield conexion
+        except BaseException:
+            conexion.rollback()
+            raise
+        conexion.commit()
+
+    def registrar_cambio(self) -> None:
+        """
+        Incrementa el contador de cambios dentro de la transacción abierta en este hilo.
+        """
+        self.conexion().execute(_SQL_REGISTRAR_CAMBIO)
+
+    def cerrar(self) -> None:
+        """
+        Cierra la conexión del hilo actual, si existe.
+        """
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+
+class TareasSQLite(Mapping):
+    """
+    Vista de solo lectura {id_tarea: Tarea} sobre la tabla de tareas.
+
+    Permite usar `gestor.tareas` igual que con el gestor en memoria (`len`, `get`, `in`,
+    iteración por ID) sin cargar todas las tareas.
+
+    Parameters
+    ----------
+    gestor : GestorDeTareasSQLite
+        Gestor al que pertenece la vista.
+    """
+
+    def __init__(self, gestor: "GestorDeTareasSQLite") -> None:
+        """
+        Inicializa la vista.
+        """
+        self._gestor = gestor
+
+    def __getitem__(self, id_tarea: int) -> Tarea:
+        tarea = self._gestor._cargar(id_tarea)
+        if tarea is None:
+            raise KeyError(id_tarea)
+        return tarea
+
+    def __iter__(self) -> Iterator[int]:
+        cursor = self._gestor._conexiones.conexion().execute("SELECT id_tarea FROM tareas ORDER BY id_tarea")
+        return (fila[0] for fila in cursor)
+
+    def __len__(self) -> int:
+        # count(*) recorre toda la tabla, así que se guarda hasta el siguiente cambio.
+        conexion = self._gestor._conexiones.conexion()
+        return self._gestor._cache.obtener(
+            "total", lambda: conexion.execute("SELECT count(*) FROM tareas").fetchone()[0])
+
+    def __contains__(self, id_tarea: object) -> bool:
+        conexion = self._gestor._conexiones.conexion()
+        return conexion.execute("SELECT 1 FROM tareas WHERE id_tarea = ?", (id_tarea,)).fetchone() is not None
+
+    def values(self) -> List[Tarea]:  # type: ignore[override]
+        return self._gestor._consultar_tareas(f"SELECT {_COLUMNAS} FROM tareas ORDER BY id_tarea", ())
+
+
+class GestorDeTareasSQLite(Publicador):
+    """
+    Gestor de tareas con la misma interfaz que GestorDeTareas, respaldado por SQLite.
+
+    Publica los mismos eventos que GestorDeTareas. Los eventos solo llegan a los
+    suscriptores del proceso que hace el cambio; los demás procesos detectan los cambios
+    a través de `version`.
+
+    Parameters
+    ----------
+    conexiones : ConexionesSQLite o str
+        Conjunto de conexiones a usar, o ruta del archivo de base de datos.
+
+    Attributes
+    ----------
+    tareas : TareasSQLite
+        Vista {id_tarea: Tarea} sobre la base de datos.
+    """
+
+    def __init__(self, conexiones: Union[ConexionesSQLite, str]) -> None:
+        """
+        Inicializa el gestor sobre la base de datos indicada.
+        """
+        super().__init__()
+        self._conexiones = conexiones if isinstance(conexiones, ConexionesSQLite) else ConexionesSQLite(conexiones)
+        self._cache = CacheVersionada(self._conexiones.version)
+        self.tareas = TareasSQLite(self)
+
+    @property
+    def version(self) -> int:
+        """
+        Versión de los datos, compartida por todos los procesos que usan la base de datos.
+
+        Returns
+        -------
+        int
+            Cambia cada vez que se confirma una escritura en tareas o proyectos.
+        """
+        return self._conexiones.version()
+
+    @property
+    def contador_id(self) -> int:
+        """
+        Identificador que recibiría la próxima tarea creada.
+
+        Returns
+        -------
+        int
+            Siguiente ID según la secuencia de SQLite.
+        """
+        fila = self._conexiones.conexion().execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'tareas'").fetchone()
+        return (fila[0] if fila else 0) + 1
+
+    @log_funcion
+    def crear_tarea(self,
+                    titulo: str,
+                    descripcion: str = "",
+                    fecha_limite_str: Optional[str] = None,
+                    prioridad: int = 2,
+                    etiquetas: Optional[List[str]] = None,
+                    usuario_asignado: Optional[str] = None) -> Optional[Tarea]:
+        """
+        Crea una nueva tarea y la guarda en la base de datos.
+
+        Parameters
+        ----------
+        titulo : str
+            Título de la tarea.
+        descripcion : str, optional
+            Descripción de la tarea.
+        fecha_limite_str : str, optional
+            Fecha límite en formato "YYYY-MM-DD".
+        prioridad : int, optional
+            Prioridad de la tarea.
+        etiquetas : Optional[List[str]], optional
+            Lista de etiquetas asociadas a la tarea.
+        usuario_asignado : Optional[str], optional
+            Usuario asignado a la tarea.
+
+        Returns
+        -------
+        Optional[Tarea]
+            La tarea creada, o None si la fecha está mal formateada.
+        """
+        try:
+            fecha = datetime.strptime(fecha_limite_str, "%Y-%m-%d").date() if fecha_limite_str else None
+        except ValueError:
+            print("[ERROR] Fecha mal formateada. Usa YYYY-MM-DD.")
+            return None
+        conexion = self._conexiones.conexion()
+        with conexion:
+            cursor = conexion.execute(
+                "INSERT INTO tareas (titulo, descripcion, fecha_limite, estado, prioridad, usuario_asignado)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (titulo, descripcion, _fecha_a_texto(fecha), EstadoTarea.PENDIENTE.name, prioridad,
+                 usuario_asignado))
+            tarea = Tarea(cursor.lastrowid, titulo, descripcion, fecha, prioridad, etiquetas, usuario_asignado)
+            self._guardar_etiquetas(conexion, tarea)
+            conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        self._publicar("crear", tarea=tarea)
+        return tarea
+
+    def crear_tareas(self,
+                     registros: Iterable[Any],
+                     lote: int = TAMANO_LOTE) -> Tuple[List[int], List[Tuple[int, str]]]:
+        """
+        Crea muchas tareas a partir de registros leídos de NDJSON o CSV.
+
+        Mismo contrato que `GestorDeTareas.crear_tareas`. Cada lote se inserta en una única
+        transacción con executemany: la transacción toma el bloqueo de escritura al empezar
+        (BEGIN IMMEDIATE), lee la secuencia y reserva un rango consecutivo de IDs, de modo
+        que otros procesos no pueden intercalar tareas en el rango.
+
+        Parameters
+        ----------
+        registros : Iterable[Any]
+            Registros de `leer_ndjson` o `leer_csv`, o diccionarios con los campos de
+            `Tarea.a_dict`.
+        lote : int, optional
+            Número de registros por lote y transacción (por defecto TAMANO_LOTE).
+
+        Returns
+        -------
+        Tuple[List[int], List[Tuple[int, str]]]
+            IDs de las tareas creadas y pares (posición del registro, mensaje de error).
+        """
+        creadas: List[int] = []
+        errores: List[Tuple[int, str]] = []
+        conexion = self._conexiones.conexion()
+        for registros_lote in por_lotes(registros, lote):
+            with sin_recolector():
+                validos, errores_lote = validar_lote(registros_lote)
+            errores.extend(errores_lote)
+            if not validos:
+                continue
+            with conexion:
+                conexion.execute("BEGIN IMMEDIATE")
+                primer_id = self.contador_id
+                tareas = []
+                for id_tarea, (_, campos) in enumerate(validos, primer_id):
+                    titulo, descripcion, fecha, prioridad, etiquetas, usuario, estado = campos
+                    tarea = Tarea(id_tarea, titulo, descripcion, fecha, prioridad, etiquetas, usuario)
+                    tarea.estado = estado
+                    tareas.append(tarea)
+                conexion.executemany(
+                    f"INSERT INTO tareas ({_COLUMNAS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(tarea.id_tarea, tarea.titulo, tarea.descripcion, _fecha_a_texto(tarea.fecha_limite),
+                      tarea.estado.name, tarea.prioridad, tarea.usuario_asignado) for tarea in tareas])
+                conexion.executemany(_SQL_INSERTAR_ETIQUETA,
+                                     [(tarea.id_tarea, i, etiqueta) for tarea in tareas
+                                      for i, etiqueta in enumerate(tarea.etiquetas)])
+                conexion.execute(_SQL_REGISTRAR_CAMBIO)
+            for tarea in tareas:
+                creadas.append(tarea.id_tarea)
+                self._publicar("crear", tarea=tarea)
+        return creadas, errores
+
+    def restaurar_tarea(self, tarea: Tarea) -> None:
+        """
+        Inserta o reemplaza una tarea conservando su ID. No publica ningún evento.
+
+        Parameters
+        ----------
+        tarea : Tarea
+            Tarea a restaurar.
+        """
+        conexion = self._conexiones.conexion()
+        with conexion:
+            self._escribir(conexion, tarea)
+            conexion.execute(_SQL_REGISTRAR_CAMBIO)
+
+    def marcar_completada(self, id_tarea: int) -> bool:
+        """
+        Marca una tarea como completada.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        bool
+            True si la tarea existía, False en caso contrario.
+        """
+        return self._actualizar(id_tarea, lambda tarea: tarea.completar(), "cambiar_estado")
+
+    @log_funcion
+    def listar_tareas(self) -> List[Tarea]:
+        """
+        Retorna la lista de todas las tareas, en orden de creación.
+
+        Returns
+        -------
+        List[Tarea]
+            Lista de tareas.
+        """
+        return self.tareas.values()
+
+    @log_funcion
+    def obtener_por_id(self, id_tarea: int) -> Optional[Tarea]:
+        """
+        Obtiene una tarea a partir de su identificador.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        Optional[Tarea]
+            La tarea encontrada o None si no existe.
+        """
+        return self._cargar(id_tarea)
+
+    @log_funcion
+    def filtrar_por_estado(self, estado: EstadoTarea) -> List[Tarea]:
+        """
+        Filtra las tareas por estado usando el índice idx_tareas_estado.
+
+        Parameters
+        ----------
+        estado : EstadoTarea
+            Estado por el que se filtra.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas con ese estado, en orden de creación.
+        """
+        return self.consultar(estado=estado)
+
+    @log_funcion
+    def filtrar_por_usuario(self, usuario: str) -> List[Tarea]:
+        """
+        Filtra las tareas asignadas a un usuario.
+
+        Parameters
+        ----------
+        usuario : str
+            Usuario por el que se filtra.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas asignadas al usuario, en orden de creación.
+        """
+        return self.consultar(usuario=usuario)
+
+    @log_funcion
+    def filtrar_por_etiqueta(self, etiqueta: str) -> List[Tarea]:
+        """
+        Filtra las tareas que contienen una etiqueta.
+
+        Parameters
+        ----------
+        etiqueta : str
+            Etiqueta por la que se filtra.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas con la etiqueta, en orden de creación.
+        """
+        return self.consultar(etiqueta=etiqueta)
+
+    @log_funcion
+    def consultar(self,
+                  estado: Optional[EstadoTarea] = None,
+                  usuario: Optional[str] = None,
+                  etiqueta: Optional[str] = None) -> List[Tarea]:
+        """
+        Filtra las tareas combinando varios criterios.
+
+        Parameters
+        ----------
+        estado : Optional[EstadoTarea], optional
+            Estado que deben tener las tareas.
+        usuario : Optional[str], optional
+            Usuario al que deben estar asignadas.
+        etiqueta : Optional[str], optional
+            Etiqueta que deben contener.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas que cumplen todos los criterios, en orden de creación.
+        """
+        condiciones, parametros = _condiciones(estado, usuario, etiqueta)
+        donde = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        return self._consultar_tareas(f"SELECT {_COLUMNAS} FROM tareas{donde} ORDER BY id_tarea", parametros)
+
+    @log_funcion
+    def paginar(self,
+                limite: int = 50,
+                cursor: Optional[str] = None,
+                orden: str = "id",
+                estado: Optional[EstadoTarea] = None,
+                usuario: Optional[str] = None,
+                etiqueta: Optional[str] = None) -> Tuple[List[Tarea], Optional[str]]:
+        """
+        Devuelve una página de tareas usando paginación por cursor.
+
+        La condición del cursor se expresa como comparación de claves, de modo que SQLite
+        empieza a leer directamente en esa posición de los índices idx_tareas_prioridad o de
+        la clave primaria, sin OFFSET.
+
+        Parameters
+        ----------
+        limite : int, optional
+            Número máximo de tareas de la página (por defecto 50).
+        cursor : Optional[str], optional
+            Cursor devuelto por la página anterior; None para la primera página.
+        orden : str, optional
+            "id" (por defecto) o "prioridad".
+        estado : Optional[EstadoTarea], optional
+            Estado que deben tener las tareas.
+        usuario : Optional[str], optional
+            Usuario al que deben estar asignadas.
+        etiqueta : Optional[str], optional
+            Etiqueta que deben contener.
+
+        Returns
+        -------
+        Tuple[List[Tarea], Optional[str]]
+            Tareas de la página y cursor de la página siguiente (None si es la última). Si el
+            cursor no es válido se muestra un error y se devuelve una página vacía.
+        """
+        try:
+            clave = decodificar_cursor(cursor, orden)
+        except ValueError:
+            print("[ERROR] Cursor de paginación no válido.")
+            return [], None
+        condiciones, parametros = _condiciones(estado, usuario, etiqueta)
+        if orden == "prioridad":
+            orden_sql = _ORDEN_PRIORIDAD
+            if clave is not None:
+                prioridad, fecha, id_tarea = clave
+                texto_fecha = (_FECHA_MAXIMA if fecha >= ORDINAL_SIN_FECHA
+                               else date.fromordinal(fecha).isoformat())
+                # "prioridad >= ?" permite a SQLite acotar el recorrido del índice.
+                condiciones.append(f"prioridad >= ? AND ({_ORDEN_PRIORIDAD}) > (?, ?, ?)")
+                parametros += [prioridad, prioridad, texto_fecha, id_tarea]
+        else:
+            orden_sql = "id_tarea"
+            if clave is not None:
+                condiciones.append("id_tarea > ?")
+                parametros.append(clave[0])
+        donde = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        tareas = self._consultar_tareas(
+            f"SELECT {_COLUMNAS} FROM tareas{donde} ORDER BY {orden_sql} LIMIT ?", parametros + [limite + 1])
+        siguiente = codificar_cursor(clave_cursor(tareas[limite - 1], orden)) if len(tareas) > limite else None
+        return tareas[:limite], siguiente
+
+    def recorrer(self,
+                 estado: Optional[EstadoTarea] = None,
+                 usuario: Optional[str] = None,
+                 etiqueta: Optional[str] = None,
+                 lote: int = 1000) -> Iterator[Tarea]:
+        """
+        Itera sobre las tareas en orden de creación leyéndolas por lotes.
+
+        Cada lote es una consulta por cursor como las de `paginar`, así que no se mantiene
+        abierta ninguna transacción de lectura entre lotes y la memoria depende de `lote`.
+
+        Parameters
+        ----------
+        estado : Optional[EstadoTarea], optional
+            Estado que deben tener las tareas.
+        usuario : Optional[str], optional
+            Usuario al que deben estar asignadas.
+        etiqueta : Optional[str], optional
+            Etiqueta que deben contener.
+        lote : int, optional
+            Número de tareas que se leen en cada consulta (por defecto 1000).
+
+        Returns
+        -------
+        Iterator[Tarea]
+            Tareas que cumplen todos los criterios.
+        """
+        condiciones, parametros = _condiciones(estado, usuario, etiqueta)
+        condiciones.append("id_tarea > ?")
+        sql = f"SELECT {_COLUMNAS} FROM tareas WHERE {' AND '.join(condiciones)} ORDER BY id_tarea LIMIT ?"
+        ultimo_id = 0
+        while True:
+            tareas = self._consultar_tareas(sql, parametros + [ultimo_id, lote])
+            yield from tareas
+            if len(tareas) < lote:
+                return
+            ultimo_id = tareas[-1].id_tarea
+
+    @log_funcion
+    def cambiar_estado_tarea(self, id_tarea: int, nuevo_estado: EstadoTarea) -> bool:
+        """
+        Cambia el estado de una tarea.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+        nuevo_estado : EstadoTarea
+            Nuevo estado.
+
+        Returns
+        -------
+        bool
+            True si la tarea existía, False en caso contrario.
+        """
+        return self._actualizar(id_tarea, lambda tarea: tarea.cambiar_estado(nuevo_estado), "cambiar_estado")
+
+    @log_funcion
+    def modificar_tarea(self,
+                        id_tarea: int,
+                        titulo: Optional[str] = None,
+                        descripcion: Optional[str] = None,
+                        fecha_limite: Optional[Union[date, str]] = None,
+                        prioridad: Optional[int] = None,
+                        etiquetas: Optional[List[str]] = None) -> bool:
+        """
+        Modifica los atributos de una tarea existente.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+        titulo : str, optional
+            Nuevo título.
+        descripcion : str, optional
+            Nueva descripción.
+        fecha_limite : date o str, optional
+            Nueva fecha límite, como objeto date o en formato "YYYY-MM-DD".
+        prioridad : int, optional
+            Nueva prioridad.
+        etiquetas : Optional[List[str]], optional
+            Nueva lista de etiquetas.
+
+        Returns
+        -------
+        bool
+            True si la tarea existía y se modificó, False en caso contrario.
+        """
+        if isinstance(fecha_limite, str):
+            try:
+                fecha_limite = datetime.strptime(fecha_limite, "%Y-%m-%d").date() if fecha_limite else None
+            except ValueError:
+                print("[ERROR] Fecha mal formateada. Usa YYYY-MM-DD.")
+                return False
+        return self._actualizar(
+            id_tarea, lambda tarea: tarea.modificar(titulo, descripcion, fecha_limite, prioridad, etiquetas),
+            "modificar")
+
+    @log_funcion
+    def asignar_usuario_tarea(self, id_tarea: int, usuario: str) -> bool:
+        """
+        Asigna un usuario a una tarea.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+        usuario : str
+            Usuario a asignar.
+
+        Returns
+        -------
+        bool
+            True si la tarea existía, False en caso contrario.
+        """
+        return self._actualizar(id_tarea, lambda tarea: tarea.asignar_usuario(usuario), "asignar")
+
+    @log_funcion
+    def ordenar_por_prioridad(self) -> List[Tarea]:
+        """
+        Devuelve las tareas ordenadas por prioridad, fecha límite e ID.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas ordenadas; el orden lo resuelve el índice idx_tareas_prioridad.
+        """
+        return self._consultar_tareas(f"SELECT {_COLUMNAS} FROM tareas ORDER BY {_ORDEN_PRIORIDAD}", ())
+
+    @log_funcion
+    def mas_urgentes(self, k: int, estado: Optional[EstadoTarea] = None) -> List[Tarea]:
+        """
+        Devuelve las `k` tareas más prioritarias.
+
+        Parameters
+        ----------
+        k : int
+            Número máximo de tareas.
+        estado : Optional[EstadoTarea], optional
+            Si se indica, solo se consideran las tareas con ese estado.
+
+        Returns
+        -------
+        List[Tarea]
+            Las `k` tareas más prioritarias.
+        """
+        if estado is None:
+            return self._consultar_tareas(
+                f"SELECT {_COLUMNAS} FROM tareas ORDER BY {_ORDEN_PRIORIDAD} LIMIT ?", (k,))
+        return self._consultar_tareas(
+            f"SELECT {_COLUMNAS} FROM tareas WHERE estado = ? ORDER BY {_ORDEN_PRIORIDAD} LIMIT ?",
+            (estado.name, k))
+
+    @log_funcion
+    def buscar(self, consulta: str, limite: int = 50, cursor: Optional[str] = None) -> Tuple[List[Tarea], Optional[str]]:
+        """
+        Busca tareas por las palabras de su título y descripción, ordenadas por relevancia.
+
+        Las palabras de la consulta se normalizan como en GestorDeTareas.buscar y se buscan en
+        la tabla FTS5 `tareas_busqueda` (ver `expresion_fts`); la relevancia la calcula bm25.
+
+        Parameters
+        ----------
+        consulta : str
+            Texto a buscar.
+        limite : int, optional
+            Número máximo de tareas de la página (por defecto 50).
+        cursor : Optional[str], optional
+            Cursor devuelto por la página anterior (número de resultados ya devueltos); None
+            para la primera página.
+
+        Returns
+        -------
+        Tuple[List[Tarea], Optional[str]]
+            Tareas de la página y cursor de la siguiente (None si es la última). Si el cursor
+            no es válido se muestra un error y se devuelve una página vacía.
+        """
+        try:
+            inicio = int(cursor) if cursor else 0
+        except ValueError:
+            inicio = -1
+        if inicio < 0:
+            print("[ERROR] Cursor de paginación no válido.")
+            return [], None
+        expresion = expresion_fts(consulta)
+        if not expresion:
+            return [], None
+        conexion = self._conexiones.conexion()
+        ids = [fila[0] for fila in conexion.execute(_SQL_BUSCAR, (expresion, limite + 1, inicio))]
+        hay_mas = len(ids) > limite
+        tareas, _ = self._cargar_lote(ids[:limite])
+        return tareas, str(inicio + limite) if hay_mas else None
+
+    @log_funcion
+    def vencen_entre(self,
+                     desde: date,
+                     hasta: date,
+                     estados: Optional[Iterable[EstadoTarea]] = None,
+                     limite: Optional[int] = None) -> List[Tarea]:
+        """
+        Devuelve las tareas cuya fecha límite está entre dos fechas, ambas incluidas.
+
+        Parameters
+        ----------
+        desde : date
+            Primera fecha del rango.
+        hasta : date
+            Última fecha del rango.
+        estados : Optional[Iterable[EstadoTarea]], optional
+            Si se indican, solo se consideran las tareas con alguno de esos estados.
+        limite : Optional[int], optional
+            Número máximo de tareas a devolver (las primeras en vencer); None para todas.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas ordenadas por fecha límite y luego por ID.
+        """
+        return self._por_vencimiento("fecha_limite BETWEEN ? AND ?",
+                                     [_fecha_a_texto(desde), _fecha_a_texto(hasta)], estados, limite)
+
+    @log_funcion
+    def vencidas(self, hoy: Optional[date] = None, limite: Optional[int] = None) -> List[Tarea]:
+        """
+        Devuelve las tareas no completadas cuya fecha límite ya ha pasado.
+
+        Parameters
+        ----------
+        hoy : Optional[date], optional
+            Fecha de referencia; las tareas que vencen ese día aún no están vencidas. Por
+            defecto, la fecha actual.
+        limite : Optional[int], optional
+            Número máximo de tareas a devolver (las más antiguas); None para todas.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas vencidas, de la más antigua a la más reciente y luego por ID.
+        """
+        return self._por_vencimiento("fecha_limite < ?", [_fecha_a_texto(hoy or date.today())],
+                                     _ESTADOS_ABIERTOS, limite)
+
+    @log_funcion
+    def proximos_vencimientos(self,
+                              k: int,
+                              desde: Optional[date] = None,
+                              estados: Optional[Iterable[EstadoTarea]] = _ESTADOS_ABIERTOS) -> List[Tarea]:
+        """
+        Devuelve las `k` próximas tareas en vencer a partir de una fecha.
+
+        Parameters
+        ----------
+        k : int
+            Número máximo de tareas a devolver.
+        desde : Optional[date], optional
+            Primera fecha a considerar (incluida). Por defecto, la fecha actual.
+        estados : Optional[Iterable[EstadoTarea]], optional
+            Estados de las tareas a considerar. Por defecto, las no completadas; None para
+            todas.
+
+        Returns
+        -------
+        List[Tarea]
+            Hasta `k` tareas ordenadas por fecha límite y luego por ID.
+        """
+        return self._por_vencimiento("fecha_limite >= ?", [_fecha_a_texto(desde or date.today())],
+                                     estados, k)
+
+    def _por_vencimiento(self,
+                         condicion: str,
+                         parametros: List[Any],
+                         estados: Optional[Iterable[EstadoTarea]],
+                         limite: Optional[int]) -> List[Tarea]:
+        """
+        Consulta las tareas con fecha límite que cumplen una condición, por orden de vencimiento.
+
+        Si los estados pedidos son los no completados se usa el índice parcial
+        idx_tareas_vencimiento; si no, idx_tareas_fecha.
+
+        Parameters
+        ----------
+        condicion : str
+            Condición SQL sobre `fecha_limite`.
+        parametros : List[Any]
+            Parámetros de la condición.
+        estados : Optional[Iterable[EstadoTarea]]
+            Estados a considerar; None para todos.
+        limite : Optional[int]
+            Número máximo de tareas; None para todas.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas ordenadas por fecha límite y luego por ID.
+        """
+        condiciones = ["fecha_limite IS NOT NULL", condicion]
+        estados = None if estados is None else set(estados)
+        if estados == set(_ESTADOS_ABIERTOS):
+            condiciones.append("estado <> 'COMPLETADA'")
+        elif estados is not None:
+            condiciones.append(f"estado IN ({', '.join('?' * len(estados))})")
+            parametros = parametros + [estado.name for estado in estados]
+        sql = f"SELECT {_COLUMNAS} FROM tareas WHERE {' AND '.join(condiciones)} ORDER BY fecha_limite, id_tarea"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros = parametros + [limite]
+        return self._consultar_tareas(sql, parametros)
+
+    @log_funcion
+    def eliminar_tarea(self, id_tarea: int) -> bool:
+        """
+        Elimina la tarea con el ID especificado, junto con sus etiquetas y pertenencias.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        bool
+            True si la tarea fue eliminada, False en caso contrario.
+        """
+        conexion = self._conexiones.conexion()
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            tarea = self._cargar(id_tarea)
+            if tarea is None:
+                return False
+            conexion.execute("DELETE FROM tareas WHERE id_tarea = ?", (id_tarea,))
+            conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        self._publicar("eliminar", tarea=tarea)
+        return True
+
+    def cambiar_estado_tareas(self,
+                              ids: Iterable[int],
+                              nuevo_estado: EstadoTarea) -> Tuple[List[int], List[Tuple[int, str]]]:
+        """
+        Cambia el estado de varias tareas en una única transacción.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Identificadores de las tareas. Los repetidos se procesan una vez.
+        nuevo_estado : EstadoTarea
+            Nuevo estado a asignar.
+
+        Returns
+        -------
+        Tuple[List[int], List[Tuple[int, str]]]
+            IDs de las tareas actualizadas y pares (ID, mensaje de error) de las que no existen.
+        """
+        conexion = self._conexiones.conexion()
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            tareas, errores = self._cargar_lote(ids)
+            conexion.executemany("UPDATE tareas SET estado = ? WHERE id_tarea = ?",
+                                 [(nuevo_estado.name, tarea.id_tarea) for tarea in tareas])
+            conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        for tarea in tareas:
+            anterior = tarea.estado
+            tarea.cambiar_estado(nuevo_estado)
+            self._publicar("cambiar_estado", tarea=tarea, anterior=anterior)
+        return [tarea.id_tarea for tarea in tareas], errores
+
+    def eliminar_tareas(self, ids: Iterable[int]) -> Tuple[List[int], List[Tuple[int, str]]]:
+        """
+        Elimina varias tareas en una única transacción, junto con sus etiquetas y pertenencias.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Identificadores de las tareas. Los repetidos se procesan una vez.
+
+        Returns
+        -------
+        Tuple[List[int], List[Tuple[int, str]]]
+            IDs de las tareas eliminadas y pares (ID, mensaje de error) de las que no existen.
+        """
+        conexion = self._conexiones.conexion()
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            tareas, errores = self._cargar_lote(ids)
+            conexion.executemany("DELETE FROM tareas WHERE id_tarea = ?", [(tarea.id_tarea,) for tarea in tareas])
+            conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        for tarea in tareas:
+            self._publicar("eliminar", tarea=tarea)
+        return [tarea.id_tarea for tarea in tareas], errores
+
+    def _cargar_lote(self, ids: Iterable[int]) -> Tuple[List[Tarea], List[Tuple[int, str]]]:
+        """
+        Lee las tareas de una operación por lotes con una consulta por bloque de IDs.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Identificadores pedidos; los repetidos se ignoran.
+
+        Returns
+        -------
+        Tuple[List[Tarea], List[Tuple[int, str]]]
+            Tareas encontradas, en el orden pedido, y pares (ID, mensaje) de las que no existen.
+        """
+        pedidos = list(dict.fromkeys(ids))
+        encontradas: Dict[int, Tarea] = {}
+        for inicio in range(0, len(pedidos), _BLOQUE_ETIQUETAS):
+            bloque = pedidos[inicio:inicio + _BLOQUE_ETIQUETAS]
+            marcadores = ", ".join("?" * len(bloque))
+            for tarea in self._consultar_tareas(
+                    f"SELECT {_COLUMNAS} FROM tareas WHERE id_tarea IN ({marcadores})", bloque):
+                encontradas[tarea.id_tarea] = tarea
+        tareas = [encontradas[id_tarea] for id_tarea in pedidos if id_tarea in encontradas]
+        errores = [(id_tarea, "Tarea no encontrada.") for id_tarea in pedidos if id_tarea not in encontradas]
+        return tareas, errores
+
+    def _cargar(self, id_tarea: int) -> Optional[Tarea]:
+        """
+        Lee una tarea de la base de datos.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        Optional[Tarea]
+            La tarea, o None si no existe.
+        """
+        tareas = self._consultar_tareas(_SQL_OBTENER, (id_tarea,))
+        return tareas[0] if tareas else None
+
+    def _consultar_tareas(self, sql: str, parametros: Sequence[Any]) -> List[Tarea]:
+        """
+        Ejecuta una consulta sobre la tabla de tareas y construye los objetos Tarea.
+
+        Parameters
+        ----------
+        sql : str
+            Consulta que selecciona las columnas de _COLUMNAS.
+        parametros : Sequence[Any]
+            Parámetros de la consulta.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas en el orden devuelto por la consulta.
+        """
+        conexion = self._conexiones.conexion()
+        filas = conexion.execute(sql, parametros).fetchall()
+        etiquetas = _leer_etiquetas(conexion, [fila[0] for fila in filas])
+        return [_fila_a_tarea(fila, etiquetas.get(fila[0])) for fila in filas]
+
+    def _actualizar(self, id_tarea: int, cambio: Any, evento: str) -> bool:
+        """
+        Lee una tarea, le aplica un cambio y la vuelve a guardar en una transacción.
+
+        La transacción toma el bloqueo de escritura antes de leer (BEGIN IMMEDIATE), así que
+        ningún otro proceso puede modificar la tarea entre la lectura y la escritura.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+        cambio : Callable[[Tarea], None]
+            Función que modifica la tarea en memoria.
+        evento : str
+            Tipo de evento a publicar si la tarea existe.
+
+        Returns
+        -------
+        bool
+            True si la tarea existía, False en caso contrario.
+        """
+        conexion = self._conexiones.conexion()
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            tarea = self._cargar(id_tarea)
+            if tarea is None:
+                return False
+            anterior = tarea.estado
+            cambio(tarea)
+            self._escribir(conexion, tarea)
+            conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        if evento == "cambiar_estado":
+            self._publicar(evento, tarea=tarea, anterior=anterior)
+        else:
+            self._publicar(evento, tarea=tarea)
+        return True
+
+    def _escribir(self, conexion: sqlite3.Connection, tarea: Tarea) -> None:
+        """
+        Inserta o actualiza todos los campos y etiquetas de una tarea.
+
+        Se usa un UPSERT en lugar de REPLACE para no borrar la fila, lo que eliminaría en
+        cascada su pertenencia a proyectos.
+
+        Parameters
+        ----------
+        conexion : sqlite3.Connection
+            Conexión con una transacción abierta.
+        tarea : Tarea
+            Tarea a guardar.
+        """
+        conexion.execute(
+            _SQL_GUARDAR,
+            (tarea.id_tarea, tarea.titulo, tarea.descripcion, _fecha_a_texto(tarea.fecha_limite),
+             tarea.estado.name, tarea.prioridad, tarea.usuario_asignado))
+        conexion.execute("DELETE FROM etiquetas WHERE id_tarea = ?", (tarea.id_tarea,))
+        self._guardar_etiquetas(conexion, tarea)
+
+    @staticmethod
+    def _guardar_etiquetas(conexion: sqlite3.Connection, tarea: Tarea) -> None:
+        """
+        Inserta las etiquetas de una tarea.
+
+        Parameters
+        ----------
+        conexion : sqlite3.Connection
+            Conexión con una transacción abierta.
+        tarea : Tarea
+            Tarea cuyas etiquetas se guardan.
+        """
+        conexion.executemany(_SQL_INSERTAR_ETIQUETA,
+                             [(tarea.id_tarea, i, etiqueta) for i, etiqueta in enumerate(tarea.etiquetas)])
+
+
+class ProyectoSQLite:
+    """
+    Proyecto almacenado en SQLite, con la misma interfaz de lectura que Proyecto.
+
+    Parameters
+    ----------
+    gestor : GestorProyectosSQLite
+        Gestor al que pertenece el proyecto.
+    nombre : str
+        Nombre del proyecto.
+    """
+
+    def __init__(self, gestor: "GestorProyectosSQLite", nombre: str) -> None:
+        """
+        Inicializa la referencia al proyecto.
+        """
+        self._gestor = gestor
+        self.nombre = nombre
+
+    @property
+    def tareas(self) -> List[Tarea]:
+        """
+        Tareas del proyecto, en el orden en que se añadieron.
+
+        Returns
+        -------
+        List[Tarea]
+            Lista de tareas del proyecto.
+        """
+        return self._gestor._gestor_tareas._consultar_tareas(
+            f"SELECT {', '.join('t.' + c for c in _COLUMNAS.split(', '))} FROM proyecto_tareas p"
+            " JOIN tareas t ON t.id_tarea = p.id_tarea WHERE p.nombre = ? ORDER BY p.rowid",
+            (self.nombre,))
+
+    def paginar_tareas(self, limite: int = 50, cursor: Optional[str] = None) -> Tuple[List[Tarea], Optional[str]]:
+        """
+        Devuelve una página de las tareas del proyecto, en el orden en que se añadieron.
+
+        El cursor es el rowid de la última pertenencia listada, de modo que la consulta
+        continúa en esa posición sin OFFSET.
+
+        Parameters
+        ----------
+        limite : int, optional
+            Número máximo de tareas de la página (por defecto 50).
+        cursor : Optional[str], optional
+            Cursor devuelto por la página anterior; None para la primera página.
+
+        Returns
+        -------
+        Tuple[List[Tarea], Optional[str]]
+            Tareas de la página y cursor de la siguiente (None si es la última). Si el cursor
+            no es válido se muestra un error y se devuelve una página vacía.
+        """
+        try:
+            ultimo = int(cursor) if cursor else 0
+        except ValueError:
+            print("[ERROR] Cursor de paginación no válido.")
+            return [], None
+        gestor_tareas = self._gestor._gestor_tareas
+        filas = self._gestor._conexiones.conexion().execute(
+            "SELECT rowid, id_tarea FROM proyecto_tareas WHERE nombre = ? AND rowid > ?"
+            " ORDER BY rowid LIMIT ?", (self.nombre, ultimo, limite + 1)).fetchall()
+        pagina = filas[:limite]
+        marcadores = ", ".join("?" * len(pagina))
+        por_id = {tarea.id_tarea: tarea for tarea in gestor_tareas._consultar_tareas(
+            f"SELECT {_COLUMNAS} FROM tareas WHERE id_tarea IN ({marcadores})", [fila[1] for fila in pagina])}
+        tareas = [por_id[id_tarea] for _, id_tarea in pagina if id_tarea in por_id]
+        return tareas, str(pagina[-1][0]) if len(filas) > limite else None
+
+    def __contains__(self, id_tarea: object) -> bool:
+        conexion = self._gestor._conexiones.conexion()
+        return conexion.execute("SELECT 1 FROM proyecto_tareas WHERE nombre = ? AND id_tarea = ?",
+                                (self.nombre, id_tarea)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return sum(self.conteo.values())
+
+    def agregar_tarea(self, tarea: Tarea) -> bool:
+        """
+        Agrega una tarea al proyecto si no la contiene ya.
+
+        Parameters
+        ----------
+        tarea : Tarea
+            La tarea a agregar.
+
+        Returns
+        -------
+        bool
+            True si se ha agregado; False si ya estaba en el proyecto.
+        """
+        conexion = self._gestor._conexiones.conexion()
+        with conexion:
+            agregada = conexion.execute("INSERT OR IGNORE INTO proyecto_tareas (nombre, id_tarea) VALUES (?, ?)",
+                                        (self.nombre, tarea.id_tarea)).rowcount
+            if agregada:
+                conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        return bool(agregada)
+
+    def quitar_tarea(self, id_tarea: int) -> Optional[Tarea]:
+        """
+        Quita una tarea del proyecto.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea a quitar.
+
+        Returns
+        -------
+        Optional[Tarea]
+            La tarea quitada, o None si no estaba en el proyecto.
+        """
+        tarea = self._gestor._gestor_tareas.obtener_por_id(id_tarea)
+        conexion = self._gestor._conexiones.conexion()
+        with conexion:
+            quitada = conexion.execute("DELETE FROM proyecto_tareas WHERE nombre = ? AND id_tarea = ?",
+                                       (self.nombre, id_tarea)).rowcount
+            if quitada:
+                conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        return tarea if quitada else None
+
+    def listar_tareas(self) -> None:
+        """
+        Imprime en consola la lista de tareas del proyecto.
+        """
+        for i, tarea in enumerate(self.tareas, 1):
+            estado = "✔️" if tarea.estado == EstadoTarea.COMPLETADA else "❌"
+            print(f"{i}. {tarea.titulo} [{estado}]")
+
+    @property
+    def conteo(self) -> Dict[EstadoTarea, int]:
+        """
+        Número de tareas del proyecto en cada estado, leído de la tabla `proyecto_conteo`.
+
+        Returns
+        -------
+        Dict[EstadoTarea, int]
+            Contador de tareas por estado (0 para los estados sin tareas).
+        """
+        conteo = dict.fromkeys(EstadoTarea, 0)
+        for estado, tareas in self._gestor._conexiones.conexion().execute(
+                "SELECT estado, tareas FROM proyecto_conteo WHERE nombre = ?", (self.nombre,)):
+            conteo[EstadoTarea[estado]] = tareas
+        return conteo
+
+    def progreso(self) -> float:
+        """
+        Calcula el porcentaje de tareas completadas a partir de los contadores del proyecto.
+
+        Returns
+        -------
+        float
+            Porcentaje de tareas completadas. Si no hay tareas, retorna 0.
+        """
+        return porcentaje_completadas(self.conteo)
+
+
+class ProyectosSQLite(Mapping):
+    """
+    Vista de solo lectura {nombre: ProyectoSQLite} sobre la tabla de proyectos.
+
+    Parameters
+    ----------
+    gestor : GestorProyectosSQLite
+        Gestor al que pertenece la vista.
+    """
+
+    def __init__(self, gestor: "GestorProyectosSQLite") -> None:
+        """
+        Inicializa la vista.
+        """
+        self._gestor = gestor
+
+    def __getitem__(self, nombre: str) -> ProyectoSQLite:
+        if nombre not in self:
+            raise KeyError(nombre)
+        return ProyectoSQLite(self._gestor, nombre)
+
+    def __iter__(self) -> Iterator[str]:
+        cursor = self._gestor._conexiones.conexion().execute("SELECT nombre FROM proyectos ORDER BY rowid")
+        return (fila[0] for fila in cursor.fetchall())
+
+    def __len__(self) -> int:
+        return self._gestor._conexiones.conexion().execute("SELECT count(*) FROM proyectos").fetchone()[0]
+
+    def __contains__(self, nombre: object) -> bool:
+        conexion = self._gestor._conexiones.conexion()
+        return conexion.execute("SELECT 1 FROM proyectos WHERE nombre = ?", (nombre,)).fetchone() is not None
+
+
+class GestorProyectosSQLite(Publicador):
+    """
+    Gestor de proyectos con la misma interfaz que GestorProyectos, respaldado por SQLite.
+
+    Parameters
+    ----------
+    gestor_tareas : GestorDeTareasSQLite
+        Gestor de tareas que comparte la misma base de datos.
+
+    Attributes
+    ----------
+    proyectos : ProyectosSQLite
+        Vista {nombre: ProyectoSQLite} sobre la base de datos.
+    """
+
+    def __init__(self, gestor_tareas: GestorDeTareasSQLite) -> None:
+        """
+        Inicializa el gestor de proyectos.
+        """
+        super().__init__()
+        self._gestor_tareas = gestor_tareas
+        self._conexiones = gestor_tareas._conexiones
+        self.proyectos = ProyectosSQLite(self)
+
+    @property
+    def version(self) -> int:
+        """
+        Versión de los datos, la misma que la del gestor de tareas.
+
+        Returns
+        -------
+        int
+            Cambia cada vez que se confirma una escritura en tareas o proyectos.
+        """
+        return self._conexiones.version()
+
+    @log_funcion
+    def crear_proyecto(self, nombre: str) -> None:
+        """
+        Crea un nuevo proyecto si no existe.
+
+        Parameters
+        ----------
+        nombre : str
+            Nombre del proyecto.
+        """
+        conexion = self._conexiones.conexion()
+        with conexion:
+            creado = conexion.execute("INSERT OR IGNORE INTO proyectos (nombre) VALUES (?)", (nombre,)).rowcount
+            if creado:
+                conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        if creado:
+            print(f"Proyecto '{nombre}' creado.")
+            self._publicar("crear_proyecto", nombre=nombre)
+        else:
+            print(f"El proyecto '{nombre}' ya existe.")
+
+    @log_funcion
+    def borrar_proyecto(self, nombre: str) -> None:
+        """
+        Borra un proyecto existente.
+
+        Parameters
+        ----------
+        nombre : str
+            Nombre del proyecto.
+        """
+        conexion = self._conexiones.conexion()
+        with conexion:
+            borrado = conexion.execute("DELETE FROM proyectos WHERE nombre = ?", (nombre,)).rowcount
+            if borrado:
+                conexion.execute(_SQL_REGISTRAR_CAMBIO)
+        if borrado:
+            print(f"Proyecto '{nombre}' borrado.")
+            self._publicar("borrar_proyecto", nombre=nombre)
+        else:
+            print(f"El proyecto '{nombre}' no existe.")
+
+    @log_funcion
+    def agregar_tarea_a_proyecto(self, nombre_proyecto: str, tarea: Tarea) -> bool:
+        """
+        Agrega una tarea a un proyecto.
+
+        Parameters
+        ----------
+        nombre_proyecto : str
+            Nombre del proyecto.
+        tarea : Tarea
+            La tarea a agregar.
+
+        Returns
+        -------
+        bool
+            True si se ha agregado; False si el proyecto no existe o ya contenía la tarea.
+        """
+        if nombre_proyecto not in self.proyectos:
+            print(f"Proyecto '{nombre_proyecto}' no encontrado.")
+            return False
+        if not self.proyectos[nombre_proyecto].agregar_tarea(tarea):
+            print(f"La tarea '{tarea}' ya está en '{nombre_proyecto}'.")
+            return False
+        print(f"Tarea '{tarea}' añadida a '{nombre_proyecto}'.")
+        self._publicar("agregar_tarea", nombre=nombre_proyecto, tarea=tarea)
+        return True
+
+    @log_funcion
+    def quitar_tarea_de_proyecto(self, nombre_proyecto: str, id_tarea: int) -> bool:
+        """
+        Quita una tarea de un proyecto, sin eliminarla del gestor de tareas.
+
+        Parameters
+        ----------
+        nombre_proyecto : str
+            Nombre del proyecto.
+        id_tarea : int
+            Identificador de la tarea a quitar.
+
+        Returns
+        -------
+        bool
+            True si se ha quitado; False si el proyecto no existe o no contenía la tarea.
+        """
+        if nombre_proyecto not in self.proyectos:
+            print(f"Proyecto '{nombre_proyecto}' no encontrado.")
+            return False
+        tarea = self.proyectos[nombre_proyecto].quitar_tarea(id_tarea)
+        if tarea is None:
+            print(f"La tarea {id_tarea} no está en '{nombre_proyecto}'.")
+            return False
+        print(f"Tarea '{tarea}' quitada de '{nombre_proyecto}'.")
+        self._publicar("quitar_tarea", nombre=nombre_proyecto, tarea=tarea)
+        return True
+
+    def proyectos_de_tarea(self, id_tarea: int) -> List[str]:
+        """
+        Devuelve los nombres de los proyectos que contienen una tarea, usando el índice
+        de `proyecto_tareas` por tarea.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        List[str]
+            Nombres de los proyectos, ordenados alfabéticamente.
+        """
+        return [fila[0] for fila in self._conexiones.conexion().execute(
+            "SELECT nombre FROM proyecto_tareas WHERE id_tarea = ? ORDER BY nombre", (id_tarea,))]
+
+    def conteo_de_proyectos(self) -> Dict[str, Dict[EstadoTarea, int]]:
+        """
+        Devuelve los contadores por estado de todos los proyectos con una única consulta.
+
+        Returns
+        -------
+        Dict[str, Dict[EstadoTarea, int]]
+            Contador de tareas por estado de cada proyecto, por nombre y en orden de creación.
+        """
+        conteos: Dict[str, Dict[EstadoTarea, int]] = {}
+        for nombre, estado, tareas in self._conexiones.conexion().execute(
+                "SELECT p.nombre, c.estado, c.tareas FROM proyectos p"
+                " LEFT JOIN proyecto_conteo c ON c.nombre = p.nombre ORDER BY p.rowid"):
+            conteo = conteos.setdefault(nombre, dict.fromkeys(EstadoTarea, 0))
+            if estado is not None:
+                conteo[EstadoTarea[estado]] = tareas
+        return conteos
+
+    def progreso_de_proyectos(self) -> Dict[str, float]:
+        """
+        Devuelve el progreso de todos los proyectos, ver `conteo_de_proyectos`.
+
+        Returns
+        -------
+        Dict[str, float]
+            Porcentaje de tareas completadas de cada proyecto, por nombre.
+        """
+        return {nombre: porcentaje_completadas(conteo) for nombre, conteo in self.conteo_de_proyectos().items()}
+
+    @log_funcion
+    def listar_tareas_de_proyecto(self, nombre_proyecto: str) -> None:
+        """
+        Lista las tareas de un proyecto.
+
+        Parameters
+        ----------
+        nombre_proyecto : str
+            Nombre del proyecto.
+        """
+        if nombre_proyecto in self.proyectos:
+            print(f"Tareas en proyecto '{nombre_proyecto}':")
+            self.proyectos[nombre_proyecto].listar_tareas()
+        else:
+            print(f"Proyecto '{nombre_proyecto}' no encontrado.")
+
+    @log_funcion
+    def mostrar_progreso_proyecto(self, nombre_proyecto: str) -> None:
+        """
+        Muestra el progreso de un proyecto.
+
+        Parameters
+        ----------
+        nombre_proyecto : str
+            Nombre del proyecto.
+        """
+        if nombre_proyecto in self.proyectos:
+            progreso = self.proyectos[nombre_proyecto].progreso()
+            print(f"Progreso de '{nombre_proyecto}': {progreso:.2f}%")
+        else:
+            print(f"Proyecto '{nombre_proyecto}' no encontrado.")
+
+
+def _condiciones(estado: Optional[EstadoTarea],
+                 usuario: Optional[str],
+                 etiqueta: Optional[str]) -> Tuple[List[str], List[Any]]:
+    """
+    Construye las condiciones WHERE de una consulta combinada.
+
+    Parameters
+    ----------
+    estado : Optional[EstadoTarea]
+        Estado requerido.
+    usuario : Optional[str]
+        Usuario requerido.
+    etiqueta : Optional[str]
+        Etiqueta requerida.
+
+    Returns
+    -------
+    Tuple[List[str], List[Any]]
+        Condiciones SQL y sus parámetros.
+    """
+    condiciones: List[str] = []
+    parametros: List[Any] = []
+    if estado is not None:
+        condiciones.append("estado = ?")
+        parametros.append(estado.name)
+    if usuario is not None:
+        condiciones.append("usuario_asignado = ?")
+        parametros.append(usuario)
+    if etiqueta is not None:
+        condiciones.append("id_tarea IN (SELECT id_tarea FROM etiquetas WHERE etiqueta = ?)")
+        parametros.append(etiqueta)
+    return condiciones, parametros
+
+
+def _fecha_a_texto(fecha: Optional[date]) -> Optional[str]:
+    """
+    Convierte una fecha en texto "YYYY-MM-DD", que en SQLite se ordena correctamente.
+
+    Parameters
+    ----------
+    fecha : Optional[date]
+        Fecha a convertir.
+
+    Returns
+    -------
+    Optional[str]
+        Fecha en formato ISO o None.
+    """
+    return fecha.isoformat() if fecha else None
+
+
+def _leer_etiquetas(conexion: sqlite3.Connection, ids: List[int]) -> Dict[int, List[str]]:
+    """
+    Lee las etiquetas de varias tareas con una consulta por bloque, en lugar de una por tarea.
+
+    Parameters
+    ----------
+    conexion : sqlite3.Connection
+        Conexión a usar.
+    ids : List[int]
+        Identificadores de las tareas.
+
+    Returns
+    -------
+    Dict[int, List[str]]
+        Etiquetas de cada tarea, en su orden original. Las tareas sin etiquetas no aparecen.
+    """
+    etiquetas: Dict[int, List[str]] = {}
+    for inicio in range(0, len(ids), _BLOQUE_ETIQUETAS):
+        bloque = ids[inicio:inicio + _BLOQUE_ETIQUETAS]
+        marcadores = ", ".join("?" * len(bloque))
+        consulta = (f"SELECT id_tarea, etiqueta FROM etiquetas WHERE id_tarea IN ({marcadores})"
+                    " ORDER BY id_tarea, posicion")
+        for id_tarea, etiqueta in conexion.execute(consulta, bloque):
+            etiquetas.setdefault(id_tarea, []).append(etiqueta)
+    return etiquetas
+
+
+def _fila_a_tarea(fila: Tuple[Any, ...], etiquetas: Optional[List[str]]) -> Tarea:
+    """
+    Construye una Tarea a partir de una fila de la tabla de tareas.
+
+    Parameters
+    ----------
+    fila : Tuple[Any, ...]
+        Fila con las columnas de _COLUMNAS.
+    etiquetas : Optional[List[str]]
+        Etiquetas de la tarea.
+
+    Returns
+    -------
+    Tarea
+        Tarea reconstruida.
+    """
+    id_tarea, titulo, descripcion, fecha, estado, prioridad, usuario = fila
+    tarea = Tarea(id_tarea, titulo, descripcion, date.fromisoformat(fecha) if fecha else None,
+                  prioridad, etiquetas, usuario)
+    tarea.estado = EstadoTarea[estado]
+    return tarea
@@ -0,0 +1,892 @@
+"""
+Módulo: tablas
+==============
+
+Tablas clave-valor para el estado de api.py (usuarios, tareas y proyectos), secuencias para
+generar sus IDs y registros de cambios, en dos variantes con la misma interfaz:
+
+    - `TablaMemoria`, `SecuenciaMemoria` y `RegistroCambiosMemoria`: en memoria, para un único
+      proceso con varios hilos.
+    - `TablaSQLite`, `SecuenciaSQLite` y `RegistroCambiosSQLite`: en una base de datos SQLite
+      que comparten todos los workers (gunicorn -w N), de modo que cualquiera de ellos ve los
+      cambios de los demás.
+
+Los valores son objetos JSON. Una tabla SQLite devuelve copias, así que para modificar un
+valor hay que volver a guardarlo; las operaciones que leen y después escriben (`actualizar`
+y `quitar`) son atómicas en ambas variantes: en memoria se hacen con un cerrojo y en SQLite
+dentro de una transacción BEGIN IMMEDIATE. Para modificar varias tablas de forma atómica, las
+tablas en memoria deben compartir el cerrojo (las SQLite comparten las conexiones) y las
+operaciones se agrupan dentro de `transaccion()`.
+
+Una tabla con claves numéricas puede indexar campos de sus valores (p. ej. el usuario de cada
+tarea) para obtener los valores con un campo dado en orden de clave, por páginas, sin
+recorrer la tabla (`por_indice`). En memoria el índice es una lista ordenada de claves por
+cada valor del campo, que se mantiene en cada escritura; en SQLite es un índice sobre la
+expresión json_extract del campo, que la base de datos mantiene en la misma transacción.
+
+Del mismo modo, una tabla puede indexar dos campos de texto de sus valores (título y
+descripción) para buscar por palabras (`buscar`): en memoria con un IndiceInvertido y en
+SQLite con una tabla FTS5 que mantienen disparadores.
+
+Una tabla cuyos valores son instantes de caducidad (p. ej. los tokens revocados, hasta que
+caducan) puede crearse con `caducidad=True` para borrar los caducados sin recorrerla
+(`quitar_caducados`): en memoria se guardan en un montículo ordenado por caducidad y en SQLite
+hay un índice sobre el valor, de modo que el coste es proporcional a los que se borran.
+
+Un registro de cambios asigna a cada operación que modifica los datos de un usuario una
+versión creciente y anota qué ha cambiado (tipo y clave: una tarea, un proyecto). La versión
+de un usuario sirve de ETag de sus datos sin leerlos y `desde` devuelve lo que ha cambiado a
+partir de una versión, con un coste proporcional a los cambios. Solo se guardan las últimas
+entradas: si un cliente pide cambios ya descartados, debe volver a cargar los datos.
+
+Dependencias:
+    - bisect, collections, heapq, json, itertools, secrets y threading (biblioteca estándar).
+    - gestor_de_tareas.almacenamiento.sqlite: ConexionesSQLite.
+    - gestor_de_tareas.utilidades.busqueda: IndiceInvertido y expresion_fts.
+"""
+
+import bisect
+import heapq
+import itertools
+import json
+import secrets
+import threading
+from collections import deque
+from collections.abc import MutableMapping
+from typing import Any, Callable, ContextManager, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from gestor_de_tareas.almacenamiento.sqlite import ConexionesSQLite
+from gestor_de_tareas.utilidades.busqueda import PESO_TITULO, IndiceInvertido, expresion_fts
+
+# Recibe el valor actual (None si la clave no existe) y devuelve el valor a guardar, o None
+# para dejarlo como estaba.
+Actualizacion = Callable[[Optional[Any]], Optional[Any]]
+
+# Tamaño máximo de las listas de claves en las consultas "IN (...)" de SQLite.
+_CLAVES_POR_CONSULTA = 500
+
+
+class TablaMemoria(dict):
+    """
+    Diccionario con operaciones atómicas para usarlo desde varios hilos.
+
+    Si tiene índices, sus claves deben ser enteros escritos como texto ("1", "2"...) y los
+    valores solo deben modificarse con `tabla[clave] = valor`, `del`, `update`, `actualizar`
+    y `quitar`, que mantienen los índices.
+
+    Parameters
+    ----------
+    indices : Iterable[str], optional
+        Campos de los valores a indexar (ver `por_indice`).
+    cerrojo : Optional[threading.RLock], optional
+        Cerrojo a compartir con otras tablas que se modifican juntas (ver `transaccion`).
+        Por defecto se crea uno nuevo.
+    texto : Optional[Tuple[str, str]], optional
+        Campos de título y descripción a indexar para `buscar`.
+    caducidad : bool, optional
+        Si los valores son instantes de caducidad (números) que `quitar_caducados` debe
+        poder borrar sin recorrer la tabla. Por defecto False.
+    """
+
+    def __init__(self,
+                 indices: Iterable[str] = (),
+                 cerrojo: Optional[threading.RLock] = None,
+                 texto: Optional[Tuple[str, str]] = None,
+                 caducidad: bool = False) -> None:
+        """
+        Inicializa la tabla vacía.
+        """
+        super().__init__()
+        self._cerrojo = cerrojo if cerrojo is not None else threading.RLock()
+        # Campo -> valor del campo -> claves (como enteros) ordenadas.
+        self._indices: Dict[str, Dict[Any, List[int]]] = {campo: {} for campo in indices}
+        self._texto: Tuple[str, ...] = tuple(texto or ())
+        self._busqueda = IndiceInvertido() if texto else None
+        # Montículo de (caducidad, clave) de cada valor guardado. Los de claves borradas o
+        # sobrescritas se descartan al salir, cuando ya han caducado.
+        self._caducidades: Optional[List[Tuple[Any, str]]] = [] if caducidad else None
+
+    def __setitem__(self, clave: str, valor: Any) -> None:
+        with self._cerrojo:
+            self._guardar(clave, valor, self._indexados(self.get(clave)))
+
+    def __delitem__(self, clave: str) -> None:
+        with self._cerrojo:
+            valor = self[clave]
+            dict.__delitem__(self, clave)
+            self._desindexar(clave, self._indexados(valor))
+
+    def update(self, valores: Dict[str, Any] = (), **otros: Any) -> None:  # type: ignore[override]
+        """
+        Guarda varios valores de una vez.
+        """
+        with self._cerrojo:
+            for clave, valor in dict(valores, **otros).items():
+                self._guardar(clave, valor, self._indexados(self.get(clave)))
+
+    def transaccion(self) -> threading.RLock:
+        """
+        Devuelve el cerrojo de la tabla, para usarlo como `with tabla.transaccion():`.
+
+        Mientras se tiene, ningún otro hilo modifica esta tabla ni las que comparten el
+        cerrojo, de modo que las operaciones del bloque se ven como una sola.
+
+        Returns
+        -------
+        threading.RLock
+            Cerrojo de la tabla.
+        """
+        return self._cerrojo
+
+    def por_indice(self, campo: str, valor: Any, desde: int = 0, limite: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Devuelve los valores cuyo `campo` es `valor`, en orden de clave.
+
+        Parameters
+        ----------
+        campo : str
+            Campo indexado.
+        valor : Any
+            Valor buscado.
+        desde : int, optional
+            Solo se devuelven las claves mayores que esta (por defecto 0, todas).
+        limite : Optional[int], optional
+            Número máximo de valores; None para todos.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Valores por clave, en orden de clave.
+        """
+        with self._cerrojo:
+            claves = self._indices[campo].get(valor, ())
+            inicio = bisect.bisect_right(claves, desde)
+            fin = len(claves) if limite is None else inicio + limite
+            return {str(clave): self[str(clave)] for clave in claves[inicio:fin]}
+
+    def buscar(self,
+               consulta: str,
+               limite: int,
+               inicio: int = 0,
+               campo: Optional[str] = None,
+               valor: Any = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Busca los valores que contienen todas las palabras de la consulta en sus campos de
+        texto, de más a menos relevante (ver gestor_de_tareas.utilidades.busqueda).
+
+        Parameters
+        ----------
+        consulta : str
+            Texto a buscar.
+        limite : int
+            Número máximo de valores.
+        inicio : int, optional
+            Número de resultados a saltar (para pedir las páginas siguientes).
+        campo : Optional[str], optional
+            Si se indica, solo se devuelven los valores cuyo `campo` es `valor` (p. ej. las
+            tareas de un usuario).
+        valor : Any, optional
+            Valor del campo anterior.
+
+        Returns
+        -------
+        Tuple[Dict[str, Any], bool]
+            Valores por clave en orden de relevancia, y True si hay más resultados.
+        """
+        with self._cerrojo:
+            admitir = None
+            if campo is not None:
+                def admitir(clave: int) -> bool:
+                    return dict.__getitem__(self, str(clave)).get(campo) == valor
+            resultados, hay_mas = self._busqueda.buscar(consulta, limite, inicio, admitir)
+            return {str(clave): dict.__getitem__(self, str(clave)) for clave, _ in resultados}, hay_mas
+
+    def varios(self, claves: Iterable[str]) -> Dict[str, Any]:
+        """
+        Devuelve los valores de varias claves.
+
+        Parameters
+        ----------
+        claves : Iterable[str]
+            Claves a buscar.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Valores de las claves que existen.
+        """
+        return {clave: valor for clave in claves if (valor := self.get(clave)) is not None}
+
+    def actualizar(self, claves: Iterable[str], funcion: Actualizacion) -> Dict[str, Any]:
+        """
+        Aplica `funcion` al valor de cada clave y guarda el resultado, de forma atómica.
+
+        Parameters
+        ----------
+        claves : Iterable[str]
+            Claves a actualizar.
+        funcion : Callable[[Optional[Any]], Optional[Any]]
+            Recibe el valor actual (None si no existe) y devuelve el nuevo, o None para no
+            modificarlo. Puede modificar el valor recibido y devolverlo.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Valores guardados, por clave.
+        """
+        guardados = {}
+        with self._cerrojo:
+            for clave in claves:
+                actual = self.get(clave)
+                # Los campos indexados se leen antes, porque `funcion` puede modificar el valor.
+                anteriores = self._indexados(actual)
+                nuevo = funcion(actual)
+                if nuevo is not None:
+                    self._guardar(clave, nuevo, anteriores)
+                    guardados[clave] = nuevo
+        return guardados
+
+    def quitar(self, claves: Iterable[str], condicion: Callable[[Any], bool]) -> List[str]:
+        """
+        Elimina las claves cuyo valor cumple `condicion`, de forma atómica.
+
+        Parameters
+        ----------
+        claves : Iterable[str]
+            Claves a eliminar.
+        condicion : Callable[[Any], bool]
+            Recibe el valor actual y decide si se elimina.
+
+        Returns
+        -------
+        List[str]
+            Claves eliminadas.
+        """
+        quitadas = []
+        with self._cerrojo:
+            for clave in claves:
+                valor = self.get(clave)
+                if valor is not None and condicion(valor):
+                    dict.__delitem__(self, clave)
+                    self._desindexar(clave, self._indexados(valor))
+                    quitadas.append(clave)
+        return quitadas
+
+    def quitar_caducados(self, ahora: float) -> int:
+        """
+        Elimina los valores menores o iguales que `ahora`, de forma atómica.
+
+        Solo recorre las entradas ya caducadas del montículo de caducidades, no la tabla.
+
+        Parameters
+        ----------
+        ahora : float
+            Instante actual, en la misma unidad que los valores.
+
+        Returns
+        -------
+        int
+            Número de claves eliminadas.
+
+        Raises
+        ------
+        ValueError
+            Si la tabla no se creó con `caducidad=True`.
+        """
+        if self._caducidades is None:
+            raise ValueError("La tabla no se creó con caducidad")
+        quitadas = 0
+        with self._cerrojo:
+            while self._caducidades and self._caducidades[0][0] <= ahora:
+                caduca, clave = heapq.heappop(self._caducidades)
+                if dict.get(self, clave) == caduca:
+                    dict.__delitem__(self, clave)
+                    quitadas += 1
+        return quitadas
+
+    def _indexados(self, valor: Optional[Any]) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve los campos indexados (también los de texto) de un valor, o None si no hay
+        valor o índices.
+        """
+        if valor is None or not (self._indices or self._texto):
+            return None
+        return {campo: valor.get(campo) for campo in itertools.chain(self._indices, self._texto)}
+
+    def _guardar(self, clave: str, valor: Any, anteriores: Optional[Dict[str, Any]]) -> None:
+        """
+        Guarda un valor y actualiza los índices; se llama con el cerrojo tomado.
+
+        Parameters
+        ----------
+        clave : str
+            Clave del valor.
+        valor : Any
+            Valor a guardar.
+        anteriores : Optional[Dict[str, Any]]
+            Campos indexados del valor anterior (ver `_indexados`).
+        """
+        dict.__setitem__(self, clave, valor)
+        if self._caducidades is not None:
+            heapq.heappush(self._caducidades, (valor, clave))
+        nuevos = self._indexados(valor)
+        if nuevos != anteriores:
+            self._desindexar(clave, anteriores)
+            for campo in self._indices:
+                valor_campo = nuevos[campo]
+                if valor_campo is not None:
+                    bisect.insort(self._indices[campo].setdefault(valor_campo, []), int(clave))
+            if self._busqueda is not None:
+                self._busqueda.agregar(int(clave), *(nuevos[campo] or "" for campo in self._texto))
+
+    def _desindexar(self, clave: str, anteriores: Optional[Dict[str, Any]]) -> None:
+        """
+        Quita una clave de los índices; se llama con el cerrojo tomado.
+        """
+        if anteriores is None:
+            return
+        if self._busqueda is not None:
+            self._busqueda.quitar(int(clave))
+        for campo in self._indices:
+            valor_campo = anteriores[campo]
+            claves = self._indices[campo].get(valor_campo)
+            if claves is None:
+                continue
+            posicion = bisect.bisect_left(claves, int(clave))
+            if posicion < len(claves) and claves[posicion] == int(clave):
+                del claves[posicion]
+            if not claves:
+                del self._indices[campo][valor_campo]
+
+
+class TablaSQLite(MutableMapping):
+    """
+    Tabla clave-valor guardada en SQLite, compartida por todos los procesos.
+
+    Cada escritura incrementa el contador de cambios de la base de datos (ver
+    `ConexionesSQLite.version`).
+
+    Parameters
+    ----------
+    conexiones : ConexionesSQLite
+        Conexiones a la base de datos.
+    nombre : str
+        Nombre de la tabla; se crea si no existe.
+    indices : Iterable[str], optional
+        Campos de los valores a indexar (ver `por_indice`). Las claves de la tabla deben ser
+        enteros escritos como texto.
+    texto : Optional[Tuple[str, str]], optional
+        Campos de título y descripción a indexar para `buscar`, en la tabla FTS5
+        "<nombre>_texto" (su rowid es el de la fila de la tabla).
+    caducidad : bool, optional
+        Si los valores son instantes de caducidad; crea el índice "<nombre>_caducidad" sobre
+        el valor para `quitar_caducados`. Por defecto False.
+    """
+
+    def __init__(self,
+                 conexiones: ConexionesSQLite,
+                 nombre: str,
+                 indices: Iterable[str] = (),
+                 texto: Optional[Tuple[str, str]] = None,
+                 caducidad: bool = False) -> None:
+        """
+        Inicializa la tabla y la crea si no existe, con sus índices.
+        """
+        indices = tuple(indices)
+        texto = tuple(texto or ())
+        for identificador in (nombre, *indices, *texto):
+            if not identificador.isidentifier():
+                raise ValueError(f"Nombre de tabla o campo no válido: {identificador}")
+        self._conexiones = conexiones
+        self._nombre = nombre
+        conexion = conexiones.conexion()
+        with conexion:
+            conexion.execute(f"CREATE TABLE IF NOT EXISTS {nombre} (clave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+            # La expresión de cada consulta debe coincidir con la del índice para que SQLite lo use.
+            self._sql_indice = {}
+            for campo in indices:
+                expresion = f"json_extract(valor, '$.{campo}')"
+                conexion.execute(f"CREATE INDEX IF NOT EXISTS {nombre}_{campo} ON {nombre} "
+                                 f"({expresion}, CAST(clave AS INTEGER))")
+                self._sql_indice[campo] = (f"SELECT clave, valor FROM {nombre} WHERE {expresion} = ?"
+                                           " AND CAST(clave AS INTEGER) > ? ORDER BY CAST(clave AS INTEGER) LIMIT ?")
+            if texto:
+                self._crear_texto(conexion, texto)
+            if caducidad:
+                conexion.execute(f"CREATE INDEX IF NOT EXISTS {nombre}_caducidad ON {nombre} (CAST(valor AS REAL))")
+        self._caducidad = caducidad
+        self._sql_leer = f"SELECT valor FROM {nombre} WHERE clave = ?"
+        self._sql_guardar = (f"INSERT INTO {nombre} (clave, valor) VALUES (?, ?)"
+                             " ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor")
+        self._sql_borrar = f"DELETE FROM {nombre} WHERE clave = ?"
+
+    def __getitem__(self, clave: str) -> Any:
+        fila = self._conexiones.conexion().execute(self._sql_leer, (clave,)).fetchone()
+        if fila is None:
+            raise KeyError(clave)
+        return json.loads(fila[0])
+
+    def __setitem__(self, clave: str, valor: Any) -> None:
+        self.update({clave: valor})
+
+    def __delitem__(self, clave: str) -> None:
+        with self._conexiones.transaccion() as conexion:
+            if not conexion.execute(self._sql_borrar, (clave,)).rowcount:
+                raise KeyError(clave)
+            self._conexiones.registrar_cambio()
+
+    def __iter__(self) -> Iterator[str]:
+        filas = self._conexiones.conexion().execute(f"SELECT clave FROM {self._nombre} ORDER BY rowid").fetchall()
+        return (fila[0] for fila in filas)
+
+    def __len__(self) -> int:
+        return self._conexiones.conexion().execute(f"SELECT count(*) FROM {self._nombre}").fetchone()[0]
+
+    def __contains__(self, clave: object) -> bool:
+        return self._conexiones.conexion().execute(self._sql_leer, (clave,)).fetchone() is not None
+
+    def copy(self) -> Dict[str, Any]:
+        """
+        Devuelve un diccionario con todo el contenido, leído con una sola consulta.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Copia de la tabla en orden de inserción.
+        """
+        filas = self._conexiones.conexion().execute(
+            f"SELECT clave, valor FROM {self._nombre} ORDER BY rowid").fetchall()
+        return {clave: json.loads(valor) for clave, valor in filas}
+
+    def transaccion(self) -> ContextManager[Any]:
+        """
+        Agrupa las operaciones del bloque en una transacción, ver `ConexionesSQLite.transaccion`.
+        """
+        return self._conexiones.transaccion()
+
+    def por_indice(self, campo: str, valor: Any, desde: int = 0, limite: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Devuelve los valores cuyo `campo` es `valor`, en orden de clave, con una consulta que
+        recorre solo el índice del campo. Ver `TablaMemoria.por_indice`.
+        """
+        filas = self._conexiones.conexion().execute(
+            self._sql_indice[campo], (valor, desde, -1 if limite is None else limite)).fetchall()
+        return {clave: json.loads(texto) for clave, texto in filas}
+
+    def buscar(self,
+               consulta: str,
+               limite: int,
+               inicio: int = 0,
+               campo: Optional[str] = None,
+               valor: Any = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Busca los valores que contienen todas las palabras de la consulta con la tabla FTS5,
+        de más a menos relevante según bm25. Ver `TablaMemoria.buscar`.
+        """
+        expresion = expresion_fts(consulta)
+        if not expresion:
+            return {}, False
+        texto = f"{self._nombre}_texto"
+        sql = (f"SELECT {self._nombre}.clave, {self._nombre}.valor FROM {texto}"
+               f" JOIN {self._nombre} ON {self._nombre}.rowid = {texto}.rowid WHERE {texto} MATCH ?")
+        parametros: List[Any] = [expresion]
+        if campo is not None:
+            if not campo.isidentifier():
+                raise ValueError(f"Nombre de campo no válido: {campo}")
+            sql += f" AND json_extract({self._nombre}.valor, '$.{campo}') = ?"
+            parametros.append(valor)
+        sql += f" ORDER BY bm25({texto}, {float(PESO_TITULO)}, 1.0), {texto}.rowid LIMIT ? OFFSET ?"
+        filas = self._conexiones.conexion().execute(sql, parametros + [limite + 1, inicio]).fetchall()
+        return {clave: json.loads(texto) for clave, texto in filas[:limite]}, len(filas) > limite
+
+    def varios(self, claves: Iterable[str]) -> Dict[str, Any]:
+        """
+        Devuelve los valores de varias claves con una consulta por cada bloque de claves. Ver
+        `TablaMemoria.varios`.
+        """
+        claves = list(claves)
+        conexion = self._conexiones.conexion()
+        encontrados = {}
+        for inicio in range(0, len(claves), _CLAVES_POR_CONSULTA):
+            bloque = claves[inicio:inicio + _CLAVES_POR_CONSULTA]
+            marcas = ", ".join("?" * len(bloque))
+            filas = conexion.execute(f"SELECT clave, valor FROM {self._nombre} WHERE clave IN ({marcas})", bloque)
+            encontrados.update((clave, json.loads(texto)) for clave, texto in filas)
+        return encontrados
+
+    def items(self):  # type: ignore[override]
+        return self.copy().items()
+
+    def values(self):  # type: ignore[override]
+        return self.copy().values()
+
+    def update(self, valores: Dict[str, Any] = (), **otros: Any) -> None:  # type: ignore[override]
+        """
+        Guarda varios valores en una única transacción.
+        """
+        filas = [(clave, json.dumps(valor, ensure_ascii=False)) for clave, valor in dict(valores, **otros).items()]
+        with self._conexiones.transaccion() as conexion:
+            conexion.executemany(self._sql_guardar, filas)
+            self._conexiones.registrar_cambio()
+
+    def actualizar(self, claves: Iterable[str], funcion: Actualizacion) -> Dict[str, Any]:
+        """
+        Aplica `funcion` al valor de cada clave y guarda el resultado, ver
+        `TablaMemoria.actualizar`. Todas las claves se actualizan en una transacción.
+        """
+        guardados = {}
+        with self._conexiones.transaccion() as conexion:
+            for clave in claves:
+                fila = conexion.execute(self._sql_leer, (clave,)).fetchone()
+                nuevo = funcion(json.loads(fila[0]) if fila else None)
+                if nuevo is not None:
+                    conexion.execute(self._sql_guardar, (clave, json.dumps(nuevo, ensure_ascii=False)))
+                    guardados[clave] = nuevo
+            if guardados:
+                self._conexiones.registrar_cambio()
+        return guardados
+
+    def quitar(self, claves: Iterable[str], condicion: Callable[[Any], bool]) -> List[str]:
+        """
+        Elimina las claves cuyo valor cumple `condicion`, ver `TablaMemoria.quitar`. Todas
+        las claves se eliminan en una transacción.
+        """
+        quitadas = []
+        with self._conexiones.transaccion() as conexion:
+            for clave in claves:
+                fila = conexion.execute(self._sql_leer, (clave,)).fetchone()
+                if fila is not None and condicion(json.loads(fila[0])):
+                    conexion.execute(self._sql_borrar, (clave,))
+                    quitadas.append(clave)
+            if quitadas:
+                self._conexiones.registrar_cambio()
+        return quitadas
+
+    def quitar_caducados(self, ahora: float) -> int:
+        """
+        Elimina los valores menores o iguales que `ahora` con una sola sentencia DELETE que
+        recorre el índice de caducidad, ver `TablaMemoria.quitar_caducados`.
+        """
+        if not self._caducidad:
+            raise ValueError("La tabla no se creó con caducidad")
+        with self._conexiones.transaccion() as conexion:
+            quitadas = conexion.execute(f"DELETE FROM {self._nombre} WHERE CAST(valor AS REAL) <= ?",
+                                        (ahora,)).rowcount
+            if quitadas:
+                self._conexiones.registrar_cambio()
+        return quitadas
+
+    def _crear_texto(self, conexion: Any, campos: Tuple[str, ...]) -> None:
+        """
+        Crea la tabla FTS5 de los campos de texto y los disparadores que la mantienen, e
+        indexa las filas existentes si la tabla es nueva.
+        """
+        nombre, texto = self._nombre, f"{self._nombre}_texto"
+        columnas = ", ".join(campos)
+        extraer = ", ".join(f"json_extract(NEW.valor, '$.{campo}')" for campo in campos)
+        conexion.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {texto} USING fts5({columnas},"
+                         " tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')")
+        conexion.execute(f"CREATE TRIGGER IF NOT EXISTS {texto}_insertar AFTER INSERT ON {nombre} BEGIN"
+                         f" INSERT INTO {texto} (rowid, {columnas}) VALUES (NEW.rowid, {extraer}); END")
+        cambiado = " OR ".join(f"json_extract(OLD.valor, '$.{campo}') IS NOT json_extract(NEW.valor, '$.{campo}')"
+                               for campo in campos)
+        asignaciones = ", ".join(f"{campo} = json_extract(NEW.valor, '$.{campo}')" for campo in campos)
+        conexion.execute(f"CREATE TRIGGER IF NOT EXISTS {texto}_modificar AFTER UPDATE OF valor ON {nombre}"
+                         f" WHEN {cambiado} BEGIN UPDATE {texto} SET {asignaciones} WHERE rowid = NEW.rowid; END")
+        conexion.execute(f"CREATE TRIGGER IF NOT EXISTS {texto}_eliminar AFTER DELETE ON {nombre} BEGIN"
+                         f" DELETE FROM {texto} WHERE rowid = OLD.rowid; END")
+        # Tablas creadas antes de indexar el texto: se indexan una vez.
+        conexion.execute(f"INSERT INTO {texto} (rowid, {columnas}) SELECT rowid, "
+                         + ", ".join(f"json_extract(valor, '$.{campo}')" for campo in campos)
+                         + f" FROM {nombre} WHERE NOT EXISTS (SELECT 1 FROM {texto})")
+
+
+class SecuenciaMemoria:
+    """
+    Generador de IDs consecutivos para un único proceso.
+
+    No usa cerrojo: `next` sobre itertools.count y `list(islice(...))` se ejecutan enteros en
+    C sin ceder el GIL, así que dos hilos nunca reciben el mismo ID.
+
+    Parameters
+    ----------
+    inicio : int, optional
+        Primer ID (por defecto 1).
+    """
+
+    def __init__(self, inicio: int = 1) -> None:
+        """
+        Inicializa la secuencia.
+        """
+        self._contador = itertools.count(inicio)
+
+    def __iter__(self) -> "SecuenciaMemoria":
+        return self
+
+    def __next__(self) -> int:
+        return next(self._contador)
+
+    def reservar(self, cantidad: int) -> List[int]:
+        """
+        Reserva `cantidad` IDs consecutivos.
+
+        Parameters
+        ----------
+        cantidad : int
+            Número de IDs.
+
+        Returns
+        -------
+        List[int]
+            Los IDs reservados.
+        """
+        return list(itertools.islice(self._contador, cantidad))
+
+
+class SecuenciaSQLite:
+    """
+    Generador de IDs consecutivos compartido por todos los procesos.
+
+    Parameters
+    ----------
+    conexiones : ConexionesSQLite
+        Conexiones a la base de datos.
+    nombre : str
+        Nombre de la secuencia.
+    """
+
+    def __init__(self, conexiones: ConexionesSQLite, nombre: str) -> None:
+        """
+        Inicializa la secuencia y crea su tabla si no existe.
+        """
+        self._conexiones = conexiones
+        self._nombre = nombre
+        conexion = conexiones.conexion()
+        with conexion:
+            conexion.execute("CREATE TABLE IF NOT EXISTS secuencias (nombre TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+            conexion.execute("INSERT OR IGNORE INTO secuencias (nombre, valor) VALUES (?, 0)", (nombre,))
+
+    def __iter__(self) -> "SecuenciaSQLite":
+        return self
+
+    def __next__(self) -> int:
+        return self.reservar(1)[0]
+
+    def reservar(self, cantidad: int) -> List[int]:
+        """
+        Reserva `cantidad` IDs consecutivos en una transacción.
+
+        Parameters
+        ----------
+        cantidad : int
+            Número de IDs.
+
+        Returns
+        -------
+        List[int]
+            Los IDs reservados.
+        """
+        with self._conexiones.transaccion() as conexion:
+            conexion.execute("UPDATE secuencias SET valor = valor + ? WHERE nombre = ?", (cantidad, self._nombre))
+            ultimo = conexion.execute("SELECT valor FROM secuencias WHERE nombre = ?", (self._nombre,)).fetchone()[0]
+        return list(range(ultimo - cantidad + 1, ultimo + 1))
+
+
+class RegistroCambiosMemoria:
+    """
+    Registro de los cambios de los datos de cada usuario, para un único proceso.
+
+    Cada llamada a `registrar` recibe una versión nueva de una secuencia común a todos los
+    usuarios, de modo que la versión de un usuario (la de su último cambio) crece con cada
+    cambio y nunca coincide con la de otro usuario con datos distintos. Se guardan las últimas
+    `capacidad` entradas (tipo, clave) de todos los usuarios, con las que `desde` obtiene lo
+    que ha cambiado a partir de una versión sin recorrer los datos.
+
+    Parameters
+    ----------
+    capacidad : int
+        Número máximo de entradas guardadas; con 0 no se guarda ninguna y `desde` solo
+        responde para la versión actual.
+
+    Attributes
+    ----------
+    epoca : str
+        Identificador del registro. Las versiones de la memoria empiezan de nuevo en cada
+        proceso, así que una versión solo tiene sentido junto con su época.
+    """
+
+    def __init__(self, capacidad: int) -> None:
+        """
+        Inicializa el registro vacío.
+        """
+        self.capacidad = capacidad
+        self.epoca = secrets.token_hex(4)
+        self._secuencia = SecuenciaMemoria()
+        # (versión, usuario, tipo, clave) en orden de versión.
+        self._entradas: Deque[Tuple[int, str, str, str]] = deque()
+        self._versiones: Dict[str, int] = {}
+        self._ultima = 0
+        # Versión de la última entrada descartada: los cambios anteriores ya no se conocen.
+        self._perdida = 0
+        self._cerrojo = threading.Lock()
+
+    def version(self, usuario: str) -> int:
+        """
+        Devuelve la versión del último cambio de los datos del usuario (0 si no hay ninguno).
+        """
+        return self._versiones.get(usuario, 0)
+
+    def ultima(self) -> int:
+        """
+        Devuelve la versión del último cambio de cualquier usuario (0 si no hay ninguno).
+        """
+        return self._ultima
+
+    def registrar(self, usuario: str, cambios: Iterable[Tuple[str, str]]) -> None:
+        """
+        Anota los cambios de una operación con una versión nueva.
+
+        Debe llamarse después de modificar los datos y, si la operación modifica varias
+        tablas, dentro de la misma `transaccion()`, para que una versión nunca se vea antes
+        que los datos que describe.
+
+        Parameters
+        ----------
+        usuario : str
+            Usuario propietario de los datos.
+        cambios : Iterable[Tuple[str, str]]
+            Pares (tipo, clave) de lo que ha cambiado, p. ej. ("tarea", "12"). Si no hay
+            ninguno, no se anota nada.
+        """
+        cambios = list(cambios)
+        if not cambios:
+            return
+        with self._cerrojo:
+            version = next(self._secuencia)
+            self._entradas.extend((version, usuario, tipo, clave) for tipo, clave in cambios)
+            while len(self._entradas) > self.capacidad:
+                self._perdida = self._entradas.popleft()[0]
+            self._versiones[usuario] = version
+            self._ultima = version
+
+    def desde(self, usuario: str, version: int) -> Optional[Tuple[int, List[Tuple[str, str]]]]:
+        """
+        Devuelve lo que ha cambiado en los datos del usuario después de una versión.
+
+        Solo recorre las entradas posteriores a `version`.
+
+        Parameters
+        ----------
+        usuario : str
+            Usuario propietario de los datos.
+        version : int
+            Versión que ya conoce el cliente.
+
+        Returns
+        -------
+        Optional[Tuple[int, List[Tuple[str, str]]]]
+            (versión actual del usuario, pares (tipo, clave) distintos en orden de su último
+            cambio), o None si ya se han descartado cambios posteriores a `version`.
+        """
+        with self._cerrojo:
+            if version < self._perdida:
+                return None
+            cambios: Dict[Tuple[str, str], None] = {}
+            for version_entrada, usuario_entrada, tipo, clave in reversed(self._entradas):
+                if version_entrada <= version:
+                    break
+                if usuario_entrada == usuario:
+                    cambios.setdefault((tipo, clave))
+            return self.version(usuario), list(reversed(cambios))
+
+
+class RegistroCambiosSQLite:
+    """
+    Registro de los cambios de los datos de cada usuario compartido por todos los procesos.
+
+    Misma interfaz que `RegistroCambiosMemoria`. Las entradas se guardan en la tabla
+    "registro_cambios", con un índice por usuario y versión, y la versión de cada usuario en
+    "registro_versiones"; `registrar` las escribe en la transacción abierta, junto con los
+    datos que describen. La época se genera al crear la base de datos y es la misma para todos
+    los workers.
+
+    Parameters
+    ----------
+    conexiones : ConexionesSQLite
+        Conexiones a la base de datos.
+    capacidad : int
+        Número máximo de entradas guardadas.
+    """
+
+    def __init__(self, conexiones: ConexionesSQLite, capacidad: int) -> None:
+        """
+        Inicializa el registro y crea sus tablas si no existen.
+        """
+        self._conexiones = conexiones
+        self.capacidad = capacidad
+        self._secuencia = SecuenciaSQLite(conexiones, "registro_cambios")
+        conexion = conexiones.conexion()
+        with conexion:
+            conexion.execute("CREATE TABLE IF NOT EXISTS registro_cambios"
+                             " (version INTEGER NOT NULL, usuario TEXT NOT NULL, tipo TEXT NOT NULL, clave TEXT NOT NULL)")
+            conexion.execute("CREATE INDEX IF NOT EXISTS registro_cambios_usuario ON registro_cambios (usuario, version)")
+            conexion.execute("CREATE TABLE IF NOT EXISTS registro_versiones"
+                             " (usuario TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            conexion.execute("CREATE TABLE IF NOT EXISTS registro_estado (nombre TEXT PRIMARY KEY, valor NOT NULL)")
+            conexion.execute("INSERT OR IGNORE INTO registro_estado (nombre, valor)"
+                             " VALUES ('epoca', lower(hex(randomblob(4)))), ('perdida', 0)")
+        self.epoca = conexion.execute("SELECT valor FROM registro_estado WHERE nombre = 'epoca'").fetchone()[0]
+
+    def version(self, usuario: str) -> int:
+        """
+        Devuelve la versión del último cambio de los datos del usuario (0 si no hay ninguno).
+        """
+        fila = self._conexiones.conexion().execute(
+            "SELECT version FROM registro_versiones WHERE usuario = ?", (usuario,)).fetchone()
+        return 0 if fila is None else fila[0]
+
+    def ultima(self) -> int:
+        """
+        Devuelve la versión del último cambio de cualquier usuario y de cualquier proceso,
+        con una consulta de una fila.
+        """
+        return self._conexiones.conexion().execute(
+            "SELECT valor FROM secuencias WHERE nombre = 'registro_cambios'").fetchone()[0]
+
+    def registrar(self, usuario: str, cambios: Iterable[Tuple[str, str]]) -> None:
+        """
+        Anota los cambios de una operación con una versión nueva y descarta las entradas que
+        superan la capacidad. Ver `RegistroCambiosMemoria.registrar`.
+        """
+        cambios = list(cambios)
+        if not cambios:
+            return
+        with self._conexiones.transaccion() as conexion:
+            version = next(self._secuencia)
+            conexion.executemany("INSERT INTO registro_cambios (version, usuario, tipo, clave) VALUES (?, ?, ?, ?)",
+                                 [(version, usuario, tipo, clave) for tipo, clave in cambios])
+            conexion.execute("INSERT INTO registro_versiones (usuario, version) VALUES (?, ?)"
+                             " ON CONFLICT(usuario) DO UPDATE SET version = excluded.version", (usuario, version))
+            limite = conexion.execute("SELECT last_insert_rowid()").fetchone()[0] - self.capacidad
+            perdida = conexion.execute("SELECT max(version) FROM registro_cambios WHERE rowid <= ?",
+                                       (limite,)).fetchone()[0]
+            if perdida is not None:
+                conexion.execute("DELETE FROM registro_cambios WHERE rowid <= ?", (limite,))
+                conexion.execute("UPDATE registro_estado SET valor = ? WHERE nombre = 'perdida'", (perdida,))
+
+    def desde(self, usuario: str, version: int) -> Optional[Tuple[int, List[Tuple[str, str]]]]:
+        """
+        Devuelve lo que ha cambiado en los datos del usuario después de una versión, con una
+        consulta sobre el índice por usuario y versión. Ver `RegistroCambiosMemoria.desde`.
+        """
+        conexion = self._conexiones.conexion()
+        actual = self.version(usuario)
+        filas = conexion.execute(
+            "SELECT tipo, clave FROM registro_cambios WHERE usuario = ? AND version > ? AND version <= ?"
+            " GROUP BY tipo, clave ORDER BY max(version)", (usuario, version, actual)).fetchall()
+        # Se lee después de las entradas: si se han descartado algunas que hacían falta mientras
+        # tanto, ya se ve aquí.
+        perdida = conexion.execute("SELECT valor FROM registro_estado WHERE nombre = 'perdida'").fetchone()[0]
+        if version < perdida:
+            return None
+        return actual, [tuple(fila) for fila in filas]
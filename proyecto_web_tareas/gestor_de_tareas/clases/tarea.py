@@ -1,6 +1,7 @@
+import sys
 from enum import Enum
 from datetime import date
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 
 class EstadoTarea(Enum):
     """
@@ -27,6 +28,12 @@ class Tarea:
     título, descripción, fecha límite, estado, prioridad, etiquetas y el usuario asignado.
     Se inicializa el estado de la tarea a PENDIENTE por defecto.
 
+    Para reducir la memoria cuando hay muchas tareas, la clase usa `__slots__` (sin `__dict__`
+    por instancia), guarda las etiquetas como una tupla de cadenas internadas y también
+    interna el nombre del usuario asignado, de modo que los valores repetidos se comparten.
+    La descripción puede guardarse como bytes UTF-8 sin decodificar (por ejemplo, al leer una
+    instantánea) y se decodifica la primera vez que se accede a ella.
+
     Parameters
     ----------
     id_tarea : int
@@ -40,10 +47,13 @@ class Tarea:
     prioridad : int
         Valor numérico que representa la prioridad; un valor menor indica mayor prioridad.
     etiquetas : Optional[List[str]], optional
-        Lista de etiquetas asociadas a la tarea. Por defecto es None, lo que se traduce en una lista vacía.
+        Lista de etiquetas asociadas a la tarea. Por defecto es None, lo que se traduce en una tupla vacía.
     usuario_asignado : Optional[str], optional
         Nombre o identificador del usuario asignado a la tarea. Por defecto es None.
     """
+    __slots__ = ("id_tarea", "titulo", "_descripcion", "fecha_limite", "estado",
+                 "prioridad", "etiquetas", "usuario_asignado")
+
     def __init__(self,
                  id_tarea: int,
                  titulo: str,
@@ -68,7 +78,7 @@ class Tarea:
         prioridad : int
             Prioridad de la tarea.
         etiquetas : Optional[List[str]], optional
-            Lista de etiquetas (default es None, lo que se interpreta como lista vacía).
+            Lista de etiquetas (default es None, lo que se interpreta como tupla vacía).
         usuario_asignado : Optional[str], optional
             Usuario asignado a la tarea (default es None).
         """
@@ -78,8 +88,35 @@ class Tarea:
         self.fecha_limite = fecha_limite
         self.estado = EstadoTarea.PENDIENTE
         self.prioridad = prioridad
-        self.etiquetas = etiquetas if etiquetas else []
-        self.usuario_asignado = usuario_asignado
+        self.etiquetas: Tuple[str, ...] = _internar_etiquetas(etiquetas)
+        self.usuario_asignado = sys.intern(usuario_asignado) if usuario_asignado else usuario_asignado
+
+    @property
+    def descripcion(self) -> str:
+        """
+        Descripción de la tarea, decodificada bajo demanda si se cargó como bytes.
+
+        Returns
+        -------
+        str
+            Descripción de la tarea.
+        """
+        descripcion = self._descripcion
+        if isinstance(descripcion, bytes):
+            descripcion = self._descripcion = descripcion.decode("utf-8")
+        return descripcion
+
+    @descripcion.setter
+    def descripcion(self, descripcion: str) -> None:
+        """
+        Establece la descripción de la tarea.
+
+        Parameters
+        ----------
+        descripcion : str
+            Nueva descripción (o bytes UTF-8 pendientes de decodificar).
+        """
+        self._descripcion = descripcion
 
     def cambiar_estado(self, nuevo_estado: EstadoTarea):
         """
@@ -109,7 +146,7 @@ class Tarea:
         usuario : str
             Nombre o identificador del usuario a asignar.
         """
-        self.usuario_asignado = usuario
+        self.usuario_asignado = sys.intern(usuario) if usuario else usuario
 
     def modificar(self,
                   titulo: Optional[str] = None,
@@ -145,7 +182,56 @@ class Tarea:
         if prioridad:
             self.prioridad = prioridad
         if etiquetas is not None:
-            self.etiquetas = etiquetas
+            self.etiquetas = _internar_etiquetas(etiquetas)
+
+    def a_dict(self) -> Dict[str, Any]:
+        """
+        Convierte la tarea en un diccionario con tipos básicos, apto para JSON.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Diccionario con todos los campos de la tarea. La fecha se representa en formato
+            "YYYY-MM-DD" y el estado por el nombre del miembro de EstadoTarea.
+        """
+        return {
+            "id_tarea": self.id_tarea,
+            "titulo": self.titulo,
+            "descripcion": self.descripcion,
+            "fecha_limite": self.fecha_limite.isoformat() if self.fecha_limite else None,
+            "estado": self.estado.name,
+            "prioridad": self.prioridad,
+            "etiquetas": list(self.etiquetas),
+            "usuario_asignado": self.usuario_asignado,
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> 'Tarea':
+        """
+        Reconstruye una tarea a partir del diccionario generado por `a_dict`.
+
+        Parameters
+        ----------
+        datos : Dict[str, Any]
+            Diccionario con los campos de la tarea.
+
+        Returns
+        -------
+        Tarea
+            Nueva instancia con los mismos valores.
+        """
+        fecha = datos.get("fecha_limite")
+        tarea = cls(
+            id_tarea=datos["id_tarea"],
+            titulo=datos["titulo"],
+            descripcion=datos.get("descripcion", ""),
+            fecha_limite=date.fromisoformat(fecha) if fecha else None,
+            prioridad=datos.get("prioridad", 2),
+            etiquetas=datos.get("etiquetas"),
+            usuario_asignado=datos.get("usuario_asignado")
+        )
+        tarea.estado = EstadoTarea[datos.get("estado", "PENDIENTE")]
+        return tarea
 
     def __lt__(self, otra_tarea: 'Tarea') -> bool:
         """
@@ -174,3 +260,24 @@ class Tarea:
         """
         return f"[{self.estado.value.upper()}] {self.titulo} (Prioridad {self.prioridad})"
 
+
+def _internar_etiquetas(etiquetas: Optional[List[str]]) -> Tuple[str, ...]:
+    """
+    Convierte una lista de etiquetas en una tupla de cadenas internadas.
+
+    Todas las tareas sin etiquetas comparten la misma tupla vacía y cada etiqueta distinta
+    se almacena una sola vez en memoria.
+
+    Parameters
+    ----------
+    etiquetas : Optional[List[str]]
+        Lista de etiquetas a convertir.
+
+    Returns
+    -------
+    Tuple[str, ...]
+        Tupla de etiquetas internadas.
+    """
+    if not etiquetas:
+        return ()
+    return tuple(sys.intern(etiqueta) for etiqueta in etiquetas)
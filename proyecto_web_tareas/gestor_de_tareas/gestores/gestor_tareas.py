@@ -11,15 +11,35 @@ Dependencias:
     - typing para especificar listas y tipos opcionales.
     - gestor_de_tareas.clases.tarea: Tarea, EstadoTarea.
     - gestor_de_tareas.utilidades.decoradores: log_funcion.
+    - gestor_de_tareas.utilidades.concurrencia: sincronización entre hilos.
 """
 
-from datetime import datetime
-from typing import List, Optional
+import heapq
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
+import threading
 from gestor_de_tareas.clases.tarea import Tarea, EstadoTarea
+from gestor_de_tareas.utilidades.concurrencia import escritura, lectura, leer_optimista, preparar
 from gestor_de_tareas.utilidades.decoradores import log_funcion  # Mantener import original
+from gestor_de_tareas.utilidades.busqueda import IndiceInvertido
+from gestor_de_tareas.utilidades.eventos import Publicador
+from gestor_de_tareas.utilidades.indices import IndiceOrdenado
+from gestor_de_tareas.utilidades.paginacion import (ORDINAL_SIN_FECHA, clave_cursor, codificar_cursor,
+                                                    decodificar_cursor)
+from gestor_de_tareas.utilidades.importacion import TAMANO_LOTE, por_lotes, sin_recolector, validar_lote
 
+# Ordinal usado para las tareas sin fecha límite: se ordenan detrás de las que tienen fecha.
+_SIN_FECHA = ORDINAL_SIN_FECHA
+# Estados de las tareas que aún pueden vencer.
+_ESTADOS_ABIERTOS = tuple(estado for estado in EstadoTarea if estado != EstadoTarea.COMPLETADA)
+# Al paginar por ID con filtros, si el menor índice tiene como mucho este número de tareas por
+# cada tarea pedida, se ordena directamente; si no, se recorren los IDs comprobando los filtros.
+_FACTOR_INDICE_PEQUENO = 20
 
-class GestorDeTareas:
+
+class GestorDeTareas(Publicador):
     """
     Clase GestorDeTareas.
 
@@ -27,22 +47,284 @@ class GestorDeTareas:
 
     Attributes
     ----------
-    tareas : List[Tarea]
-        Lista de tareas gestionadas.
+    tareas : Dict[int, Tarea]
+        Índice de tareas gestionadas por identificador. Al ser un diccionario conserva el
+        orden de creación y permite buscar, actualizar y eliminar en O(1). Tras
+        `cargar_perezosamente` es un mapeo que decodifica cada tarea al pedirla.
     contador_id : int
         Contador para asignar identificadores únicos a cada tarea.
+    cerrojo : threading.RLock
+        Cerrojo que serializa las modificaciones.
+    version : int
+        Se incrementa al empezar y al terminar cada modificación (ver
+        gestor_de_tareas.utilidades.concurrencia).
+
+    Además de `tareas`, el gestor mantiene índices secundarios por estado, por usuario
+    asignado y por etiqueta. Cada índice asocia una clave con el conjunto de IDs de sus
+    tareas, de modo que los filtros cuestan O(resultado) y no O(total de tareas).
+    Los IDs existentes se guardan además en una lista ordenada, sobre la que `paginar` y
+    `recorrer` localizan el cursor con búsqueda binaria aunque se hayan eliminado muchas
+    tareas. También se mantiene, para cada estado, un índice ordenado por prioridad (desempatando
+    por fecha límite y luego por ID) que se actualiza de forma incremental, y otro por
+    fecha límite y luego por ID con las tareas que tienen fecha, sobre el que se resuelven
+    las consultas de vencimientos (`vencen_entre`, `vencidas`, `proximos_vencimientos`)
+    en O(log n + k) mediante búsqueda binaria. Para `buscar` se mantiene un índice invertido
+    de las palabras de títulos y descripciones (ver gestor_de_tareas.utilidades.busqueda),
+    que se construye en la primera búsqueda y después se actualiza al crear, modificar,
+    restaurar y eliminar tareas. Todas las modificaciones de tareas deben pasar por el gestor para que los índices
+    se mantengan correctos.
+
+    Cada modificación se publica como evento (ver `Publicador`): "crear", "modificar",
+    "cambiar_estado" (con el estado "anterior"), "asignar" y "eliminar", todos con la
+    tarea afectada en "tarea". `restaurar_tarea` publica "restaurar", con la tarea que
+    sustituye en "anterior" (o None), para que otros gestores actualicen sus referencias.
+
+    El gestor se puede usar desde varios hilos: las modificaciones (y la asignación de IDs
+    con `contador_id`) se hacen con `cerrojo` tomado, y los eventos se publican dentro de la
+    misma sección, de modo que los suscriptores los reciben en orden. Las consultas no
+    toman el cerrojo salvo que coincidan con una modificación.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, cerrojo: Optional[threading.RLock] = None) -> None:
         """
         Inicializa una nueva instancia de GestorDeTareas.
 
-        Crea una lista vacía de tareas y establece el contador de IDs en 1.
+        Crea un índice vacío de tareas y establece el contador de IDs en 1.
+
+        Parameters
+        ----------
+        cerrojo : Optional[threading.RLock], optional
+            Cerrojo a compartir con otro gestor (p. ej. el de proyectos que escribe en el
+            mismo diario). Por defecto se crea uno nuevo.
         """
-        self.tareas: List[Tarea] = []
+        super().__init__()
+        preparar(self, cerrojo)
+        self.tareas: Dict[int, Tarea] = {}
         self.contador_id = 1
+        self._por_estado: Dict[EstadoTarea, Set[int]] = {estado: set() for estado in EstadoTarea}
+        self._por_usuario: Dict[str, Set[int]] = {}
+        self._por_etiqueta: Dict[str, Set[int]] = {}
+        self._por_prioridad: Dict[EstadoTarea, IndiceOrdenado] = {estado: IndiceOrdenado()
+                                                                 for estado in EstadoTarea}
+        self._por_fecha: Dict[EstadoTarea, IndiceOrdenado] = {estado: IndiceOrdenado() for estado in EstadoTarea}
+        self._por_id = IndiceOrdenado()
+        # Índice de texto; None hasta la primera búsqueda (ver `_asegurar_busqueda`).
+        self._busqueda: Optional[IndiceInvertido] = None
+        # Si es True, los índices secundarios se construirán en la primera consulta.
+        self._indices_pendientes = False
+
+    @escritura
+    def cargar_perezosamente(self, tareas: Mapping[int, Tarea]) -> None:
+        """
+        Sustituye las tareas del gestor por un mapeo que las decodifica bajo demanda.
+
+        Pensado para el arranque con una instantánea grande (ver
+        gestor_de_tareas.almacenamiento.mapeado.TareasMapeadas): no se decodifica ninguna
+        tarea y los índices secundarios se construyen en la primera consulta que los
+        necesita, a partir de `tareas.campos_indice()`. `contador_id` no se modifica: debe
+        ajustarlo quien carga la instantánea.
+
+        Parameters
+        ----------
+        tareas : Mapping[int, Tarea]
+            Mapeo mutable de tareas con el método `campos_indice`.
+        """
+        self.tareas = tareas
+        self._por_estado = {estado: set() for estado in EstadoTarea}
+        self._por_usuario = {}
+        self._por_etiqueta = {}
+        self._por_prioridad = {estado: IndiceOrdenado() for estado in EstadoTarea}
+        self._por_fecha = {estado: IndiceOrdenado() for estado in EstadoTarea}
+        self._por_id = IndiceOrdenado()
+        self._busqueda = None
+        self._indices_pendientes = True
+
+    def _asegurar_indices(self) -> None:
+        """
+        Construye los índices secundarios si están pendientes tras `cargar_perezosamente`.
+
+        Se construyen con el cerrojo tomado y se publican al final, de modo que las consultas
+        de otros hilos nunca ven índices a medio construir.
+        """
+        if not self._indices_pendientes:
+            return
+        with self.cerrojo:
+            if not self._indices_pendientes:
+                return
+            por_estado: Dict[EstadoTarea, Set[int]] = {estado: set() for estado in EstadoTarea}
+            por_usuario: Dict[str, Set[int]] = {}
+            por_etiqueta: Dict[str, Set[int]] = {}
+            claves: Dict[EstadoTarea, List[Tuple[int, int, int]]] = {estado: [] for estado in EstadoTarea}
+            fechas: Dict[EstadoTarea, List[Tuple[int, int]]] = {estado: [] for estado in EstadoTarea}
+            ids: List[int] = []
+            for id_tarea, estado, prioridad, fecha, usuario, etiquetas in self.tareas.campos_indice():
+                ids.append(id_tarea)
+                por_estado[estado].add(id_tarea)
+                claves[estado].append((prioridad, fecha or _SIN_FECHA, id_tarea))
+                if fecha:
+                    fechas[estado].append((fecha, id_tarea))
+                if usuario:
+                    por_usuario.setdefault(usuario, set()).add(id_tarea)
+                for etiqueta in etiquetas:
+                    por_etiqueta.setdefault(etiqueta, set()).add(id_tarea)
+            for estado, claves_estado in claves.items():
+                self._por_prioridad[estado].cargar(claves_estado)
+                self._por_fecha[estado].cargar(fechas[estado])
+            self._por_id.cargar(ids)
+            self._por_estado = por_estado
+            self._por_usuario = por_usuario
+            self._por_etiqueta = por_etiqueta
+            self._indices_pendientes = False
+
+    def _asegurar_busqueda(self) -> IndiceInvertido:
+        """
+        Construye el índice de texto si aún no existe y lo devuelve.
+
+        Como `_asegurar_indices`, se construye con el cerrojo tomado y se publica al final.
+
+        Returns
+        -------
+        IndiceInvertido
+            Índice de texto de las tareas.
+        """
+        busqueda = self._busqueda
+        if busqueda is not None:
+            return busqueda
+        with self.cerrojo:
+            if self._busqueda is None:
+                busqueda = IndiceInvertido()
+                busqueda.cargar((tarea.id_tarea, tarea.titulo, tarea.descripcion) for tarea in self.tareas.values())
+                self._busqueda = busqueda
+            return self._busqueda
+
+    def _indexar_texto(self, tarea: Tarea) -> None:
+        """
+        Añade o actualiza el título y la descripción de una tarea en el índice de texto.
+        """
+        if self._busqueda is not None:
+            self._busqueda.agregar(tarea.id_tarea, tarea.titulo, tarea.descripcion)
+
+    def _desindexar_texto(self, id_tarea: int) -> None:
+        """
+        Retira una tarea del índice de texto.
+        """
+        if self._busqueda is not None:
+            self._busqueda.quitar(id_tarea)
+
+    def _agregar_ids(self, ids: List[int]) -> None:
+        """
+        Añade los IDs de tareas nuevas a la lista ordenada de IDs existentes.
+        """
+        if not self._indices_pendientes:
+            self._por_id.cargar(ids)
+
+    def _quitar_ids(self, ids: List[int]) -> None:
+        """
+        Retira los IDs de tareas eliminadas de la lista ordenada de IDs existentes.
+        """
+        if not self._indices_pendientes:
+            self._por_id.quitar_varias(ids)
+
+    def _indexar(self, tarea: Tarea) -> None:
+        """
+        Añade una tarea a los índices secundarios.
+
+        Parameters
+        ----------
+        tarea : Tarea
+            Tarea a indexar.
+        """
+        if self._indices_pendientes:
+            return
+        self._por_estado[tarea.estado].add(tarea.id_tarea)
+        self._por_prioridad[tarea.estado].agregar(_clave_prioridad(tarea))
+        if tarea.fecha_limite:
+            self._por_fecha[tarea.estado].agregar(_clave_fecha(tarea))
+        if tarea.usuario_asignado:
+            self._por_usuario.setdefault(tarea.usuario_asignado, set()).add(tarea.id_tarea)
+        for etiqueta in tarea.etiquetas:
+            self._por_etiqueta.setdefault(etiqueta, set()).add(tarea.id_tarea)
+
+    def _desindexar(self, tarea: Tarea) -> None:
+        """
+        Retira una tarea de los índices secundarios.
+
+        Las claves que se quedan sin tareas se eliminan para no acumular entradas vacías.
+
+        Parameters
+        ----------
+        tarea : Tarea
+            Tarea a retirar de los índices.
+        """
+        if self._indices_pendientes:
+            return
+        self._por_estado[tarea.estado].discard(tarea.id_tarea)
+        self._por_prioridad[tarea.estado].quitar(_clave_prioridad(tarea))
+        if tarea.fecha_limite:
+            self._por_fecha[tarea.estado].quitar(_clave_fecha(tarea))
+        if tarea.usuario_asignado:
+            _quitar_de_indice(self._por_usuario, tarea.usuario_asignado, tarea.id_tarea)
+        for etiqueta in tarea.etiquetas:
+            _quitar_de_indice(self._por_etiqueta, etiqueta, tarea.id_tarea)
+
+    def _indexar_lote(self, tareas: List[Tarea]) -> None:
+        """
+        Añade varias tareas a los índices secundarios, actualizando cada índice una vez.
+
+        Parameters
+        ----------
+        tareas : List[Tarea]
+            Tareas a indexar.
+        """
+        if self._indices_pendientes:
+            return
+        claves: Dict[EstadoTarea, List[Tuple[int, int, int]]] = {estado: [] for estado in EstadoTarea}
+        fechas: Dict[EstadoTarea, List[Tuple[int, int]]] = {estado: [] for estado in EstadoTarea}
+        for tarea in tareas:
+            self._por_estado[tarea.estado].add(tarea.id_tarea)
+            claves[tarea.estado].append(_clave_prioridad(tarea))
+            if tarea.fecha_limite:
+                fechas[tarea.estado].append(_clave_fecha(tarea))
+            if tarea.usuario_asignado:
+                self._por_usuario.setdefault(tarea.usuario_asignado, set()).add(tarea.id_tarea)
+            for etiqueta in tarea.etiquetas:
+                self._por_etiqueta.setdefault(etiqueta, set()).add(tarea.id_tarea)
+        for estado, claves_estado in claves.items():
+            if claves_estado:
+                self._por_prioridad[estado].cargar(claves_estado)
+            if fechas[estado]:
+                self._por_fecha[estado].cargar(fechas[estado])
+
+    def _desindexar_lote(self, tareas: List[Tarea]) -> None:
+        """
+        Retira varias tareas de los índices secundarios, actualizando cada índice una vez.
+
+        Parameters
+        ----------
+        tareas : List[Tarea]
+            Tareas a retirar de los índices.
+        """
+        if self._indices_pendientes:
+            return
+        claves: Dict[EstadoTarea, List[Tuple[int, int, int]]] = {estado: [] for estado in EstadoTarea}
+        fechas: Dict[EstadoTarea, List[Tuple[int, int]]] = {estado: [] for estado in EstadoTarea}
+        for tarea in tareas:
+            self._por_estado[tarea.estado].discard(tarea.id_tarea)
+            claves[tarea.estado].append(_clave_prioridad(tarea))
+            if tarea.fecha_limite:
+                fechas[tarea.estado].append(_clave_fecha(tarea))
+            if tarea.usuario_asignado:
+                _quitar_de_indice(self._por_usuario, tarea.usuario_asignado, tarea.id_tarea)
+            for etiqueta in tarea.etiquetas:
+                _quitar_de_indice(self._por_etiqueta, etiqueta, tarea.id_tarea)
+        for estado, claves_estado in claves.items():
+            if claves_estado:
+                self._por_prioridad[estado].quitar_varias(claves_estado)
+            if fechas[estado]:
+                self._por_fecha[estado].quitar_varias(fechas[estado])
 
     @log_funcion  # Mantener decorador original
+    @escritura
     def crear_tarea(self,
                     titulo: str,
                     descripcion: str = "",
@@ -74,23 +356,122 @@ class GestorDeTareas:
             La tarea creada si la fecha se puede parsear correctamente; de lo contrario, None.
         """
         try:
-            fecha = datetime.strptime(fecha_limite_str, "%Y-%m-%d").date() if fecha_limite_str else None
-            tarea = Tarea(
-                id_tarea=self.contador_id,
-                titulo=titulo,
-                descripcion=descripcion,
-                fecha_limite=fecha,
-                prioridad=prioridad,
-                etiquetas=etiquetas,
-                usuario_asignado=usuario_asignado
-            )
-            self.tareas.append(tarea)
-            self.contador_id += 1
-            return tarea
+            fecha = _parsear_fecha(fecha_limite_str) if fecha_limite_str else None
         except ValueError:
             print("[ERROR] Fecha mal formateada. Usa YYYY-MM-DD.")
             return None
+        tarea = Tarea(
+            id_tarea=self.contador_id,
+            titulo=titulo,
+            descripcion=descripcion,
+            fecha_limite=fecha,
+            prioridad=prioridad,
+            etiquetas=etiquetas,
+            usuario_asignado=usuario_asignado
+        )
+        self.tareas[tarea.id_tarea] = tarea
+        self._agregar_ids([tarea.id_tarea])
+        self._indexar(tarea)
+        self._indexar_texto(tarea)
+        self.contador_id += 1
+        self._publicar("crear", tarea=tarea)
+        return tarea
+
+    def crear_tareas(self,
+                     registros: Iterable[Any],
+                     lote: int = TAMANO_LOTE) -> Tuple[List[int], List[Tuple[int, str]]]:
+        """
+        Crea muchas tareas a partir de registros leídos de NDJSON o CSV.
+
+        Los registros se procesan por lotes: cada lote se valida entero (las fechas se
+        analizan una vez por valor distinto), recibe un rango consecutivo de IDs y actualiza
+        los índices secundarios una sola vez. Un registro con errores no detiene la
+        importación: se informa en su posición y no consume ID. Se publica un evento "crear"
+        por cada tarea creada. El cerrojo se toma una vez por lote, no durante toda la
+        importación.
+
+        Parameters
+        ----------
+        registros : Iterable[Any]
+            Registros de `leer_ndjson` o `leer_csv` (ver gestor_de_tareas.utilidades.importacion)
+            o diccionarios con los campos de `Tarea.a_dict`.
+        lote : int, optional
+            Número de registros por lote (por defecto TAMANO_LOTE).
+
+        Returns
+        -------
+        Tuple[List[int], List[Tuple[int, str]]]
+            IDs de las tareas creadas, en el orden de entrada, y pares (posición del registro,
+            empezando en 1, mensaje de error) de los registros rechazados.
+        """
+        creadas: List[int] = []
+        errores: List[Tuple[int, str]] = []
+        for registros_lote in por_lotes(registros, lote):
+            with sin_recolector():
+                validos, errores_lote = validar_lote(registros_lote)
+            errores.extend(errores_lote)
+            creadas.extend(self._insertar_lote(validos))
+        return creadas, errores
+
+    @escritura
+    def _insertar_lote(self, validos: List[Tuple[int, List[Any]]]) -> List[int]:
+        """
+        Crea las tareas de un lote ya validado con un rango consecutivo de IDs.
+
+        Parameters
+        ----------
+        validos : List[Tuple[int, List[Any]]]
+            Pares (posición, campos) devueltos por `validar_lote`.
+
+        Returns
+        -------
+        List[int]
+            IDs de las tareas creadas.
+        """
+        with sin_recolector():
+            primer_id = self.contador_id
+            self.contador_id += len(validos)
+            tareas = []
+            for id_tarea, (_, campos) in enumerate(validos, primer_id):
+                titulo, descripcion, fecha, prioridad, etiquetas, usuario, estado = campos
+                tarea = Tarea(id_tarea, titulo, descripcion, fecha, prioridad, etiquetas, usuario)
+                tarea.estado = estado
+                self.tareas[id_tarea] = tarea
+                tareas.append(tarea)
+            self._agregar_ids([tarea.id_tarea for tarea in tareas])
+            self._indexar_lote(tareas)
+            for tarea in tareas:
+                self._indexar_texto(tarea)
+        for tarea in tareas:
+            self._publicar("crear", tarea=tarea)
+        return [tarea.id_tarea for tarea in tareas]
 
+    @escritura
+    def restaurar_tarea(self, tarea: Tarea) -> None:
+        """
+        Inserta o reemplaza una tarea ya existente, por ejemplo al cargarla desde disco.
+
+        Conserva el ID de la tarea, actualiza los índices y ajusta `contador_id` para que
+        las nuevas tareas no reutilicen identificadores. Publica el evento "restaurar", que
+        el diario no registra.
+
+        Parameters
+        ----------
+        tarea : Tarea
+            Tarea a restaurar.
+        """
+        anterior = self.tareas.get(tarea.id_tarea)
+        if anterior is not None:
+            self._desindexar(anterior)
+        else:
+            self._agregar_ids([tarea.id_tarea])
+        _insertar_en_orden(self.tareas, tarea)
+        self._indexar(tarea)
+        self._indexar_texto(tarea)
+        self.contador_id = max(self.contador_id, tarea.id_tarea + 1)
+        self._publicar("restaurar", tarea=tarea, anterior=anterior)
+
+    @escritura
     def marcar_completada(self, id_tarea: int) -> bool:
         """
         Marca una tarea como completada.
@@ -105,25 +486,31 @@ class GestorDeTareas:
         bool
             True si la tarea fue encontrada y marcada como completada, False en caso contrario.
         """
-        tarea = next((t for t in self.tareas if t.id_tarea == id_tarea), None)
+        tarea = self.tareas.get(id_tarea)
         if tarea:
+            anterior = tarea.estado
+            self._desindexar(tarea)
             tarea.completar()
+            self._indexar(tarea)
+            self._publicar("cambiar_estado", tarea=tarea, anterior=anterior)
             return True
         return False
 
     @log_funcion
+    @lectura
     def listar_tareas(self) -> List[Tarea]:
         """
-        Retorna la lista de todas las tareas gestionadas.
+        Retorna la lista de todas las tareas gestionadas, en orden de creación.
 
         Returns
         -------
         List[Tarea]
             Lista de tareas registradas en el gestor.
         """
-        return self.tareas
+        return list(self.tareas.values())
 
     @log_funcion
+    @lectura
     def obtener_por_id(self, id_tarea: int) -> Optional[Tarea]:
         """
         Obtiene una tarea a partir de su identificador.
@@ -138,12 +525,10 @@ class GestorDeTareas:
         Optional[Tarea]
             La tarea encontrada o None si no existe.
         """
-        for t in self.tareas:
-            if t.id_tarea == id_tarea:
-                return t
-        return None
+        return self.tareas.get(id_tarea)
 
     @log_funcion
+    @lectura
     def filtrar_por_estado(self, estado: EstadoTarea) -> List[Tarea]:
         """
         Filtra las tareas por un estado específico.
@@ -156,11 +541,274 @@ class GestorDeTareas:
         Returns
         -------
         List[Tarea]
-            Lista de tareas que cumplen con el estado proporcionado.
+            Lista de tareas que cumplen con el estado proporcionado, en orden de creación.
+        """
+        self._asegurar_indices()
+        return _en_orden_de_creacion(self.tareas, self._por_estado[estado])
+
+    @log_funcion
+    @lectura
+    def filtrar_por_usuario(self, usuario: str) -> List[Tarea]:
+        """
+        Filtra las tareas asignadas a un usuario.
+
+        Parameters
+        ----------
+        usuario : str
+            Usuario asignado por el que se filtra.
+
+        Returns
+        -------
+        List[Tarea]
+            Lista de tareas asignadas al usuario, en orden de creación.
+        """
+        self._asegurar_indices()
+        return _en_orden_de_creacion(self.tareas, self._por_usuario.get(usuario, ()))
+
+    @log_funcion
+    @lectura
+    def filtrar_por_etiqueta(self, etiqueta: str) -> List[Tarea]:
+        """
+        Filtra las tareas que contienen una etiqueta.
+
+        Parameters
+        ----------
+        etiqueta : str
+            Etiqueta por la que se filtra.
+
+        Returns
+        -------
+        List[Tarea]
+            Lista de tareas con la etiqueta, en orden de creación.
+        """
+        self._asegurar_indices()
+        return _en_orden_de_creacion(self.tareas, self._por_etiqueta.get(etiqueta, ()))
+
+    @log_funcion
+    @lectura
+    def consultar(self,
+                  estado: Optional[EstadoTarea] = None,
+                  usuario: Optional[str] = None,
+                  etiqueta: Optional[str] = None) -> List[Tarea]:
+        """
+        Filtra las tareas combinando varios criterios.
+
+        Los criterios que se dejan en None no se aplican. Se recorre únicamente el índice
+        más pequeño de los solicitados y el resto se comprueba con búsquedas O(1), por lo
+        que el coste depende del tamaño del menor índice y no del total de tareas.
+
+        Parameters
+        ----------
+        estado : Optional[EstadoTarea], optional
+            Estado que deben tener las tareas.
+        usuario : Optional[str], optional
+            Usuario al que deben estar asignadas.
+        etiqueta : Optional[str], optional
+            Etiqueta que deben contener.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas que cumplen todos los criterios, en orden de creación.
+        """
+        indices = []
+        if estado is not None or usuario is not None or etiqueta is not None:
+            self._asegurar_indices()
+        if estado is not None:
+            indices.append(self._por_estado[estado])
+        if usuario is not None:
+            indices.append(self._por_usuario.get(usuario, set()))
+        if etiqueta is not None:
+            indices.append(self._por_etiqueta.get(etiqueta, set()))
+        if not indices:
+            return self.listar_tareas()
+
+        indices.sort(key=len)
+        menor, resto = indices[0], indices[1:]
+        coincidencias = [id_tarea for id_tarea in menor if all(id_tarea in indice for indice in resto)]
+        return _en_orden_de_creacion(self.tareas, coincidencias)
+
+    @log_funcion
+    def paginar(self,
+                limite: int = 50,
+                cursor: Optional[str] = None,
+                orden: str = "id",
+                estado: Optional[EstadoTarea] = None,
+                usuario: Optional[str] = None,
+                etiqueta: Optional[str] = None) -> Tuple[List[Tarea], Optional[str]]:
+        """
+        Devuelve una página de tareas usando paginación por cursor.
+
+        Con `orden="id"` las tareas se listan en orden de creación y la página siguiente se
+        localiza comprobando los IDs posteriores al cursor. Con `orden="prioridad"` se sigue
+        el orden de `ordenar_por_prioridad` y la posición del cursor se busca con bisect en
+        los índices ordenados. En ambos casos el coste depende del tamaño de la página y no
+        del número total de tareas.
+
+        Parameters
+        ----------
+        limite : int, optional
+            Número máximo de tareas de la página (por defecto 50).
+        cursor : Optional[str], optional
+            Cursor devuelto por la página anterior; None para la primera página.
+        orden : str, optional
+            "id" (por defecto) o "prioridad".
+        estado : Optional[EstadoTarea], optional
+            Estado que deben tener las tareas.
+        usuario : Optional[str], optional
+            Usuario al que deben estar asignadas.
+        etiqueta : Optional[str], optional
+            Etiqueta que deben contener.
+
+        Returns
+        -------
+        Tuple[List[Tarea], Optional[str]]
+            Tareas de la página y cursor de la página siguiente (None si es la última). Si el
+            cursor no es válido se muestra un error y se devuelve una página vacía.
+        """
+        try:
+            clave = decodificar_cursor(cursor, orden)
+        except ValueError:
+            print("[ERROR] Cursor de paginación no válido.")
+            return [], None
+        return self._pagina(limite, clave, orden, estado, usuario, etiqueta)
+
+    @lectura
+    def _pagina(self,
+                limite: int,
+                clave: Optional[Tuple[int, ...]],
+                orden: str,
+                estado: Optional[EstadoTarea],
+                usuario: Optional[str],
+                etiqueta: Optional[str]) -> Tuple[List[Tarea], Optional[str]]:
+        """
+        Calcula la página de `paginar` a partir del cursor ya decodificado.
+
+        Es la parte de `paginar` que consulta las tareas; el error de un cursor no válido se
+        muestra fuera, porque una lectura que coincide con una escritura se repite.
+
+        Returns
+        -------
+        Tuple[List[Tarea], Optional[str]]
+            Tareas de la página y cursor de la página siguiente (None si es la última).
+        """
+        filtros = []
+        if estado is not None or usuario is not None or etiqueta is not None:
+            self._asegurar_indices()
+        if usuario is not None:
+            filtros.append(self._por_usuario.get(usuario, set()))
+        if etiqueta is not None:
+            filtros.append(self._por_etiqueta.get(etiqueta, set()))
+
+        if orden == "prioridad":
+            if estado is not None:
+                claves = self._por_prioridad[estado].desde(clave)
+            else:
+                claves = heapq.merge(*(indice.desde(clave) for indice in self._por_prioridad.values()))
+            candidatos = (clave_tarea[-1] for clave_tarea in claves)
+        else:
+            if estado is not None:
+                filtros.append(self._por_estado[estado])
+            candidatos = self._ids_desde(clave[0] if clave else 0, filtros, limite)
+
+        ids = []
+        for id_tarea in candidatos:
+            if all(id_tarea in filtro for filtro in filtros):
+                ids.append(id_tarea)
+                if len(ids) > limite:
+                    break
+        tareas = [self.tareas[id_tarea] for id_tarea in ids[:limite]]
+        siguiente = codificar_cursor(clave_cursor(tareas[-1], orden)) if len(ids) > limite else None
+        return tareas, siguiente
+
+    def _ids_desde(self, ultimo_id: int, filtros: List[Set[int]], limite: int) -> Iterator[int]:
+        """
+        Itera en orden ascendente sobre los IDs existentes mayores que `ultimo_id`.
+
+        Si alguno de los filtros es pequeño en relación con la página pedida, se ordenan sus
+        IDs; en otro caso se recorre la lista ordenada de IDs existentes a partir del cursor,
+        localizado con búsqueda binaria, así que los IDs de las tareas eliminadas no cuestan
+        nada.
+
+        Parameters
+        ----------
+        ultimo_id : int
+            Último ID ya listado (0 para empezar desde el principio).
+        filtros : List[Set[int]]
+            Índices secundarios que deben contener a las tareas.
+        limite : int
+            Tamaño de la página.
+
+        Returns
+        -------
+        Iterator[int]
+            IDs candidatos, todavía sin comprobar contra los filtros.
+        """
+        if filtros:
+            menor = min(filtros, key=len)
+            if len(menor) <= (limite + 1) * _FACTOR_INDICE_PEQUENO:
+                return iter(sorted(id_tarea for id_tarea in menor if id_tarea > ultimo_id))
+        self._asegurar_indices()
+        return self._por_id.desde(ultimo_id)
+
+    def recorrer(self,
+                 estado: Optional[EstadoTarea] = None,
+                 usuario: Optional[str] = None,
+                 etiqueta: Optional[str] = None,
+                 lote: int = 1000) -> Iterator[Tarea]:
+        """
+        Itera sobre las tareas en orden de creación sin construir la lista completa.
+
+        Pensado para exportar todas las tareas: se avanza por lotes de IDs como en `paginar`,
+        de modo que la memoria usada depende de `lote` y no del total, y las tareas creadas o
+        eliminadas mientras se recorre no interrumpen la iteración. Tras
+        `cargar_perezosamente` las tareas que no estaban en memoria se decodifican sin
+        guardarse. Cada lote de IDs se selecciona como una consulta (ver `lectura`), sin
+        bloquear a los demás hilos entre lotes.
+
+        Parameters
+        ----------
+        estado : Optional[EstadoTarea], optional
+            Estado que deben tener las tareas.
+        usuario : Optional[str], optional
+            Usuario al que deben estar asignadas.
+        etiqueta : Optional[str], optional
+            Etiqueta que deben contener.
+        lote : int, optional
+            Número de IDs que se seleccionan en cada paso (por defecto 1000).
+
+        Returns
+        -------
+        Iterator[Tarea]
+            Tareas que cumplen todos los criterios.
         """
-        return [t for t in self.tareas if t.estado == estado]
+        def siguientes(ultimo_id: int) -> List[int]:
+            filtros = []
+            if estado is not None or usuario is not None or etiqueta is not None:
+                self._asegurar_indices()
+            if estado is not None:
+                filtros.append(self._por_estado[estado])
+            if usuario is not None:
+                filtros.append(self._por_usuario.get(usuario, set()))
+            if etiqueta is not None:
+                filtros.append(self._por_etiqueta.get(etiqueta, set()))
+            return list(islice((id_tarea for id_tarea in self._ids_desde(ultimo_id, filtros, lote)
+                                if all(id_tarea in filtro for filtro in filtros)), lote))
+
+        leer = getattr(self.tareas, "leer", self.tareas.get)
+        ultimo_id = 0
+        while True:
+            ids = leer_optimista(self, siguientes, ultimo_id)
+            if not ids:
+                return
+            for id_tarea in ids:
+                tarea = leer(id_tarea)
+                if tarea is not None:
+                    yield tarea
+            ultimo_id = ids[-1]
 
     @log_funcion
+    @escritura
     def cambiar_estado_tarea(self, id_tarea: int, nuevo_estado: EstadoTarea) -> bool:
         """
         Cambia el estado de una tarea identificada por su ID.
@@ -179,16 +827,74 @@ class GestorDeTareas:
         """
         tarea = self.obtener_por_id(id_tarea)
         if tarea:
+            anterior = tarea.estado
+            self._desindexar(tarea)
             tarea.cambiar_estado(nuevo_estado)
+            self._indexar(tarea)
+            self._publicar("cambiar_estado", tarea=tarea, anterior=anterior)
             return True
         return False
 
+    @escritura
+    def cambiar_estado_tareas(self,
+                              ids: Iterable[int],
+                              nuevo_estado: EstadoTarea) -> Tuple[List[int], List[Tuple[int, str]]]:
+        """
+        Cambia el estado de varias tareas, actualizando los índices una sola vez.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Identificadores de las tareas. Los repetidos se procesan una vez.
+        nuevo_estado : EstadoTarea
+            Nuevo estado a asignar.
+
+        Returns
+        -------
+        Tuple[List[int], List[Tuple[int, str]]]
+            IDs de las tareas actualizadas y pares (ID, mensaje de error) de las que no existen.
+        """
+        tareas, errores = self._buscar_lote(ids)
+        self._desindexar_lote(tareas)
+        anteriores = [tarea.estado for tarea in tareas]
+        for tarea in tareas:
+            tarea.cambiar_estado(nuevo_estado)
+        self._indexar_lote(tareas)
+        for tarea, anterior in zip(tareas, anteriores):
+            self._publicar("cambiar_estado", tarea=tarea, anterior=anterior)
+        return [tarea.id_tarea for tarea in tareas], errores
+
+    def _buscar_lote(self, ids: Iterable[int]) -> Tuple[List[Tarea], List[Tuple[int, str]]]:
+        """
+        Busca las tareas de una operación por lotes.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Identificadores pedidos; los repetidos se ignoran.
+
+        Returns
+        -------
+        Tuple[List[Tarea], List[Tuple[int, str]]]
+            Tareas encontradas, en el orden pedido, y pares (ID, mensaje) de las que no existen.
+        """
+        tareas: List[Tarea] = []
+        errores: List[Tuple[int, str]] = []
+        for id_tarea in dict.fromkeys(ids):
+            tarea = self.tareas.get(id_tarea)
+            if tarea is None:
+                errores.append((id_tarea, "Tarea no encontrada."))
+            else:
+                tareas.append(tarea)
+        return tareas, errores
+
     @log_funcion
+    @escritura
     def modificar_tarea(self,
                         id_tarea: int,
                         titulo: Optional[str] = None,
                         descripcion: Optional[str] = None,
-                        fecha_limite: Optional[datetime] = None,
+                        fecha_limite: Optional[Union[date, str]] = None,
                         prioridad: Optional[int] = None,
                         etiquetas: Optional[List[str]] = None) -> bool:
         """
@@ -204,8 +910,8 @@ class GestorDeTareas:
             Nuevo título para la tarea.
         descripcion : str, optional
             Nueva descripción para la tarea.
-        fecha_limite : datetime, optional
-            Nueva fecha límite para la tarea.
+        fecha_limite : date o str, optional
+            Nueva fecha límite para la tarea, como objeto date o en formato "YYYY-MM-DD".
         prioridad : int, optional
             Nueva prioridad para la tarea.
         etiquetas : Optional[List[str]], optional
@@ -214,15 +920,28 @@ class GestorDeTareas:
         Returns
         -------
         bool
-            True si la tarea fue encontrada y modificada, False en caso contrario.
+            True si la tarea fue encontrada y modificada, False en caso contrario (también si
+            la fecha está mal formateada).
         """
         tarea = self.obtener_por_id(id_tarea)
-        if tarea:
-            tarea.modificar(titulo, descripcion, fecha_limite, prioridad, etiquetas)
-            return True
-        return False
+        if not tarea:
+            return False
+        if isinstance(fecha_limite, str):
+            try:
+                fecha_limite = _parsear_fecha(fecha_limite) if fecha_limite else None
+            except ValueError:
+                print("[ERROR] Fecha mal formateada. Usa YYYY-MM-DD.")
+                return False
+        self._desindexar(tarea)
+        tarea.modificar(titulo, descripcion, fecha_limite, prioridad, etiquetas)
+        self._indexar(tarea)
+        if titulo is not None or descripcion is not None:
+            self._indexar_texto(tarea)
+        self._publicar("modificar", tarea=tarea)
+        return True
 
     @log_funcion
+    @escritura
     def asignar_usuario_tarea(self, id_tarea: int, usuario: str) -> bool:
         """
         Asigna un usuario a una tarea específica.
@@ -241,25 +960,241 @@ class GestorDeTareas:
         """
         tarea = self.obtener_por_id(id_tarea)
         if tarea:
+            self._desindexar(tarea)
             tarea.asignar_usuario(usuario)
+            self._indexar(tarea)
+            self._publicar("asignar", tarea=tarea)
             return True
         return False
 
     @log_funcion
+    @lectura
     def ordenar_por_prioridad(self) -> List[Tarea]:
         """
         Devuelve una lista de tareas ordenadas según su prioridad.
 
         Las tareas se ordenan de forma ascendente, donde un número menor indica una mayor prioridad.
+        A igual prioridad se ordenan por fecha límite (las tareas sin fecha al final) y luego por ID.
+        El orden se obtiene mezclando los índices por estado, que ya están ordenados, sin llamar
+        a `Tarea.__lt__`.
 
         Returns
         -------
         List[Tarea]
             Lista de tareas ordenadas por prioridad.
         """
-        return sorted(self.tareas)
+        return [self.tareas[clave[-1]] for clave in self._claves_por_prioridad()]
+
+    @log_funcion
+    @lectura
+    def mas_urgentes(self, k: int, estado: Optional[EstadoTarea] = None) -> List[Tarea]:
+        """
+        Devuelve las `k` tareas más prioritarias sin ordenar la lista completa.
+
+        Parameters
+        ----------
+        k : int
+            Número máximo de tareas a devolver.
+        estado : Optional[EstadoTarea], optional
+            Si se indica, solo se consideran las tareas con ese estado.
+
+        Returns
+        -------
+        List[Tarea]
+            Las `k` tareas más prioritarias, con el mismo orden que `ordenar_por_prioridad`.
+        """
+        self._asegurar_indices()
+        if estado is not None:
+            claves = self._por_prioridad[estado].primeros(k)
+        else:
+            claves = islice(self._claves_por_prioridad(), k)
+        return [self.tareas[clave[-1]] for clave in claves]
+
+    def _claves_por_prioridad(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Itera sobre las claves de prioridad de todas las tareas, en orden.
+
+        Returns
+        -------
+        Iterator[Tuple[int, int, int]]
+            Claves (prioridad, fecha, id) en orden ascendente.
+        """
+        self._asegurar_indices()
+        return heapq.merge(*self._por_prioridad.values())
+
+    @log_funcion
+    def buscar(self, consulta: str, limite: int = 50, cursor: Optional[str] = None) -> Tuple[List[Tarea], Optional[str]]:
+        """
+        Busca tareas por las palabras de su título y descripción, ordenadas por relevancia.
+
+        Las palabras se comparan sin distinguir mayúsculas ni tildes, cada palabra de la
+        consulta encuentra también las que empiezan por ella y las tareas deben contener
+        todas (ver gestor_de_tareas.utilidades.busqueda). Las coincidencias en el título
+        pesan más que en la descripción.
+
+        Parameters
+        ----------
+        consulta : str
+            Texto a buscar.
+        limite : int, optional
+            Número máximo de tareas de la página (por defecto 50).
+        cursor : Optional[str], optional
+            Cursor devuelto por la página anterior; None para la primera página. Como el
+            orden depende de la relevancia, el cursor es el número de resultados ya
+            devueltos.
+
+        Returns
+        -------
+        Tuple[List[Tarea], Optional[str]]
+            Tareas de la página y cursor de la siguiente (None si es la última). Si el cursor
+            no es válido se muestra un error y se devuelve una página vacía.
+        """
+        try:
+            inicio = int(cursor) if cursor else 0
+        except ValueError:
+            inicio = -1
+        if inicio < 0:
+            print("[ERROR] Cursor de paginación no válido.")
+            return [], None
+        return self._buscar_desde(consulta, limite, inicio)
+
+    @lectura
+    def _buscar_desde(self, consulta: str, limite: int, inicio: int) -> Tuple[List[Tarea], Optional[str]]:
+        """
+        Calcula la página de `buscar` a partir de la posición ya validada del cursor.
+
+        Returns
+        -------
+        Tuple[List[Tarea], Optional[str]]
+            Tareas de la página y cursor de la siguiente (None si es la última).
+        """
+        resultados, hay_mas = self._asegurar_busqueda().buscar(consulta, limite, inicio)
+        tareas = [self.tareas[id_tarea] for id_tarea, _ in resultados]
+        return tareas, str(inicio + limite) if hay_mas else None
+
+    @log_funcion
+    @lectura
+    def vencen_entre(self,
+                     desde: date,
+                     hasta: date,
+                     estados: Optional[Iterable[EstadoTarea]] = None,
+                     limite: Optional[int] = None) -> List[Tarea]:
+        """
+        Devuelve las tareas cuya fecha límite está entre dos fechas, ambas incluidas.
+
+        Parameters
+        ----------
+        desde : date
+            Primera fecha del rango.
+        hasta : date
+            Última fecha del rango.
+        estados : Optional[Iterable[EstadoTarea]], optional
+            Si se indican, solo se consideran las tareas con alguno de esos estados.
+        limite : Optional[int], optional
+            Número máximo de tareas a devolver (las primeras en vencer); None para todas.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas ordenadas por fecha límite y luego por ID.
+        """
+        claves = self._claves_por_fecha((desde.toordinal(),), (hasta.toordinal() + 1,), estados, limite)
+        return [self.tareas[clave[-1]] for clave in claves]
+
+    @log_funcion
+    @lectura
+    def vencidas(self, hoy: Optional[date] = None, limite: Optional[int] = None) -> List[Tarea]:
+        """
+        Devuelve las tareas no completadas cuya fecha límite ya ha pasado.
+
+        Parameters
+        ----------
+        hoy : Optional[date], optional
+            Fecha de referencia; las tareas que vencen ese día aún no están vencidas. Por
+            defecto, la fecha actual.
+        limite : Optional[int], optional
+            Número máximo de tareas a devolver (las más antiguas); None para todas.
+
+        Returns
+        -------
+        List[Tarea]
+            Tareas vencidas, de la más antigua a la más reciente y luego por ID.
+        """
+        hoy = hoy or date.today()
+        claves = self._claves_por_fecha((0,), (hoy.toordinal(),), _ESTADOS_ABIERTOS, limite)
+        return [self.tareas[clave[-1]] for clave in claves]
 
     @log_funcion
+    @lectura
+    def proximos_vencimientos(self,
+                              k: int,
+                              desde: Optional[date] = None,
+                              estados: Optional[Iterable[EstadoTarea]] = _ESTADOS_ABIERTOS) -> List[Tarea]:
+        """
+        Devuelve las `k` próximas tareas en vencer a partir de una fecha.
+
+        Parameters
+        ----------
+        k : int
+            Número máximo de tareas a devolver.
+        desde : Optional[date], optional
+            Primera fecha a considerar (incluida). Por defecto, la fecha actual.
+        estados : Optional[Iterable[EstadoTarea]], optional
+            Estados de las tareas a considerar. Por defecto, las no completadas; None para
+            todas.
+
+        Returns
+        -------
+        List[Tarea]
+            Hasta `k` tareas ordenadas por fecha límite y luego por ID.
+        """
+        self._asegurar_indices()
+        desde = desde or date.today()
+        estados = EstadoTarea if estados is None else estados
+        # Mezcla perezosa de los índices por estado: solo se recorren las k primeras claves.
+        claves = heapq.merge(*(self._por_fecha[estado].desde((desde.toordinal(),)) for estado in estados))
+        return [self.tareas[clave[-1]] for clave in islice(claves, k)]
+
+    def _claves_por_fecha(self,
+                          inicio: Tuple[int, ...],
+                          fin: Tuple[int, ...],
+                          estados: Optional[Iterable[EstadoTarea]],
+                          limite: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Devuelve en orden las claves (ordinal de la fecha límite, id) de un rango.
+
+        De cada índice por estado se copia solo el rango pedido, localizado por búsqueda
+        binaria, y los tramos (ya ordenados) se combinan con `sorted`, que los fusiona en
+        tiempo lineal. El coste es O(log n + k) para k claves en el rango; con `limite`, de
+        cada índice se copian como mucho `limite` claves, así que no depende del tamaño del
+        rango.
+
+        Parameters
+        ----------
+        inicio : Tuple[int, ...]
+            Extremo inferior del rango (incluido).
+        fin : Tuple[int, ...]
+            Extremo superior del rango (excluido).
+        estados : Optional[Iterable[EstadoTarea]]
+            Estados a considerar; None para todos.
+        limite : Optional[int], optional
+            Número máximo de claves a devolver; None para todas.
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            Claves en orden ascendente.
+        """
+        self._asegurar_indices()
+        estados = EstadoTarea if estados is None else estados
+        tramos = [tramo for tramo in (self._por_fecha[estado].entre(inicio, fin, limite) for estado in estados)
+                  if tramo]
+        if len(tramos) == 1:
+            return tramos[0]
+        return sorted(chain.from_iterable(tramos))[:limite]
+
+    @log_funcion
+    @escritura
     def eliminar_tarea(self, id_tarea: int) -> bool:
         """
         Elimina la tarea con el ID especificado.
@@ -274,8 +1209,172 @@ class GestorDeTareas:
         bool
             True si la tarea fue eliminada, False en caso contrario.
         """
-        for i, t in enumerate(self.tareas):
-            if t.id_tarea == id_tarea:
-                del self.tareas[i]
-                return True
-        return False
+        # Borrar la clave del diccionario no desplaza el resto de tareas.
+        tarea = self.tareas.pop(id_tarea, None)
+        if tarea is None:
+            return False
+        self._quitar_ids([id_tarea])
+        self._desindexar(tarea)
+        self._desindexar_texto(id_tarea)
+        self._publicar("eliminar", tarea=tarea)
+        return True
+
+    @escritura
+    def eliminar_tareas(self, ids: Iterable[int]) -> Tuple[List[int], List[Tuple[int, str]]]:
+        """
+        Elimina varias tareas, actualizando los índices una sola vez.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Identificadores de las tareas. Los repetidos se procesan una vez.
+
+        Returns
+        -------
+        Tuple[List[int], List[Tuple[int, str]]]
+            IDs de las tareas eliminadas y pares (ID, mensaje de error) de las que no existen.
+        """
+        tareas, errores = self._buscar_lote(ids)
+        for tarea in tareas:
+            del self.tareas[tarea.id_tarea]
+            self._desindexar_texto(tarea.id_tarea)
+        self._quitar_ids([tarea.id_tarea for tarea in tareas])
+        self._desindexar_lote(tareas)
+        for tarea in tareas:
+            self._publicar("eliminar", tarea=tarea)
+        return [tarea.id_tarea for tarea in tareas], errores
+
+
+@lru_cache(maxsize=4096)
+def _parsear_fecha(fecha_str: str) -> date:
+    """
+    Convierte una cadena "YYYY-MM-DD" en un objeto date.
+
+    El resultado se cachea, de modo que las tareas con la misma fecha límite comparten un
+    único objeto date y se evita repetir `datetime.strptime`, que es costoso.
+
+    Parameters
+    ----------
+    fecha_str : str
+        Fecha en formato "YYYY-MM-DD".
+
+    Returns
+    -------
+    date
+        Fecha correspondiente.
+
+    Raises
+    ------
+    ValueError
+        Si la cadena no tiene el formato esperado.
+    """
+    return datetime.strptime(fecha_str, "%Y-%m-%d").date()
+
+
+def _clave_prioridad(tarea: Tarea) -> Tuple[int, int, int]:
+    """
+    Calcula la clave de ordenación por prioridad de una tarea.
+
+    Parameters
+    ----------
+    tarea : Tarea
+        Tarea de la que se calcula la clave.
+
+    Returns
+    -------
+    Tuple[int, int, int]
+        Tupla (prioridad, ordinal de la fecha límite, id) comparable en C.
+    """
+    fecha = tarea.fecha_limite.toordinal() if isinstance(tarea.fecha_limite, date) else _SIN_FECHA
+    return (tarea.prioridad, fecha, tarea.id_tarea)
+
+
+def _clave_fecha(tarea: Tarea) -> Tuple[int, int]:
+    """
+    Calcula la clave del índice de vencimientos de una tarea con fecha límite.
+
+    Parameters
+    ----------
+    tarea : Tarea
+        Tarea de la que se calcula la clave.
+
+    Returns
+    -------
+    Tuple[int, int]
+        Tupla (ordinal de la fecha límite, id).
+    """
+    return (tarea.fecha_limite.toordinal(), tarea.id_tarea)
+
+
+def _quitar_de_indice(indice: Dict[str, Set[int]], clave: str, id_tarea: int) -> None:
+    """
+    Retira una tarea de la entrada `clave` de un índice secundario.
+
+    Si la entrada se queda vacía, se elimina del índice.
+
+    Parameters
+    ----------
+    indice : Dict[str, Set[int]]
+        Índice secundario (por usuario o por etiqueta).
+    clave : str
+        Clave de la entrada.
+    id_tarea : int
+        Identificador de la tarea a retirar.
+    """
+    entrada = indice.get(clave)
+    if entrada is None:
+        return
+    entrada.discard(id_tarea)
+    if not entrada:
+        del indice[clave]
+
+
+def _insertar_en_orden(tareas: Dict[int, Tarea], tarea: Tarea) -> None:
+    """
+    Inserta o reemplaza una tarea manteniendo el diccionario ordenado por ID.
+
+    `listar_tareas` devuelve las tareas en el orden del diccionario, que coincide con el de
+    los IDs mientras se insertan de forma creciente. Si se restaura una tarea nueva con un ID
+    menor que alguno existente, las tareas posteriores se sacan y se vuelven a insertar
+    detrás de ella, con un coste proporcional a su número. Los mapeos de
+    gestor_de_tareas.almacenamiento.mapeado ya iteran en orden de ID.
+
+    Parameters
+    ----------
+    tareas : Dict[int, Tarea]
+        Tareas del gestor, por identificador.
+    tarea : Tarea
+        Tarea a insertar.
+    """
+    id_tarea = tarea.id_tarea
+    if (isinstance(tareas, dict) and id_tarea not in tareas and tareas
+            and next(reversed(tareas)) > id_tarea):
+        posteriores = [(clave, valor) for clave, valor in tareas.items() if clave > id_tarea]
+        for clave, _ in posteriores:
+            del tareas[clave]
+        tareas[id_tarea] = tarea
+        tareas.update(posteriores)
+    else:
+        tareas[id_tarea] = tarea
+
+
+def _en_orden_de_creacion(tareas: Mapping[int, Tarea], ids: Iterable[int]) -> List[Tarea]:
+    """
+    Devuelve las tareas con los IDs indicados ordenadas por identificador.
+
+    Los identificadores son crecientes, por lo que ordenar por ID equivale a ordenar por
+    fecha de creación. El coste es O(k log k) sobre el tamaño k del resultado.
+
+    Parameters
+    ----------
+    tareas : Mapping[int, Tarea]
+        Tareas del gestor, por identificador.
+    ids : Iterable[int]
+        IDs de las tareas, por ejemplo una entrada de un índice secundario.
+
+    Returns
+    -------
+    List[Tarea]
+        Tareas en orden de creación.
+    """
+    return [tareas[id_tarea] for id_tarea in sorted(ids)]
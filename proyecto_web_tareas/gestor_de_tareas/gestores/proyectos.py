@@ -1,15 +1,53 @@
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Set, Tuple
+
 from gestor_de_tareas.clases.tarea import Tarea, EstadoTarea
+from gestor_de_tareas.utilidades.concurrencia import escritura, lectura, preparar
+from gestor_de_tareas.utilidades.decoradores import log_funcion
+from gestor_de_tareas.utilidades.eventos import Publicador
+
+
+def porcentaje_completadas(conteo: Dict[EstadoTarea, int]) -> float:
+    """
+    Calcula el porcentaje de tareas completadas a partir del número de tareas por estado.
+
+    Parameters
+    ----------
+    conteo : Dict[EstadoTarea, int]
+        Número de tareas en cada estado.
+
+    Returns
+    -------
+    float
+        Porcentaje de tareas completadas. Si no hay tareas, retorna 0.
+    """
+    total = sum(conteo.values())
+    if not total:
+        return 0
+    return (conteo[EstadoTarea.COMPLETADA] / total) * 100
+
 
 class Proyecto:
     """
     Representa un proyecto que contiene múltiples tareas.
 
+    Las tareas se guardan en un diccionario por ID, de modo que comprobar si una tarea está
+    en el proyecto, agregarla y quitarla cuesta O(1), y una tarea no puede estar dos veces.
+    Para paginar en orden de inserción con cursores estables, cada tarea recibe al agregarse
+    un número de orden creciente; las entradas de las tareas quitadas se descartan de la
+    lista de órdenes cuando son más de la mitad.
+
     Attributes
     ----------
     nombre : str
         Nombre del proyecto.
     tareas : List[Tarea]
-        Lista de tareas asociadas al proyecto.
+        Lista de tareas asociadas al proyecto, en el orden en que se añadieron.
+    conteo : Dict[EstadoTarea, int]
+        Número de tareas del proyecto en cada estado. Se actualiza al agregar y quitar tareas
+        y, si el proyecto pertenece a un GestorProyectos que sigue al gestor de tareas,
+        cuando una tarea cambia de estado. Así `progreso` no tiene que recorrer las tareas.
     """
     def __init__(self, nombre: str) -> None:
         """
@@ -21,9 +59,33 @@ class Proyecto:
             Nombre del proyecto.
         """
         self.nombre = nombre
-        self.tareas = []
+        self.conteo: Dict[EstadoTarea, int] = {estado: 0 for estado in EstadoTarea}
+        self._tareas: Dict[int, Tarea] = {}
+        # Número de orden de cada tarea y pares (orden, ID) en orden creciente, incluidas
+        # algunas tareas ya quitadas (ver `_descartar_quitadas`).
+        self._orden: Dict[int, int] = {}
+        self._entradas: List[Tuple[int, int]] = []
+        self._siguiente_orden = 0
+
+    @property
+    def tareas(self) -> List[Tarea]:
+        """
+        Tareas del proyecto, en el orden en que se añadieron.
+
+        Returns
+        -------
+        List[Tarea]
+            Copia de la lista de tareas.
+        """
+        return list(self._tareas.values())
+
+    def __contains__(self, id_tarea: object) -> bool:
+        return id_tarea in self._tareas
+
+    def __len__(self) -> int:
+        return len(self._tareas)
 
-    def agregar_tarea(self, tarea: Tarea) -> None:
+    def agregar_tarea(self, tarea: Tarea) -> bool:
         """
         Agrega una nueva tarea al proyecto.
 
@@ -31,8 +93,108 @@ class Proyecto:
         ----------
         tarea : Tarea
             La tarea a agregar.
+
+        Returns
+        -------
+        bool
+            True si se ha agregado, False si la tarea ya estaba en el proyecto.
+        """
+        if tarea.id_tarea in self._tareas:
+            return False
+        self._tareas[tarea.id_tarea] = tarea
+        self._orden[tarea.id_tarea] = self._siguiente_orden
+        self._entradas.append((self._siguiente_orden, tarea.id_tarea))
+        self._siguiente_orden += 1
+        self.conteo[tarea.estado] += 1
+        return True
+
+    def quitar_tarea(self, id_tarea: int) -> Optional[Tarea]:
         """
-        self.tareas.append(tarea)
+        Quita una tarea del proyecto.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        Optional[Tarea]
+            La tarea quitada, o None si no estaba en el proyecto.
+        """
+        tarea = self._tareas.pop(id_tarea, None)
+        if tarea is None:
+            return None
+        del self._orden[id_tarea]
+        self.conteo[tarea.estado] -= 1
+        if len(self._entradas) > 2 * len(self._orden):
+            self._descartar_quitadas()
+        return tarea
+
+    def _descartar_quitadas(self) -> None:
+        """
+        Elimina de la lista de órdenes las entradas de las tareas quitadas.
+
+        Se llama cuando son más de la mitad, así que el coste por tarea quitada es O(1)
+        amortizado. Los números de orden no cambian, de modo que los cursores ya
+        entregados siguen siendo válidos.
+        """
+        orden = self._orden
+        self._entradas = [(numero, id_tarea) for numero, id_tarea in self._entradas
+                          if orden.get(id_tarea) == numero]
+
+    def _actualizar_tarea(self, tarea: Tarea, anterior: EstadoTarea) -> None:
+        """
+        Ajusta los contadores y la referencia tras un cambio en una tarea del proyecto.
+
+        Parameters
+        ----------
+        tarea : Tarea
+            Tarea con su estado actual. Si es un objeto nuevo (p. ej. restaurado desde el
+            diario), sustituye al anterior.
+        anterior : EstadoTarea
+            Estado de la tarea antes del cambio.
+        """
+        if tarea.id_tarea in self._tareas:
+            self._tareas[tarea.id_tarea] = tarea
+            self.conteo[anterior] -= 1
+            self.conteo[tarea.estado] += 1
+
+    def paginar_tareas(self, limite: int = 50, cursor: Optional[str] = None) -> Tuple[List[Tarea], Optional[str]]:
+        """
+        Devuelve una página de las tareas del proyecto, en el orden en que se añadieron.
+
+        El cursor es el número de orden de la última tarea listada; la página siguiente
+        empieza por búsqueda binaria en la lista de órdenes, así que quitar tareas no hace
+        que otras se salten ni se repitan.
+
+        Parameters
+        ----------
+        limite : int, optional
+            Número máximo de tareas de la página (por defecto 50).
+        cursor : Optional[str], optional
+            Cursor devuelto por la página anterior; None para la primera página.
+
+        Returns
+        -------
+        Tuple[List[Tarea], Optional[str]]
+            Tareas de la página y cursor de la siguiente (None si es la última). Si el cursor
+            no es válido se muestra un error y se devuelve una página vacía.
+        """
+        try:
+            ultimo = int(cursor) if cursor else -1
+        except ValueError:
+            print("[ERROR] Cursor de paginación no válido.")
+            return [], None
+        entradas, orden, tareas = self._entradas, self._orden, self._tareas
+        pagina: List[Tuple[int, Tarea]] = []
+        for posicion in range(bisect_left(entradas, (ultimo + 1,)), len(entradas)):
+            numero, id_tarea = entradas[posicion]
+            if orden.get(id_tarea) == numero:
+                if len(pagina) == limite:
+                    return [tarea for _, tarea in pagina], str(pagina[-1][0])
+                pagina.append((numero, tareas[id_tarea]))
+        return [tarea for _, tarea in pagina], None
 
     def listar_tareas(self) -> None:
         """
@@ -47,33 +209,106 @@ class Proyecto:
 
     def progreso(self) -> float:
         """
-        Calcula el porcentaje de tareas completadas en el proyecto.
+        Calcula el porcentaje de tareas completadas en el proyecto, en O(1) a partir de `conteo`.
 
         Returns
         -------
         float
             Porcentaje de tareas completadas. Si no hay tareas, retorna 0.
         """
-        if not self.tareas:
-            return 0
-        completadas = sum(1 for t in self.tareas if t.estado == EstadoTarea.COMPLETADA)
-        return (completadas / len(self.tareas)) * 100
+        return porcentaje_completadas(self.conteo)
 
-class GestorProyectos:
+class GestorProyectos(Publicador):
     """
     Gestiona múltiples proyectos.
 
+    Los cambios se publican como eventos (ver `Publicador`): "crear_proyecto" y
+    "borrar_proyecto" con el "nombre", y "agregar_tarea" y "quitar_tarea" con el "nombre" y
+    la "tarea". Como en GestorDeTareas, los cambios se hacen con `cerrojo` tomado.
+
+    La pertenencia de las tareas a los proyectos se indexa en ambos sentidos: cada proyecto
+    guarda sus tareas por ID y el gestor guarda, para cada ID de tarea, el conjunto de
+    proyectos que la contienen (ver `proyectos_de_tarea`). Agregar, quitar y consultar
+    cuestan O(1). El gestor se suscribe a los eventos del gestor de tareas (ver
+    `seguir_tareas`) para que los contadores de estado de cada proyecto (`Proyecto.conteo`)
+    sigan siendo correctos y para quitar de sus proyectos las tareas eliminadas.
+
     Attributes
     ----------
     proyectos : dict[str, Proyecto]
         Diccionario que mapea el nombre del proyecto a su objeto Proyecto.
+    cerrojo : threading.RLock
+        Cerrojo que serializa las modificaciones.
+    version : int
+        Se incrementa al empezar y al terminar cada modificación.
     """
-    def __init__(self) -> None:
+    def __init__(self, cerrojo: Optional[threading.RLock] = None, gestor_tareas: Any = None) -> None:
         """
         Inicializa el gestor de proyectos.
+
+        Parameters
+        ----------
+        cerrojo : Optional[threading.RLock], optional
+            Cerrojo a compartir con el gestor de tareas. Por defecto se usa el de
+            `gestor_tareas` o, si no se indica, se crea uno nuevo.
+        gestor_tareas : GestorDeTareas, optional
+            Gestor de tareas a seguir para mantener los proyectos (ver `seguir_tareas`).
         """
+        super().__init__()
+        if cerrojo is None and gestor_tareas is not None:
+            cerrojo = gestor_tareas.cerrojo
+        preparar(self, cerrojo)
         self.proyectos = {}
+        self._proyectos_de_tarea: Dict[int, Set[str]] = {}
+        if gestor_tareas is not None:
+            self.seguir_tareas(gestor_tareas)
 
+    def seguir_tareas(self, gestor_tareas: Any) -> None:
+        """
+        Se suscribe a los eventos de un gestor de tareas para mantener los proyectos.
+
+        Los eventos "cambiar_estado" y "restaurar" ajustan los contadores de los proyectos
+        que contienen la tarea, y "eliminar" la quita de todos ellos. Ambos gestores
+        deberían compartir el cerrojo: así una tarea no puede cambiar de estado ni
+        eliminarse mientras se agrega a un proyecto.
+
+        Parameters
+        ----------
+        gestor_tareas : GestorDeTareas
+            Gestor de tareas a seguir.
+        """
+        gestor_tareas.suscribir(self._al_cambiar_tarea)
+
+    @escritura
+    def _al_cambiar_tarea(self, tipo: str, datos: Dict[str, Any]) -> None:
+        """
+        Suscriptor de GestorDeTareas: actualiza los proyectos que contienen la tarea.
+
+        Parameters
+        ----------
+        tipo : str
+            Tipo de evento.
+        datos : Dict[str, Any]
+            Datos del evento; incluye la tarea afectada.
+        """
+        tarea = datos["tarea"]
+        if tipo == "eliminar":
+            # El borrado en cascada no se publica: al recuperar el diario se repite al
+            # reaplicar la eliminación de la tarea.
+            for nombre in self._proyectos_de_tarea.pop(tarea.id_tarea, ()):
+                self.proyectos[nombre].quitar_tarea(tarea.id_tarea)
+            return
+        if tipo == "cambiar_estado":
+            anterior = datos["anterior"]
+        elif tipo == "restaurar" and datos["anterior"] is not None:
+            anterior = datos["anterior"].estado
+        else:
+            return
+        for nombre in self._proyectos_de_tarea.get(tarea.id_tarea, ()):
+            self.proyectos[nombre]._actualizar_tarea(tarea, anterior)
+
+    @log_funcion
+    @escritura
     def crear_proyecto(self, nombre: str) -> None:
         """
         Crea un nuevo proyecto.
@@ -86,11 +321,13 @@ class GestorProyectos:
             Nombre del proyecto a crear.
         """
         if nombre not in self.proyectos:
-            self.proyectos[nombre] = Proyecto(nombre)
+            self._crear(nombre)
             print(f"Proyecto '{nombre}' creado.")
         else:
             print(f"El proyecto '{nombre}' ya existe.")
 
+    @log_funcion
+    @escritura
     def borrar_proyecto(self, nombre: str) -> None:
         """
         Borra un proyecto existente.
@@ -101,12 +338,14 @@ class GestorProyectos:
             Nombre del proyecto a borrar.
         """
         if nombre in self.proyectos:
-            del self.proyectos[nombre]
+            self._borrar(nombre)
             print(f"Proyecto '{nombre}' borrado.")
         else:
             print(f"El proyecto '{nombre}' no existe.")
 
-    def agregar_tarea_a_proyecto(self, nombre_proyecto: str, tarea: Tarea) -> None:
+    @log_funcion
+    @escritura
+    def agregar_tarea_a_proyecto(self, nombre_proyecto: str, tarea: Tarea) -> bool:
         """
         Agrega una tarea a un proyecto específico.
 
@@ -116,13 +355,175 @@ class GestorProyectos:
             Nombre del proyecto al que se desea agregar la tarea.
         tarea : Tarea
             La tarea a agregar.
+
+        Returns
+        -------
+        bool
+            True si se ha agregado; False si el proyecto no existe o ya contenía la tarea.
         """
-        if nombre_proyecto in self.proyectos:
-            self.proyectos[nombre_proyecto].agregar_tarea(tarea)
-            print(f"Tarea '{tarea}' añadida a '{nombre_proyecto}'.")
-        else:
+        proyecto = self.proyectos.get(nombre_proyecto)
+        if proyecto is None:
+            print(f"Proyecto '{nombre_proyecto}' no encontrado.")
+            return False
+        if not self._agregar(proyecto, tarea):
+            print(f"La tarea '{tarea}' ya está en '{nombre_proyecto}'.")
+            return False
+        print(f"Tarea '{tarea}' añadida a '{nombre_proyecto}'.")
+        return True
+
+    @log_funcion
+    @escritura
+    def quitar_tarea_de_proyecto(self, nombre_proyecto: str, id_tarea: int) -> bool:
+        """
+        Quita una tarea de un proyecto, sin eliminarla del gestor de tareas.
+
+        Parameters
+        ----------
+        nombre_proyecto : str
+            Nombre del proyecto.
+        id_tarea : int
+            Identificador de la tarea a quitar.
+
+        Returns
+        -------
+        bool
+            True si se ha quitado; False si el proyecto no existe o no contenía la tarea.
+        """
+        proyecto = self.proyectos.get(nombre_proyecto)
+        if proyecto is None:
             print(f"Proyecto '{nombre_proyecto}' no encontrado.")
+            return False
+        tarea = self._quitar(proyecto, id_tarea)
+        if tarea is None:
+            print(f"La tarea {id_tarea} no está en '{nombre_proyecto}'.")
+            return False
+        print(f"Tarea '{tarea}' quitada de '{nombre_proyecto}'.")
+        return True
+
+    @escritura
+    def restaurar(self, operacion: str, nombre: str, tarea: Optional[Tarea] = None,
+                  id_tarea: Optional[int] = None) -> None:
+        """
+        Repite un cambio ya registrado, por ejemplo al recuperar el diario, sin mostrar
+        mensajes. Los cambios que ya no se pueden aplicar (proyecto inexistente o repetido,
+        tarea ya agregada o quitada) se ignoran.
+
+        Parameters
+        ----------
+        operacion : str
+            "crear_proyecto", "borrar_proyecto", "agregar_tarea" o "quitar_tarea".
+        nombre : str
+            Nombre del proyecto.
+        tarea : Optional[Tarea], optional
+            Tarea a agregar, para "agregar_tarea".
+        id_tarea : Optional[int], optional
+            ID de la tarea a quitar, para "quitar_tarea".
+        """
+        proyecto = self.proyectos.get(nombre)
+        if operacion == "crear_proyecto" and proyecto is None:
+            self._crear(nombre)
+        elif operacion == "borrar_proyecto" and proyecto is not None:
+            self._borrar(nombre)
+        elif operacion == "agregar_tarea" and proyecto is not None and tarea is not None:
+            self._agregar(proyecto, tarea)
+        elif operacion == "quitar_tarea" and proyecto is not None:
+            self._quitar(proyecto, id_tarea)
+
+    def _crear(self, nombre: str) -> None:
+        """
+        Crea un proyecto que no existe y publica el evento; se llama dentro de una escritura.
+        """
+        self.proyectos[nombre] = Proyecto(nombre)
+        self._publicar("crear_proyecto", nombre=nombre)
+
+    def _borrar(self, nombre: str) -> None:
+        """
+        Borra un proyecto existente y publica el evento; se llama dentro de una escritura.
+        """
+        for id_tarea in self.proyectos.pop(nombre)._tareas:
+            self._desvincular(nombre, id_tarea)
+        self._publicar("borrar_proyecto", nombre=nombre)
+
+    def _agregar(self, proyecto: Proyecto, tarea: Tarea) -> bool:
+        """
+        Agrega una tarea a un proyecto y publica el evento; se llama dentro de una escritura.
+
+        Returns
+        -------
+        bool
+            False si el proyecto ya contenía la tarea.
+        """
+        if not proyecto.agregar_tarea(tarea):
+            return False
+        self._proyectos_de_tarea.setdefault(tarea.id_tarea, set()).add(proyecto.nombre)
+        self._publicar("agregar_tarea", nombre=proyecto.nombre, tarea=tarea)
+        return True
+
+    def _quitar(self, proyecto: Proyecto, id_tarea: int) -> Optional[Tarea]:
+        """
+        Quita una tarea de un proyecto y publica el evento; se llama dentro de una escritura.
+
+        Returns
+        -------
+        Optional[Tarea]
+            La tarea quitada, o None si el proyecto no la contenía.
+        """
+        tarea = proyecto.quitar_tarea(id_tarea)
+        if tarea is not None:
+            self._desvincular(proyecto.nombre, id_tarea)
+            self._publicar("quitar_tarea", nombre=proyecto.nombre, tarea=tarea)
+        return tarea
+
+    def _desvincular(self, nombre: str, id_tarea: int) -> None:
+        """
+        Quita un proyecto del conjunto de proyectos de una tarea.
+        """
+        nombres = self._proyectos_de_tarea[id_tarea]
+        nombres.discard(nombre)
+        if not nombres:
+            del self._proyectos_de_tarea[id_tarea]
+
+    @lectura
+    def proyectos_de_tarea(self, id_tarea: int) -> List[str]:
+        """
+        Devuelve los nombres de los proyectos que contienen una tarea, sin recorrerlos.
+
+        Parameters
+        ----------
+        id_tarea : int
+            Identificador de la tarea.
+
+        Returns
+        -------
+        List[str]
+            Nombres de los proyectos, ordenados alfabéticamente.
+        """
+        return sorted(self._proyectos_de_tarea.get(id_tarea, ()))
+
+    @lectura
+    def conteo_de_proyectos(self) -> Dict[str, Dict[EstadoTarea, int]]:
+        """
+        Devuelve los contadores por estado de todos los proyectos, en O(1) por proyecto.
+
+        Returns
+        -------
+        Dict[str, Dict[EstadoTarea, int]]
+            Copia del contador de tareas por estado de cada proyecto, por nombre.
+        """
+        return {nombre: dict(proyecto.conteo) for nombre, proyecto in self.proyectos.items()}
+
+    def progreso_de_proyectos(self) -> Dict[str, float]:
+        """
+        Devuelve el progreso de todos los proyectos, ver `conteo_de_proyectos`.
+
+        Returns
+        -------
+        Dict[str, float]
+            Porcentaje de tareas completadas de cada proyecto, por nombre.
+        """
+        return {nombre: porcentaje_completadas(conteo) for nombre, conteo in self.conteo_de_proyectos().items()}
 
+    @log_funcion
     def listar_tareas_de_proyecto(self, nombre_proyecto: str) -> None:
         """
         Lista las tareas de un proyecto.
@@ -138,6 +539,7 @@ class GestorProyectos:
         else:
             print(f"Proyecto '{nombre_proyecto}' no encontrado.")
 
+    @log_funcion
     def mostrar_progreso_proyecto(self, nombre_proyecto: str) -> None:
         """
         Muestra el progreso (porcentaje de tareas completadas) de un proyecto.
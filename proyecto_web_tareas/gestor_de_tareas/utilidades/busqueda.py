@@ -0,0 +1,484 @@
+"""
+Módulo: busqueda
+================
+
+Búsqueda de texto completo sobre los títulos y descripciones de las tareas mediante un
+índice invertido que se actualiza de forma incremental.
+
+Los textos se dividen en palabras y cada palabra se normaliza: se pasa a minúsculas y se le
+quitan las tildes y diéresis ("Revisión" -> "revision", "año" -> "ano"), de modo que buscar
+"revision" encuentra "Revisión". Las palabras vacías más frecuentes del español ("de", "la",
+"que"...) no se indexan. Cada palabra de la consulta encuentra también las palabras que
+empiezan por ella ("inf" -> "informe", "informacion"), y una tarea debe contener todas las
+palabras de la consulta.
+
+Los resultados se ordenan por relevancia: cada palabra suma el número de veces que aparece en
+la tarea (las del título cuentan `PESO_TITULO` veces) multiplicado por su rareza en el
+conjunto de tareas (idf). Las coincidencias por prefijo valen la mitad que las exactas.
+
+Los backends SQLite usan en su lugar tablas FTS5 con el tokenizador unicode61, que normaliza
+igual las palabras; `expresion_fts` traduce la consulta a una expresión MATCH equivalente.
+
+Dependencias:
+    - re y unicodedata (biblioteca estándar) para dividir y normalizar los textos.
+    - bisect y heapq para el vocabulario ordenado y la selección de los mejores resultados.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Cada aparición en el título cuenta como esta cantidad de apariciones en la descripción.
+PESO_TITULO = 3
+# Una coincidencia por prefijo vale esta fracción de una coincidencia exacta.
+_FACTOR_PREFIJO = 0.5
+# Las palabras de la consulta más cortas que esto solo coinciden de forma exacta.
+_LONGITUD_MINIMA_PREFIJO = 2
+# Un término con hasta estas palabras coincidentes se comprueba buscando el documento en cada
+# una; con más, recorriendo las palabras del documento.
+_PALABRAS_POR_CONSULTA = 4
+# Mayor que cualquier carácter: las palabras con prefijo p están en [p, p + _FIN_PREFIJO).
+_FIN_PREFIJO = "\U0010ffff"
+
+_PALABRA = re.compile(r"[^\W_]+")
+
+PALABRAS_VACIAS = frozenset((
+    "a", "al", "algo", "ante", "con", "contra", "cual", "cuando", "de", "del", "desde", "donde",
+    "e", "el", "ella", "ellos", "en", "entre", "era", "es", "esa", "ese", "eso", "esta", "estas",
+    "este", "esto", "estos", "fue", "ha", "hay", "la", "las", "le", "les", "lo", "los", "mas", "me",
+    "mi", "muy", "ni", "no", "nos", "o", "otra", "otro", "para", "pero", "por", "que", "se", "si",
+    "sin", "sobre", "su", "sus", "te", "tu", "u", "un", "una", "unas", "uno", "unos", "y", "ya",
+    "yo",
+))
+
+
+@lru_cache(maxsize=65536)
+def _plegar(palabra: str) -> str:
+    """
+    Quita las tildes, diéresis y demás marcas diacríticas de una palabra en minúsculas.
+
+    Las palabras se repiten mucho entre tareas, así que el resultado se cachea.
+    """
+    if palabra.isascii():
+        return palabra
+    descompuesta = unicodedata.normalize("NFKD", palabra)
+    return "".join(caracter for caracter in descompuesta if not unicodedata.combining(caracter))
+
+
+def normalizar(texto: str) -> List[str]:
+    """
+    Divide un texto en palabras normalizadas, sin las palabras vacías.
+
+    Parameters
+    ----------
+    texto : str
+        Texto a dividir.
+
+    Returns
+    -------
+    List[str]
+        Palabras en minúsculas y sin tildes, en el orden del texto (con repeticiones). Por
+        ejemplo, "Revisión del AÑO fiscal" da ["revision", "ano", "fiscal"].
+    """
+    palabras = (_plegar(palabra) for palabra in _PALABRA.findall(texto.lower()))
+    return [palabra for palabra in palabras if palabra not in PALABRAS_VACIAS]
+
+
+def expresion_fts(consulta: str) -> str:
+    """
+    Convierte una consulta de texto en una expresión MATCH de FTS5.
+
+    Cada palabra normalizada se entrecomilla (así los caracteres especiales de FTS5 no se
+    interpretan) y, si es lo bastante larga, se busca también como prefijo. FTS5 une los
+    términos con AND, igual que `IndiceInvertido.buscar`.
+
+    Parameters
+    ----------
+    consulta : str
+        Texto a buscar.
+
+    Returns
+    -------
+    str
+        Expresión MATCH, o cadena vacía si la consulta no tiene palabras que buscar.
+    """
+    terminos = dict.fromkeys(normalizar(consulta))
+    return " ".join(f'"{termino}"*' if len(termino) >= _LONGITUD_MINIMA_PREFIJO else f'"{termino}"'
+                    for termino in terminos)
+
+
+class IndiceInvertido:
+    """
+    Índice invertido de documentos (tareas) identificados por un entero.
+
+    Para cada palabra se guarda el peso que tiene en cada documento que la contiene y, para
+    recorrerlos de mayor a menor peso, las listas ordenadas de documentos con cada peso. Para
+    cada documento se guarda la lista de sus palabras, de modo que agregar, actualizar y
+    quitar un documento cuesta O(palabras del documento). Las palabras se guardan además en
+    una lista ordenada (el vocabulario) para encontrar por búsqueda binaria las que empiezan
+    por un prefijo.
+
+    Una consulta recorre los documentos de la palabra más selectiva de mayor a menor peso y
+    comprueba el resto de palabras solo sobre esos documentos. Se detiene en cuanto ninguno
+    de los que quedan puede entrar entre los mejores resultados y, si para entrar necesitan
+    un peso alto en otra palabra, pasa a recorrer solo los documentos con ese peso. Así su
+    coste depende de la palabra más selectiva y del tamaño de la página, y no del total de
+    documentos.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa un índice vacío.
+        """
+        self._pesos: Dict[str, Dict[int, int]] = {}
+        # Palabra -> peso -> IDs de los documentos con ese peso, ordenados.
+        self._niveles: Dict[str, Dict[int, List[int]]] = {}
+        self._palabras: Dict[int, Tuple[str, ...]] = {}
+        self._vocabulario: List[str] = []
+
+    @property
+    def documentos(self) -> int:
+        """
+        Número de documentos indexados.
+        """
+        return len(self._palabras)
+
+    def cargar(self, documentos: Iterable[Tuple[int, str, str]]) -> None:
+        """
+        Indexa muchos documentos de una vez, ordenando el vocabulario una sola vez.
+
+        Parameters
+        ----------
+        documentos : Iterable[Tuple[int, str, str]]
+            Triples (ID, título, descripción). Los IDs ya indexados se sustituyen.
+        """
+        nuevas = False
+        for id_documento, titulo, descripcion in documentos:
+            self.quitar(id_documento)
+            pesos = _contar(titulo, descripcion)
+            self._palabras[id_documento] = tuple(pesos)
+            for palabra, peso in pesos.items():
+                nuevas |= self._anotar(palabra, id_documento, peso)
+        if nuevas:
+            self._vocabulario = sorted(self._pesos)
+
+    def agregar(self, id_documento: int, titulo: str, descripcion: str) -> None:
+        """
+        Indexa un documento o, si ya estaba indexado, sustituye sus textos.
+
+        Al sustituirlos solo se tocan las palabras cuyo peso cambia, de modo que modificar el
+        título no reindexa la descripción.
+
+        Parameters
+        ----------
+        id_documento : int
+            Identificador del documento.
+        titulo : str
+            Título del documento.
+        descripcion : str
+            Descripción del documento.
+        """
+        pesos = _contar(titulo, descripcion)
+        for palabra in self._palabras.get(id_documento, ()):
+            if pesos.get(palabra) != self._pesos[palabra][id_documento]:
+                self._retirar(palabra, id_documento)
+        for palabra, peso in pesos.items():
+            documentos = self._pesos.get(palabra)
+            if documentos is not None and documentos.get(id_documento) == peso:
+                continue
+            if self._anotar(palabra, id_documento, peso):
+                insort(self._vocabulario, palabra)
+        self._palabras[id_documento] = tuple(pesos)
+
+    def quitar(self, id_documento: int) -> bool:
+        """
+        Retira un documento del índice.
+
+        Las palabras que se quedan sin documentos se eliminan también del vocabulario.
+
+        Parameters
+        ----------
+        id_documento : int
+            Identificador del documento.
+
+        Returns
+        -------
+        bool
+            True si el documento estaba indexado.
+        """
+        palabras = self._palabras.pop(id_documento, None)
+        if palabras is None:
+            return False
+        for palabra in palabras:
+            self._retirar(palabra, id_documento)
+        return True
+
+    def buscar(self,
+               consulta: str,
+               limite: int,
+               inicio: int = 0,
+               admitir: Optional[Callable[[int], bool]] = None) -> Tuple[List[Tuple[int, float]], bool]:
+        """
+        Busca los documentos que contienen todas las palabras de la consulta.
+
+        Parameters
+        ----------
+        consulta : str
+            Texto a buscar; se normaliza igual que los documentos.
+        limite : int
+            Número máximo de resultados.
+        inicio : int, optional
+            Número de resultados a saltar (para pedir las páginas siguientes).
+        admitir : Optional[Callable[[int], bool]], optional
+            Si se indica, solo se devuelven los documentos para los que devuelve True (p. ej.
+            las tareas de un usuario). Se aplica después de comprobar las palabras.
+
+        Returns
+        -------
+        Tuple[List[Tuple[int, float]], bool]
+            Pares (ID, puntuación) de mayor a menor puntuación (a igual puntuación, por ID), y
+            True si hay más resultados después de estos.
+        """
+        terminos = [_Termino(self, termino) for termino in dict.fromkeys(normalizar(consulta))]
+        if not terminos or not all(termino.coincidencias for termino in terminos):
+            return [], False
+        terminos.sort(key=lambda termino: termino.documentos)
+        guia, resto = terminos[0], terminos[1:]
+        # Máximo que puede sumar el resto de términos a la puntuación de un documento.
+        maximo_resto = 0.0
+        for termino in resto:
+            maximo_resto += termino.maximo
+
+        # Los `necesarios` mejores hasta ahora, en un montículo cuya raíz es el peor:
+        # (puntuación, -ID), porque a igual puntuación va antes el ID menor.
+        necesarios = inicio + limite + 1
+        mejores: List[Tuple[float, int]] = []
+
+        def considerar(id_documento: int, contribucion: float) -> None:
+            puntuacion = contribucion
+            for termino in resto:
+                mejor = termino.contribucion(id_documento)
+                if not mejor:
+                    return
+                puntuacion += mejor
+            if admitir is not None and not admitir(id_documento):
+                return
+            if len(mejores) < necesarios:
+                heapq.heappush(mejores, (puntuacion, -id_documento))
+            elif (puntuacion, -id_documento) > mejores[0]:
+                heapq.heapreplace(mejores, (puntuacion, -id_documento))
+
+        pendientes = guia.documentos
+        evaluada = None
+        for contribucion, id_documento in guia.recorrer():
+            if len(mejores) == necesarios:
+                # El resto de documentos llega con menor contribución o igual y mayor ID.
+                if (contribucion + maximo_resto, -id_documento) < mejores[0]:
+                    break
+                if contribucion != evaluada:
+                    evaluada = contribucion
+                    candidatos = self._candidatos(resto, mejores[0][0] - contribucion, pendientes)
+                    if candidatos is not None:
+                        posicion = (-contribucion, id_documento)
+                        for candidato in candidatos:
+                            contribucion_candidato = guia.contribucion(candidato)
+                            if contribucion_candidato and (-contribucion_candidato, candidato) >= posicion:
+                                considerar(candidato, contribucion_candidato)
+                        break
+            pendientes -= 1
+            considerar(id_documento, contribucion)
+
+        ordenados = [(-id_negado, puntuacion) for puntuacion, id_negado in sorted(mejores, reverse=True)]
+        return ordenados[inicio:inicio + limite], len(ordenados) > inicio + limite
+
+    def _candidatos(self, resto: List["_Termino"], requerido: float, pendientes: int) -> Optional[Set[int]]:
+        """
+        Documentos que pueden sumar al menos `requerido` con el resto de términos, si son
+        menos que los `pendientes` de recorrer del término guía.
+
+        Para sumarlo, algún término debe aportar al menos lo requerido menos lo máximo que
+        pueden aportar los demás; basta con reunir los niveles de peso que lo alcanzan. Se
+        incluyen con un pequeño margen por el redondeo (los documentos de más se descartan al
+        calcular su puntuación).
+
+        Returns
+        -------
+        Optional[Set[int]]
+            IDs de los documentos, o None si no compensa (o no se puede) acotarlos así.
+        """
+        if any(termino.comprobacion is None for termino in resto):
+            return None
+        margen = 1e-9 * (1 + abs(requerido))
+        maximo_resto = sum(termino.maximo for termino in resto)
+        seleccion: List[List[int]] = []
+        cuenta = 0
+        for termino in resto:
+            umbral = requerido - (maximo_resto - termino.maximo) - margen
+            for palabra, factor in termino.coincidencias.items():
+                for peso, documentos in self._niveles[palabra].items():
+                    if peso * factor >= umbral:
+                        seleccion.append(documentos)
+                        cuenta += len(documentos)
+            if cuenta >= pendientes:
+                return None
+        return set(chain.from_iterable(seleccion))
+
+    def _expandir(self, termino: str) -> List[str]:
+        """
+        Devuelve las palabras del vocabulario que coinciden con un término de la consulta:
+        él mismo y, si es lo bastante largo, las que empiezan por él.
+        """
+        if len(termino) < _LONGITUD_MINIMA_PREFIJO:
+            return [termino] if termino in self._pesos else []
+        vocabulario = self._vocabulario
+        inicio = bisect_left(vocabulario, termino)
+        return vocabulario[inicio:bisect_left(vocabulario, termino + _FIN_PREFIJO, inicio)]
+
+    def _factor(self, palabra: str, termino: str, total: int) -> float:
+        """
+        Multiplicador del peso de una palabra: su idf, reducido si solo coincide por prefijo.
+        """
+        idf = math.log(1 + total / len(self._pesos[palabra]))
+        return idf if palabra == termino else idf * _FACTOR_PREFIJO
+
+    def _anotar(self, palabra: str, id_documento: int, peso: int) -> bool:
+        """
+        Anota el peso de una palabra en un documento, sin tocar el vocabulario.
+
+        Returns
+        -------
+        bool
+            True si la palabra no estaba en el índice.
+        """
+        documentos = self._pesos.get(palabra)
+        nueva = documentos is None
+        if nueva:
+            documentos = self._pesos[palabra] = {}
+            self._niveles[palabra] = {}
+        documentos[id_documento] = peso
+        nivel = self._niveles[palabra].setdefault(peso, [])
+        # Los IDs suelen llegar en orden creciente: entonces basta con añadir al final.
+        if not nivel or nivel[-1] < id_documento:
+            nivel.append(id_documento)
+        else:
+            insort(nivel, id_documento)
+        return nueva
+
+    def _retirar(self, palabra: str, id_documento: int) -> None:
+        """
+        Retira una palabra de un documento; si se queda sin documentos, la quita también
+        del vocabulario.
+        """
+        documentos = self._pesos[palabra]
+        peso = documentos.pop(id_documento)
+        if not documentos:
+            del self._pesos[palabra]
+            del self._niveles[palabra]
+            del self._vocabulario[bisect_left(self._vocabulario, palabra)]
+            return
+        niveles = self._niveles[palabra]
+        nivel = niveles[peso]
+        del nivel[bisect_left(nivel, id_documento)]
+        if not nivel:
+            del niveles[peso]
+
+
+class _Termino:
+    """
+    Término de una consulta, con las palabras del índice que coinciden con él.
+
+    Attributes
+    ----------
+    coincidencias : Dict[str, float]
+        Palabras que coinciden y su multiplicador (ver `IndiceInvertido._factor`).
+    documentos : int
+        Número de documentos de las palabras que coinciden (con repeticiones).
+    maximo : float
+        Lo máximo que el término puede sumar a la puntuación de un documento.
+    comprobacion : Optional[List[Tuple[Dict[int, int], float]]]
+        Pesos por documento y multiplicador de cada palabra, para comprobar un documento
+        buscándolo en cada una; None si coinciden demasiadas palabras y es mejor recorrer
+        las palabras del documento.
+    """
+
+    def __init__(self, indice: IndiceInvertido, termino: str) -> None:
+        """
+        Busca las palabras del índice que coinciden con el término.
+        """
+        self._indice = indice
+        total = len(indice._palabras)
+        self.coincidencias = {palabra: indice._factor(palabra, termino, total)
+                              for palabra in indice._expandir(termino)}
+        self.documentos = sum(len(indice._pesos[palabra]) for palabra in self.coincidencias)
+        self.maximo = max((max(indice._niveles[palabra]) * factor for palabra, factor in self.coincidencias.items()),
+                          default=0.0)
+        self.comprobacion = ([(indice._pesos[palabra], factor) for palabra, factor in self.coincidencias.items()]
+                             if len(self.coincidencias) <= _PALABRAS_POR_CONSULTA else None)
+
+    def contribucion(self, id_documento: int) -> float:
+        """
+        Lo que el término suma a la puntuación de un documento: el mayor peso por
+        multiplicador de las palabras que coinciden, o 0 si no contiene ninguna.
+        """
+        mejor = 0.0
+        if self.comprobacion is not None:
+            for pesos, factor in self.comprobacion:
+                peso = pesos.get(id_documento)
+                if peso is not None and peso * factor > mejor:
+                    mejor = peso * factor
+            return mejor
+        pesos_palabras = self._indice._pesos
+        for palabra in self._indice._palabras.get(id_documento, ()):
+            factor = self.coincidencias.get(palabra)
+            if factor is not None and pesos_palabras[palabra][id_documento] * factor > mejor:
+                mejor = pesos_palabras[palabra][id_documento] * factor
+        return mejor
+
+    def recorrer(self) -> Iterator[Tuple[float, int]]:
+        """
+        Recorre los documentos que contienen alguna de las palabras que coinciden, de mayor a
+        menor contribución y, a igual contribución, por ID.
+
+        Returns
+        -------
+        Iterator[Tuple[float, int]]
+            Pares (contribución, ID). Un documento con varias de las palabras aparece una sola
+            vez, con la mayor contribución.
+        """
+        niveles = self._indice._niveles
+
+        def recorrer_palabra(palabra: str, factor: float) -> Iterator[Tuple[float, int]]:
+            por_peso = niveles[palabra]
+            for peso in sorted(por_peso, reverse=True):
+                contribucion = peso * factor
+                for id_documento in por_peso[peso]:
+                    yield contribucion, id_documento
+
+        if len(self.coincidencias) == 1:
+            yield from recorrer_palabra(*next(iter(self.coincidencias.items())))
+            return
+        vistos = set()
+        for contribucion, id_documento in heapq.merge(*(recorrer_palabra(palabra, factor)
+                                                        for palabra, factor in self.coincidencias.items()),
+                                                      key=lambda par: (-par[0], par[1])):
+            if id_documento not in vistos:
+                vistos.add(id_documento)
+                yield contribucion, id_documento
+
+
+def _contar(titulo: Optional[str], descripcion: Optional[str]) -> Dict[str, int]:
+    """
+    Peso de cada palabra de un documento: sus apariciones en la descripción más
+    `PESO_TITULO` por cada aparición en el título.
+    """
+    pesos: Dict[str, int] = {}
+    for palabra in normalizar(titulo or ""):
+        pesos[palabra] = pesos.get(palabra, 0) + PESO_TITULO
+    for palabra in normalizar(descripcion or ""):
+        pesos[palabra] = pesos.get(palabra, 0) + 1
+    return pesos
@@ -0,0 +1,194 @@
+"""
+Módulo: cache
+=============
+
+Cachés en memoria:
+
+    - `CacheVersionada`: resultados de consultas invalidados por un número de versión.
+    - `CacheLRU`: número limitado de entradas con caducidad; al llenarse descarta primero las
+      caducadas y después las usadas hace más tiempo.
+
+Los gestores exponen una `version` que cambia con cada modificación de los datos. En el
+backend SQLite esa versión se guarda en la propia base de datos, de modo que un cambio
+hecho por cualquier proceso (por ejemplo, otro worker de gunicorn) invalida las cachés de
+todos los demás la siguiente vez que las consultan, sin mensajes entre procesos.
+
+Dependencias:
+    - collections, heapq, threading, time y typing (biblioteca estándar).
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class CacheVersionada:
+    """
+    Guarda resultados de consultas mientras no cambie la versión de los datos.
+
+    Cada consulta a la caché lee la versión actual; si es distinta de la de los valores
+    guardados, estos se descartan. Un valor nunca es más antiguo que la versión leída al
+    pedirlo. Se puede usar desde varios hilos: en el peor caso dos hilos calculan el mismo
+    valor.
+
+    Parameters
+    ----------
+    version : Callable[[], int]
+        Función que devuelve la versión actual de los datos.
+    """
+
+    def __init__(self, version: Callable[[], int]) -> None:
+        """
+        Inicializa la caché vacía.
+        """
+        self._leer_version = version
+        self._version = None
+        self._datos: Dict[Hashable, Any] = {}
+
+    def obtener(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor guardado para `clave` o lo calcula y lo guarda.
+
+        Parameters
+        ----------
+        clave : Hashable
+            Identifica la consulta.
+        calcular : Callable[[], Any]
+            Calcula el valor si no está guardado para la versión actual.
+
+        Returns
+        -------
+        Any
+            El valor de la consulta.
+        """
+        version = self._leer_version()
+        datos = self._datos
+        if version != self._version:
+            # Se sustituye el diccionario en lugar de vaciarlo: un hilo que todavía esté
+            # calculando con la versión anterior guardará su valor en el diccionario viejo.
+            datos = {}
+            self._datos, self._version = datos, version
+        try:
+            return datos[clave]
+        except KeyError:
+            valor = datos[clave] = calcular()
+            return valor
+
+    def limpiar(self) -> None:
+        """
+        Descarta todos los valores guardados.
+        """
+        self._datos, self._version = {}, None
+
+
+class CacheLRU:
+    """
+    Caché con un máximo de entradas, cada una con un instante de caducidad opcional.
+
+    Una entrada caducada nunca se devuelve. Cuando la caché está llena, una inserción descarta
+    primero las entradas caducadas y, si no hay, la usada hace más tiempo. Todas las
+    operaciones son O(log n) y se pueden usar desde varios hilos.
+
+    Parameters
+    ----------
+    capacidad : int
+        Número máximo de entradas; con 0 la caché no guarda nada.
+    """
+
+    def __init__(self, capacidad: int) -> None:
+        """
+        Inicializa la caché vacía.
+        """
+        self.capacidad = capacidad
+        self._datos: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        # Montículo de (caducidad, orden, clave); puede contener entradas ya sustituidas.
+        self._caducidades: List[Tuple[float, int, Hashable]] = []
+        self._orden = 0
+        self._cerrojo = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """
+        Devuelve el valor guardado para `clave` y lo marca como usado.
+
+        Parameters
+        ----------
+        clave : Hashable
+            Clave a buscar.
+
+        Returns
+        -------
+        Optional[Any]
+            El valor, o None si no está o ha caducado.
+        """
+        with self._cerrojo:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            valor, caduca = entrada
+            if caduca is not None and caduca <= time.time():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any, caduca: Optional[float] = None) -> None:
+        """
+        Guarda un valor.
+
+        Parameters
+        ----------
+        clave : Hashable
+            Clave del valor.
+        valor : Any
+            Valor a guardar.
+        caduca : Optional[float], optional
+            Instante (segundos desde la época, como time.time()) a partir del cual el valor
+            deja de ser válido. None si no caduca.
+        """
+        if self.capacidad <= 0:
+            return
+        with self._cerrojo:
+            self._datos[clave] = (valor, caduca)
+            self._datos.move_to_end(clave)
+            if caduca is not None:
+                self._orden += 1
+                heapq.heappush(self._caducidades, (caduca, self._orden, clave))
+            if len(self._datos) > self.capacidad:
+                self._descartar_caducadas()
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+            if len(self._caducidades) > 2 * self.capacidad:
+                self._caducidades = [(fin, i, otra) for i, (otra, (_, fin)) in enumerate(self._datos.items())
+                                     if fin is not None]
+                heapq.heapify(self._caducidades)
+
+    def quitar(self, clave: Hashable) -> None:
+        """
+        Descarta el valor de `clave`, si está guardado.
+        """
+        with self._cerrojo:
+            self._datos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        """
+        Descarta todos los valores guardados.
+        """
+        with self._cerrojo:
+            self._datos.clear()
+            self._caducidades.clear()
+
+    def _descartar_caducadas(self) -> None:
+        """
+        Elimina las entradas caducadas; se llama con el cerrojo tomado.
+        """
+        ahora = time.time()
+        while self._caducidades and self._caducidades[0][0] <= ahora:
+            caduca, _, clave = heapq.heappop(self._caducidades)
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[1] == caduca:
+                del self._datos[clave]
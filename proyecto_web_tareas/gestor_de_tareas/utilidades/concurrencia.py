@@ -0,0 +1,131 @@
+"""
+Módulo: concurrencia
+====================
+
+Decoradores para usar los gestores desde varios hilos, como ocurre con los servidores WSGI
+con hilos (waitress, gunicorn con gthread o el propio servidor de desarrollo de Flask).
+
+Las escrituras se serializan con un cerrojo reentrante y las lecturas no lo toman: cada
+objeto sincronizado lleva un número de `version` que las escrituras incrementan al empezar y
+al terminar, de modo que es impar mientras hay una escritura en curso. Una lectura anota la
+versión, se ejecuta sin cerrojo y solo se repite con el cerrojo tomado si la versión era
+impar, si ha cambiado al terminar o si la lectura ha fallado porque otro hilo modificó las
+estructuras mientras las recorría. Con muchas más lecturas que escrituras, casi todas las
+lecturas se ejecutan en paralelo sin esperar a nadie.
+
+Los objetos decorados deben tener los atributos `cerrojo` (threading.RLock), `version`
+(int) y `_escrituras` (int, profundidad de escrituras anidadas), ver `preparar`.
+
+Dependencias:
+    - functools y threading (biblioteca estándar).
+"""
+
+import functools
+import threading
+from typing import Any, Callable, Optional
+
+# Errores que puede provocar una lectura sin cerrojo si otro hilo modifica a la vez los
+# diccionarios, conjuntos o listas que recorre (p. ej. "Set changed size during iteration").
+_ERRORES_DE_CARRERA = (RuntimeError, KeyError, IndexError)
+
+
+def preparar(objeto: Any, cerrojo: Optional[threading.RLock] = None) -> None:
+    """
+    Añade a un objeto los atributos que necesitan `escritura` y `lectura`.
+
+    Parameters
+    ----------
+    objeto : Any
+        Objeto que se va a sincronizar, normalmente un gestor en su `__init__`.
+    cerrojo : Optional[threading.RLock], optional
+        Cerrojo a compartir con otro objeto. Los gestores que escriben en el mismo diario
+        deben compartirlo para que sus escrituras no se mezclen.
+    """
+    objeto.cerrojo = cerrojo if cerrojo is not None else threading.RLock()
+    objeto.version = 0
+    objeto._escrituras = 0
+
+
+def escritura(metodo: Callable) -> Callable:
+    """
+    Decorador para los métodos que modifican el objeto.
+
+    El método se ejecuta con el cerrojo tomado. La versión se incrementa al entrar en la
+    escritura más externa y al salir de ella; las escrituras anidadas no la modifican.
+
+    Parameters
+    ----------
+    metodo : Callable
+        Método a decorar.
+
+    Returns
+    -------
+    Callable
+        Envoltura que conserva el nombre y la documentación del método.
+    """
+    @functools.wraps(metodo)
+    def envoltura(self: Any, *args: Any, **kwargs: Any) -> Any:
+        with self.cerrojo:
+            self._escrituras += 1
+            if self._escrituras == 1:
+                self.version += 1
+            try:
+                return metodo(self, *args, **kwargs)
+            finally:
+                self._escrituras -= 1
+                if self._escrituras == 0:
+                    self.version += 1
+    return envoltura
+
+
+def lectura(metodo: Callable) -> Callable:
+    """
+    Decorador para los métodos que solo consultan el objeto, ver `leer_optimista`.
+
+    Parameters
+    ----------
+    metodo : Callable
+        Método a decorar.
+
+    Returns
+    -------
+    Callable
+        Envoltura que conserva el nombre y la documentación del método.
+    """
+    @functools.wraps(metodo)
+    def envoltura(self: Any, *args: Any, **kwargs: Any) -> Any:
+        return leer_optimista(self, metodo, self, *args, **kwargs)
+    return envoltura
+
+
+def leer_optimista(objeto: Any, funcion: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Ejecuta una consulta sin cerrojo y la repite con él si ha coincidido con una escritura.
+
+    Parameters
+    ----------
+    objeto : Any
+        Objeto sincronizado que se consulta.
+    funcion : Callable
+        Consulta a ejecutar; no debe modificar el objeto ni tener otros efectos, como
+        mostrar mensajes, porque puede ejecutarse dos veces.
+    *args, **kwargs
+        Argumentos de `funcion`.
+
+    Returns
+    -------
+    Any
+        El resultado de `funcion`, calculado sobre un estado que ninguna escritura ha
+        modificado mientras se calculaba.
+    """
+    version = objeto.version
+    if not version & 1:
+        try:
+            resultado = funcion(*args, **kwargs)
+        except _ERRORES_DE_CARRERA:
+            pass
+        else:
+            if objeto.version == version:
+                return resultado
+    with objeto.cerrojo:
+        return funcion(*args, **kwargs)
@@ -1,11 +1,27 @@
-from typing import Callable, Any
+import functools
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from time import perf_counter
+from typing import Callable, Any, Optional
+
+from gestor_de_tareas.utilidades.metricas import metricas
+
+# Las trazas se activan con la variable de entorno GESTOR_TRAZAS=1 antes de importar los gestores.
+TRAZAS_ACTIVAS = os.environ.get("GESTOR_TRAZAS", "0") not in ("", "0")
+
+logger = logging.getLogger("gestor_de_tareas.trazas")
+
 
 def log_funcion(funcion: Callable) -> Callable:
     """
-    Decorador para imprimir un log antes y después de llamar a la función.
+    Decorador para registrar las llamadas a una función y su latencia.
 
-    Este decorador envuelve la función original para mostrar mensajes de log que indican
-    cuándo se inicia y cuándo se finaliza la ejecución de la función.
+    Si las trazas están desactivadas (por defecto), el decorador devuelve la función original,
+    por lo que no añade ningún coste. Si están activadas, cada llamada se contabiliza en el
+    registro de métricas en memoria (número de llamadas e histograma de latencias) y, si el
+    logger "gestor_de_tareas.trazas" acepta el nivel DEBUG, se emite un mensaje de log.
 
     Parameters
     ----------
@@ -15,13 +31,47 @@ def log_funcion(funcion: Callable) -> Callable:
     Returns
     -------
     Callable
-        Una función envuelta que imprime mensajes de log antes y después de ejecutar la
-        función original, devolviendo posteriormente el resultado de dicha función.
+        La función original o una envoltura que conserva su nombre y documentación.
     """
+    if not TRAZAS_ACTIVAS:
+        return funcion
+
+    nombre = funcion.__qualname__
+
+    @functools.wraps(funcion)
     def envoltura(*args: Any, **kwargs: Any) -> Any:
-        print(f"[LOG] Ejecutando: {funcion.__name__}")
-        resultado = funcion(*args, **kwargs)
-        print(f"[LOG] Finalizado: {funcion.__name__}")
-        return resultado
+        inicio = perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            duracion = perf_counter() - inicio
+            metricas.observar(nombre, duracion)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s finalizado en %.6f s", nombre, duracion)
     return envoltura
 
+
+def configurar_log_asincrono(manejador: Optional[logging.Handler] = None) -> QueueListener:
+    """
+    Envía los mensajes de traza a través de una cola para no bloquear el hilo de la petición.
+
+    El logger de trazas solo encola los registros; un hilo en segundo plano se encarga de
+    escribirlos con `manejador`.
+
+    Parameters
+    ----------
+    manejador : Optional[logging.Handler], optional
+        Manejador que escribe los registros (por defecto, un StreamHandler a stderr).
+
+    Returns
+    -------
+    QueueListener
+        El hilo de escucha ya iniciado; llamar a `stop()` al cerrar la aplicación.
+    """
+    cola: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(cola))
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    escucha = QueueListener(cola, manejador or logging.StreamHandler())
+    escucha.start()
+    return escucha
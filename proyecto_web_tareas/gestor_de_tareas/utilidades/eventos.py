@@ -0,0 +1,139 @@
+"""
+Módulo: eventos
+===============
+
+Mecanismo sencillo de publicación/suscripción para que otros componentes (persistencia,
+cachés, contadores...) reaccionen a los cambios de los gestores sin que estos los conozcan.
+
+`Difusor` avisa a quien espera cambios de un usuario concreto (p. ej. un flujo de eventos
+abierto por un cliente) cuando se modifican sus datos, sin despertar a los demás.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Set
+
+Suscriptor = Callable[[str, Dict[str, Any]], None]
+
+
+class Publicador:
+    """
+    Clase base que permite suscribirse a los eventos de un gestor.
+
+    Cada suscriptor es una función que recibe el tipo de evento (por ejemplo "crear" o
+    "eliminar") y un diccionario con los datos del evento. Los suscriptores se llaman de
+    forma síncrona, en el orden en que se registraron, después de aplicar el cambio.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa la lista de suscriptores vacía.
+        """
+        self._suscriptores: List[Suscriptor] = []
+
+    def suscribir(self, suscriptor: Suscriptor) -> None:
+        """
+        Registra una función que se llamará con cada evento.
+
+        Parameters
+        ----------
+        suscriptor : Callable[[str, Dict[str, Any]], None]
+            Función que recibe el tipo de evento y sus datos.
+        """
+        self._suscriptores.append(suscriptor)
+
+    def cancelar_suscripcion(self, suscriptor: Suscriptor) -> None:
+        """
+        Elimina una función previamente registrada.
+
+        Parameters
+        ----------
+        suscriptor : Callable[[str, Dict[str, Any]], None]
+            Función a eliminar. Si no estaba registrada, no se hace nada.
+        """
+        if suscriptor in self._suscriptores:
+            self._suscriptores.remove(suscriptor)
+
+    def _publicar(self, tipo: str, **datos: Any) -> None:
+        """
+        Notifica un evento a todos los suscriptores.
+
+        Parameters
+        ----------
+        tipo : str
+            Tipo de evento.
+        **datos : Any
+            Datos asociados al evento.
+        """
+        for suscriptor in self._suscriptores:
+            suscriptor(tipo, datos)
+
+
+class Difusor:
+    """
+    Avisos de cambios por usuario para los clientes que esperan en este proceso.
+
+    Cada suscripción es una función sin argumentos (p. ej. `threading.Event.set`) que se
+    llama cuando cambian los datos de su usuario. El aviso no lleva los cambios: quien lo
+    recibe los consulta (ver `RegistroCambiosMemoria.desde`), de modo que varios avisos
+    seguidos se resuelven con una sola consulta y una suscripción no acumula nada mientras
+    su cliente no lee. Avisar a un usuario solo recorre sus suscripciones, así que las de
+    los demás usuarios no cuestan nada.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa el difusor sin suscripciones.
+        """
+        self._suscripciones: Dict[str, Set[Callable[[], None]]] = {}
+        self._cerrojo = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._cerrojo:
+            return sum(len(avisos) for avisos in self._suscripciones.values())
+
+    def suscribir(self, usuario: str, avisar: Callable[[], None]) -> None:
+        """
+        Registra una función que se llamará cuando cambien los datos del usuario.
+
+        Parameters
+        ----------
+        usuario : str
+            Usuario cuyos cambios interesan.
+        avisar : Callable[[], None]
+            Función a llamar; debe ser rápida y no bloquear, porque se llama desde el hilo
+            que ha hecho el cambio.
+        """
+        with self._cerrojo:
+            self._suscripciones.setdefault(usuario, set()).add(avisar)
+
+    def cancelar_suscripcion(self, usuario: str, avisar: Callable[[], None]) -> None:
+        """
+        Elimina una suscripción. Si no existe, no se hace nada.
+        """
+        with self._cerrojo:
+            avisos = self._suscripciones.get(usuario)
+            if avisos is not None:
+                avisos.discard(avisar)
+                if not avisos:
+                    del self._suscripciones[usuario]
+
+    def usuarios(self) -> List[str]:
+        """
+        Devuelve los usuarios con alguna suscripción.
+        """
+        with self._cerrojo:
+            return list(self._suscripciones)
+
+    def avisar(self, usuario: str) -> None:
+        """
+        Avisa a las suscripciones del usuario de que sus datos han cambiado.
+
+        Parameters
+        ----------
+        usuario : str
+            Usuario cuyos datos han cambiado.
+        """
+        with self._cerrojo:
+            avisos = list(self._suscripciones.get(usuario, ()))
+        for avisar in avisos:
+            avisar()
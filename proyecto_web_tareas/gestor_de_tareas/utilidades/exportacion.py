@@ -0,0 +1,179 @@
+"""
+Módulo: exportacion
+===================
+
+Exportación en streaming de tareas y proyectos en formato NDJSON (una tarea JSON por línea)
+o CSV.
+
+Las funciones de este módulo son generadores: reciben un iterable de tareas (normalmente
+`gestor.recorrer()`) y producen el texto a medida que se consume, de modo que exportar
+millones de tareas usa una memoria constante. `agrupar` junta las líneas en bloques de
+tamaño acotado para que cada escritura en el socket o en el archivo no sea de una sola
+línea; en Flask, devolver ese generador en una Response sin longitud produce una respuesta
+con "Transfer-Encoding: chunked".
+
+Cada línea NDJSON es el diccionario de `Tarea.a_dict`. En CSV las etiquetas se unen con
+SEPARADOR_ETIQUETAS.
+
+Dependencias:
+    - csv y json (biblioteca estándar).
+    - gestor_de_tareas.clases.tarea: Tarea.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator, Mapping
+
+from gestor_de_tareas.clases.tarea import Tarea
+
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CAMPOS_CSV = ("id_tarea", "titulo", "descripcion", "fecha_limite", "estado", "prioridad",
+              "etiquetas", "usuario_asignado")
+SEPARADOR_ETIQUETAS = "|"
+# Tamaño aproximado, en caracteres, de cada bloque que produce `agrupar`.
+TAMANO_BLOQUE = 64 * 1024
+
+
+def lineas_ndjson(tareas: Iterable[Tarea]) -> Iterator[str]:
+    """
+    Convierte cada tarea en una línea JSON.
+
+    Parameters
+    ----------
+    tareas : Iterable[Tarea]
+        Tareas a exportar.
+
+    Returns
+    -------
+    Iterator[str]
+        Una línea terminada en "\\n" por tarea.
+    """
+    codificar = json.JSONEncoder(ensure_ascii=False).encode
+    for tarea in tareas:
+        yield codificar(tarea.a_dict()) + "\n"
+
+
+def lineas_csv(tareas: Iterable[Tarea]) -> Iterator[str]:
+    """
+    Convierte las tareas en filas CSV, precedidas de la fila de cabecera.
+
+    Parameters
+    ----------
+    tareas : Iterable[Tarea]
+        Tareas a exportar.
+
+    Returns
+    -------
+    Iterator[str]
+        La cabecera y una fila por tarea.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(CAMPOS_CSV)
+    yield buffer.getvalue()
+    for tarea in tareas:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerow((
+            tarea.id_tarea,
+            tarea.titulo,
+            tarea.descripcion,
+            tarea.fecha_limite.isoformat() if tarea.fecha_limite else "",
+            tarea.estado.name,
+            tarea.prioridad,
+            SEPARADOR_ETIQUETAS.join(tarea.etiquetas),
+            tarea.usuario_asignado or "",
+        ))
+        yield buffer.getvalue()
+
+
+def exportar_tareas(tareas: Iterable[Tarea], formato: str = "ndjson") -> Iterator[str]:
+    """
+    Exporta tareas en el formato indicado, agrupadas en bloques.
+
+    Parameters
+    ----------
+    tareas : Iterable[Tarea]
+        Tareas a exportar.
+    formato : str, optional
+        "ndjson" (por defecto) o "csv".
+
+    Returns
+    -------
+    Iterator[str]
+        Bloques de texto listos para escribirse.
+
+    Raises
+    ------
+    ValueError
+        Si el formato no existe.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación desconocido: {formato}.")
+    lineas = lineas_csv(tareas) if formato == "csv" else lineas_ndjson(tareas)
+    return agrupar(lineas)
+
+
+def exportar_proyectos(proyectos: Mapping[str, Any], lote: int = 1000) -> Iterator[str]:
+    """
+    Exporta los proyectos en NDJSON, una línea {"nombre", "tareas"} por proyecto.
+
+    Las tareas de cada proyecto se leen con `paginar_tareas` y solo se guardan sus IDs.
+
+    Parameters
+    ----------
+    proyectos : Mapping[str, Any]
+        Proyectos por nombre (Proyecto o ProyectoSQLite).
+    lote : int, optional
+        Número de tareas que se leen en cada página (por defecto 1000).
+
+    Returns
+    -------
+    Iterator[str]
+        Bloques de texto listos para escribirse.
+    """
+    def lineas():
+        codificar = json.JSONEncoder(ensure_ascii=False).encode
+        for nombre in list(proyectos):
+            proyecto = proyectos.get(nombre)
+            if proyecto is None:
+                continue
+            ids, cursor = [], None
+            while True:
+                tareas, cursor = proyecto.paginar_tareas(lote, cursor)
+                ids.extend(tarea.id_tarea for tarea in tareas)
+                if cursor is None:
+                    break
+            yield codificar({"nombre": nombre, "tareas": ids}) + "\n"
+
+    return agrupar(lineas())
+
+
+def agrupar(lineas: Iterable[str], tamano: int = TAMANO_BLOQUE) -> Iterator[str]:
+    """
+    Junta líneas consecutivas en bloques de unos `tamano` caracteres.
+
+    Parameters
+    ----------
+    lineas : Iterable[str]
+        Líneas a agrupar.
+    tamano : int, optional
+        Tamaño a partir del cual se emite un bloque (por defecto TAMANO_BLOQUE).
+
+    Returns
+    -------
+    Iterator[str]
+        Bloques de texto; el último puede ser más pequeño.
+    """
+    bloque = []
+    acumulado = 0
+    for linea in lineas:
+        bloque.append(linea)
+        acumulado += len(linea)
+        if acumulado >= tamano:
+            yield "".join(bloque)
+            bloque = []
+            acumulado = 0
+    if bloque:
+        yield "".join(bloque)
@@ -0,0 +1,256 @@
+"""
+Módulo: importacion
+===================
+
+Lectura y validación por lotes de tareas en formato NDJSON o CSV, para la creación masiva
+con `GestorDeTareas.crear_tareas` (o `GestorDeTareasSQLite.crear_tareas`).
+
+Los formatos son los mismos que produce gestor_de_tareas.utilidades.exportacion, así que una
+exportación se puede volver a importar; el campo "id_tarea" se ignora y las tareas reciben
+IDs nuevos. Solo "titulo" es obligatorio. En CSV las etiquetas van separadas por
+SEPARADOR_ETIQUETAS.
+
+Los lectores son generadores que producen un registro por línea (o fila) no vacía: un
+diccionario con los campos, o un ValueError si la línea no se puede interpretar, de modo que
+el error se informa en su posición sin detener la importación. `validar_lote` convierte un
+lote de registros en los argumentos de las tareas y analiza las fechas una sola vez por
+cada valor distinto del lote.
+
+Dependencias:
+    - csv y json (biblioteca estándar).
+    - gestor_de_tareas.clases.tarea: EstadoTarea.
+    - gestor_de_tareas.utilidades.exportacion: SEPARADOR_ETIQUETAS.
+"""
+
+import csv
+import gc
+import json
+from contextlib import contextmanager
+from datetime import date
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from gestor_de_tareas.clases.tarea import EstadoTarea
+from gestor_de_tareas.utilidades.exportacion import SEPARADOR_ETIQUETAS
+
+# Campos ya validados de una tarea: [titulo, descripcion, fecha_limite, prioridad, etiquetas,
+# usuario_asignado, estado].
+CamposTarea = List[Any]
+# Número de registros que se validan e insertan juntos por defecto.
+TAMANO_LOTE = 10_000
+# Estados admitidos, por nombre ("EN_PROGRESO") o por valor ("En progreso").
+_ESTADOS = {**{estado.name: estado for estado in EstadoTarea},
+            **{estado.value: estado for estado in EstadoTarea}}
+
+
+def leer_ndjson(lineas: Iterable[Union[str, bytes]]) -> Iterator[Union[Dict[str, Any], ValueError]]:
+    """
+    Interpreta cada línea no vacía como un objeto JSON.
+
+    Parameters
+    ----------
+    lineas : Iterable[Union[str, bytes]]
+        Líneas del documento, por ejemplo un archivo abierto.
+
+    Returns
+    -------
+    Iterator[Union[Dict[str, Any], ValueError]]
+        Un diccionario por línea, o un ValueError si la línea no es un objeto JSON.
+    """
+    for linea in lineas:
+        if not linea.strip():
+            continue
+        try:
+            datos = json.loads(linea)
+        except ValueError:
+            yield ValueError("JSON no válido.")
+            continue
+        yield datos if isinstance(datos, dict) else ValueError("Se esperaba un objeto JSON.")
+
+
+def leer_csv(lineas: Iterable[str]) -> Iterator[Union[Dict[str, Any], ValueError]]:
+    """
+    Interpreta un CSV con fila de cabecera, como el que genera la exportación.
+
+    Parameters
+    ----------
+    lineas : Iterable[str]
+        Líneas del documento. Si procede de un archivo, debe abrirse con newline="" para
+        respetar los saltos de línea dentro de los campos.
+
+    Returns
+    -------
+    Iterator[Union[Dict[str, Any], ValueError]]
+        Un diccionario por fila con las etiquetas ya separadas, o un ValueError si la fila
+        tiene más columnas que la cabecera.
+    """
+    for fila in csv.DictReader(lineas):
+        if None in fila:
+            yield ValueError("La fila tiene más columnas que la cabecera.")
+            continue
+        etiquetas = fila.get("etiquetas")
+        fila["etiquetas"] = etiquetas.split(SEPARADOR_ETIQUETAS) if etiquetas else []
+        yield fila
+
+
+def por_lotes(registros: Iterable[Any], tamano: int = TAMANO_LOTE) -> Iterator[List[Tuple[int, Any]]]:
+    """
+    Agrupa los registros en lotes, numerándolos desde 1.
+
+    Cada lote se lee (y, con `leer_ndjson` o `leer_csv`, se decodifica) con el recolector
+    de ciclos suspendido, ver `sin_recolector`.
+
+    Parameters
+    ----------
+    registros : Iterable[Any]
+        Registros a agrupar.
+    tamano : int, optional
+        Número máximo de registros por lote (por defecto TAMANO_LOTE).
+
+    Returns
+    -------
+    Iterator[List[Tuple[int, Any]]]
+        Lotes de pares (posición, registro).
+    """
+    numerados = enumerate(registros, 1)
+    while True:
+        with sin_recolector():
+            lote = list(islice(numerados, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+@contextmanager
+def sin_recolector() -> Iterator[None]:
+    """
+    Suspende el recolector de ciclos mientras se procesa un lote.
+
+    Crear decenas de miles de objetos seguidos dispara colecciones completas que recorren
+    todos los objetos vivos, de modo que el coste de cada lote crecería con el total de
+    tareas. Las tareas no forman ciclos, así que no hace falta el recolector durante el lote;
+    al salir se restaura el estado anterior.
+    """
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+
+
+def parsear_fechas(textos: Iterable[str]) -> Dict[str, date]:
+    """
+    Analiza un conjunto de fechas "YYYY-MM-DD", una sola vez por cada valor distinto.
+
+    Parameters
+    ----------
+    textos : Iterable[str]
+        Fechas a analizar; puede haber repetidas.
+
+    Returns
+    -------
+    Dict[str, date]
+        Fecha de cada texto válido. Los textos no válidos no aparecen.
+    """
+    fechas = {}
+    for texto in set(textos):
+        # date.fromisoformat acepta también otros formatos ISO; solo se admite YYYY-MM-DD.
+        if len(texto) != 10 or texto[4] != "-" or texto[7] != "-":
+            continue
+        try:
+            fechas[texto] = date.fromisoformat(texto)
+        except ValueError:
+            continue
+    return fechas
+
+
+def validar_lote(lote: List[Tuple[int, Any]]) -> Tuple[List[Tuple[int, CamposTarea]], List[Tuple[int, str]]]:
+    """
+    Valida un lote de registros y convierte sus campos.
+
+    Parameters
+    ----------
+    lote : List[Tuple[int, Any]]
+        Pares (posición, registro) generados por `por_lotes`.
+
+    Returns
+    -------
+    Tuple[List[Tuple[int, CamposTarea]], List[Tuple[int, str]]]
+        Pares (posición, campos) de los registros válidos, en el orden de entrada, y pares
+        (posición, mensaje) de los que tienen errores.
+    """
+    errores: List[Tuple[int, str]] = []
+    candidatos = []
+    for posicion, registro in lote:
+        try:
+            candidatos.append((posicion, _convertir(registro)))
+        except ValueError as error:
+            errores.append((posicion, str(error)))
+
+    fechas = parsear_fechas(campos[2] for _, campos in candidatos if campos[2] is not None)
+    validos = []
+    for posicion, campos in candidatos:
+        texto = campos[2]
+        if texto is not None:
+            fecha = fechas.get(texto)
+            if fecha is None:
+                errores.append((posicion, "Fecha mal formateada. Usa YYYY-MM-DD."))
+                continue
+            campos[2] = fecha
+        validos.append((posicion, campos))
+    errores.sort()
+    return validos, errores
+
+
+def _convertir(registro: Any) -> List[Any]:
+    """
+    Comprueba los tipos de un registro y normaliza sus campos, salvo la fecha.
+
+    Parameters
+    ----------
+    registro : Any
+        Diccionario leído o ValueError del lector.
+
+    Returns
+    -------
+    List[Any]
+        Campos en el orden de CamposTarea, con la fecha todavía como texto (o None).
+
+    Raises
+    ------
+    ValueError
+        Si el registro no es válido; el mensaje describe el problema.
+    """
+    if isinstance(registro, ValueError):
+        raise registro
+    if not isinstance(registro, dict):
+        raise ValueError("Registro no válido.")
+    titulo = registro.get("titulo")
+    if not isinstance(titulo, str) or not titulo:
+        raise ValueError("El título es obligatorio.")
+    descripcion = registro.get("descripcion") or ""
+    if not isinstance(descripcion, str):
+        raise ValueError("La descripción debe ser texto.")
+    fecha = registro.get("fecha_limite") or None
+    if fecha is not None and not isinstance(fecha, str):
+        raise ValueError("Fecha mal formateada. Usa YYYY-MM-DD.")
+    prioridad = registro.get("prioridad")
+    if type(prioridad) is not int:  # bool es subclase de int y no se admite.
+        if prioridad is None or prioridad == "":
+            prioridad = 2
+        elif isinstance(prioridad, str) and prioridad.strip().isdigit():
+            prioridad = int(prioridad)
+        else:
+            raise ValueError("La prioridad debe ser un número entero.")
+    etiquetas = registro.get("etiquetas") or []
+    if not isinstance(etiquetas, list) or not all(isinstance(etiqueta, str) for etiqueta in etiquetas):
+        raise ValueError("Las etiquetas deben ser una lista de textos.")
+    usuario = registro.get("usuario_asignado") or None
+    if usuario is not None and not isinstance(usuario, str):
+        raise ValueError("El usuario asignado debe ser texto.")
+    estado = registro.get("estado") or EstadoTarea.PENDIENTE.name
+    if not isinstance(estado, str) or estado not in _ESTADOS:
+        raise ValueError(f"Estado desconocido: {estado}.")
+    return [titulo, descripcion, fecha, prioridad, etiquetas, usuario, _ESTADOS[estado]]
@@ -0,0 +1,204 @@
+"""
+Módulo: indices
+===============
+
+Estructuras auxiliares para mantener índices ordenados de tareas de forma incremental.
+
+Dependencias:
+    - bisect para la búsqueda binaria sobre listas ordenadas.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+# Al insertar o eliminar un lote de claves, si el lote tiene menos de una clave por cada
+# este número de claves del índice, se procesan una a una con bisect; si no, se reconstruye
+# la lista de una vez.
+_PROPORCION_LOTE = 64
+
+
+class IndiceOrdenado:
+    """
+    Lista de claves que se mantiene ordenada al insertar y eliminar.
+
+    Las claves son tuplas comparables cuyo último elemento es el identificador de la
+    tarea, de modo que dos tareas nunca comparten clave, o los propios identificadores. La búsqueda de la posición es
+    O(log n) y el desplazamiento de elementos se realiza en C, por lo que insertar o
+    eliminar es mucho más barato que volver a ordenar todas las tareas en cada consulta.
+
+    Attributes
+    ----------
+    claves : List[Tuple[Any, ...]]
+        Claves ordenadas de forma ascendente.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa un índice vacío.
+        """
+        self.claves: List[Tuple[Any, ...]] = []
+
+    def agregar(self, clave: Tuple[Any, ...]) -> None:
+        """
+        Inserta una clave manteniendo el orden.
+
+        Parameters
+        ----------
+        clave : Tuple[Any, ...]
+            Clave a insertar.
+        """
+        insort(self.claves, clave)
+
+    def cargar(self, claves: Iterable[Tuple[Any, ...]]) -> None:
+        """
+        Inserta muchas claves de una vez, ordenando el índice una sola vez.
+
+        Es preferible a llamar a `agregar` repetidamente al construir un índice grande, ya
+        que evita desplazar la lista en cada inserción. Si el lote es pequeño en relación con
+        el índice, se inserta clave a clave para no reordenar toda la lista.
+
+        Parameters
+        ----------
+        claves : Iterable[Tuple[Any, ...]]
+            Claves a insertar.
+        """
+        claves = list(claves)
+        if len(claves) * _PROPORCION_LOTE < len(self.claves):
+            for clave in claves:
+                insort(self.claves, clave)
+        else:
+            self.claves.extend(claves)
+            self.claves.sort()
+
+    def quitar(self, clave: Tuple[Any, ...]) -> bool:
+        """
+        Elimina una clave del índice.
+
+        Parameters
+        ----------
+        clave : Tuple[Any, ...]
+            Clave a eliminar.
+
+        Returns
+        -------
+        bool
+            True si la clave estaba en el índice, False en caso contrario.
+        """
+        posicion = bisect_left(self.claves, clave)
+        if posicion < len(self.claves) and self.claves[posicion] == clave:
+            del self.claves[posicion]
+            return True
+        return False
+
+    def quitar_varias(self, claves: Iterable[Tuple[Any, ...]]) -> None:
+        """
+        Elimina muchas claves de una vez.
+
+        Si el lote es grande en relación con el índice, la lista se reconstruye en una sola
+        pasada en lugar de desplazarla en cada eliminación. Las claves que no están en el
+        índice se ignoran.
+
+        Parameters
+        ----------
+        claves : Iterable[Tuple[Any, ...]]
+            Claves a eliminar.
+        """
+        claves = set(claves)
+        if len(claves) * _PROPORCION_LOTE < len(self.claves):
+            for clave in claves:
+                self.quitar(clave)
+        elif claves:
+            self.claves[:] = [clave for clave in self.claves if clave not in claves]
+
+    def primeros(self, k: int) -> List[Tuple[Any, ...]]:
+        """
+        Devuelve las `k` claves menores sin recorrer el resto del índice.
+
+        Parameters
+        ----------
+        k : int
+            Número de claves a devolver.
+
+        Returns
+        -------
+        List[Tuple[Any, ...]]
+            Las `k` primeras claves en orden ascendente.
+        """
+        return self.claves[:k]
+
+    def desde(self, clave: Optional[Tuple[Any, ...]]) -> Iterator[Tuple[Any, ...]]:
+        """
+        Itera en orden ascendente sobre las claves mayores que `clave`.
+
+        La posición inicial se localiza con búsqueda binaria, así que no se recorren las
+        claves anteriores.
+
+        Parameters
+        ----------
+        clave : Optional[Tuple[Any, ...]]
+            Clave a partir de la cual empezar (excluida). Si es None, se empieza por la primera.
+
+        Returns
+        -------
+        Iterator[Tuple[Any, ...]]
+            Iterador sobre las claves siguientes.
+        """
+        claves = self.claves
+        posicion = 0 if clave is None else bisect_right(claves, clave)
+        return (claves[i] for i in range(posicion, len(claves)))
+
+    def entre(self,
+              inicio: Tuple[Any, ...],
+              fin: Tuple[Any, ...],
+              limite: Optional[int] = None) -> List[Tuple[Any, ...]]:
+        """
+        Devuelve en orden ascendente las claves `c` con `inicio <= c < fin`.
+
+        Ambos extremos se localizan con búsqueda binaria y el rango se copia de una vez, así
+        que el coste es O(log n + k) para k claves devueltas. Como las claves son tuplas,
+        se pueden usar prefijos: `entre((a,), (b,))` devuelve las claves cuyo primer
+        elemento está en [a, b).
+
+        Parameters
+        ----------
+        inicio : Tuple[Any, ...]
+            Extremo inferior (incluido).
+        fin : Tuple[Any, ...]
+            Extremo superior (excluido).
+        limite : Optional[int], optional
+            Número máximo de claves a devolver (las primeras del rango); None para todas.
+
+        Returns
+        -------
+        List[Tuple[Any, ...]]
+            Claves del rango.
+        """
+        claves = self.claves
+        primera = bisect_left(claves, inicio)
+        ultima = bisect_left(claves, fin)
+        if limite is not None:
+            ultima = min(ultima, primera + limite)
+        return claves[primera:ultima]
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        """
+        Itera sobre las claves en orden ascendente.
+
+        Returns
+        -------
+        Iterator[Tuple[Any, ...]]
+            Iterador sobre las claves.
+        """
+        return iter(self.claves)
+
+    def __len__(self) -> int:
+        """
+        Retorna el número de claves del índice.
+
+        Returns
+        -------
+        int
+            Número de claves.
+        """
+        return len(self.claves)
+
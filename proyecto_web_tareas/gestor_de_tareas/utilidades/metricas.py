@@ -0,0 +1,236 @@
+"""
+Módulo: metricas
+================
+
+Recolector de métricas en memoria para medir cuántas veces se llama a cada operación y
+cuánto tarda. Está pensado para el camino caliente de las peticiones: registrar una
+observación solo incrementa contadores en memoria, sin locks ni escrituras a disco.
+
+Las actualizaciones no usan locks; bajo el GIL, en el peor caso, dos hilos concurrentes
+pueden perder algún incremento, lo cual es aceptable para métricas de monitorización.
+
+Las métricas se pueden exportar en el formato de texto de Prometheus con
+`exportar_prometheus` y, en aplicaciones Flask, `instrumentar_app` mide cada petición.
+
+Dependencias:
+    - bisect para localizar el intervalo del histograma.
+    - flask (solo en `instrumentar_app`).
+"""
+
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Límites superiores (en segundos) de los intervalos de los histogramas de latencia.
+LIMITES_LATENCIA: Tuple[float, ...] = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0
+)
+
+
+class Histograma:
+    """
+    Histograma acumulado de latencias.
+
+    Attributes
+    ----------
+    limites : Tuple[float, ...]
+        Límites superiores de cada intervalo, en orden ascendente.
+    cuentas : List[int]
+        Número de observaciones de cada intervalo; la última posición cuenta las que
+        superan el mayor límite.
+    suma : float
+        Suma de todas las observaciones.
+    total : int
+        Número total de observaciones.
+    """
+    __slots__ = ("limites", "cuentas", "suma", "total")
+
+    def __init__(self, limites: Tuple[float, ...] = LIMITES_LATENCIA) -> None:
+        """
+        Inicializa un histograma vacío.
+
+        Parameters
+        ----------
+        limites : Tuple[float, ...], optional
+            Límites superiores de los intervalos (por defecto LIMITES_LATENCIA).
+        """
+        self.limites = limites
+        self.cuentas: List[int] = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        """
+        Registra una observación.
+
+        Parameters
+        ----------
+        valor : float
+            Valor observado (por ejemplo, segundos de ejecución).
+        """
+        self.cuentas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class RegistroMetricas:
+    """
+    Conjunto de histogramas identificados por nombre.
+
+    Attributes
+    ----------
+    histogramas : Dict[str, Histograma]
+        Histogramas registrados, indexados por nombre de la operación.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa un registro vacío.
+        """
+        self.histogramas: Dict[str, Histograma] = {}
+
+    def observar(self, nombre: str, valor: float) -> None:
+        """
+        Registra una observación en el histograma `nombre`, creándolo si no existe.
+
+        Parameters
+        ----------
+        nombre : str
+            Nombre de la operación medida.
+        valor : float
+            Valor observado.
+        """
+        histograma = self.histogramas.get(nombre)
+        if histograma is None:
+            histograma = self.histogramas.setdefault(nombre, Histograma())
+        histograma.observar(valor)
+
+    def reiniciar(self) -> None:
+        """
+        Elimina todas las observaciones registradas.
+        """
+        self.histogramas.clear()
+
+
+# Registro global usado por el decorador `log_funcion`.
+metricas = RegistroMetricas()
+# Latencia de las peticiones HTTP, indexada por "MÉTODO /ruta".
+metricas_http = RegistroMetricas()
+# Duración de las operaciones de guardado de la capa de persistencia.
+metricas_persistencia = RegistroMetricas()
+
+
+def _escapar(valor: str) -> str:
+    """
+    Escapa el valor de una etiqueta según el formato de texto de Prometheus.
+
+    Parameters
+    ----------
+    valor : str
+        Valor a escapar.
+
+    Returns
+    -------
+    str
+        Valor con barras invertidas, comillas y saltos de línea escapados.
+    """
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formatear_histogramas(nombre: str, ayuda: str, etiqueta: str,
+                          registro: RegistroMetricas) -> List[str]:
+    """
+    Convierte los histogramas de un registro en líneas del formato de Prometheus.
+
+    Parameters
+    ----------
+    nombre : str
+        Nombre de la métrica.
+    ayuda : str
+        Texto descriptivo de la métrica.
+    etiqueta : str
+        Nombre de la etiqueta que recibe el nombre de cada histograma.
+    registro : RegistroMetricas
+        Registro con los histogramas a exportar.
+
+    Returns
+    -------
+    List[str]
+        Líneas HELP, TYPE, _bucket, _sum y _count.
+    """
+    lineas = [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} histogram"]
+    for clave, histograma in list(registro.histogramas.items()):
+        etiquetas = f'{etiqueta}="{_escapar(clave)}"'
+        acumulado = 0
+        for limite, cuenta in zip(histograma.limites, histograma.cuentas):
+            acumulado += cuenta
+            lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+        acumulado += histograma.cuentas[-1]
+        lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {acumulado}')
+        lineas.append(f"{nombre}_sum{{{etiquetas}}} {histograma.suma}")
+        lineas.append(f"{nombre}_count{{{etiquetas}}} {acumulado}")
+    return lineas
+
+
+def exportar_prometheus(indicadores: Iterable[Tuple[str, str, float]] = ()) -> str:
+    """
+    Genera el texto de exposición de Prometheus con todas las métricas registradas.
+
+    Parameters
+    ----------
+    indicadores : Iterable[Tuple[str, str, float]], optional
+        Indicadores instantáneos (tipo gauge) como tuplas (nombre, ayuda, valor), por ejemplo
+        el número de tareas o de proyectos. Sus nombres no deben terminar en "_total", que
+        Prometheus reserva para los contadores.
+
+    Returns
+    -------
+    str
+        Texto en formato de exposición de Prometheus (versión 0.0.4).
+    """
+    lineas: List[str] = []
+    lineas += formatear_histogramas("http_peticion_duracion_segundos",
+                                    "Latencia de las peticiones HTTP por ruta.", "ruta", metricas_http)
+    lineas += formatear_histogramas("gestor_metodo_duracion_segundos",
+                                    "Duración de los métodos de los gestores (requiere GESTOR_TRAZAS=1).",
+                                    "metodo", metricas)
+    lineas += formatear_histogramas("persistencia_guardado_duracion_segundos",
+                                    "Duración de las operaciones de guardado.", "operacion",
+                                    metricas_persistencia)
+    for nombre, ayuda, valor in indicadores:
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} gauge", f"{nombre} {valor}"]
+    return "\n".join(lineas) + "\n"
+
+
+def instrumentar_app(app: Any, indicadores: Callable[[], Iterable[Tuple[str, str, float]]]) -> None:
+    """
+    Mide la latencia de cada petición de una aplicación Flask y añade la ruta /metrics.
+
+    La duración se agrupa por método HTTP y patrón de ruta (por ejemplo "GET /modificar"),
+    no por URL concreta, para que el número de series no crezca sin límite.
+
+    Parameters
+    ----------
+    app : flask.Flask
+        Aplicación a instrumentar.
+    indicadores : Callable[[], Iterable[Tuple[str, str, float]]]
+        Función que devuelve los indicadores instantáneos en el momento de la consulta.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def _iniciar_cronometro() -> None:
+        g.inicio_peticion = perf_counter()
+
+    @app.after_request
+    def _registrar_duracion(respuesta: Any) -> Any:
+        inicio = g.pop("inicio_peticion", None)
+        if inicio is not None:
+            ruta = request.url_rule.rule if request.url_rule else "<sin_ruta>"
+            metricas_http.observar(f"{request.method} {ruta}", perf_counter() - inicio)
+        return respuesta
+
+    @app.route("/metrics")
+    def metrics() -> Any:
+        return Response(exportar_prometheus(indicadores()),
+                        mimetype="text/plain; version=0.0.4; charset=utf-8")
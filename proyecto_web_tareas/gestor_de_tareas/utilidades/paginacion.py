@@ -0,0 +1,119 @@
+"""
+Módulo: paginacion
+==================
+
+Utilidades para la paginación por cursor (keyset) de los listados de tareas.
+
+En lugar de saltar las N primeras tareas (OFFSET), cada página empieza justo después de la
+clave de la última tarea de la página anterior. Así el coste de una página no depende de su
+posición ni del total de tareas, y las páginas no se desplazan si se crean o eliminan tareas
+entre dos peticiones.
+
+Los cursores son cadenas opacas para el cliente: la clave de ordenación de la última tarea
+devuelta, con sus enteros separados por puntos. Con `orden="id"` la clave es (id,) y con
+`orden="prioridad"` es (prioridad, ordinal de la fecha límite, id).
+"""
+
+from datetime import date
+from typing import Optional, Tuple
+
+from gestor_de_tareas.clases.tarea import Tarea
+
+# Ordinal usado para las tareas sin fecha límite: se ordenan detrás de las que tienen fecha.
+ORDINAL_SIN_FECHA = date.max.toordinal() + 1
+# Órdenes de listado admitidos y número de enteros de la clave de cada uno.
+ORDENES = {"id": 1, "prioridad": 3}
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+
+def clave_cursor(tarea: Tarea, orden: str) -> Tuple[int, ...]:
+    """
+    Calcula la clave de ordenación de una tarea para el orden indicado.
+
+    Parameters
+    ----------
+    tarea : Tarea
+        Tarea de la que se calcula la clave.
+    orden : str
+        Orden del listado ("id" o "prioridad").
+
+    Returns
+    -------
+    Tuple[int, ...]
+        (id,) o (prioridad, ordinal de la fecha límite, id).
+    """
+    if orden == "prioridad":
+        fecha = tarea.fecha_limite.toordinal() if isinstance(tarea.fecha_limite, date) else ORDINAL_SIN_FECHA
+        return (tarea.prioridad, fecha, tarea.id_tarea)
+    return (tarea.id_tarea,)
+
+
+def codificar_cursor(clave: Tuple[int, ...]) -> str:
+    """
+    Convierte la clave de ordenación de una tarea en un cursor.
+
+    Parameters
+    ----------
+    clave : Tuple[int, ...]
+        Clave de la última tarea de una página.
+
+    Returns
+    -------
+    str
+        Cursor para pedir la página siguiente.
+    """
+    return ".".join(str(valor) for valor in clave)
+
+
+def decodificar_cursor(cursor: Optional[str], orden: str) -> Optional[Tuple[int, ...]]:
+    """
+    Convierte un cursor en la clave a partir de la cual continuar el listado.
+
+    Parameters
+    ----------
+    cursor : Optional[str]
+        Cursor recibido, o None/cadena vacía para la primera página.
+    orden : str
+        Orden del listado ("id" o "prioridad").
+
+    Returns
+    -------
+    Optional[Tuple[int, ...]]
+        Clave de la última tarea ya listada, o None para empezar desde el principio.
+
+    Raises
+    ------
+    ValueError
+        Si el orden no existe o el cursor no corresponde a ese orden.
+    """
+    if orden not in ORDENES:
+        raise ValueError(f"Orden de listado desconocido: {orden}.")
+    if not cursor:
+        return None
+    clave = tuple(int(valor) for valor in cursor.split("."))
+    if len(clave) != ORDENES[orden]:
+        raise ValueError("El cursor no corresponde al orden del listado.")
+    return clave
+
+
+def normalizar_limite(limite: Optional[str]) -> int:
+    """
+    Interpreta el parámetro `limit` de una petición.
+
+    Parameters
+    ----------
+    limite : Optional[str]
+        Valor recibido en la URL.
+
+    Returns
+    -------
+    int
+        Número de tareas por página, entre 1 y LIMITE_MAXIMO. Si el valor falta o no es un
+        entero, se usa LIMITE_POR_DEFECTO.
+    """
+    try:
+        valor = int(limite)
+    except (TypeError, ValueError):
+        return LIMITE_POR_DEFECTO
+    return max(1, min(valor, LIMITE_MAXIMO))
@@ -0,0 +1,17 @@
+"""
+Configuración común de las pruebas
+==================================
+
+Añade al camino de importación la carpeta proyecto_web_tareas (paquetes gestor_de_tareas y
+benchmarks) y la raíz del repositorio (api_operaciones), como hacen los benchmarks.
+
+Ejemplo de ejecución (desde la carpeta proyecto_web_tareas):
+    $ python -m pytest -q
+"""
+
+import os
+import sys
+
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_PROYECTO)
+sys.path.insert(0, os.path.dirname(DIRECTORIO_PROYECTO))
@@ -0,0 +1,82 @@
+"""
+Pruebas del registro de cambios de la API
+=========================================
+
+`desde` devuelve lo que ha cambiado en los datos de un usuario después de una versión y None
+cuando parte de esos cambios ya se ha descartado del registro; GET /cambios responde entonces
+410 para que el cliente vuelva a cargar los datos.
+"""
+
+import pytest
+
+from gestor_de_tareas.almacenamiento.sqlite import ConexionesSQLite
+from gestor_de_tareas.almacenamiento.tablas import RegistroCambiosMemoria, RegistroCambiosSQLite
+
+CAPACIDAD = 5
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def registro(request, tmp_path):
+    """
+    Registro de cambios con capacidad para CAPACIDAD entradas, de cada implementación.
+    """
+    if request.param == "sqlite":
+        return RegistroCambiosSQLite(ConexionesSQLite(str(tmp_path / "api.db"), esquema=""), CAPACIDAD)
+    return RegistroCambiosMemoria(CAPACIDAD)
+
+
+def test_desde_devuelve_solo_los_cambios_del_usuario(registro):
+    """
+    Cada clave aparece una vez, en el orden de su último cambio, y no se mezclan usuarios.
+    """
+    registro.registrar("ana", [("tarea", "1")])
+    inicio = registro.version("ana")
+    registro.registrar("ana", [("tarea", "2"), ("proyecto", "P")])
+    registro.registrar("luis", [("tarea", "3")])
+    registro.registrar("ana", [("tarea", "2")])
+    assert registro.desde("ana", inicio) == (registro.version("ana"), [("proyecto", "P"), ("tarea", "2")])
+    assert registro.desde("ana", registro.version("ana")) == (registro.version("ana"), [])
+    assert registro.desde("luis", registro.version("luis")) == (registro.version("luis"), [])
+
+
+def test_desde_detecta_cambios_descartados(registro):
+    """
+    Si se han descartado entradas posteriores a la versión, también de otros usuarios,
+    `desde` devuelve None en lugar de una lista incompleta.
+    """
+    versiones = []
+    for i in range(CAPACIDAD * 2):
+        usuario = "ana" if i % 2 else "luis"
+        registro.registrar(usuario, [("tarea", str(i))])
+        versiones.append(registro.version(usuario))
+    # Quedan las CAPACIDAD últimas entradas: se conoce lo que cambió después de la anterior.
+    conservada = versiones[-CAPACIDAD - 1]
+    resultado = registro.desde("ana", conservada)
+    assert resultado is not None
+    assert resultado[1] == [("tarea", str(i)) for i in range(CAPACIDAD, CAPACIDAD * 2) if i % 2]
+    assert registro.desde("ana", conservada - 1) is None
+    assert registro.desde("luis", 0) is None
+
+
+def test_cambios_desde_responde_410(monkeypatch):
+    """
+    GET /cambios responde 410 con una versión descartada o de otra época, y 400 si no es una
+    versión.
+    """
+    import api_operaciones as operaciones
+
+    monkeypatch.setattr(operaciones, "registro", RegistroCambiosMemoria(CAPACIDAD))
+    usuario = "prueba_cambios"
+    inicial = operaciones.version_usuario(usuario)
+    for i in range(CAPACIDAD):
+        operaciones.crear_tarea(usuario, f"Tarea {i}", "")
+    intermedia = operaciones.version_usuario(usuario)
+    operaciones.crear_tarea(usuario, "Última", "")
+
+    assert operaciones.cambios_desde(usuario, inicial)[1] == 410
+    assert operaciones.cambios_desde(usuario, "otraepoca" + intermedia[intermedia.index("."):])[1] == 410
+    assert operaciones.cambios_desde(usuario, "no-es-una-version")[1] == 400
+    cambios, codigo = operaciones.cambios_desde(usuario, intermedia)
+    assert codigo == 200
+    assert cambios["version"] == operaciones.version_usuario(usuario)
+    assert [tarea["name"] for tarea in cambios["tareas"].values()] == ["Última"]
@@ -0,0 +1,40 @@
+"""
+Prueba de carga con hilos
+=========================
+
+Versión corta de benchmarks/bench_concurrencia.py: varios hilos modifican y consultan
+GestorDeTareas, y crean y borran tareas a través de api.py, y al terminar no puede haberse
+incumplido ningún invariante (IDs repetidos, índices desincronizados, consultas fallidas).
+"""
+
+import sys
+
+import pytest
+
+from benchmarks import bench_concurrencia
+
+
+@pytest.fixture(autouse=True)
+def entrelazar(monkeypatch):
+    """
+    Reduce las operaciones por hilo y el intervalo de cambio de hilo, como `main`.
+    """
+    monkeypatch.setattr(bench_concurrencia, "OPERACIONES", 300)
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(intervalo)
+
+
+def test_gestor_desde_varios_hilos():
+    """
+    Los índices, los IDs y los eventos del gestor son correctos tras la carga.
+    """
+    assert bench_concurrencia.probar_gestor() == []
+
+
+def test_api_desde_varios_hilos():
+    """
+    api.py no repite IDs ni falla consultas al crear y borrar tareas desde varios hilos.
+    """
+    assert bench_concurrencia.probar_api() == []
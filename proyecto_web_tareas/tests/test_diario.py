@@ -0,0 +1,144 @@
+"""
+Pruebas de la recuperación con DiarioPersistente
+================================================
+
+Tras cerrar el diario (o perder la última línea por un corte a mitad de escritura), volver a
+abrir el directorio de datos debe reconstruir las mismas tareas y proyectos, con la
+instantánea cargada entera o bajo demanda.
+"""
+
+import os
+import random
+
+import pytest
+
+from gestor_de_tareas.almacenamiento.diario import DiarioPersistente
+from gestor_de_tareas.clases.tarea import EstadoTarea
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas
+from gestor_de_tareas.gestores.proyectos import GestorProyectos
+
+PROYECTOS = ("P", "Q")
+
+
+def abrir(directorio, carga_perezosa, eventos_por_instantanea=10_000):
+    """
+    Crea los gestores y los conecta a un diario sobre `directorio`.
+    """
+    gestor, proyectos = GestorDeTareas(), GestorProyectos()
+    diario = DiarioPersistente(str(directorio), eventos_por_instantanea=eventos_por_instantanea,
+                               carga_perezosa=carga_perezosa)
+    diario.conectar(gestor, proyectos)
+    return gestor, proyectos, diario
+
+
+def estado(gestor, proyectos):
+    """
+    Resume las tareas y los proyectos, sin las tareas eliminadas que siguen en un proyecto.
+    """
+    return ([tarea.a_dict() for tarea in gestor.listar_tareas()], gestor.contador_id,
+            {nombre: [t.id_tarea for t in proyecto.tareas if t.id_tarea in gestor.tareas]
+             for nombre, proyecto in proyectos.proyectos.items()})
+
+
+def modificar(gestor, proyectos, azar, veces):
+    """
+    Hace `veces` modificaciones aleatorias de tareas y proyectos.
+    """
+    for i in range(veces):
+        id_tarea = azar.randrange(1, gestor.contador_id + 1)
+        operacion = azar.random()
+        if operacion < 0.4:
+            gestor.crear_tarea(f"Tarea {i}", "", f"2030-01-{azar.randint(1, 28):02d}", azar.randint(1, 3),
+                               ["bug"], "ana")
+        elif operacion < 0.55:
+            gestor.cambiar_estado_tarea(id_tarea, azar.choice(list(EstadoTarea)))
+        elif operacion < 0.65:
+            gestor.modificar_tarea(id_tarea, titulo=f"Modificada {i}")
+        elif operacion < 0.75:
+            gestor.eliminar_tarea(id_tarea)
+        elif operacion < 0.8:
+            proyectos.crear_proyecto(azar.choice(PROYECTOS))
+        elif operacion < 0.82:
+            proyectos.borrar_proyecto(azar.choice(PROYECTOS))
+        else:
+            nombre, tarea = azar.choice(PROYECTOS), gestor.obtener_por_id(id_tarea)
+            if tarea is not None and nombre in proyectos.proyectos:
+                proyectos.agregar_tarea_a_proyecto(nombre, tarea)
+
+
+@pytest.mark.parametrize("carga_perezosa", [False, True])
+def test_recuperar_con_linea_cortada(tmp_path, carga_perezosa):
+    """
+    Una última línea incompleta se descarta y el diario sigue admitiendo registros.
+    """
+    azar = random.Random(1)
+    gestor, proyectos, diario = abrir(tmp_path, carga_perezosa)
+    modificar(gestor, proyectos, azar, 100)
+    diario.compactar()
+    for _ in range(3):
+        modificar(gestor, proyectos, azar, 120)
+        esperado = estado(gestor, proyectos)
+        diario.cerrar()
+        with open(tmp_path / DiarioPersistente.ARCHIVO_DIARIO, "ab") as archivo:
+            archivo.write(b'{"op": "tarea", "tarea": {"id_ta')
+        gestor, proyectos, diario = abrir(tmp_path, carga_perezosa)
+        assert estado(gestor, proyectos) == esperado
+    diario.cerrar()
+
+
+@pytest.mark.parametrize("carga_perezosa", [False, True])
+def test_recuperar_tras_compactaciones_en_segundo_plano(tmp_path, carga_perezosa):
+    """
+    Con compactaciones en segundo plano durante las modificaciones no se pierde ningún cambio.
+    """
+    azar = random.Random(3)
+    gestor, proyectos, diario = abrir(tmp_path, carga_perezosa, eventos_por_instantanea=50)
+    for _ in range(3):
+        modificar(gestor, proyectos, azar, 200)
+        esperado = estado(gestor, proyectos)
+        diario.cerrar()
+        gestor, proyectos, diario = abrir(tmp_path, carga_perezosa, eventos_por_instantanea=50)
+        assert estado(gestor, proyectos) == esperado
+    diario.cerrar()
+
+
+@pytest.mark.parametrize("carga_perezosa", [False, True])
+def test_recuperar_compactacion_sin_terminar(tmp_path, carga_perezosa):
+    """
+    Si un corte deja el diario anterior a una compactación (con la última línea cortada),
+    se reaplica antes que el diario nuevo.
+    """
+    azar = random.Random(2)
+    gestor, proyectos, diario = abrir(tmp_path, carga_perezosa)
+    modificar(gestor, proyectos, azar, 120)
+    diario.compactar()
+    modificar(gestor, proyectos, azar, 30)
+    esperado = estado(gestor, proyectos)
+    diario.cerrar()
+    # Así queda el directorio si el proceso termina mientras se escribe la instantánea.
+    os.replace(tmp_path / DiarioPersistente.ARCHIVO_DIARIO, tmp_path / DiarioPersistente.ARCHIVO_DIARIO_ANTERIOR)
+    with open(tmp_path / DiarioPersistente.ARCHIVO_DIARIO_ANTERIOR, "ab") as archivo:
+        archivo.write(b'{"op": "elimin')
+    gestor, proyectos, diario = abrir(tmp_path, carga_perezosa)
+    assert estado(gestor, proyectos) == esperado
+    modificar(gestor, proyectos, azar, 30)
+    esperado = estado(gestor, proyectos)
+    diario.compactar()
+    diario.cerrar()
+    assert not os.path.exists(tmp_path / DiarioPersistente.ARCHIVO_DIARIO_ANTERIOR)
+    gestor, proyectos, diario = abrir(tmp_path, carga_perezosa)
+    assert estado(gestor, proyectos) == esperado
+    diario.cerrar()
+
+
+def test_recuperar_sin_mensajes(tmp_path, capsys):
+    """
+    Reaplicar el diario no repite los mensajes de las operaciones.
+    """
+    gestor, proyectos, diario = abrir(tmp_path, False)
+    modificar(gestor, proyectos, random.Random(4), 100)
+    diario.cerrar()
+    capsys.readouterr()
+    gestor, proyectos, diario = abrir(tmp_path, False)
+    diario.cerrar()
+    assert capsys.readouterr().out == ""
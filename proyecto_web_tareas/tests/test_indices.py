@@ -0,0 +1,142 @@
+"""
+Pruebas de los índices secundarios de GestorDeTareas
+====================================================
+
+Tras crear, cambiar de estado, modificar, asignar, restaurar y eliminar tareas, los filtros,
+las consultas ordenadas y los contadores de los proyectos deben coincidir con lo que se
+obtiene recorriendo todas las tareas.
+"""
+
+import random
+from datetime import date
+
+import pytest
+
+from gestor_de_tareas.clases.tarea import EstadoTarea, Tarea
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas, _clave_prioridad
+from gestor_de_tareas.gestores.proyectos import GestorProyectos
+
+ETIQUETAS = ("backend", "frontend", "bug")
+USUARIOS = ("ana", "luis")
+HOY = date(2030, 1, 15)
+
+
+def comprobar(gestor):
+    """
+    Compara cada consulta indexada con el resultado de recorrer las tareas.
+    """
+    tareas = list(gestor.tareas.values())
+    assert [tarea.id_tarea for tarea in gestor.listar_tareas()] == sorted(gestor.tareas)
+    assert list(gestor._por_id) == sorted(gestor.tareas)
+    for estado in EstadoTarea:
+        assert gestor.filtrar_por_estado(estado) == [t for t in tareas if t.estado == estado]
+    for usuario in USUARIOS:
+        assert gestor.filtrar_por_usuario(usuario) == [t for t in tareas if t.usuario_asignado == usuario]
+        assert gestor.consultar(EstadoTarea.PENDIENTE, usuario) == [
+            t for t in tareas if t.usuario_asignado == usuario and t.estado == EstadoTarea.PENDIENTE]
+    for etiqueta in ETIQUETAS:
+        assert gestor.filtrar_por_etiqueta(etiqueta) == [t for t in tareas if etiqueta in t.etiquetas]
+    assert gestor.ordenar_por_prioridad() == sorted(tareas, key=_clave_prioridad)
+    for estado in EstadoTarea:
+        esperadas = sorted((t for t in tareas if t.estado == estado), key=_clave_prioridad)
+        assert gestor.mas_urgentes(len(tareas) + 1, estado) == esperadas
+    abiertas = [t for t in tareas if t.estado != EstadoTarea.COMPLETADA and t.fecha_limite and t.fecha_limite < HOY]
+    vencidas = sorted(abiertas, key=lambda t: (t.fecha_limite, t.id_tarea))
+    assert gestor.vencidas(HOY) == vencidas
+    assert gestor.vencidas(HOY, 5) == vencidas[:5]
+    estados = (EstadoTarea.PENDIENTE, EstadoTarea.EN_PROGRESO)
+    proximas = sorted((t for t in tareas if t.estado in estados and t.fecha_limite and HOY <= t.fecha_limite),
+                      key=lambda t: (t.fecha_limite, t.id_tarea))
+    assert gestor.vencen_entre(HOY, date(2030, 1, 31), estados) == proximas
+    assert gestor.vencen_entre(HOY, date(2030, 1, 31), estados, 5) == proximas[:5]
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_indices_tras_modificaciones(semilla):
+    """
+    Los índices siguen a las tareas tras una secuencia aleatoria de modificaciones.
+    """
+    azar = random.Random(semilla)
+    gestor = GestorDeTareas()
+    for i in range(300):
+        id_tarea = azar.randrange(1, gestor.contador_id + 1)
+        operacion = azar.random()
+        if operacion < 0.35:
+            gestor.crear_tarea(f"Tarea {i}", "", f"2030-01-{azar.randint(1, 28):02d}", azar.randint(1, 3),
+                               [azar.choice(ETIQUETAS)], azar.choice(USUARIOS + (None,)))
+        elif operacion < 0.55:
+            gestor.cambiar_estado_tarea(id_tarea, azar.choice(list(EstadoTarea)))
+        elif operacion < 0.65:
+            gestor.modificar_tarea(id_tarea, prioridad=azar.randint(1, 3), etiquetas=[azar.choice(ETIQUETAS)])
+        elif operacion < 0.75:
+            gestor.asignar_usuario_tarea(id_tarea, azar.choice(USUARIOS))
+        elif operacion < 0.9:
+            gestor.eliminar_tarea(id_tarea)
+        else:
+            gestor.eliminar_tareas(range(id_tarea, id_tarea + 3))
+    comprobar(gestor)
+
+
+def test_crear_tarea_solo_captura_errores_de_fecha():
+    """
+    Una fecha mal formateada no crea la tarea; un error posterior no se confunde con ella.
+    """
+    gestor = GestorDeTareas()
+    assert gestor.crear_tarea("Mala fecha", fecha_limite_str="2030-13-45") is None
+    assert gestor.contador_id == 1 and not gestor.tareas
+
+    def fallar(tipo, datos):
+        raise ValueError("fallo del suscriptor")
+
+    gestor.suscribir(fallar)
+    with pytest.raises(ValueError, match="suscriptor"):
+        gestor.crear_tarea("Creada", etiquetas=["bug"])
+    assert gestor.contador_id == 2
+    comprobar(gestor)
+
+
+def test_restaurar_id_menor_conserva_el_orden():
+    """
+    Restaurar una tarea eliminada con un ID menor que otros no altera el orden por ID.
+    """
+    gestor = GestorDeTareas()
+    for i in range(5):
+        gestor.crear_tarea(f"Tarea {i}", etiquetas=["bug"], usuario_asignado="ana")
+    gestor.eliminar_tarea(2)
+    gestor.restaurar_tarea(Tarea(2, "Restaurada", "", None, 1, ["bug"], "ana"))
+    gestor.restaurar_tarea(Tarea(4, "Sustituida", "", None, 3, ["backend"], "luis"))
+    assert [tarea.id_tarea for tarea in gestor.listar_tareas()] == [1, 2, 3, 4, 5]
+    assert gestor.obtener_por_id(4).titulo == "Sustituida"
+    assert gestor.contador_id == 6
+    comprobar(gestor)
+
+
+def test_conteo_de_proyectos_sigue_a_las_tareas():
+    """
+    Los contadores por estado de los proyectos coinciden con sus tareas tras cambiar de
+    estado, restaurar, quitar y eliminar tareas.
+    """
+    azar = random.Random(0)
+    gestor = GestorDeTareas()
+    proyectos = GestorProyectos(gestor_tareas=gestor)
+    for nombre in ("P", "Q"):
+        proyectos.crear_proyecto(nombre)
+    for i in range(60):
+        tarea = gestor.crear_tarea(f"Tarea {i}")
+        for nombre in azar.sample(("P", "Q"), azar.randint(0, 2)):
+            proyectos.agregar_tarea_a_proyecto(nombre, tarea)
+    for _ in range(200):
+        id_tarea = azar.randrange(1, gestor.contador_id)
+        operacion = azar.random()
+        if operacion < 0.6:
+            gestor.cambiar_estado_tarea(id_tarea, azar.choice(list(EstadoTarea)))
+        elif operacion < 0.7 and id_tarea in gestor.tareas:
+            anterior = gestor.tareas[id_tarea]
+            gestor.restaurar_tarea(Tarea(id_tarea, anterior.titulo, "", None, 2))
+        elif operacion < 0.85:
+            proyectos.quitar_tarea_de_proyecto(azar.choice(("P", "Q")), id_tarea)
+        else:
+            gestor.eliminar_tarea(id_tarea)
+    for nombre, conteo in proyectos.conteo_de_proyectos().items():
+        tareas = [gestor.tareas[tarea.id_tarea] for tarea in proyectos.proyectos[nombre].tareas]
+        assert conteo == {estado: sum(t.estado == estado for t in tareas) for estado in EstadoTarea}
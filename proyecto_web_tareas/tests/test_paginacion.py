@@ -0,0 +1,102 @@
+"""
+Pruebas de la paginación por cursor
+===================================
+
+Si se eliminan tareas entre una página y la siguiente (incluida la última tarea de la página,
+que da el cursor), las tareas que quedan no se saltan ni se repiten y siguen en orden.
+"""
+
+import random
+
+import pytest
+
+from gestor_de_tareas.gestores.gestor_tareas import GestorDeTareas, _clave_prioridad
+from gestor_de_tareas.gestores.proyectos import GestorProyectos
+
+LIMITE = 7
+
+
+def recorrer_eliminando(paginar, eliminar, azar):
+    """
+    Pide páginas hasta la última y tras cada una elimina la última tarea de la página y
+    algunas de las siguientes.
+
+    Returns
+    -------
+    tuple
+        (tareas recibidas en orden, IDs eliminados antes de poder recibirse).
+    """
+    recibidas, eliminadas, cursor = [], set(), None
+    while True:
+        pagina, cursor = paginar(cursor)
+        assert len(pagina) <= LIMITE
+        recibidas.extend(pagina)
+        if cursor is None:
+            return recibidas, eliminadas
+        eliminar(pagina[-1].id_tarea)
+        for id_tarea in azar.sample(range(1, 121), 4):
+            if id_tarea not in {tarea.id_tarea for tarea in recibidas} and eliminar(id_tarea):
+                eliminadas.add(id_tarea)
+
+
+@pytest.mark.parametrize("orden", ["id", "prioridad"])
+def test_paginar_tareas_con_eliminaciones(orden):
+    """
+    `GestorDeTareas.paginar` continúa tras el cursor aunque su tarea ya no exista.
+    """
+    azar = random.Random(orden)
+    gestor = GestorDeTareas()
+    for i in range(120):
+        gestor.crear_tarea(f"Tarea {i}", "", f"2030-01-{azar.randint(1, 28):02d}", azar.randint(1, 3),
+                           usuario_asignado="ana" if i % 3 else "luis")
+    todas = {id_tarea: tarea for id_tarea, tarea in gestor.tareas.items() if tarea.usuario_asignado == "ana"}
+
+    recibidas, eliminadas = recorrer_eliminando(
+        lambda cursor: gestor.paginar(LIMITE, cursor, orden, usuario="ana"), gestor.eliminar_tarea, azar)
+
+    clave = (lambda tarea: tarea.id_tarea) if orden == "id" else _clave_prioridad
+    assert recibidas == sorted(recibidas, key=clave)
+    assert len({tarea.id_tarea for tarea in recibidas}) == len(recibidas)
+    assert {tarea.id_tarea for tarea in recibidas} == set(todas) - eliminadas
+
+
+def test_paginar_tras_eliminar_casi_todas():
+    """
+    Tras eliminar un tramo largo de IDs, las páginas siguientes siguen completas y en orden.
+    """
+    gestor = GestorDeTareas()
+    gestor.crear_tareas({"titulo": f"Tarea {i}"} for i in range(2_000))
+    gestor.eliminar_tareas(range(10, 1_990))
+    pagina, cursor = gestor.paginar(LIMITE)
+    recibidas = list(pagina)
+    while cursor is not None:
+        pagina, cursor = gestor.paginar(LIMITE, cursor)
+        recibidas.extend(pagina)
+    assert [tarea.id_tarea for tarea in recibidas] == list(range(1, 10)) + list(range(1_990, 2_001))
+
+
+def test_paginar_tareas_de_proyecto_con_eliminaciones():
+    """
+    `Proyecto.paginar_tareas` continúa por orden de inserción aunque se quiten tareas.
+    """
+    azar = random.Random(0)
+    gestor = GestorDeTareas()
+    proyectos = GestorProyectos(gestor_tareas=gestor)
+    proyectos.crear_proyecto("P")
+    for i in range(120):
+        gestor.crear_tarea(f"Tarea {i}")
+    orden = azar.sample(range(1, 121), 120)
+    for id_tarea in orden:
+        proyectos.agregar_tarea_a_proyecto("P", gestor.obtener_por_id(id_tarea))
+    proyecto = proyectos.proyectos["P"]
+
+    def quitar(id_tarea):
+        # La mitad se quitan del proyecto y la otra mitad se eliminan del gestor.
+        if id_tarea % 2:
+            return proyectos.quitar_tarea_de_proyecto("P", id_tarea)
+        return gestor.eliminar_tarea(id_tarea)
+
+    recibidas, eliminadas = recorrer_eliminando(lambda cursor: proyecto.paginar_tareas(LIMITE, cursor),
+                                                quitar, azar)
+
+    assert [tarea.id_tarea for tarea in recibidas] == [id_tarea for id_tarea in orden if id_tarea not in eliminadas]